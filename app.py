@@ -1,12 +1,32 @@
+import time
+SCRIPT_STARTED = time.perf_counter()  # before the imports, so the run profile includes them
+
 import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
+import json
 import math
-from datetime import datetime, timedelta
+import uuid
+from collections import deque
+from datetime import date, datetime, timedelta
 import numpy as np
 
+from dc_estimator import STUDIES_DATA, Phase, QuoteConfig
+from dc_estimator.cache import cached_figure, cached_table, memoized_costs, quote_key, results_cache
+from dc_estimator.cashflow import default_phase_dates, project_cashflow
+from dc_estimator.export import EXPORT_FORMATS, submit_export
+from dc_estimator.goalseek import cost_coefficients, max_load_for_buses, priced_buses
+from dc_estimator.graph import QuoteGraph
+from dc_estimator.history import client_key, default_history, format_timestamp
+from dc_estimator.montecarlo import DISTRIBUTIONS, Distribution, simulate_costs
+from dc_estimator.profiling import ProfileSummary, RunProfile, export_profile
+from dc_estimator.ratecard import card_label, default_rate_cards
+from dc_estimator.scenarios import ScenarioWorkspace
+from dc_estimator.sensitivity import sensitivity_analysis
+from dc_estimator.topology import file_digest, summarize_topology
+
 # Page configuration
 st.set_page_config(
     page_title="Enhanced DC Cost Estimator v2.0 | Abhishek Diwanji",
@@ -15,103 +35,34 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Per-stage timings of this run, for the optional performance panel at the bottom
+profile = st.session_state['run_profile'] = RunProfile(started=SCRIPT_STARTED)
+profile.add_time("imports & page config", time.perf_counter() - SCRIPT_STARTED)
+PROFILE_HISTORY = 20  # recent runs kept per session
+GRAPH_NODES_SHOWN = 30  # recomputed graph nodes listed in the profile panel
+PHASE_EXPANDER_LIMIT = 10  # more phases than this always render as one table
+
+
+def html_block(name, html):
+    # Large HTML blocks go through here so their payload size shows up in the profile
+    st.markdown(st.session_state['run_profile'].payload(name, html), unsafe_allow_html=True)
+
+
+def finish_profile(run_profile):
+    run_profile.finish()
+    record = export_profile(run_profile)
+    st.session_state.setdefault('run_profiles', deque(maxlen=PROFILE_HISTORY)).appendleft(ProfileSummary(record))
+
+
+profile.start("css & header")
+
 # Professional CSS (keeping the successful styling from Perplexity Labs)
-st.markdown("""
-<style>
-    @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700;800&display=swap');
-    
-    .stApp {
-        background: linear-gradient(135deg, #0a0e27 0%, #1a1a2e 50%, #16213e 100%);
-        font-family: 'Inter', sans-serif;
-        color: #e2e8f0;
-    }
-    
-    .main-header {
-        background: linear-gradient(135deg, #00d4aa 0%, #00a8ff 50%, #0078ff 100%);
-        padding: 2.5rem;
-        border-radius: 16px;
-        color: white;
-        text-align: center;
-        margin-bottom: 2rem;
-        box-shadow: 0 20px 40px rgba(0, 212, 170, 0.3);
-    }
-    
-    .enhanced-badge {
-        background: linear-gradient(135deg, #ff6b6b 0%, #feca57 100%);
-        padding: 0.5rem 1rem;
-        border-radius: 20px;
-        font-size: 0.8rem;
-        font-weight: bold;
-        color: white;
-        display: inline-block;
-        margin: 0.5rem;
-    }
-    
-    .pricing-comparison {
-        display: grid;
-        grid-template-columns: 1fr 1fr;
-        gap: 2rem;
-        margin: 2rem 0;
-    }
-    
-    .pricing-card {
-        background: linear-gradient(135deg, rgba(0, 212, 170, 0.1), rgba(0, 168, 255, 0.1));
-        border: 2px solid rgba(0, 212, 170, 0.3);
-        border-radius: 20px;
-        padding: 2rem;
-        text-align: center;
-        transition: all 0.3s ease;
-    }
-    
-    .pricing-card.competitive {
-        background: linear-gradient(135deg, rgba(255, 107, 107, 0.1), rgba(254, 202, 87, 0.1));
-        border-color: rgba(255, 107, 107, 0.3);
-    }
-    
-    .pricing-card:hover {
-        transform: translateY(-5px);
-        box-shadow: 0 15px 35px rgba(0, 212, 170, 0.2);
-    }
-    
-    .factor-section {
-        background: rgba(255,255,255,0.05);
-        border-radius: 12px;
-        padding: 1.5rem;
-        margin: 1rem 0;
-        border-left: 4px solid #00d4aa;
-    }
-    
-    .study-card {
-        background: linear-gradient(135deg, rgba(255,255,255,0.06), rgba(255,255,255,0.02));
-        backdrop-filter: blur(12px);
-        border: 1px solid rgba(100, 116, 139, 0.2);
-        border-radius: 16px;
-        padding: 2rem;
-        margin: 1.5rem 0;
-        transition: all 0.3s ease;
-    }
-    
-    .phase-section {
-        background: linear-gradient(135deg, rgba(0, 168, 255, 0.1), rgba(0, 212, 170, 0.1));
-        border: 1px solid rgba(0, 168, 255, 0.3);
-        border-radius: 12px;
-        padding: 1.5rem;
-        margin: 1rem 0;
-    }
-    
-    .savings-highlight {
-        background: linear-gradient(135deg, rgba(254, 202, 87, 0.2), rgba(255, 107, 107, 0.2));
-        border: 2px solid rgba(254, 202, 87, 0.4);
-        border-radius: 12px;
-        padding: 1.5rem;
-        text-align: center;
-        margin: 2rem 0;
-    }
-</style>
-""", unsafe_allow_html=True)
+# The stylesheet is served from static/ (enableStaticServing in .streamlit/config.toml), so each
+# rerun sends only this link and the browser fetches the CSS once per session
+html_block('css', '<link rel="stylesheet" href="app/static/estimator.css">')
 
 # Enhanced Header
-st.markdown("""
+html_block('header', """
 <div class="main-header">
     <h1>⚡ Enhanced DC Project Cost Estimator v2.0</h1>
     <h2>Advanced Competitive Pricing & Phase-wise Calculation</h2>
@@ -119,11 +70,34 @@ st.markdown("""
     <div class="enhanced-badge">NEW: Dynamic Reporting Costs</div>
     <div class="enhanced-badge">NEW: Phase-wise Methodology</div>
 </div>
-""", unsafe_allow_html=True)
+""")
+
+profile.stop()
 
 # Enhanced Sidebar Configuration
+profile.start("sidebar")
 st.sidebar.header("🔧 Enhanced Project Configuration")
 
+# NEW: Client lookup against the quote history
+st.sidebar.subheader("👤 Client")
+client_name = st.sidebar.text_input("Client Name", placeholder="Saved with every quote")
+# Quotes are saved on every priced rerun; tagging them with the session keeps
+# an estimator's own what-ifs from making a new prospect look like a returning client
+history_session = st.session_state.setdefault('history_session', uuid.uuid4().hex)
+if client_name.strip():
+    with profile.stage("client lookup"):
+        client_profile = default_history().client_profile(client_name, exclude_session=history_session)
+    # Pre-fill the discounts once per client; the toggles stay editable afterwards
+    if st.session_state.get('history_client') != client_key(client_name):
+        st.session_state['history_client'] = client_key(client_name)
+        st.session_state['repeat_customer'] = client_profile.repeat_customer
+        st.session_state['etap_model_available'] = client_profile.etap_model_available
+    if client_profile.quotes:
+        st.sidebar.info(f"Returning client: {client_profile.quotes:,} earlier quote(s), "
+                        f"last on {format_timestamp(client_profile.last_quoted)}")
+    else:
+        st.sidebar.caption("New client: no earlier quotes")
+
 # Core Load Parameters (from successful Perplexity model)
 st.sidebar.subheader("⚡ Load Parameters")
 it_capacity = st.sidebar.number_input("IT Capacity (MW)", min_value=0.1, max_value=200.0, value=15.0, step=0.1)
@@ -139,6 +113,35 @@ if use_custom_bus:
 else:
     custom_bus_count = None
 
+# NEW: Bus count from an existing ETAP model's bus/branch export
+topology_file = st.sidebar.file_uploader("ETAP Bus/Branch Export", type=["csv", "xml"],
+                                         help="Counts buses by voltage level and equipment type from the model")
+topology = None
+if topology_file is not None:
+    with profile.stage("topology import"):
+        # Hash each upload once per session; the parsed summary is shared by content hash
+        digests = st.session_state.setdefault('topology_digests', {})
+        if topology_file.file_id not in digests:
+            digests[topology_file.file_id] = file_digest(topology_file)
+        try:
+            topology = summarize_topology(topology_file, digest=digests[topology_file.file_id])
+        except ValueError as error:
+            st.sidebar.error(f"⚠️ {error}")
+if topology is not None:
+    st.sidebar.caption(f"{topology.buses:,} buses · {len(topology.buses_by_voltage)} voltage level(s) · "
+                       f"{topology.protective_devices:,} protective devices · {topology.elements:,} elements")
+    with st.sidebar.expander("Imported topology"):
+        st.dataframe(pd.DataFrame(topology.voltage_levels(), columns=["Voltage", "Buses"]),
+                     hide_index=True, width='stretch')
+        st.dataframe(pd.DataFrame(list(topology.equipment.items()), columns=["Equipment", "Count"]),
+                     hide_index=True, width='stretch')
+        st.dataframe(pd.DataFrame([(STUDIES_DATA[key]['name'], count) for key, count in topology.study_counts().items()],
+                                  columns=["Study", "Elements"]),
+                     hide_index=True, width='stretch')
+    if custom_bus_count is None:
+        custom_bus_count = topology.buses
+        st.sidebar.info("Using the imported model's bus count instead of the load-based estimate")
+
 # Project Configuration
 st.sidebar.subheader("🏗️ Project Configuration")
 tier_level = st.sidebar.selectbox("Tier Level", ["Tier I", "Tier II", "Tier III", "Tier IV"], index=2)
@@ -155,20 +158,69 @@ if client_type == "Premium":
 else:
     premium_factor = 1.0
 
-# Phase-wise Configuration (NEW)
+# Rate card: defaults to the one in force today; older cards reprice past quotes
+rate_cards = {card.version: card for card in default_rate_cards().choices()}
+rate_card_version = st.sidebar.selectbox(
+    "Rate Card", list(rate_cards), index=list(rate_cards).index(default_rate_cards().in_force().version),
+    format_func=lambda version: card_label(rate_cards[version]),
+    help="Labor rates and technical factors used for this quote"
+)
+
+# Phase-wise Configuration (NEW): an editable table scales to hundreds of phases
+phases = []
 if calculation_methodology == "Phase-wise":
     st.sidebar.subheader("📊 Phase-wise Configuration")
-    num_phases = st.sidebar.slider("Number of Phases", 1, 5, 2, 1)
-    
-    phases = []
-    for i in range(num_phases):
-        st.sidebar.write(f"**Phase {i+1}:**")
-        phase_name = st.sidebar.text_input(f"Phase {i+1} Name", value=f"Phase {i+1}", key=f"phase_name_{i}")
-        phase_capacity = st.sidebar.number_input(f"Phase {i+1} Capacity (MW)", 
-                                                min_value=0.1, max_value=100.0, 
-                                                value=round((it_capacity + mechanical_load + house_load)/num_phases, 1), 
-                                                step=0.1, key=f"phase_cap_{i}")
-        phases.append({"name": phase_name, "capacity": phase_capacity})
+    num_phases = st.sidebar.number_input("Number of Phases", min_value=1, max_value=500, value=2, step=1)
+
+    # Reseed the table only when the phase count changes, so edits survive load changes
+    if st.session_state.get('phase_table_count') != num_phases:
+        st.session_state['phase_table_count'] = num_phases
+        # Back-to-back quarters from the first of next month, for the cash-flow projection
+        next_month = (date.today().replace(day=1) + timedelta(days=32)).replace(day=1)
+        phase_capacity = round((it_capacity + mechanical_load + house_load)/num_phases, 1)
+
+        def build_phase_seed():
+            phase_dates = default_phase_dates(num_phases, next_month)
+            return pd.DataFrame({
+                'Name': [f"Phase {i+1}" for i in range(num_phases)],
+                'Capacity (MW)': [phase_capacity] * num_phases,
+                'Bus Override': pd.array([None] * num_phases, dtype="Int64"),
+                'Start': [start for start, _ in phase_dates],
+                'End': [end for _, end in phase_dates],
+            })
+
+        # The editor never modifies its seed, so sessions with the same defaults share one frame
+        st.session_state['phase_table_seed'] = cached_table(('phase seed', num_phases, phase_capacity, next_month),
+                                                            build_phase_seed)
+
+    phase_table = st.sidebar.data_editor(
+        st.session_state['phase_table_seed'],
+        key="phase_table",
+        num_rows="dynamic",
+        hide_index=True,
+        width='stretch',
+        column_config={
+            'Name': st.column_config.TextColumn("Name"),
+            'Capacity (MW)': st.column_config.NumberColumn("Capacity (MW)", min_value=0.1, max_value=100.0, step=0.1, format="%.1f"),
+            'Bus Override': st.column_config.NumberColumn("Bus Override", min_value=1, max_value=100000, step=1,
+                                                          help="Leave blank to estimate buses from capacity and tier"),
+            'Start': st.column_config.DateColumn("Start", format="YYYY-MM-DD"),
+            'End': st.column_config.DateColumn("End", format="YYYY-MM-DD"),
+        },
+    )
+
+    for i, row in enumerate(phase_table.itertuples(index=False)):
+        name, capacity, bus_override, start, end = row
+        if pd.isna(capacity):
+            continue
+        start = None if pd.isna(start) else pd.Timestamp(start).date()
+        end = None if pd.isna(end) else pd.Timestamp(end).date()
+        phases.append({"name": name if isinstance(name, str) and name.strip() else f"Phase {i+1}",
+                       "capacity": float(capacity),
+                       "bus_override": None if pd.isna(bus_override) else int(bus_override),
+                       # An end before the start is treated as undated rather than failing the quote
+                       "start": start, "end": end if start is None or end is None or end >= start else None})
+    st.sidebar.caption(f"{len(phases)} phases · {sum(phase['capacity'] for phase in phases):,.1f} MW")
 
 # Studies Selection with Enhanced Configuration
 st.sidebar.subheader("📋 Studies Configuration")
@@ -192,473 +244,897 @@ base_report_costs = {
 report_format = st.sidebar.selectbox("Report Format", ["Basic", "Detailed", "Comprehensive"], index=1)
 report_complexity_factor = st.sidebar.slider("Study Complexity Factor for Reports", 0.5, 2.0, 1.0, 0.1)
 
+# NEW: Monte Carlo Uncertainty Simulation
+st.sidebar.subheader("🎲 Uncertainty Simulation")
+simulation_enabled = st.sidebar.toggle("Simulate Cost Uncertainty", value=False)
+if simulation_enabled:
+    simulation_distribution = st.sidebar.selectbox("Distribution", DISTRIBUTIONS)
+    hours_spread = st.sidebar.slider("Hours per Bus Spread (±)", 0.0, 0.5, 0.2, 0.05)
+    rate_spread = st.sidebar.slider("L1/L2/L3 Rate Spread (±)", 0.0, 0.5, 0.1, 0.05)
+    bus_spread = st.sidebar.slider("Tier Bus Multiplier Spread (±)", 0.0, 0.5, 0.1, 0.05)
+    simulation_samples = st.sidebar.select_slider("Samples", options=[10000, 50000, 100000, 250000], value=100000)
+
+# NEW: Display
+st.sidebar.subheader("🖥️ Display")
+compact_view = st.sidebar.toggle("Compact Breakdown Tables", value=False,
+                                 help="Study and phase breakdowns as one scrollable table, with details for the "
+                                      f"selected row only. Always used above {PHASE_EXPANDER_LIMIT} phases.")
+
+# NEW: Diagnostics
+st.sidebar.subheader("🛠️ Diagnostics")
+show_profile = st.sidebar.toggle("Show Performance Profile", value=False,
+                                 help="Per-stage timings and HTML payload sizes of each rerun")
+
+# Sidebar values for the fragments below. Sidebar widgets can only live in the
+# full script run, so they are snapshotted into session state for the fragments.
+st.session_state['client_name'] = client_name.strip()
+st.session_state['compact_view'] = compact_view
+st.session_state['sidebar_inputs'] = {
+    'it_capacity': it_capacity,
+    'mechanical_load': mechanical_load,
+    'house_load': house_load,
+    'custom_bus_count': custom_bus_count,
+    'tier_level': tier_level,
+    'delivery_type': delivery_type,
+    'project_type': project_type,
+    'calculation_methodology': calculation_methodology,
+    'client_type': client_type,
+    'premium_factor': premium_factor,
+    'phases': tuple(Phase(phase['name'], phase['capacity'], phase['bus_override'], phase['start'], phase['end'])
+                    for phase in phases),
+    'selected_studies': tuple(study_key for study_key, selected in studies_config.items() if selected),
+    'base_report_costs': base_report_costs,
+    'report_format': report_format,
+    'report_complexity_factor': report_complexity_factor,
+    'rate_card': rate_cards[rate_card_version],
+}
+st.session_state['simulation_settings'] = {
+    'samples': simulation_samples,
+    'distribution': simulation_distribution,
+    'hours_spread': hours_spread,
+    'rate_spread': rate_spread,
+    'bus_spread': bus_spread,
+} if simulation_enabled else None
+profile.stop()
+
+
 # Main Content Area
-col1, col2 = st.columns([2, 1])
 
-with col1:
+
+def render_selected_studies(selected_studies):
     # Study Selection Display
     st.markdown("### 📋 Selected Studies Configuration")
-    
-    selected_studies = []
-    for study_key, selected in studies_config.items():
-        if selected:
-            selected_studies.append(study_key)
-    
+
     if selected_studies:
         study_names = {
             'load_flow': 'Load Flow Study',
-            'short_circuit': 'Short Circuit Study', 
+            'short_circuit': 'Short Circuit Study',
             'pdc': 'Protective Device Coordination',
             'arc_flash': 'Arc Flash Study'
         }
-        
+
         for study in selected_studies:
             st.success(f"✅ {study_names[study]}")
     else:
         st.warning("⚠️ No studies selected")
 
-with col2:
+
+def render_competitive_controls(project_type):
     # Enhanced Competitive Factors Section
     st.markdown("### 🎯 Competitive Pricing Factors")
-    
+
+    controls = {}
     with st.expander("🔧 Advanced Pricing Controls", expanded=True):
         st.markdown("**Historical Project Benefits:**")
-        etap_model_available = st.toggle("ETAP Model Available from Historical Projects")
-        etap_discount_factor = st.slider("ETAP Model Discount Factor", 0.70, 0.95, 0.85, 0.01) if etap_model_available else 1.0
-        
-        typical_modeling_factor = st.slider("Typical Modelling Factor", 0.80, 1.20, 1.0, 0.05)
-        
+        controls['etap_model_available'] = st.toggle("ETAP Model Available from Historical Projects", key="etap_model_available")
+        controls['etap_discount_factor'] = st.slider("ETAP Model Discount Factor", 0.70, 0.95, 0.85, 0.01, key="etap_discount_factor") if controls['etap_model_available'] else 1.0
+
+        controls['typical_modeling_factor'] = st.slider("Typical Modelling Factor", 0.80, 1.20, 1.0, 0.05, key="typical_modeling_factor")
+
         st.markdown("**Client Relationship Benefits:**")
-        repeat_customer = st.toggle("Repeat Customer")
-        repeat_discount_factor = st.slider("Repeat Customer Discount", 0.75, 0.95, 0.88, 0.01) if repeat_customer else 1.0
-        
+        controls['repeat_customer'] = st.toggle("Repeat Customer", key="repeat_customer")
+        controls['repeat_discount_factor'] = st.slider("Repeat Customer Discount", 0.75, 0.95, 0.88, 0.01, key="repeat_discount_factor") if controls['repeat_customer'] else 1.0
+
         st.markdown("**Project-Specific Factors:**")
         if project_type == "Phase Extension":
-            phase_extension_discount = st.slider("Phase Extension Discount", 0.80, 0.95, 0.90, 0.01)
+            controls['phase_extension_discount'] = st.slider("Phase Extension Discount", 0.80, 0.95, 0.90, 0.01, key="phase_extension_discount")
         else:
-            phase_extension_discount = 1.0
-        
+            controls['phase_extension_discount'] = 1.0
+
         st.markdown("**Overall Competitive Factor:**")
-        overall_competitive_factor = st.slider("Overall Competitive Reduction", 0.75, 0.98, 0.88, 0.01)
+        controls['overall_competitive_factor'] = st.slider("Overall Competitive Reduction", 0.75, 0.98, 0.88, 0.01, key="overall_competitive_factor")
+    return controls
 
-# Custom Additional Costs Section
-st.markdown("### 💰 Custom Additional Costs")
 
-additional_col1, additional_col2, additional_col3 = st.columns(3)
+def render_additional_costs():
+    # Custom Additional Costs Section
+    st.markdown("### 💰 Custom Additional Costs")
 
-with additional_col1:
-    labels_required = st.toggle("Labels/Stickers Required")
-    if labels_required:
-        label_count = st.number_input("Number of Labels", min_value=0, max_value=1000, value=50, step=10)
-        label_cost_per_unit = st.number_input("Cost per Label (₹)", min_value=50, max_value=500, value=150, step=25)
-        total_label_cost = label_count * label_cost_per_unit
-    else:
-        total_label_cost = 0
-
-with additional_col2:
-    site_visits_required = st.toggle("Additional Site Visits")
-    if site_visits_required:
-        visit_count = st.number_input("Number of Additional Visits", min_value=0, max_value=20, value=3, step=1)
-        visit_cost_per_trip = st.number_input("Cost per Visit (₹)", min_value=2000, max_value=25000, value=8000, step=500)
-        total_visit_cost = visit_count * visit_cost_per_trip
-    else:
-        total_visit_cost = 0
+    additional = {'label_cost': 0, 'visit_cost': 0, 'other_cost': 0}
+    additional_col1, additional_col2, additional_col3 = st.columns(3)
 
-with additional_col3:
-    other_costs_required = st.toggle("Other Custom Costs")
-    if other_costs_required:
-        other_cost_description = st.text_input("Description", value="Miscellaneous")
-        other_cost_amount = st.number_input("Amount (₹)", min_value=0, max_value=100000, value=5000, step=1000)
-    else:
-        other_cost_amount = 0
-
-# Enhanced Calculation Engine
-def calculate_enhanced_project_costs():
-    # Bus Count Calculation (from successful Perplexity model)
-    total_load = it_capacity + mechanical_load + house_load
-    
-    if use_custom_bus and custom_bus_count:
-        estimated_buses = custom_bus_count
-    else:
-        # Tier-based bus estimation (proven from Perplexity Labs)
-        tier_multipliers = {"Tier I": 1.5, "Tier II": 1.8, "Tier III": 2.1, "Tier IV": 2.6}
-        estimated_buses = math.ceil(total_load * tier_multipliers[tier_level])
-    
-    # Study Configuration (from successful Perplexity model)
-    STUDIES_DATA = {
-        'load_flow': {'name': 'Load Flow Study', 'base_hours_per_bus': 0.8, 'complexity': 'Medium', 'emoji': '⚡'},
-        'short_circuit': {'name': 'Short Circuit Study', 'base_hours_per_bus': 1.0, 'complexity': 'Medium-High', 'emoji': '⚡'},
-        'pdc': {'name': 'Protective Device Coordination', 'base_hours_per_bus': 1.5, 'complexity': 'High', 'emoji': '🔧'},
-        'arc_flash': {'name': 'Arc Flash Study', 'base_hours_per_bus': 1.2, 'complexity': 'High', 'emoji': '🔥'}
-    }
-    
-    # Technical multipliers (proven values)
-    tier_complexity = {"Tier I": 1.0, "Tier II": 1.15, "Tier III": 1.3, "Tier IV": 1.6}[tier_level]
-    delivery_multiplier = 1.3 if delivery_type == "Urgent" else 1.0
-    
-    # Resource allocation (successful rates from Perplexity)
-    l1_rate, l2_rate, l3_rate = 1200, 750, 500
-    l1_percentage, l2_percentage, l3_percentage = 0.20, 0.30, 0.50
-    
-    results = {
-        'estimated_buses': estimated_buses,
-        'total_load': total_load,
-        'studies': {},
-        'phase_results': [],
-        'standard_cost': 0,
-        'competitive_cost': 0,
-        'additional_costs': total_label_cost + total_visit_cost + other_cost_amount
-    }
-    
-    # Phase-wise or Consolidated Calculation
-    if calculation_methodology == "Phase-wise":
-        # Calculate for each phase
-        total_standard_cost = 0
-        total_hours = 0
-        
-        for i, phase in enumerate(phases):
-            phase_buses = math.ceil(phase['capacity'] * tier_multipliers[tier_level])
-            phase_studies = {}
-            phase_total_cost = 0
-            phase_total_hours = 0
-            
-            for study_key in selected_studies:
-                study_data = STUDIES_DATA[study_key]
-                
-                # Hours calculation
-                study_hours = (phase_buses * study_data['base_hours_per_bus'] * 
-                              tier_complexity * delivery_multiplier * typical_modeling_factor)
-                
-                # Resource allocation
-                l1_hours = study_hours * l1_percentage
-                l2_hours = study_hours * l2_percentage
-                l3_hours = study_hours * l3_percentage
-                
-                # Labor cost
-                labor_cost = (l1_hours * l1_rate + l2_hours * l2_rate + l3_hours * l3_rate)
-                
-                # NEW: Dynamic report cost calculation
-                base_report_cost = base_report_costs[study_key]
-                report_format_multiplier = {"Basic": 0.8, "Detailed": 1.0, "Comprehensive": 1.4}[report_format]
-                dynamic_report_cost = base_report_cost * report_format_multiplier * report_complexity_factor
-                
-                # Total study cost for this phase
-                study_total_cost = labor_cost + dynamic_report_cost
-                phase_total_cost += study_total_cost
-                phase_total_hours += study_hours
-                
-                phase_studies[study_key] = {
-                    'name': study_data['name'],
-                    'emoji': study_data['emoji'],
-                    'hours': study_hours,
-                    'labor_cost': labor_cost,
-                    'report_cost': dynamic_report_cost,
-                    'total_cost': study_total_cost
-                }
-            
-            phase_result = {
-                'name': phase['name'],
-                'capacity': phase['capacity'],
-                'buses': phase_buses,
-                'studies': phase_studies,
-                'total_hours': phase_total_hours,
-                'total_cost': phase_total_cost
-            }
-            
-            results['phase_results'].append(phase_result)
-            total_standard_cost += phase_total_cost
-            total_hours += phase_total_hours
-            
-        results['total_hours'] = total_hours
-        
-    else:
-        # Consolidated Calculation (original successful method)
-        total_hours = 0
-        total_standard_cost = 0
-        
-        for study_key in selected_studies:
-            study_data = STUDIES_DATA[study_key]
-            
-            # Hours calculation
-            study_hours = (estimated_buses * study_data['base_hours_per_bus'] * 
-                          tier_complexity * delivery_multiplier * typical_modeling_factor)
-            
-            # Resource allocation
-            l1_hours = study_hours * l1_percentage
-            l2_hours = study_hours * l2_percentage  
-            l3_hours = study_hours * l3_percentage
-            
-            # Labor cost
-            labor_cost = (l1_hours * l1_rate + l2_hours * l2_rate + l3_hours * l3_rate)
-            
-            # NEW: Dynamic report cost calculation
-            base_report_cost = base_report_costs[study_key]
-            report_format_multiplier = {"Basic": 0.8, "Detailed": 1.0, "Comprehensive": 1.4}[report_format]
-            dynamic_report_cost = base_report_cost * report_format_multiplier * report_complexity_factor
-            
-            # Total study cost
-            study_total_cost = labor_cost + dynamic_report_cost
-            total_standard_cost += study_total_cost
-            total_hours += study_hours
-            
-            results['studies'][study_key] = {
-                'name': study_data['name'],
-                'emoji': study_data['emoji'],
-                'hours': study_hours,
-                'l1_hours': l1_hours,
-                'l2_hours': l2_hours,
-                'l3_hours': l3_hours,
-                'labor_cost': labor_cost,
-                'report_cost': dynamic_report_cost,
-                'total_cost': study_total_cost,
-                'complexity': study_data['complexity']
-            }
-        
-        results['total_hours'] = total_hours
-    
-    # Apply premium client factor
-    total_standard_cost *= premium_factor
-    
-    # Add additional costs
-    total_standard_cost += results['additional_costs']
-    
-    # Apply phase extension discount
-    if project_type == "Phase Extension":
-        total_standard_cost *= phase_extension_discount
-    
-    results['standard_cost'] = total_standard_cost
-    
-    # NEW: Competitive Cost Calculation
-    competitive_multiplier = 1.0
-    
-    if etap_model_available:
-        competitive_multiplier *= etap_discount_factor
-    
-    if repeat_customer:
-        competitive_multiplier *= repeat_discount_factor
-    
-    # Apply overall competitive factor
-    competitive_multiplier *= overall_competitive_factor
-    
-    results['competitive_cost'] = total_standard_cost * competitive_multiplier
-    results['savings'] = results['standard_cost'] - results['competitive_cost']
-    results['savings_percentage'] = (results['savings'] / results['standard_cost']) * 100 if results['standard_cost'] > 0 else 0
-    
-    return results
-
-# Calculate Results
-if selected_studies:
-    results = calculate_enhanced_project_costs()
-    
+    with additional_col1:
+        if st.toggle("Labels/Stickers Required", key="labels_required"):
+            additional['label_count'] = st.number_input("Number of Labels", min_value=0, max_value=1000, value=50, step=10, key="label_count")
+            additional['label_cost_per_unit'] = st.number_input("Cost per Label (₹)", min_value=50, max_value=500, value=150, step=25, key="label_cost_per_unit")
+            additional['label_cost'] = additional['label_count'] * additional['label_cost_per_unit']
+
+    with additional_col2:
+        if st.toggle("Additional Site Visits", key="site_visits_required"):
+            additional['visit_count'] = st.number_input("Number of Additional Visits", min_value=0, max_value=20, value=3, step=1, key="visit_count")
+            additional['visit_cost_per_trip'] = st.number_input("Cost per Visit (₹)", min_value=2000, max_value=25000, value=8000, step=500, key="visit_cost_per_trip")
+            additional['visit_cost'] = additional['visit_count'] * additional['visit_cost_per_trip']
+
+    with additional_col3:
+        if st.toggle("Other Custom Costs", key="other_costs_required"):
+            additional['other_description'] = st.text_input("Description", value="Miscellaneous", key="other_cost_description")
+            additional['other_cost'] = st.number_input("Amount (₹)", min_value=0, max_value=100000, value=5000, step=1000, key="other_cost_amount")
+    return additional
+
+
+# Enhanced Calculation Engine (see dc_estimator.engine)
+def build_quote_config(inputs, controls, additional):
+    return QuoteConfig(
+        **inputs,
+        **controls,
+        additional_costs=additional['label_cost'] + additional['visit_cost'] + additional['other_cost']
+    )
+
+
+# Chart builders: figures depend only on their data, so identical inputs from
+# any session reuse the same figure object (see dc_estimator.cache)
+def build_comparison_figure(names, standard_costs, competitive_costs):
+    fig_comparison = go.Figure()
+    fig_comparison.add_trace(go.Bar(name='Standard', x=list(names), y=list(standard_costs), marker_color='#00d4aa'))
+    fig_comparison.add_trace(go.Bar(name='Competitive', x=list(names), y=list(competitive_costs), marker_color='#ff6b6b'))
+    fig_comparison.update_layout(
+        title="Standard vs Competitive Pricing",
+        barmode='group',
+        template='plotly_dark',
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)'
+    )
+    return fig_comparison
+
+def build_pie_figure(names, costs):
+    fig_pie = go.Figure(data=[go.Pie(labels=list(names), values=list(costs), hole=0.4)])
+    fig_pie.update_layout(
+        title="Cost Distribution",
+        template='plotly_dark',
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)'
+    )
+    return fig_pie
+
+def build_simulation_figure(simulation):
+    # Pre-binned histogram so the browser never receives the raw samples
+    fig_simulation = go.Figure()
+    for name, label, color in [('standard_cost', 'Standard', '#00d4aa'), ('competitive_cost', 'Competitive', '#ff6b6b')]:
+        counts, edges = simulation.histogram(name)
+        fig_simulation.add_trace(go.Bar(name=label, x=(edges[:-1] + edges[1:]) / 2, y=counts,
+                                        width=edges[1] - edges[0], marker_color=color, opacity=0.7))
+    fig_simulation.update_layout(
+        title="Simulated Cost Distribution",
+        barmode='overlay',
+        xaxis_title="Cost (₹)",
+        yaxis_title="Samples",
+        template='plotly_dark',
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)'
+    )
+    return fig_simulation
+
+def build_tornado_figure(sensitivities, base_cost):
+    ordered = list(reversed(sensitivities))  # largest swing drawn at the top
+    fig_tornado = go.Figure()
+    fig_tornado.add_trace(go.Bar(
+        name='Lowest', y=[factor.label for factor in ordered],
+        x=[factor.low_cost - base_cost for factor in ordered], base=base_cost,
+        orientation='h', marker_color='#00d4aa',
+        customdata=[str(factor.low_value) for factor in ordered],
+        hovertemplate='%{y}<br>Setting: %{customdata}<br>₹%{x:,.0f} vs current<extra></extra>'
+    ))
+    fig_tornado.add_trace(go.Bar(
+        name='Highest', y=[factor.label for factor in ordered],
+        x=[factor.high_cost - base_cost for factor in ordered], base=base_cost,
+        orientation='h', marker_color='#ff6b6b',
+        customdata=[str(factor.high_value) for factor in ordered],
+        hovertemplate='%{y}<br>Setting: %{customdata}<br>₹%{x:,.0f} vs current<extra></extra>'
+    ))
+    fig_tornado.update_layout(
+        title=f"Competitive Cost Sensitivity (current ₹{base_cost:,.0f})",
+        barmode='overlay',
+        xaxis_title="Competitive Cost (₹)",
+        template='plotly_dark',
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)'
+    )
+    return fig_tornado
+
+
+def build_cashflow_figure(projection):
+    months = projection.months.astype('datetime64[D]').astype(object)
+    fig_cashflow = make_subplots(specs=[[{"secondary_y": True}]])
+    for column, (level, color) in enumerate(zip(("L1", "L2", "L3"), ('#00d4aa', '#00a8cc', '#6366f1'))):
+        fig_cashflow.add_trace(go.Bar(name=f"{level} Labor", x=months, y=projection.labor_cost[:, column],
+                                      marker_color=color), secondary_y=False)
+    fig_cashflow.add_trace(go.Bar(name="Reports", x=months, y=projection.report_cost, marker_color='#f59e0b'),
+                           secondary_y=False)
+    fig_cashflow.add_trace(go.Scatter(name="Cumulative Work (quoted)", x=months, y=projection.cumulative_competitive,
+                                      mode='lines', line=dict(color='#ff6b6b')), secondary_y=True)
+    fig_cashflow.add_trace(go.Scatter(name="Cumulative Receipts", x=months, y=projection.cumulative_receipts,
+                                      mode='lines', line=dict(color='#e2e8f0', shape='hv')), secondary_y=True)
+    fig_cashflow.update_layout(
+        title="Monthly Cost and Cumulative Cash Flow",
+        barmode='stack',
+        template='plotly_dark',
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)'
+    )
+    fig_cashflow.update_yaxes(title_text="Monthly Cost (₹)", secondary_y=False)
+    fig_cashflow.update_yaxes(title_text="Cumulative (₹)", secondary_y=True)
+    return fig_cashflow
+
+def plot(figure_key, build):
+    # Figure construction (skipped on a cache hit) and JSON serialisation are profiled separately
+    run_profile = st.session_state['run_profile']
+    with run_profile.stage("plotly build"):
+        figure = cached_figure(figure_key, build)
+    with run_profile.stage("plotly serialize"):
+        st.plotly_chart(figure, width='stretch')
+
+
+def render_summary(config, results):
     # Display Key Metrics
     st.markdown("### 📊 Project Summary")
-    
+
     metric_col1, metric_col2, metric_col3, metric_col4 = st.columns(4)
-    
+
     with metric_col1:
-        st.metric("Total Load", f"{results['total_load']:.1f} MW", delta=f"{tier_level}")
-    
+        st.metric("Total Load", f"{results['total_load']:.1f} MW", delta=f"{config.tier_level}")
+
     with metric_col2:
-        st.metric("Estimated Buses", f"{results['estimated_buses']:,}", 
-                 delta="Custom" if use_custom_bus else "Auto")
-    
+        st.metric("Estimated Buses", f"{results['estimated_buses']:,}",
+                 delta="Custom" if config.custom_bus_count else "Auto")
+
     with metric_col3:
-        st.metric("Total Hours", f"{results['total_hours']:.0f}", 
-                 delta=f"{len(selected_studies)} studies")
-    
+        st.metric("Total Hours", f"{results['total_hours']:.0f}",
+                 delta=f"{len(config.selected_studies)} studies")
+
     with metric_col4:
-        st.metric("Methodology", calculation_methodology, 
-                 delta=f"{client_type} Client")
-    
+        st.metric("Methodology", config.calculation_methodology,
+                 delta=f"{config.client_type} Client")
+
+
+def render_pricing_cards(config, results, current_quote_key, simulation_settings):
     # NEW: Dual Pricing Comparison
     st.markdown("### 💰 Dual Pricing Models Comparison")
-    
+
     pricing_col1, pricing_col2 = st.columns(2)
-    
-    with pricing_col1:
-        st.markdown(f"""
-        <div class="pricing-card">
-            <h3>📋 Standard Pricing</h3>
-            <h2 style="color: #00d4aa; font-size: 2.5rem; margin: 1rem 0;">₹{results['standard_cost']:,.0f}</h2>
-            <p><strong>Methodology:</strong> {calculation_methodology}</p>
-            <p><strong>Client Type:</strong> {client_type}</p>
-            <p><strong>Project Type:</strong> {project_type}</p>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with pricing_col2:
-        st.markdown(f"""
-        <div class="pricing-card competitive">
-            <h3>🎯 Competitive Pricing</h3>
-            <h2 style="color: #ff6b6b; font-size: 2.5rem; margin: 1rem 0;">₹{results['competitive_cost']:,.0f}</h2>
-            <p><strong>ETAP Model:</strong> {'Available' if etap_model_available else 'Not Available'}</p>
-            <p><strong>Repeat Customer:</strong> {'Yes' if repeat_customer else 'No'}</p>
-            <p><strong>Overall Factor:</strong> {overall_competitive_factor:.0%}</p>
-        </div>
-        """, unsafe_allow_html=True)
-    
+
+    if simulation_settings:
+        # Monte Carlo: P50 headline with the P10-P90 band instead of a single point value
+        simulation_params = tuple(simulation_settings.values())
+        simulation = results_cache.get_or_compute(('simulation', current_quote_key) + simulation_params, lambda: simulate_costs(
+            config,
+            samples=simulation_settings['samples'],
+            hours=Distribution(simulation_settings['distribution'], simulation_settings['hours_spread']),
+            rates=Distribution(simulation_settings['distribution'], simulation_settings['rate_spread']),
+            bus_multiplier=Distribution(simulation_settings['distribution'], simulation_settings['bus_spread']),
+            seed=0  # fixed seed keeps the percentiles stable across reruns
+        ))
+        standard_percentiles = simulation.percentiles('standard_cost')
+        competitive_percentiles = simulation.percentiles('competitive_cost')
+
+        with pricing_col1:
+            html_block('standard card', f"""
+            <div class="pricing-card">
+                <h3>📋 Standard Pricing (P50)</h3>
+                <h2 style="color: #00d4aa; font-size: 2.5rem; margin: 1rem 0;">₹{standard_percentiles['P50']:,.0f}</h2>
+                <p><strong>P10 – P90:</strong> ₹{standard_percentiles['P10']:,.0f} – ₹{standard_percentiles['P90']:,.0f}</p>
+                <p><strong>Point Estimate:</strong> ₹{results['standard_cost']:,.0f}</p>
+                <p><strong>Samples:</strong> {simulation_settings['samples']:,} ({simulation_settings['distribution']})</p>
+            </div>
+            """)
+
+        with pricing_col2:
+            html_block('competitive card', f"""
+            <div class="pricing-card competitive">
+                <h3>🎯 Competitive Pricing (P50)</h3>
+                <h2 style="color: #ff6b6b; font-size: 2.5rem; margin: 1rem 0;">₹{competitive_percentiles['P50']:,.0f}</h2>
+                <p><strong>P10 – P90:</strong> ₹{competitive_percentiles['P10']:,.0f} – ₹{competitive_percentiles['P90']:,.0f}</p>
+                <p><strong>Point Estimate:</strong> ₹{results['competitive_cost']:,.0f}</p>
+                <p><strong>Overall Factor:</strong> {config.overall_competitive_factor:.0%}</p>
+            </div>
+            """)
+
+        plot(('simulation', current_quote_key) + simulation_params, lambda: build_simulation_figure(simulation))
+
+    else:
+        with pricing_col1:
+            html_block('standard card', f"""
+            <div class="pricing-card">
+                <h3>📋 Standard Pricing</h3>
+                <h2 style="color: #00d4aa; font-size: 2.5rem; margin: 1rem 0;">₹{results['standard_cost']:,.0f}</h2>
+                <p><strong>Methodology:</strong> {config.calculation_methodology}</p>
+                <p><strong>Client Type:</strong> {config.client_type}</p>
+                <p><strong>Project Type:</strong> {config.project_type}</p>
+            </div>
+            """)
+
+        with pricing_col2:
+            html_block('competitive card', f"""
+            <div class="pricing-card competitive">
+                <h3>🎯 Competitive Pricing</h3>
+                <h2 style="color: #ff6b6b; font-size: 2.5rem; margin: 1rem 0;">₹{results['competitive_cost']:,.0f}</h2>
+                <p><strong>ETAP Model:</strong> {'Available' if config.etap_model_available else 'Not Available'}</p>
+                <p><strong>Repeat Customer:</strong> {'Yes' if config.repeat_customer else 'No'}</p>
+                <p><strong>Overall Factor:</strong> {config.overall_competitive_factor:.0%}</p>
+            </div>
+            """)
+
     # Savings Highlight
-    st.markdown(f"""
+    html_block('savings highlight', f"""
     <div class="savings-highlight">
         <h3 style="color: #feca57; margin: 0;">💡 Competitive Advantage</h3>
         <h2 style="color: #feca57; font-size: 2rem; margin: 1rem 0;">₹{results['savings']:,.0f} Savings</h2>
         <p style="margin: 0;"><strong>{results['savings_percentage']:.1f}% reduction</strong> from standard pricing</p>
     </div>
-    """, unsafe_allow_html=True)
-    
-    # Phase-wise Results (if applicable)
-    if calculation_methodology == "Phase-wise":
-        st.markdown("### 📊 Phase-wise Breakdown")
-        
-        for i, phase in enumerate(results['phase_results']):
-            with st.expander(f"📋 {phase['name']} - {phase['capacity']:.1f} MW"):
-                
-                phase_col1, phase_col2, phase_col3 = st.columns(3)
-                
-                with phase_col1:
-                    st.metric("Phase Capacity", f"{phase['capacity']:.1f} MW")
-                    st.metric("Phase Buses", f"{phase['buses']:,}")
-                
-                with phase_col2:
-                    st.metric("Phase Hours", f"{phase['total_hours']:.0f}")
-                    st.metric("Studies", f"{len(phase['studies'])}")
-                
-                with phase_col3:
-                    st.metric("Phase Cost", f"₹{phase['total_cost']:,.0f}")
-                    st.metric("Avg Cost/Bus", f"₹{phase['total_cost']/phase['buses']:,.0f}")
-                
-                # Phase studies detail
-                st.markdown("**Phase Studies:**")
-                for study_key, study in phase['studies'].items():
-                    st.write(f"• {study['emoji']} {study['name']}: {study['hours']:.0f}h - ₹{study['total_cost']:,.0f}")
-    
-    # Consolidated Study Details
-    else:
-        st.markdown("### 📋 Study-wise Cost Breakdown")
-        
-        for study_key, study in results['studies'].items():
-            competitive_study_cost = study['total_cost'] * overall_competitive_factor
-            
-            st.markdown(f"""
-            <div class="study-card">
-                <h4>{study['emoji']} {study['name']}</h4>
-                <div style="display: grid; grid-template-columns: 2fr 1fr; gap: 2rem;">
-                    <div>
-                        <p><strong>Complexity:</strong> {study['complexity']}</p>
-                        <p><strong>Total Hours:</strong> {study['hours']:.1f}</p>
-                        <p><strong>Labor Cost:</strong> ₹{study['labor_cost']:,.0f}</p>
-                        <p><strong>Dynamic Report Cost:</strong> ₹{study['report_cost']:,.0f}</p>
-                        <p><em>Report: {report_format} × {report_complexity_factor}x complexity</em></p>
+    """)
+
+
+def selected_row(key, rows, column_config):
+    # One virtualized grid for the whole breakdown; returns the index of the row picked for details
+    event = st.dataframe(
+        pd.DataFrame(rows),
+        key=key,
+        hide_index=True,
+        width='stretch',
+        on_select="rerun",
+        selection_mode="single-row",
+        column_config=column_config,
+    )
+    selected = event.selection.rows
+    return selected[0] if selected and selected[0] < len(rows) else None
+
+
+def render_phase_table(results):
+    # One sortable table instead of an expander per phase for large campuses
+    rows = []
+    for phase in results['phase_results']:
+        row = {
+            'Phase': phase['name'],
+            'Capacity (MW)': phase['capacity'],
+            'Buses': phase['buses'],
+            'Hours': phase['total_hours'],
+            'Cost (₹)': phase['total_cost'],
+            'Avg Cost/Bus (₹)': phase['total_cost'] / phase['buses'] if phase['buses'] else None,
+        }
+        for study in phase['studies'].values():
+            row[f"{study['name']} (₹)"] = study['total_cost']
+        rows.append(row)
+
+    st.caption("Select a phase to see its details.")
+    index = selected_row(
+        "phase_breakdown_table",
+        rows,
+        {name: st.column_config.NumberColumn(format="%.0f") for name in rows[0] if name.endswith("(₹)") or name == 'Hours'},
+    )
+    if index is not None:
+        phase = results['phase_results'][index]
+        with st.container(border=True):
+            st.markdown(f"**📋 {phase['name']} - {phase['capacity']:.1f} MW**")
+            render_phase_detail(phase)
+
+
+def render_phase_detail(phase):
+    phase_col1, phase_col2, phase_col3 = st.columns(3)
+
+    with phase_col1:
+        st.metric("Phase Capacity", f"{phase['capacity']:.1f} MW")
+        st.metric("Phase Buses", f"{phase['buses']:,}")
+
+    with phase_col2:
+        st.metric("Phase Hours", f"{phase['total_hours']:.0f}")
+        st.metric("Studies", f"{len(phase['studies'])}")
+
+    with phase_col3:
+        st.metric("Phase Cost", f"₹{phase['total_cost']:,.0f}")
+        st.metric("Avg Cost/Bus", f"₹{phase['total_cost']/phase['buses']:,.0f}" if phase['buses'] else "—")
+
+    # Phase studies detail
+    st.markdown("**Phase Studies:**")
+    for study_key, study in phase['studies'].items():
+        st.write(f"• {study['emoji']} {study['name']}: {study['hours']:.0f}h - ₹{study['total_cost']:,.0f}")
+
+
+def render_phase_breakdown(results, compact=False):
+    # Phase-wise Results
+    st.markdown("### 📊 Phase-wise Breakdown")
+
+    if compact or len(results['phase_results']) > PHASE_EXPANDER_LIMIT:
+        render_phase_table(results)
+        return
+
+    for i, phase in enumerate(results['phase_results']):
+        with st.expander(f"📋 {phase['name']} - {phase['capacity']:.1f} MW"):
+            render_phase_detail(phase)
+
+
+def render_study_card(config, study):
+    competitive_study_cost = study['total_cost'] * config.overall_competitive_factor
+
+    html_block('study card', f"""
+        <div class="study-card">
+            <h4>{study['emoji']} {study['name']}</h4>
+            <div style="display: grid; grid-template-columns: 2fr 1fr; gap: 2rem;">
+                <div>
+                    <p><strong>Complexity:</strong> {study['complexity']}</p>
+                    <p><strong>Total Hours:</strong> {study['hours']:.1f}</p>
+                    <p><strong>Labor Cost:</strong> ₹{study['labor_cost']:,.0f}</p>
+                    <p><strong>Dynamic Report Cost:</strong> ₹{study['report_cost']:,.0f}</p>
+                    <p><em>Report: {config.report_format} × {config.report_complexity_factor}x complexity</em></p>
+                </div>
+                <div style="text-align: center;">
+                    <div style="background: rgba(0, 212, 170, 0.1); padding: 1rem; border-radius: 8px; margin-bottom: 1rem;">
+                        <p style="margin: 0; color: #00d4aa; font-size: 1.2rem; font-weight: bold;">₹{study['total_cost']:,.0f}</p>
+                        <small>Standard</small>
                     </div>
-                    <div style="text-align: center;">
-                        <div style="background: rgba(0, 212, 170, 0.1); padding: 1rem; border-radius: 8px; margin-bottom: 1rem;">
-                            <p style="margin: 0; color: #00d4aa; font-size: 1.2rem; font-weight: bold;">₹{study['total_cost']:,.0f}</p>
-                            <small>Standard</small>
-                        </div>
-                        <div style="background: rgba(255, 107, 107, 0.1); padding: 1rem; border-radius: 8px;">
-                            <p style="margin: 0; color: #ff6b6b; font-size: 1.2rem; font-weight: bold;">₹{competitive_study_cost:,.0f}</p>
-                            <small>Competitive</small>
-                        </div>
+                    <div style="background: rgba(255, 107, 107, 0.1); padding: 1rem; border-radius: 8px;">
+                        <p style="margin: 0; color: #ff6b6b; font-size: 1.2rem; font-weight: bold;">₹{competitive_study_cost:,.0f}</p>
+                        <small>Competitive</small>
                     </div>
                 </div>
             </div>
-            """, unsafe_allow_html=True)
-    
+        </div>
+        """)
+
+
+def render_study_table(config, results):
+    # Compact view: the studies as table rows, with the full card for the selected study only
+    studies = list(results['studies'].values())
+    rows = [{
+        'Study': f"{study['emoji']} {study['name']}",
+        'Complexity': study['complexity'],
+        'Hours': study['hours'],
+        'Labor (₹)': study['labor_cost'],
+        'Report (₹)': study['report_cost'],
+        'Standard (₹)': study['total_cost'],
+        'Competitive (₹)': study['total_cost'] * config.overall_competitive_factor,
+    } for study in studies]
+
+    st.caption("Select a study to see its details.")
+    index = selected_row(
+        "study_breakdown_table",
+        rows,
+        {name: st.column_config.NumberColumn(format="%.0f") for name in rows[0] if name.endswith("(₹)")}
+        | {'Hours': st.column_config.NumberColumn(format="%.1f")},
+    )
+    if index is not None:
+        render_study_card(config, studies[index])
+
+
+def render_study_breakdown(config, results, compact=False):
+    # Consolidated Study Details
+    st.markdown("### 📋 Study-wise Cost Breakdown")
+
+    if compact:
+        render_study_table(config, results)
+        return
+
+    for study_key, study in results['studies'].items():
+        render_study_card(config, study)
+
+
+def render_additional_breakdown(additional, results):
     # Additional Costs Breakdown
-    if results['additional_costs'] > 0:
-        st.markdown("### 💰 Additional Costs Breakdown")
-        
-        additional_breakdown = []
-        if total_label_cost > 0:
-            additional_breakdown.append(f"🏷️ Labels: {label_count} × ₹{label_cost_per_unit} = ₹{total_label_cost:,.0f}")
-        if total_visit_cost > 0:
-            additional_breakdown.append(f"🚗 Site Visits: {visit_count} × ₹{visit_cost_per_trip} = ₹{total_visit_cost:,.0f}")
-        if other_cost_amount > 0:
-            additional_breakdown.append(f"📝 {other_cost_description}: ₹{other_cost_amount:,.0f}")
-        
-        for item in additional_breakdown:
-            st.write(f"• {item}")
-        
-        st.success(f"**Total Additional Costs: ₹{results['additional_costs']:,.0f}**")
-    
+    st.markdown("### 💰 Additional Costs Breakdown")
+
+    additional_breakdown = []
+    if additional['label_cost'] > 0:
+        additional_breakdown.append(f"🏷️ Labels: {additional['label_count']} × ₹{additional['label_cost_per_unit']} = ₹{additional['label_cost']:,.0f}")
+    if additional['visit_cost'] > 0:
+        additional_breakdown.append(f"🚗 Site Visits: {additional['visit_count']} × ₹{additional['visit_cost_per_trip']} = ₹{additional['visit_cost']:,.0f}")
+    if additional['other_cost'] > 0:
+        additional_breakdown.append(f"📝 {additional['other_description']}: ₹{additional['other_cost']:,.0f}")
+
+    for item in additional_breakdown:
+        st.write(f"• {item}")
+
+    st.success(f"**Total Additional Costs: ₹{results['additional_costs']:,.0f}**")
+
+
+def render_applied_factors(config):
     # Competitive Factors Summary
     st.markdown("### 🎯 Applied Competitive Factors")
-    
+
     factors_col1, factors_col2 = st.columns(2)
-    
+
     with factors_col1:
         st.markdown("**Cost Reduction Factors:**")
-        if etap_model_available:
-            st.write(f"• ETAP Model Discount: {(1-etap_discount_factor)*100:.0f}%")
-        if repeat_customer:
-            st.write(f"• Repeat Customer: {(1-repeat_discount_factor)*100:.0f}%")
-        if project_type == "Phase Extension":
-            st.write(f"• Phase Extension: {(1-phase_extension_discount)*100:.0f}%")
-        st.write(f"• Overall Competitive: {(1-overall_competitive_factor)*100:.0f}%")
-    
+        if config.etap_model_available:
+            st.write(f"• ETAP Model Discount: {(1-config.etap_discount_factor)*100:.0f}%")
+        if config.repeat_customer:
+            st.write(f"• Repeat Customer: {(1-config.repeat_discount_factor)*100:.0f}%")
+        if config.project_type == "Phase Extension":
+            st.write(f"• Phase Extension: {(1-config.phase_extension_discount)*100:.0f}%")
+        st.write(f"• Overall Competitive: {(1-config.overall_competitive_factor)*100:.0f}%")
+
     with factors_col2:
         st.markdown("**Premium Factors:**")
-        if client_type == "Premium":
-            st.write(f"• Premium Client: +{(premium_factor-1)*100:.0f}%")
-        st.write(f"• Modeling Factor: {typical_modeling_factor:.0%}")
-        st.write(f"• Report Complexity: {report_complexity_factor:.0%}")
-    
-    # Charts
-    if len(selected_studies) > 1:
-        st.markdown("### 📈 Cost Analysis Charts")
-        
-        chart_col1, chart_col2 = st.columns(2)
-        
-        with chart_col1:
-            # Standard vs Competitive comparison
-            if calculation_methodology == "Consolidated":
-                study_names = [results['studies'][key]['name'] for key in selected_studies]
-                standard_costs = [results['studies'][key]['total_cost'] for key in selected_studies]
-                competitive_costs = [cost * overall_competitive_factor for cost in standard_costs]
+        if config.client_type == "Premium":
+            st.write(f"• Premium Client: +{(config.premium_factor-1)*100:.0f}%")
+        st.write(f"• Modeling Factor: {config.typical_modeling_factor:.0%}")
+        st.write(f"• Report Complexity: {config.report_complexity_factor:.0%}")
+
+
+def render_sensitivity(config, results, current_quote_key):
+    # NEW: Sensitivity Analysis (one batched sweep over every pricing lever)
+    with st.expander("🌪️ Sensitivity Analysis – Which Lever Moves the Price Most?"):
+        sensitivities = results_cache.get_or_compute(('sensitivity', current_quote_key),
+                                                     lambda: sensitivity_analysis(config))
+        base_cost = results['competitive_cost']
+        plot(('tornado', current_quote_key), lambda: build_tornado_figure(sensitivities, base_cost))
+        st.caption("Discounts and the premium factor are only swept when they apply to this quote.")
+
+        top = sensitivities[0]
+        st.info(f"Biggest lever: **{top.label}**, swinging the competitive price by ₹{top.swing:,.0f} "
+                f"(₹{top.low_cost:,.0f} at {top.low_value} to ₹{top.high_cost:,.0f} at {top.high_value}).")
+
+
+def render_cashflow(config, results, current_quote_key):
+    # NEW: Month-by-month cost and cash flow with yearly rate escalation
+    with st.expander("📆 Cash-Flow Projection"):
+        cash_col1, cash_col2, cash_col3, cash_col4 = st.columns(4)
+        with cash_col1:
+            escalation_text = st.text_input("Rate Escalation per Year (%)", value="5",
+                                            help="One rate for every year, or a list for years 1, 2, 3… "
+                                                 "(e.g. 5, 6, 7); the last rate repeats")
+        with cash_col2:
+            advance_share = st.slider("Advance at Phase Start", 0.0, 1.0, 0.3, 0.05)
+        with cash_col3:
+            payment_terms_days = st.number_input("Payment Terms (days)", min_value=0, max_value=180, value=30, step=15)
+        with cash_col4:
+            if config.calculation_methodology == "Consolidated":
+                project_start = (date.today().replace(day=1) + timedelta(days=32)).replace(day=1)
+                project_dates = st.date_input("Project Dates", value=(project_start, project_start + timedelta(weeks=13)))
             else:
-                study_names = ["Phase " + str(i+1) for i in range(len(results['phase_results']))]
-                standard_costs = [phase['total_cost'] for phase in results['phase_results']]
-                competitive_costs = [cost * overall_competitive_factor for cost in standard_costs]
-            
-            fig_comparison = go.Figure()
-            fig_comparison.add_trace(go.Bar(name='Standard', x=study_names, y=standard_costs, marker_color='#00d4aa'))
-            fig_comparison.add_trace(go.Bar(name='Competitive', x=study_names, y=competitive_costs, marker_color='#ff6b6b'))
-            fig_comparison.update_layout(
-                title="Standard vs Competitive Pricing",
-                barmode='group',
-                template='plotly_dark',
-                paper_bgcolor='rgba(0,0,0,0)',
-                plot_bgcolor='rgba(0,0,0,0)'
+                project_dates = ()
+                st.caption("Phases are dated in the sidebar phase table. Rates escalate from today.")
+
+        try:
+            escalation = tuple(float(value) / 100 for value in escalation_text.replace('%', '').split(',') if value.strip())
+        except ValueError:
+            st.warning("⚠️ Enter the escalation as a number or a comma-separated list of numbers.")
+            return
+        if config.calculation_methodology == "Consolidated" and len(project_dates) != 2:
+            st.info("Pick the project's start and end dates.")
+            return
+
+        start, end = project_dates if project_dates else (None, None)
+        try:
+            projection = project_cashflow(config, results, start=start, end=end, escalation=escalation or 0.0,
+                                          escalation_base=date.today(), advance_share=advance_share,
+                                          payment_terms_days=int(payment_terms_days))
+        except ValueError as error:
+            st.warning(f"⚠️ {error}")
+            return
+
+        totals = projection.totals()
+        metric_col1, metric_col2, metric_col3, metric_col4 = st.columns(4)
+        metric_col1.metric("Months", f"{totals['months']:,}", delta=f"{projection.months[0]} – {projection.months[-1]}",
+                           delta_color="off")
+        metric_col2.metric("Escalated Competitive Price", f"₹{totals['competitive_cost']:,.0f}",
+                           delta=f"₹{totals['competitive_cost'] - results['competitive_cost']:,.0f} escalation",
+                           delta_color="inverse")
+        metric_col3.metric("Escalated Standard Cost", f"₹{totals['standard_cost']:,.0f}")
+        metric_col4.metric("Peak Unfunded Work", f"₹{totals['peak_unfunded']:,.0f}",
+                           help="Largest gap between the quoted value of work done and receipts to date")
+
+        dates = tuple((phase.start, phase.end) for phase in config.phases) or (start, end)
+        plot(('cashflow', current_quote_key, dates, escalation, advance_share, int(payment_terms_days), date.today()),
+             lambda: build_cashflow_figure(projection))
+
+        table = pd.DataFrame(projection.columns())
+        st.dataframe(
+            table,
+            hide_index=True,
+            width='stretch',
+            column_config={
+                'month': st.column_config.DateColumn("Month", format="YYYY-MM"),
+                'escalation': st.column_config.NumberColumn("Escalation", format="%.3f×"),
+                **{column: st.column_config.NumberColumn(format="%.0f") for column in table.columns
+                   if column not in ('month', 'escalation')},
+            },
+        )
+        st.download_button("⬇️ Download Projection (CSV)", table.to_csv(index=False),
+                           file_name=f"cashflow_{current_quote_key[:8]}.csv", mime="text/csv")
+
+def render_scenario_save(config):
+    # NEW: Keep this configuration for side-by-side comparison on the Scenarios page
+    workspace = st.session_state.setdefault('scenario_workspace', ScenarioWorkspace())
+    with st.form("save_scenario", clear_on_submit=True, border=False):
+        scenario_col1, scenario_col2 = st.columns([3, 1])
+        with scenario_col1:
+            scenario_name = st.text_input("Scenario Name", placeholder=f"Scenario {len(workspace) + 1}",
+                                          label_visibility="collapsed")
+        with scenario_col2:
+            save = st.form_submit_button("🧪 Save as Scenario", width='stretch')
+    if save:
+        scenario_name = scenario_name.strip() or f"Scenario {len(workspace) + 1}"
+        workspace.save(scenario_name, config)
+        st.success(f"Saved **{scenario_name}**; {len(workspace)} scenario(s) to compare on the Scenarios page.")
+
+def render_export(config, results, additional):
+    # NEW: Client-ready exports, rendered on a background pool only when downloaded
+    st.markdown("### 📤 Export Quote")
+
+    additional_items = []
+    if additional['label_cost'] > 0:
+        additional_items.append((f"Labels: {additional['label_count']} × ₹{additional['label_cost_per_unit']}", additional['label_cost']))
+    if additional['visit_cost'] > 0:
+        additional_items.append((f"Site Visits: {additional['visit_count']} × ₹{additional['visit_cost_per_trip']}", additional['visit_cost']))
+    if additional['other_cost'] > 0:
+        additional_items.append((additional['other_description'], additional['other_cost']))
+    client = st.session_state['client_name'] or None
+    stem = f"dc_quote_{(client or 'estimate').replace(' ', '_')}_{quote_key(config)[:8]}"
+
+    export_col1, export_col2 = st.columns(2)
+    for column, export_format, label in [(export_col1, 'pdf', "📄 Download PDF Report"),
+                                         (export_col2, 'xlsx', "📊 Download Excel Workbook")]:
+        with column:
+            st.download_button(
+                label,
+                data=lambda export_format=export_format: submit_export(
+                    config, results, export_format, client, additional_items).result(),
+                file_name=f"{stem}.{EXPORT_FORMATS[export_format].extension}",
+                mime=EXPORT_FORMATS[export_format].mime,
+                on_click="ignore",
+                key=f"export_{export_format}",
+                width='stretch',
             )
-            st.plotly_chart(fig_comparison, use_container_width=True)
-        
-        with chart_col2:
-            # Cost distribution pie chart
-            if calculation_methodology == "Consolidated":
-                costs = [results['studies'][key]['total_cost'] for key in selected_studies]
-                names = [results['studies'][key]['name'] for key in selected_studies]
+
+
+@st.fragment
+def goal_seek_panel(config, results):
+    # NEW: Goal Seek (closed-form inverse pricing from cached linear coefficients).
+    # Its own fragment: typing a target price reruns only this panel.
+    with st.expander("🎯 Goal Seek – Price a Client's Target"):
+        coefficients = cost_coefficients(config)
+        current_buses = priced_buses(config)
+
+        seek_col1, seek_col2 = st.columns(2)
+
+        with seek_col1:
+            target_price = st.number_input("Client Target Price (₹)", min_value=0, max_value=1000000000,
+                                           value=int(round(results['competitive_cost'], -3)), step=10000)
+            target_basis = st.radio("Target Applies To", ["Competitive", "Standard"], horizontal=True)
+
+            max_buses = coefficients.max_buses(target_price, competitive=target_basis == "Competitive")
+            if max_buses is None:
+                st.write("• Price does not depend on bus count for this configuration")
             else:
-                costs = [phase['total_cost'] for phase in results['phase_results']]
-                names = [phase['name'] for phase in results['phase_results']]
-            
-            fig_pie = go.Figure(data=[go.Pie(labels=names, values=costs, hole=0.4)])
-            fig_pie.update_layout(
-                title="Cost Distribution",
-                template='plotly_dark',
-                paper_bgcolor='rgba(0,0,0,0)',
-                plot_bgcolor='rgba(0,0,0,0)'
+                st.metric("Max Buses Within Target", f"{max_buses:,}", delta=f"{max_buses - current_buses:+,} vs current")
+                if config.calculation_methodology == "Consolidated" and not config.custom_bus_count:
+                    st.write(f"• Equivalent max total load: {max_load_for_buses(max_buses, config.tier_level, config.rate_card):.1f} MW")
+
+            required_factor = coefficients.required_overall_factor(current_buses, target_price)
+            if required_factor is not None:
+                st.metric("Required Overall Competitive Factor", f"{required_factor:.3f}",
+                          delta=f"{required_factor - config.overall_competitive_factor:+.3f} vs current")
+                if not 0.75 <= required_factor <= 0.98:
+                    st.warning("⚠️ Outside the 0.75 – 0.98 range allowed by the Overall Competitive Reduction slider")
+
+        with seek_col2:
+            bus_query = st.number_input("Price for N Buses", min_value=1, max_value=100000, value=current_buses, step=1)
+            st.metric("Standard Price", f"₹{coefficients.standard_cost(bus_query):,.0f}")
+            st.metric("Competitive Price", f"₹{coefficients.competitive_cost(bus_query):,.0f}")
+            st.caption(f"₹{coefficients.labor_per_bus * coefficients.premium_factor * coefficients.phase_extension_discount:,.0f} "
+                       f"standard per additional bus")
+
+
+def render_charts(config, results):
+    # Charts
+    st.markdown("### 📈 Cost Analysis Charts")
+
+    chart_col1, chart_col2 = st.columns(2)
+
+    with chart_col1:
+        # Standard vs Competitive comparison
+        if config.calculation_methodology == "Consolidated":
+            study_names = [results['studies'][key]['name'] for key in config.selected_studies]
+            standard_costs = [results['studies'][key]['total_cost'] for key in config.selected_studies]
+        else:
+            study_names = ["Phase " + str(i+1) for i in range(len(results['phase_results']))]
+            standard_costs = [phase['total_cost'] for phase in results['phase_results']]
+        competitive_costs = [cost * config.overall_competitive_factor for cost in standard_costs]
+
+        comparison_data = (tuple(study_names), tuple(standard_costs), tuple(competitive_costs))
+        plot(('comparison',) + comparison_data, lambda: build_comparison_figure(*comparison_data))
+
+    with chart_col2:
+        # Cost distribution pie chart
+        if config.calculation_methodology == "Consolidated":
+            costs = [results['studies'][key]['total_cost'] for key in config.selected_studies]
+            names = [results['studies'][key]['name'] for key in config.selected_studies]
+        else:
+            costs = [phase['total_cost'] for phase in results['phase_results']]
+            names = [phase['name'] for phase in results['phase_results']]
+
+        pie_data = (tuple(names), tuple(costs))
+        plot(('pie',) + pie_data, lambda: build_pie_figure(*pie_data))
+
+
+def price_on_graph(quote_config):
+    # The session's last quote is kept as a dependency graph, so a quote no session
+    # has priced yet recomputes only the nodes its changed inputs feed
+    quote_graph = st.session_state.get('quote_graph')
+    if quote_graph is None:
+        quote_graph = st.session_state['quote_graph'] = QuoteGraph(quote_config)
+        results = quote_graph.results()
+        st.session_state['graph_recomputed'] = quote_graph.graph.take_recomputed()
+        return results
+    st.session_state['graph_recomputed'] = quote_graph.update(quote_config)
+    return quote_graph.results()
+
+
+def render_pricing_workspace(run_profile):
+    inputs = st.session_state['sidebar_inputs']
+    # Stays None when the quote comes from the shared results cache
+    st.session_state['graph_recomputed'] = None
+
+    run_profile.start("workspace widgets")
+    col1, col2 = st.columns([2, 1])
+
+    with col1:
+        render_selected_studies(inputs['selected_studies'])
+
+    with col2:
+        controls = render_competitive_controls(inputs['project_type'])
+
+    additional = render_additional_costs()
+    run_profile.stop()
+
+    # Calculate Results
+    if not inputs['selected_studies']:
+        st.warning("⚠️ Please select at least one study to see cost estimates.")
+        return
+    if inputs['calculation_methodology'] == "Phase-wise" and not inputs['phases']:
+        st.warning("⚠️ Add at least one phase with a capacity to see phase-wise estimates.")
+        return
+
+    with run_profile.stage("engine"):
+        quote_config = build_quote_config(inputs, controls, additional)
+        current_quote_key = quote_key(quote_config)
+        results = memoized_costs(quote_config, lambda: price_on_graph(quote_config))
+
+    # Save each distinct quote once per session; the write happens on a background thread
+    client = st.session_state['client_name']
+    if st.session_state.get('last_saved_quote') != (current_quote_key, client):
+        st.session_state['last_saved_quote'] = (current_quote_key, client)
+        default_history().record(quote_config, results, client=client or None,
+                                 session=st.session_state['history_session'])
+
+    with run_profile.stage("summary metrics"):
+        render_summary(quote_config, results)
+    with run_profile.stage("pricing cards"):
+        render_pricing_cards(quote_config, results, current_quote_key, st.session_state['simulation_settings'])
+
+    if quote_config.calculation_methodology == "Phase-wise":
+        with run_profile.stage("phase breakdown"):
+            render_phase_breakdown(results, compact=st.session_state['compact_view'])
+    else:
+        with run_profile.stage("study cards"):
+            render_study_breakdown(quote_config, results, compact=st.session_state['compact_view'])
+
+    with run_profile.stage("factors & breakdowns"):
+        if results['additional_costs'] > 0:
+            render_additional_breakdown(additional, results)
+        render_applied_factors(quote_config)
+    with run_profile.stage("sensitivity"):
+        render_sensitivity(quote_config, results, current_quote_key)
+    with run_profile.stage("goal seek"):
+        goal_seek_panel(quote_config, results)
+    with run_profile.stage("cash flow"):
+        render_cashflow(quote_config, results, current_quote_key)
+
+    if len(quote_config.selected_studies) > 1:
+        with run_profile.stage("charts"):
+            render_charts(quote_config, results)
+
+    with run_profile.stage("export"):
+        render_export(quote_config, results, additional)
+        render_scenario_save(quote_config)
+
+
+@st.fragment
+def pricing_workspace():
+    # Everything below the header reruns as one fragment: changing a competitive
+    # control or additional cost skips the CSS, header and sidebar entirely.
+    # Cached results and figures (dc_estimator.cache) keep unchanged sections cheap.
+    run_profile = st.session_state['run_profile']
+    if run_profile.finished is not None:
+        # A fragment rerun: the last full run's profile is closed, so time this one on its own
+        run_profile = st.session_state['run_profile'] = RunProfile("fragment")
+    try:
+        render_pricing_workspace(run_profile)
+    finally:
+        if run_profile.kind == "fragment":
+            finish_profile(run_profile)
+
+
+def render_profile_panel(run_profile):
+    # NEW: Performance profile of this run plus the session's recent runs
+    with st.expander("⏱️ Performance Profile", expanded=True):
+        record = run_profile.as_dict()
+        profile_col1, profile_col2, profile_col3, profile_col4 = st.columns(4)
+        profile_col1.metric("This Run", f"{record['total_ms']:,.0f} ms")
+        profile_col2.metric("HTML Payload", f"{record['payload_bytes'] / 1024:,.1f} KB")
+        profile_col3.metric("Result Cache Hits", f"{results_cache.hits:,} / {results_cache.hits + results_cache.misses:,}")
+        recomputed = st.session_state.get('graph_recomputed')
+        profile_col4.metric("Graph Nodes Recomputed", "cached" if recomputed is None else f"{len(recomputed):,}")
+        if recomputed:
+            shown = ", ".join(str(name) for name in recomputed[:GRAPH_NODES_SHOWN])
+            st.caption(f"Recomputed on the pricing graph: {shown}"
+                       + (f" and {len(recomputed) - GRAPH_NODES_SHOWN:,} more" if len(recomputed) > GRAPH_NODES_SHOWN else ""))
+
+        stages_col, payloads_col = st.columns([3, 2])
+        with stages_col:
+            st.dataframe(
+                pd.DataFrame({
+                    'Stage': ["\u2003" * stage['depth'] + stage['stage'] for stage in record['stages']],
+                    'Time (ms)': [stage['ms'] for stage in record['stages']],
+                    'Calls': [stage['calls'] for stage in record['stages']],
+                }),
+                hide_index=True,
+                width='stretch',
+                column_config={'Time (ms)': st.column_config.NumberColumn(format="%.1f")},
+            )
+        with payloads_col:
+            st.dataframe(
+                pd.DataFrame({
+                    'HTML Block': [payload['block'] for payload in record['payloads']],
+                    'Blocks': [payload['blocks'] for payload in record['payloads']],
+                    'Size (KB)': [payload['bytes'] / 1024 for payload in record['payloads']],
+                }),
+                hide_index=True,
+                width='stretch',
+                column_config={'Size (KB)': st.column_config.NumberColumn(format="%.1f")},
             )
-            st.plotly_chart(fig_pie, use_container_width=True)
 
-else:
-    st.warning("⚠️ Please select at least one study to see cost estimates.")
+        recent = list(st.session_state.get('run_profiles', ()))
+        st.caption(f"Last {len(recent)} run(s) this session, newest first. Competitive-control and additional-cost "
+                   f"changes rerun only the workspace fragment; those runs are listed here after the next full rerun.")
+        st.dataframe(
+            pd.DataFrame({
+                'Run': [entry.kind for entry in recent],
+                'At': [datetime.fromtimestamp(entry.created_at).strftime("%H:%M:%S") for entry in recent],
+                'Total (ms)': [entry.total_ms for entry in recent],
+                'Slowest Stage': [entry.slowest_stage for entry in recent],
+            }),
+            hide_index=True,
+            width='stretch',
+            column_config={'Total (ms)': st.column_config.NumberColumn(format="%.1f")},
+        )
+        st.download_button("⬇️ Download Metrics (JSON)",
+                           data=json.dumps([entry.as_dict() for entry in recent], indent=2),
+                           file_name="rerun_profile.json", mime="application/json")
+
+
+pricing_workspace()
 
 # Footer
 st.markdown("---")
-st.markdown("""
+profile.start("footer")
+html_block('footer', """
 <div style="text-align: center; color: #64748b; padding: 2rem;">
     <p style="font-size: 1.2rem; font-weight: 600; color: #00d4aa;">⚡ Enhanced DC Project Cost Estimator v2.0</p>
     <p>🚀 Developed by <strong>Abhishek Diwanji</strong> | Advanced Competitive Pricing & Phase-wise Analysis</p>
     <p style="font-size: 0.9rem;">Built upon the successful Perplexity Labs foundation with enhanced business intelligence</p>
 </div>
-""", unsafe_allow_html=True)
+""")
+profile.stop()
+
+finish_profile(profile)
+if show_profile:
+    render_profile_panel(profile)
@@ -0,0 +1,270 @@
+"""Benchmark suite for the pricing engine and the Streamlit rerun path.
+
+Measures:
+
+``scalar``
+    ``calculate_enhanced_project_costs`` quotes/sec (Consolidated and 4-phase).
+``batch``
+    ``price_batch`` over 1k / 100k / 1M quotes, plus ``price_configs`` (which
+    includes building the batch from ``QuoteConfig`` objects) at 1k / 100k.
+``phases``
+    Phase-wise pricing time against the number of phases.
+``staffing``
+    Planning hundreds of active projects against L1/L2/L3 capacity, and
+    re-planning with the urgency surcharge when one quote is added.
+``rerun``
+    Full-page script reruns of ``app.py`` through Streamlit's headless
+    ``AppTest`` for the Consolidated and Phase-wise paths.
+
+Every case reports the best and median of several repeats. Results are
+written as JSON together with the git commit and library versions; pass
+``--baseline`` with an earlier file to flag cases that got slower.
+
+    python benchmarks/pricing_benchmarks.py --output bench.json
+    python benchmarks/pricing_benchmarks.py --quick --only scalar,batch --baseline bench.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+REPO_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+sys.path.insert(0, REPO_ROOT)
+
+import numpy as np  # noqa: E402
+
+from dc_estimator.batch import QuoteBatch, consolidated_buses, price_batch, price_configs  # noqa: E402
+from dc_estimator.engine import (  # noqa: E402
+    DEFAULT_REPORT_COSTS,
+    DELIVERY_TYPES,
+    REPORT_FORMATS,
+    STUDY_KEYS,
+    TIER_LEVELS,
+    Phase,
+    QuoteConfig,
+    calculate_enhanced_project_costs,
+)
+from dc_estimator.scheduling import TeamCapacity, project_from_quote, schedule, urgency_surcharge  # noqa: E402
+
+SUITES = ('scalar', 'batch', 'phases', 'staffing', 'rerun')
+
+
+def measure(function, repeats: int, number: int = 1) -> dict:
+    """Best and median seconds per call of ``function`` over ``repeats`` rounds of ``number`` calls."""
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        for _ in range(number):
+            function()
+        timings.append((time.perf_counter() - started) / number)
+    return {'best_s': min(timings), 'median_s': statistics.median(timings), 'repeats': repeats, 'number': number}
+
+
+def random_configs(count: int, rng: random.Random):
+    return [QuoteConfig(
+        it_capacity=round(rng.uniform(1, 150), 1),
+        mechanical_load=round(rng.uniform(1, 60), 1),
+        house_load=round(rng.uniform(0.5, 20), 1),
+        tier_level=rng.choice(TIER_LEVELS),
+        delivery_type=rng.choice(DELIVERY_TYPES),
+        repeat_customer=rng.random() < 0.4,
+        etap_model_available=rng.random() < 0.3,
+        overall_competitive_factor=round(rng.uniform(0.75, 0.98), 2),
+    ) for _ in range(count)]
+
+
+def random_batch(count: int, seed: int) -> QuoteBatch:
+    """Consolidated quotes built directly as columns (1M QuoteConfig objects would dominate the timing)."""
+    rng = np.random.default_rng(seed)
+    total_load = rng.uniform(2, 230, count)
+    tier = rng.integers(0, len(TIER_LEVELS), count).astype(np.int8)
+    buses = consolidated_buses(total_load, tier)
+    return QuoteBatch(
+        estimated_buses=buses,
+        buses=buses.astype(np.float64),
+        report_units=np.ones(count),
+        tier=tier,
+        delivery=rng.integers(0, len(DELIVERY_TYPES), count).astype(np.int8),
+        study_mask=rng.random((count, len(STUDY_KEYS))) < 0.8,
+        report_costs=np.tile([DEFAULT_REPORT_COSTS[key] for key in STUDY_KEYS], (count, 1)).astype(np.float64),
+        report_format=rng.integers(0, len(REPORT_FORMATS), count).astype(np.int8),
+        report_complexity_factor=np.ones(count),
+        typical_modeling_factor=np.ones(count),
+        premium_factor=np.ones(count),
+        phase_extension_discount=np.ones(count),
+        competitive_multiplier=rng.uniform(0.6, 0.98, count),
+        additional_costs=np.zeros(count),
+        total_load=total_load,
+    )
+
+
+def bench_scalar(quick: bool) -> dict:
+    configs = random_configs(200, random.Random(0))
+    phased = [QuoteConfig(calculation_methodology="Phase-wise", phases=tuple(Phase(f"Phase {i+1}", 7.5) for i in range(4)),
+                          tier_level=config.tier_level) for config in configs]
+    results = {}
+    for name, cases in (('consolidated', configs), ('phase_wise_4', phased)):
+        timing = measure(lambda: [calculate_enhanced_project_costs(config) for config in cases],
+                         repeats=3 if quick else 7)
+        timing['quotes_per_s'] = len(cases) / timing['best_s']
+        results[name] = timing
+    return results
+
+
+def bench_batch(quick: bool) -> dict:
+    results = {}
+    sizes = (1_000, 100_000) if quick else (1_000, 100_000, 1_000_000)
+    for size in sizes:
+        batch = random_batch(size, seed=size)
+        timing = measure(lambda: price_batch(batch), repeats=3 if quick or size >= 1_000_000 else 7)
+        timing['quotes_per_s'] = size / timing['best_s']
+        results[f'price_batch_{size}'] = timing
+
+    rng = random.Random(1)
+    for size in (1_000,) if quick else (1_000, 100_000):
+        configs = random_configs(size, rng)
+        timing = measure(lambda: price_configs(configs), repeats=3)
+        timing['quotes_per_s'] = size / timing['best_s']
+        results[f'price_configs_{size}'] = timing
+    return results
+
+
+def bench_phases(quick: bool) -> dict:
+    results = {}
+    for count in (1, 5, 20, 50, 100, 200) if quick else (1, 5, 10, 20, 50, 100, 200, 500):
+        config = QuoteConfig(calculation_methodology="Phase-wise",
+                             phases=tuple(Phase(f"Phase {i+1}", round(2 + i % 13 * 1.7, 1)) for i in range(count)))
+        timing = measure(lambda: calculate_enhanced_project_costs(config), repeats=5, number=3 if quick else 10)
+        timing['phases'] = count
+        timing['us_per_phase'] = timing['best_s'] / count * 1e6
+        results[f'phases_{count}'] = timing
+    return results
+
+
+def bench_staffing(quick: bool) -> dict:
+    rng = random.Random(2)
+    team = TeamCapacity({"L1": 6, "L2": 10, "L3": 16}, max_share=0.5)
+    results = {}
+    for count in (100, 500) if quick else (100, 500, 2_000):
+        projects = []
+        for index, config in enumerate(random_configs(count, rng)):
+            release = rng.randint(0, 26)
+            projects.append(project_from_quote(f"Q{index}", config, calculate_enhanced_project_costs(config),
+                                               release=release, deadline=release + rng.randint(4, 16)))
+        *active, added = projects
+        plan = schedule(active, team)
+        results[f'schedule_{count}'] = measure(lambda: schedule(projects, team), repeats=3 if quick else 7)
+        results[f'add_quote_{count}'] = measure(lambda: urgency_surcharge(active, team, added, baseline=plan),
+                                                repeats=3 if quick else 7)
+    return results
+
+
+def bench_rerun(quick: bool) -> dict:
+    import tempfile
+
+    from streamlit.testing.v1 import AppTest
+
+    # Keep benchmark quotes out of the real quote history
+    os.environ.setdefault('DC_ESTIMATOR_DB', os.path.join(tempfile.mkdtemp(), 'benchmark_history.db'))
+
+    def rerun_timing(setup) -> dict:
+        app = AppTest.from_file(os.path.join(REPO_ROOT, 'app.py'), default_timeout=120).run()
+        setup(app)
+        app.run()
+        if app.exception:
+            raise RuntimeError(f"app.py raised during the benchmark: {app.exception[0].message}")
+        return measure(app.run, repeats=3 if quick else 10)
+
+    def widget(widgets, label):
+        return next(widget for widget in widgets if widget.label == label)
+
+    def phase_wise(app, phases):
+        widget(app.sidebar.selectbox, "Calculation Methodology").set_value("Phase-wise").run()
+        widget(app.sidebar.number_input, "Number of Phases").set_value(phases)
+
+    return {
+        'consolidated': rerun_timing(lambda app: None),
+        'phase_wise_2': rerun_timing(lambda app: phase_wise(app, 2)),
+        'phase_wise_50': rerun_timing(lambda app: phase_wise(app, 50)),
+    }
+
+
+def environment() -> dict:
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    versions = {'python': platform.python_version(), 'numpy': np.__version__}
+    try:
+        import streamlit
+        versions['streamlit'] = streamlit.__version__
+    except ImportError:
+        pass
+    return {
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'commit': commit,
+        'platform': platform.platform(),
+        'versions': versions,
+    }
+
+
+def compare(report: dict, baseline: dict, threshold: float) -> list:
+    """Cases whose best time grew by more than ``threshold`` (a fraction) against ``baseline``."""
+    regressions = []
+    for suite, cases in report['results'].items():
+        for case, timing in cases.items():
+            previous = baseline.get('results', {}).get(suite, {}).get(case)
+            if previous and timing['best_s'] > previous['best_s'] * (1 + threshold):
+                regressions.append({'case': f'{suite}.{case}', 'baseline_s': previous['best_s'],
+                                    'current_s': timing['best_s'],
+                                    'slowdown': timing['best_s'] / previous['best_s']})
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--only', type=lambda text: [name for name in text.split(',') if name],
+                        default=list(SUITES), help=f"comma-separated subset of {','.join(SUITES)}")
+    parser.add_argument('--quick', action='store_true', help="fewer repeats and smaller sizes")
+    parser.add_argument('--output', help="write the JSON report here (default: stdout)")
+    parser.add_argument('--baseline', help="earlier JSON report to compare against")
+    parser.add_argument('--threshold', type=float, default=0.2, help="allowed slowdown before flagging (default 0.2)")
+    args = parser.parse_args()
+
+    unknown = set(args.only) - set(SUITES)
+    if unknown:
+        parser.error(f"unknown suite(s): {', '.join(sorted(unknown))}")
+
+    benchmarks = {'scalar': bench_scalar, 'batch': bench_batch, 'phases': bench_phases, 'staffing': bench_staffing,
+                  'rerun': bench_rerun}
+    report = {'environment': environment(), 'quick': args.quick, 'results': {}}
+    for suite in args.only:
+        print(f"running {suite}…", file=sys.stderr)
+        report['results'][suite] = benchmarks[suite](args.quick)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as handle:
+            report['regressions'] = compare(report, json.load(handle), args.threshold)
+        for regression in report['regressions']:
+            print(f"REGRESSION {regression['case']}: {regression['baseline_s'] * 1000:.3f} ms -> "
+                  f"{regression['current_s'] * 1000:.3f} ms ({regression['slowdown']:.2f}x)", file=sys.stderr)
+
+    encoded = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as handle:
+            handle.write(encoded + "\n")
+    else:
+        print(encoded)
+    return 1 if report.get('regressions') else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
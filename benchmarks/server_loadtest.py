@@ -0,0 +1,142 @@
+"""Load test for the local quoting service.
+
+Opens ``--connections`` keep-alive connections and has each send requests
+back to back for ``--duration`` seconds, then reports p50/p99 request latency
+and quotes/sec. By default an in-process server is started on a free port;
+pass ``--url`` to target one that is already running.
+
+    python benchmarks/server_loadtest.py --mode single --connections 16
+    python benchmarks/server_loadtest.py --mode batch --batch-size 5000 --json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from dc_estimator.engine import DELIVERY_TYPES, TIER_LEVELS  # noqa: E402
+from dc_estimator.server import QuoteServer  # noqa: E402
+
+
+def random_quote(rng: random.Random) -> dict:
+    return {
+        'it_capacity': round(rng.uniform(1, 150), 1),
+        'mechanical_load': round(rng.uniform(1, 60), 1),
+        'house_load': round(rng.uniform(0.5, 20), 1),
+        'tier_level': rng.choice(TIER_LEVELS),
+        'delivery_type': rng.choice(DELIVERY_TYPES),
+        'repeat_customer': rng.random() < 0.4,
+        'etap_model_available': rng.random() < 0.3,
+        'overall_competitive_factor': round(rng.uniform(0.75, 0.98), 2),
+    }
+
+
+async def _request(reader, writer, host, path, body: bytes):
+    writer.write(
+        f"POST {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n".encode('latin-1') + body
+    )
+    await writer.drain()
+    status_line = await reader.readline()
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        if name.lower() == 'content-length':
+            length = int(value)
+    await reader.readexactly(length)
+    return int(status_line.split()[1])
+
+
+async def _worker(host, port, path, bodies, quotes_per_request, deadline, latencies, counters):
+    reader, writer = await asyncio.open_connection(host, port)
+    index = 0
+    try:
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            status = await _request(reader, writer, host, path, bodies[index % len(bodies)])
+            latencies.append(time.perf_counter() - started)
+            index += 1
+            if status == 200:
+                counters['quotes'] += quotes_per_request
+            else:
+                counters['errors'] += 1
+    finally:
+        writer.close()
+
+
+async def run(args) -> dict:
+    rng = random.Random(args.seed)
+    server = None
+    if args.url:
+        parts = urlsplit(args.url)
+        host, port = parts.hostname, parts.port or 80
+    else:
+        server = await asyncio.start_server(QuoteServer().serve_connection, '127.0.0.1', 0)
+        host, port = server.sockets[0].getsockname()[:2]
+
+    if args.mode == 'single':
+        path, quotes_per_request = '/quote', 1
+        bodies = [json.dumps(random_quote(rng)).encode() for _ in range(256)]
+    else:
+        path, quotes_per_request = '/quotes', args.batch_size
+        bodies = [json.dumps({'quotes': [random_quote(rng) for _ in range(args.batch_size)]}).encode()
+                  for _ in range(4)]
+
+    latencies, counters = [], {'quotes': 0, 'errors': 0}
+    started = time.perf_counter()
+    deadline = started + args.duration
+    await asyncio.gather(*[
+        _worker(host, port, path, bodies, quotes_per_request, deadline, latencies, counters)
+        for _ in range(args.connections)
+    ])
+    elapsed = time.perf_counter() - started
+    if server is not None:
+        server.close()
+        await server.wait_closed()
+
+    latencies.sort()
+    pick = lambda p: latencies[min(len(latencies) - 1, int(round(p / 100 * (len(latencies) - 1))))] * 1000
+    return {
+        'mode': args.mode,
+        'connections': args.connections,
+        'batch_size': quotes_per_request,
+        'requests': len(latencies),
+        'errors': counters['errors'],
+        'p50_ms': pick(50),
+        'p99_ms': pick(99),
+        'requests_per_s': len(latencies) / elapsed,
+        'quotes_per_s': counters['quotes'] / elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', help="target server, e.g. http://127.0.0.1:8765 (default: start one in-process)")
+    parser.add_argument('--mode', choices=['single', 'batch'], default='single')
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--connections', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=5.0, help="seconds")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', action='store_true', help="print the report as JSON")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"{report['requests']:,} requests ({report['errors']} errors) over {args.connections} connections")
+        print(f"latency p50 {report['p50_ms']:.2f} ms, p99 {report['p99_ms']:.2f} ms")
+        print(f"{report['requests_per_s']:,.0f} requests/s, {report['quotes_per_s']:,.0f} quotes/s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,244 @@
+"""Multi-session load test for the Streamlit estimator page.
+
+Simulates ``--sessions`` estimators using one server process at once. Each
+session is a headless ``AppTest`` of ``app.py`` with its own session state,
+and all of them share the process-wide caches exactly as Streamlit sessions
+do. Sessions run concurrently on a thread pool and each makes ``--actions``
+widget changes drawn from what estimators actually do: pick a tier, delivery
+type, load, report format or methodology, flip the repeat-customer toggle,
+move the competitive slider. Values come from short lists, so sessions keep
+landing on quotes another session has already priced. Between changes a
+session pauses for an exponentially distributed ``--think-time``.
+
+``AppTest`` installs its own runtime and config for each run and removes them
+afterwards, so reruns of different sessions cannot overlap and are queued on
+a lock. Two latencies are reported: service time (the rerun itself) and
+response time (queueing included).
+
+The reruns therefore run one at a time, with ``AppTest``'s own setup and
+element-tree bookkeeping added to each. The CPU figures and percentiles
+describe that serialized harness, not a Streamlit server handling sessions
+concurrently: use them to compare two versions of the app under the same
+settings, not to size a deployment.
+
+Two passes are run with the same seed:
+
+timing
+    Service and response time percentiles per widget change and the process
+    CPU time (user + system) over the wall time of the run.
+memory
+    The same workload under ``tracemalloc``. Once the sessions finish, each
+    ``AppTest``'s element tree is dropped and only the server-side session
+    state is kept. The memory still held is reported per session; what is
+    left after those are released too is growth of the shared caches. Code
+    objects from compiling ``app.py`` are left out, since ``AppTest``
+    compiles it per run where a server compiles it once. The per-session
+    figure includes the debug panel's run-profile history
+    (:mod:`dc_estimator.profiling`), which the app did not keep before
+    profiling was added, so it is only comparable between versions that
+    both have it.
+
+Quotes are saved to a temporary history database unless ``DC_ESTIMATOR_DB``
+is set.
+
+    python benchmarks/session_loadtest.py --sessions 20 --actions 10
+    python benchmarks/session_loadtest.py --sessions 50 --workers 8 --json
+"""
+
+import argparse
+import gc
+import json
+import os
+import random
+import resource
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+REPO_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+APP = os.path.abspath(os.path.join(REPO_ROOT, "app.py"))
+sys.path.insert(0, REPO_ROOT)
+
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+from dc_estimator.cache import figure_cache, results_cache  # noqa: E402
+from dc_estimator.engine import DELIVERY_TYPES, METHODOLOGIES, REPORT_FORMATS, TIER_LEVELS  # noqa: E402
+
+# Widget changes a session picks from: (widget kind, label, candidate values)
+ACTIONS = (
+    ('selectbox', "Tier Level", TIER_LEVELS),
+    ('selectbox', "Delivery Type", DELIVERY_TYPES),
+    ('selectbox', "Report Format", REPORT_FORMATS),
+    ('selectbox', "Calculation Methodology", METHODOLOGIES),
+    ('number_input', "IT Capacity (MW)", (10.0, 15.0, 20.0, 30.0, 50.0)),
+    ('number_input', "Mechanical Load (MW)", (5.0, 10.0, 20.0)),
+    ('slider', "Overall Competitive Reduction", (0.80, 0.85, 0.88, 0.92)),
+    ('toggle', "Repeat Customer", (False, True)),
+    ('toggle', "Compact Breakdown Tables", (False, True)),
+)
+
+
+RUN_LOCK = threading.Lock()
+
+
+def widget(app: AppTest, kind: str, label: str):
+    return next(element for element in app.get(kind) if element.label == label)
+
+
+def percentile(sorted_values, p: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(round(p / 100 * (len(sorted_values) - 1))))]
+
+
+def rerun(app: AppTest):
+    """Run ``app`` once; returns ``(service, response)`` seconds."""
+    queued = time.perf_counter()
+    with RUN_LOCK:
+        started = time.perf_counter()
+        app.run()
+        finished = time.perf_counter()
+    if app.exception:
+        raise RuntimeError(app.exception[0].message)
+    return finished - started, finished - queued
+
+
+def run_session(seed: int, actions: int, think_time: float, timeout: float):
+    """One estimator's visit: the first page load then ``actions`` widget changes.
+
+    Returns the ``AppTest`` and ``(service, response)`` seconds per rerun, first load first.
+    """
+    rng = random.Random(seed)
+    app = AppTest.from_file(APP, default_timeout=timeout)
+    latencies = [rerun(app)]
+    for _ in range(actions):
+        if think_time > 0:
+            time.sleep(rng.expovariate(1 / think_time))
+        kind, label, values = rng.choice(ACTIONS)
+        element = widget(app, kind, label)
+        element.set_value(rng.choice([value for value in values if value != element.value]))
+        latencies.append(rerun(app))
+    return app, latencies
+
+
+def run_sessions(args):
+    with ThreadPoolExecutor(max_workers=args.workers or args.sessions) as pool:
+        futures = [pool.submit(run_session, args.seed + index, args.actions, args.think_time, args.timeout)
+                   for index in range(args.sessions)]
+        return [future.result() for future in futures]
+
+
+def cpu_seconds() -> float:
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def timing_pass(args) -> dict:
+    cpu_started, started = cpu_seconds(), time.perf_counter()
+    sessions = run_sessions(args)
+    elapsed, cpu = time.perf_counter() - started, cpu_seconds() - cpu_started
+
+    first_loads = [latencies[0][0] for _, latencies in sessions]
+    report = {
+        'reruns': sum(len(latencies) - 1 for _, latencies in sessions),
+        'first_load_p50_ms': statistics.median(first_loads) * 1000,
+    }
+    for position, name in enumerate(('service', 'response')):
+        values = sorted(latency[position] for _, latencies in sessions for latency in latencies[1:])
+        for p in (50, 90, 99):
+            report[f'{name}_p{p}_ms'] = percentile(values, p) * 1000
+        report[f'{name}_max_ms'] = values[-1] * 1000
+    report.update({
+        'wall_s': elapsed,
+        'cpu_s': cpu,
+        'cpu_percent': cpu / elapsed * 100,
+        'cpu_ms_per_rerun': cpu / (report['reruns'] + len(first_loads)) * 1000,
+    })
+    return report
+
+
+# AppTest compiles app.py afresh for every run and a session's fragment keeps that code alive;
+# a server compiles the script once for all sessions, so those allocations are not counted
+HARNESS_ONLY = (
+    tracemalloc.Filter(False, "*/streamlit/runtime/scriptrunner/script_cache.py"),
+    tracemalloc.Filter(False, "*/ast.py"),
+)
+
+
+def traced_bytes() -> int:
+    gc.collect()
+    return sum(stat.size for stat in tracemalloc.take_snapshot().filter_traces(HARNESS_ONLY).statistics('filename'))
+
+
+def memory_pass(args) -> dict:
+    tracemalloc.start()
+    baseline = traced_bytes()
+    sessions = run_sessions(args)
+    peak = tracemalloc.get_traced_memory()[1]
+
+    # Keep what a server keeps per session; the element trees only exist for the test harness
+    states = [(app._session_state, app._fragment_storage) for app, _ in sessions]
+    del sessions
+    with_sessions = traced_bytes()
+    del states
+    shared = traced_bytes()
+    tracemalloc.stop()
+    return {
+        'per_session_kib': (with_sessions - shared) / args.sessions / 1024,
+        'sessions_total_kib': (with_sessions - shared) / 1024,
+        'shared_growth_kib': (shared - baseline) / 1024,
+        'peak_kib': (peak - baseline) / 1024,
+    }
+
+
+def run(args) -> dict:
+    # Warm the imports and the caches for the default quote, as a server that has served a page would be
+    run_session(args.seed - 1, 0, 0, args.timeout)
+    report = {'sessions': args.sessions, 'actions': args.actions, 'think_time_s': args.think_time,
+              'workers': args.workers or args.sessions, 'rerun_mode': "serialized (AppTest)"}
+    report.update(timing_pass(args))
+    if not args.no_memory:
+        report.update(memory_pass(args))
+    report['results_cache'] = results_cache.stats()
+    report['figure_cache'] = figure_cache.stats()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sessions', type=int, default=20, help="concurrent estimator sessions")
+    parser.add_argument('--actions', type=int, default=10, help="widget changes per session")
+    parser.add_argument('--workers', type=int, default=0, help="threads running sessions (default: one per session)")
+    parser.add_argument('--think-time', type=float, default=2.0, help="mean seconds between a session's changes")
+    parser.add_argument('--timeout', type=float, default=120.0, help="seconds allowed per rerun")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--no-memory', action='store_true', help="skip the tracemalloc pass")
+    parser.add_argument('--json', action='store_true', help="print the report as JSON")
+    args = parser.parse_args()
+
+    os.environ.setdefault("DC_ESTIMATOR_DB", os.path.join(tempfile.mkdtemp(), "loadtest_history.db"))
+    report = run(args)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(f"{args.sessions} sessions × {args.actions} widget changes ({args.think_time:g} s think time) "
+          f"on {report['workers']} threads; first load p50 {report['first_load_p50_ms']:.0f} ms")
+    print("AppTest runs one rerun at a time: timings are for comparing app versions, not server capacity")
+    for name in ('service', 'response'):
+        print(f"{name} time p50 {report[f'{name}_p50_ms']:.0f} ms, p90 {report[f'{name}_p90_ms']:.0f} ms, "
+              f"p99 {report[f'{name}_p99_ms']:.0f} ms, max {report[f'{name}_max_ms']:.0f} ms")
+    print(f"CPU {report['cpu_s']:.1f} s over {report['wall_s']:.1f} s wall ({report['cpu_percent']:.0f}%), "
+          f"{report['cpu_ms_per_rerun']:.0f} ms per rerun")
+    if not args.no_memory:
+        print(f"memory per session {report['per_session_kib']:,.0f} KiB "
+              f"({report['sessions_total_kib']:,.0f} KiB for all sessions); "
+              f"shared caches grew {report['shared_growth_kib']:,.0f} KiB; peak {report['peak_kib']:,.0f} KiB")
+    for name in ('results_cache', 'figure_cache'):
+        stats = report[name]
+        print(f"{name}: {stats['size']} entries, {stats['hits']:,} hits / {stats['misses']:,} misses")
+
+
+if __name__ == '__main__':
+    main()
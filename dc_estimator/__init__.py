@@ -0,0 +1,32 @@
+"""Pricing engine for the Enhanced DC Project Cost Estimator.
+
+The Streamlit UI in ``app.py`` is a thin layer over this package. Everything
+here is importable without Streamlit or Plotly so quotes can be priced from
+scripts, scheduled jobs and services.
+"""
+
+from .engine import (
+    BUILTIN_RATE_CARD,
+    DELIVERY_TYPES,
+    Phase,
+    QuoteConfig,
+    RateCard,
+    REPORT_FORMATS,
+    STUDIES_DATA,
+    STUDY_KEYS,
+    TIER_LEVELS,
+    calculate_enhanced_project_costs,
+)
+
+__all__ = [
+    "BUILTIN_RATE_CARD",
+    "DELIVERY_TYPES",
+    "Phase",
+    "QuoteConfig",
+    "RateCard",
+    "REPORT_FORMATS",
+    "STUDIES_DATA",
+    "STUDY_KEYS",
+    "TIER_LEVELS",
+    "calculate_enhanced_project_costs",
+]
@@ -0,0 +1,202 @@
+"""Columnar analytics over the quote history.
+
+The SQLite history (:mod:`dc_estimator.history`) is row-oriented and carries
+full JSON inputs and results per quote. For portfolio analytics its headline
+columns are snapshotted into uncompressed Arrow IPC part files, appending only
+quotes newer than the last snapshot. Category columns are dictionary encoded
+against the engine's fixed choices, so every part shares one dictionary. The
+parts are opened with ``pa.memory_map`` and read zero-copy: the snapshot stays
+in the page cache instead of being decoded onto the heap. Every chart is fed
+from a small pre-aggregated Arrow table (one row per month × tier, histogram
+bin × client type, and so on) computed with Arrow's group-by kernels, so
+neither pandas nor Plotly ever sees one row per quote.
+
+Snapshots are written to ``quote_history_arrow/``; set
+``DC_ESTIMATOR_ANALYTICS_DIR`` to use another directory.
+"""
+
+import glob
+import os
+import sqlite3
+import tempfile
+import threading
+from typing import Optional, Tuple
+
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from .engine import CLIENT_TYPES, METHODOLOGIES, PROJECT_TYPES, TIER_LEVELS
+from .history import QuoteHistory
+
+DEFAULT_SNAPSHOT_DIR = "quote_history_arrow"
+SNAPSHOT_COLUMNS = ('id', 'created_at', 'tier_level', 'client_type', 'project_type', 'calculation_methodology',
+                    'total_load', 'estimated_buses', 'standard_cost', 'competitive_cost', 'savings_percentage')
+SCHEMA = pa.schema([
+    ('id', pa.int64()),
+    ('created', pa.timestamp('ms')),
+    ('tier_level', pa.dictionary(pa.int8(), pa.string())),
+    ('client_type', pa.dictionary(pa.int8(), pa.string())),
+    ('project_type', pa.dictionary(pa.int8(), pa.string())),
+    ('calculation_methodology', pa.dictionary(pa.int8(), pa.string())),
+    ('total_load', pa.float64()),
+    ('estimated_buses', pa.int64()),
+    ('standard_cost', pa.float64()),
+    ('competitive_cost', pa.float64()),
+    ('savings_percentage', pa.float64()),
+])
+# Fixed dictionaries: an IPC file allows only one dictionary per column across its batches
+DICTIONARIES = tuple(pa.array(choices, pa.string())
+                     for choices in (TIER_LEVELS, CLIENT_TYPES, PROJECT_TYPES, METHODOLOGIES))
+DEFAULT_CHUNK_ROWS = 100_000
+SAVINGS_BIN_WIDTH = 2.5
+
+
+def default_snapshot_dir() -> str:
+    return os.environ.get("DC_ESTIMATOR_ANALYTICS_DIR", DEFAULT_SNAPSHOT_DIR)
+
+
+def _parts(directory: str):
+    return sorted(glob.glob(os.path.join(directory, "part-*.arrow")))
+
+
+def _last_snapshot_id(directory: str) -> int:
+    # Part files are named part-<first id>-<last id>.arrow
+    parts = _parts(directory)
+    return int(os.path.basename(parts[-1]).split('-')[2].split('.')[0]) if parts else 0
+
+
+def _encode(values, dictionary: pa.Array) -> pa.DictionaryArray:
+    # Values outside the engine's choices become nulls
+    indices = pc.index_in(pa.array(values, pa.string()), value_set=dictionary)
+    return pa.DictionaryArray.from_arrays(pc.cast(indices, pa.int8()), dictionary)
+
+
+def _chunk_table(rows) -> pa.Table:
+    columns = list(zip(*rows))
+    created = pa.array(columns[1], pa.float64())
+    return pa.table([
+        pa.array(columns[0], pa.int64()),
+        pc.cast(pc.cast(pc.round(pc.multiply(created, 1000)), pa.int64()), pa.timestamp('ms')),
+        *(_encode(column, dictionary) for column, dictionary in zip(columns[2:6], DICTIONARIES)),
+        *(pa.array(column) for column in columns[6:]),
+    ], schema=SCHEMA)
+
+
+# Sessions refreshing at once would both read the last snapshot id and write the same quotes twice
+_snapshot_lock = threading.Lock()
+
+
+def snapshot_history(history: QuoteHistory, directory: str, chunk_rows: int = DEFAULT_CHUNK_ROWS) -> int:
+    """Append quotes saved since the last snapshot as a new Arrow part; returns the rows added."""
+    os.makedirs(directory, exist_ok=True)
+    history.flush()
+    with _snapshot_lock:
+        since = _last_snapshot_id(directory)
+        handle, temporary = tempfile.mkstemp(suffix='.tmp', prefix='part-', dir=directory)
+        os.close(handle)
+        connection = sqlite3.connect(history.path)
+        writer, first_id, last_id, rows_written = None, None, None, 0
+        try:
+            cursor = connection.execute(
+                f"SELECT {', '.join(SNAPSHOT_COLUMNS)} FROM quotes WHERE id > ? ORDER BY id", (since,))
+            with pa.OSFile(temporary, 'wb') as sink:
+                while True:
+                    rows = cursor.fetchmany(chunk_rows)
+                    if not rows:
+                        break
+                    if writer is None:
+                        writer = pa.ipc.new_file(sink, SCHEMA)
+                        first_id = rows[0][0]
+                    writer.write_table(_chunk_table(rows))
+                    last_id = rows[-1][0]
+                    rows_written += len(rows)
+                if writer is not None:
+                    writer.close()
+            if rows_written:
+                os.replace(temporary, os.path.join(directory, f"part-{first_id:012d}-{last_id:012d}.arrow"))
+        finally:
+            connection.close()
+            if os.path.exists(temporary):
+                os.remove(temporary)
+    return rows_written
+
+
+def snapshot_fingerprint(directory: str) -> Tuple[Tuple[str, int], ...]:
+    """Changes whenever a part is added, so summaries can be cached on it."""
+    return tuple((os.path.basename(path), os.path.getsize(path)) for path in _parts(directory))
+
+
+def load_snapshot(directory: str) -> Optional[pa.Table]:
+    """All snapshot parts as one memory-mapped table (``None`` when empty).
+
+    The table's buffers point into the mapped files, so it stays valid after
+    the parts are replaced or removed but reads no more of them than the
+    summaries touch.
+    """
+    parts = _parts(directory)
+    if not parts:
+        return None
+    return pa.concat_tables([pa.ipc.open_file(pa.memory_map(path)).read_all() for path in parts])
+
+
+def _sorted(summary: pa.Table, keys) -> pa.Table:
+    # Summaries are tiny: decode dictionary columns so they sort and convert plainly
+    columns = [pc.cast(column, pa.string()) if pa.types.is_dictionary(column.type) else column
+               for column in summary.columns]
+    return pa.table(columns, names=summary.column_names).sort_by([(key, 'ascending') for key in keys])
+
+
+def with_unit_costs(table: pa.Table) -> pa.Table:
+    """Add month, cost-per-MW and cost-per-bus columns (on the competitive price)."""
+    return (table
+            .append_column('month', pc.floor_temporal(table['created'], unit='month'))
+            .append_column('cost_per_mw', pc.divide(table['competitive_cost'], table['total_load']))
+            .append_column('cost_per_bus', pc.divide(table['competitive_cost'],
+                                                     pc.cast(table['estimated_buses'], pa.float64()))))
+
+
+def price_trend_by_tier(table: pa.Table) -> pa.Table:
+    """Monthly quote count and mean price, cost per MW and cost per bus per tier."""
+    summary = table.group_by(['month', 'tier_level']).aggregate([
+        ('id', 'count'), ('competitive_cost', 'mean'), ('cost_per_mw', 'mean'), ('cost_per_bus', 'mean')])
+    return _sorted(summary, ['month', 'tier_level'])
+
+
+def unit_costs_by_tier(table: pa.Table) -> pa.Table:
+    summary = table.group_by('tier_level').aggregate([
+        ('id', 'count'), ('cost_per_mw', 'mean'), ('cost_per_mw', 'approximate_median'),
+        ('cost_per_bus', 'mean'), ('cost_per_bus', 'approximate_median')])
+    return _sorted(summary, ['tier_level'])
+
+
+def savings_distribution(table: pa.Table, bin_width: float = SAVINGS_BIN_WIDTH) -> pa.Table:
+    """Histogram of savings percentage per client type, as (client_type, bin start, count)."""
+    bins = pc.multiply(pc.floor(pc.divide(table['savings_percentage'], bin_width)), bin_width)
+    binned = pa.table({'client_type': table['client_type'], 'savings_bin': bins, 'id': table['id']})
+    summary = binned.group_by(['client_type', 'savings_bin']).aggregate([('id', 'count')])
+    return _sorted(summary, ['client_type', 'savings_bin'])
+
+
+def project_type_comparison(table: pa.Table) -> pa.Table:
+    """Phase extension vs fresh project: counts and mean unit costs and savings."""
+    summary = table.group_by('project_type').aggregate([
+        ('id', 'count'), ('total_load', 'mean'), ('cost_per_mw', 'mean'),
+        ('cost_per_bus', 'mean'), ('savings_percentage', 'mean')])
+    return _sorted(summary, ['project_type'])
+
+
+def summarize(directory: str) -> Optional[dict]:
+    """Every pre-aggregated summary the analytics page draws, from one snapshot read."""
+    table = load_snapshot(directory)
+    if table is None or table.num_rows == 0:
+        return None
+    table = with_unit_costs(table)
+    return {
+        'quotes': table.num_rows,
+        'first_quote': pc.min(table['created']).as_py(),
+        'last_quote': pc.max(table['created']).as_py(),
+        'price_trend': price_trend_by_tier(table),
+        'unit_costs': unit_costs_by_tier(table),
+        'savings_distribution': savings_distribution(table),
+        'project_types': project_type_comparison(table),
+    }
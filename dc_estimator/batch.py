@@ -0,0 +1,172 @@
+"""Vectorized pricing for many quotes at once.
+
+The scalar engine is affine in bus count: for every pricing unit (the whole
+project, or one phase in Phase-wise mode) the cost is
+``buses × Σ(hours_per_bus) × tier complexity × delivery × modeling × blended
+rate + Σ report cost``. Summed over units this collapses to two numbers per
+quote, the total priced buses and the number of units carrying a report, so
+N quotes price as a handful of NumPy array expressions with no Python loop.
+
+A batch is priced against one rate card, whose tables come precompiled from
+:func:`dc_estimator.ratecard.compiled`; :func:`price_configs` splits mixed
+cards into one pass per card.
+"""
+
+from dataclasses import dataclass, fields
+from typing import Dict, Iterable, List, Sequence
+
+import numpy as np
+
+from .engine import (
+    BUILTIN_RATE_CARD,
+    DELIVERY_TYPES,
+    REPORT_FORMATS,
+    STUDY_KEYS,
+    TIER_LEVELS,
+    QuoteConfig,
+    RateCard,
+    estimate_buses,
+    phase_buses,
+)
+from .ratecard import compiled
+
+
+@dataclass
+class QuoteBatch:
+    """Column-oriented inputs for N quotes.
+
+    ``tier``, ``delivery`` and ``report_format`` hold indices into
+    ``TIER_LEVELS``, ``DELIVERY_TYPES`` and ``REPORT_FORMATS``. ``study_mask``
+    and ``report_costs`` are N × len(STUDY_KEYS). ``buses`` is the number of
+    buses priced for labor (the sum over phases in Phase-wise mode) and
+    ``report_units`` how many times each study report is billed (1, or the
+    number of phases). The multiplier columns are already resolved: a factor
+    whose toggle is off must be passed as 1.0. Bus counts are resolved too,
+    so they already reflect each quote's rate card.
+    """
+
+    estimated_buses: np.ndarray
+    buses: np.ndarray
+    report_units: np.ndarray
+    tier: np.ndarray
+    delivery: np.ndarray
+    study_mask: np.ndarray
+    report_costs: np.ndarray
+    report_format: np.ndarray
+    report_complexity_factor: np.ndarray
+    typical_modeling_factor: np.ndarray
+    premium_factor: np.ndarray
+    phase_extension_discount: np.ndarray
+    competitive_multiplier: np.ndarray
+    additional_costs: np.ndarray
+    total_load: np.ndarray
+
+    def __len__(self):
+        return len(self.buses)
+
+    def repeat(self, count: int) -> "QuoteBatch":
+        """Tile every quote ``count`` times, e.g. as the base grid of a sweep."""
+        return QuoteBatch(**{f.name: np.repeat(getattr(self, f.name), count, axis=0) for f in fields(self)})
+
+    @classmethod
+    def concat(cls, batches: Sequence["QuoteBatch"]) -> "QuoteBatch":
+        return cls(**{f.name: np.concatenate([getattr(b, f.name) for b in batches]) for f in fields(cls)})
+
+    @classmethod
+    def from_configs(cls, configs: Iterable[QuoteConfig]) -> "QuoteBatch":
+        configs = list(configs)
+        tier_codes = {tier: code for code, tier in enumerate(TIER_LEVELS)}
+        delivery_codes = {kind: code for code, kind in enumerate(DELIVERY_TYPES)}
+        format_codes = {fmt: code for code, fmt in enumerate(REPORT_FORMATS)}
+
+        estimated, buses, units = [], [], []
+        for config in configs:
+            if config.custom_bus_count:
+                estimated.append(config.custom_bus_count)
+            else:
+                estimated.append(estimate_buses(config.total_load, config.tier_level, config.rate_card))
+            if config.calculation_methodology == "Phase-wise":
+                buses.append(sum(phase_buses(phase, config.tier_level, config.rate_card) for phase in config.phases))
+                units.append(len(config.phases))
+            else:
+                buses.append(estimated[-1])
+                units.append(1)
+
+        return cls(
+            estimated_buses=np.array(estimated, dtype=np.int64),
+            buses=np.array(buses, dtype=np.float64),
+            report_units=np.array(units, dtype=np.float64),
+            tier=np.array([tier_codes[c.tier_level] for c in configs], dtype=np.int8),
+            delivery=np.array([delivery_codes[c.delivery_type] for c in configs], dtype=np.int8),
+            study_mask=np.array([[key in c.selected_studies for key in STUDY_KEYS] for c in configs],
+                                dtype=bool).reshape(len(configs), len(STUDY_KEYS)),
+            report_costs=np.array([[c.base_report_costs.get(key, 0.0) for key in STUDY_KEYS] for c in configs],
+                                  dtype=np.float64).reshape(len(configs), len(STUDY_KEYS)),
+            report_format=np.array([format_codes[c.report_format] for c in configs], dtype=np.int8),
+            report_complexity_factor=np.array([c.report_complexity_factor for c in configs], dtype=np.float64),
+            typical_modeling_factor=np.array([c.typical_modeling_factor for c in configs], dtype=np.float64),
+            premium_factor=np.array([c.effective_premium_factor for c in configs], dtype=np.float64),
+            phase_extension_discount=np.array([c.effective_phase_extension_discount for c in configs],
+                                              dtype=np.float64),
+            competitive_multiplier=np.array([c.competitive_multiplier for c in configs], dtype=np.float64),
+            additional_costs=np.array([c.additional_costs for c in configs], dtype=np.float64),
+            total_load=np.array([c.total_load for c in configs], dtype=np.float64),
+        )
+
+
+def consolidated_buses(total_load: np.ndarray, tier: np.ndarray,
+                       rate_card: RateCard = BUILTIN_RATE_CARD) -> np.ndarray:
+    """Vectorized ``ceil(total_load × tier multiplier)``."""
+    return np.ceil(total_load * compiled(rate_card).tier_bus_multiplier[tier]).astype(np.int64)
+
+
+def price_batch(batch: QuoteBatch, rate_card: RateCard = BUILTIN_RATE_CARD) -> Dict[str, np.ndarray]:
+    """Price every quote in ``batch``; returns arrays keyed like the scalar results dict."""
+    tables = compiled(rate_card)
+    hours_per_bus = batch.study_mask @ tables.hours_per_bus
+    hour_scale = (tables.tier_complexity[batch.tier] * tables.delivery[batch.delivery]
+                  * batch.typical_modeling_factor)
+    total_hours = batch.buses * hours_per_bus * hour_scale
+    labor_cost = total_hours * tables.blended_rate
+
+    report_cost = ((batch.report_costs * batch.study_mask).sum(axis=1)
+                   * tables.report_format[batch.report_format] * batch.report_complexity_factor)
+
+    standard_cost = ((labor_cost + batch.report_units * report_cost) * batch.premium_factor
+                     + batch.additional_costs) * batch.phase_extension_discount
+    competitive_cost = standard_cost * batch.competitive_multiplier
+    savings = standard_cost - competitive_cost
+    with np.errstate(divide='ignore', invalid='ignore'):
+        savings_percentage = np.where(standard_cost > 0, savings / standard_cost * 100, 0.0)
+
+    return {
+        'estimated_buses': batch.estimated_buses,
+        'total_load': batch.total_load,
+        'total_hours': total_hours,
+        'labor_cost': labor_cost,
+        'report_cost': batch.report_units * report_cost,
+        'standard_cost': standard_cost,
+        'competitive_cost': competitive_cost,
+        'savings': savings,
+        'savings_percentage': savings_percentage,
+    }
+
+
+def price_configs(configs: Sequence[QuoteConfig]) -> Dict[str, np.ndarray]:
+    """Price ``configs`` in one batch per rate card, returning arrays in input order."""
+    configs = list(configs)
+    groups: Dict[RateCard, List[int]] = {}
+    for index, config in enumerate(configs):
+        groups.setdefault(config.rate_card, []).append(index)
+    if len(groups) <= 1:
+        rate_card = next(iter(groups), BUILTIN_RATE_CARD)
+        return price_batch(QuoteBatch.from_configs(configs), rate_card)
+
+    priced = {}
+    for rate_card, indices in groups.items():
+        group = price_batch(QuoteBatch.from_configs(configs[index] for index in indices), rate_card)
+        for name, values in group.items():
+            if name not in priced:
+                priced[name] = np.empty(len(configs), dtype=values.dtype)
+            priced[name][indices] = values
+    return priced
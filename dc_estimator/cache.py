@@ -0,0 +1,142 @@
+"""Process-wide memoization of quote results and derived artefacts.
+
+Streamlit reruns the whole script on every widget interaction, including
+ones that cannot change the price (renaming a phase, expanding a panel). The
+caches here are keyed on a canonical hash of only the cost-relevant inputs
+and live at module level, so every session served by the same process
+shares them. Cached values are shared objects and must be treated as
+read-only by callers.
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Callable, Hashable, Optional
+
+from .engine import BUILTIN_RATE_CARD, STUDY_KEYS, QuoteConfig, calculate_enhanced_project_costs
+from .ratecard import fingerprint
+
+_MISSING = object()
+
+
+class LRUCache:
+    """Thread-safe mapping with least-recently-used eviction beyond ``maxsize`` entries."""
+
+    def __init__(self, maxsize: int = 256):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key: Hashable, default=None):
+        with self._lock:
+            value = self._data.get(key, _MISSING)
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], object]):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            # Computed outside the lock: two sessions racing on the same key
+            # both compute, which is cheaper than serialising every miss.
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+
+    def stats(self) -> dict:
+        return {'size': len(self._data), 'maxsize': self.maxsize, 'hits': self.hits, 'misses': self.misses}
+
+
+def normalized_inputs(config: QuoteConfig) -> dict:
+    """The inputs that can change ``config``'s price, in canonical form.
+
+    Settings hidden behind an inactive toggle (e.g. the ETAP discount when no
+    model is available) and display-only fields such as phase names are
+    dropped, so configurations that price identically normalise identically.
+    """
+    studies = [key for key in STUDY_KEYS if key in config.selected_studies]
+    phase_wise = config.calculation_methodology == "Phase-wise"
+    return {
+        'total_load': float(config.total_load),
+        'custom_bus_count': int(config.custom_bus_count) if config.custom_bus_count else None,
+        'tier_level': config.tier_level,
+        'delivery_type': config.delivery_type,
+        'calculation_methodology': config.calculation_methodology,
+        'phases': [[float(phase.capacity), phase.bus_override or None] for phase in config.phases] if phase_wise else [],
+        'studies': {key: float(config.base_report_costs[key]) for key in studies},
+        'report_format': config.report_format,
+        'report_complexity_factor': float(config.report_complexity_factor),
+        'typical_modeling_factor': float(config.typical_modeling_factor),
+        'premium_factor': float(config.effective_premium_factor),
+        'phase_extension_discount': float(config.effective_phase_extension_discount),
+        'etap_discount_factor': float(config.etap_discount_factor) if config.etap_model_available else None,
+        'repeat_discount_factor': float(config.repeat_discount_factor) if config.repeat_customer else None,
+        'overall_competitive_factor': float(config.overall_competitive_factor),
+        'additional_costs': float(config.additional_costs),
+        # Left out for the built-in card so its keys stay what they were before rate cards
+        **({} if config.rate_card is BUILTIN_RATE_CARD else {'rate_card': fingerprint(config.rate_card)}),
+    }
+
+
+def quote_key(config: QuoteConfig) -> str:
+    """Stable hex digest of :func:`normalized_inputs`."""
+    canonical = json.dumps(normalized_inputs(config), sort_keys=True, separators=(',', ':'))
+    return hashlib.blake2b(canonical.encode(), digest_size=16).hexdigest()
+
+
+results_cache = LRUCache(maxsize=512)
+figure_cache = LRUCache(maxsize=256)
+table_cache = LRUCache(maxsize=64)
+
+
+def memoized_costs(config: QuoteConfig, compute: Optional[Callable[[], dict]] = None) -> dict:
+    """``calculate_enhanced_project_costs`` served from :data:`results_cache` when possible.
+
+    ``compute`` replaces the engine call on a miss; it must return the same results.
+    """
+    results = results_cache.get_or_compute(quote_key(config),
+                                           compute or (lambda: calculate_enhanced_project_costs(config)))
+
+    # Phase names are not part of the key; relabel without touching the shared entry
+    if config.calculation_methodology == "Phase-wise" and any(
+            phase_result['name'] != phase.name for phase_result, phase in zip(results['phase_results'], config.phases)):
+        results = dict(results)
+        results['phase_results'] = [dict(phase_result, name=phase.name)
+                                    for phase_result, phase in zip(results['phase_results'], config.phases)]
+    return results
+
+
+def cached_figure(key: Hashable, build: Callable[[], object]):
+    """Reuse a chart object built for identical data by any session."""
+    return figure_cache.get_or_compute(key, build)
+
+
+def cached_table(key: Hashable, build: Callable[[], object]):
+    """Reuse a read-only table (e.g. a ``data_editor`` seed) built for identical inputs by any session."""
+    return table_cache.get_or_compute(key, build)
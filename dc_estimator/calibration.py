@@ -0,0 +1,359 @@
+"""Calibrate hours per bus, tier complexity and the L1/L2/L3 split from timesheets.
+
+The engine's study effort is ``buses × hours_per_bus[study] ×
+tier_complexity[tier] × delivery multiplier``. Taking logs makes that linear
+in the unknown coefficients, so past projects' booked hours give a
+least-squares fit of ``base_hours_per_bus`` and ``tier_complexity``; a Huber
+IRLS pass then down-weights projects whose hours were distorted by rework or
+scope changes. A fit in logs predicts the geometric mean, which falls short
+of the mean hours actually booked, so the hours per bus are scaled by Duan's
+smearing factor (the weighted mean of the exponentiated residuals). The
+resource split is the hours-weighted share booked at each level.
+
+Timesheet files (CSV or Parquet) are read in chunks with these columns:
+
+``study``
+    A study key (``load_flow``) or display name (``Load Flow Study``).
+``tier_level``, ``buses``
+    The project's tier and priced bus count.
+``l1_hours``, ``l2_hours``, ``l3_hours``, or ``level`` plus ``hours``
+    Booked hours, one column per level or one row per level.
+``project_id`` (optional)
+    When present, rows are summed per project and study first, so raw
+    per-engineer timesheet entries can be loaded as exported.
+``delivery_type``, ``typical_modeling_factor`` (optional)
+    Divided out using the base rate card, so urgent jobs do not inflate the
+    fitted hours.
+
+Rows with an unknown study or tier, or without positive buses and hours, are
+skipped and counted. Everything after chunk parsing is NumPy over compact
+per-observation arrays and a (study, tier) cell grid, so millions of rows fit
+in a few seconds.
+"""
+
+import argparse
+import math
+import os
+import re
+from dataclasses import dataclass, field
+from typing import BinaryIO, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from .engine import DELIVERY_TYPES, RESOURCE_LEVELS, STUDIES_DATA, STUDY_KEYS, TIER_LEVELS, RateCard
+from .ingest import DEFAULT_CHUNK_ROWS, iter_quote_chunks
+from .ratecard import default_rate_cards, parse_rate_card, rate_card_dict, write_rate_card
+
+HUBER_K = 1.345  # 95% efficiency under normal errors
+MAX_ITERATIONS = 50
+TOLERANCE = 1e-9
+
+HOUR_COLUMNS = tuple(f"{level.lower()}_hours" for level in RESOURCE_LEVELS)
+
+
+def _lookup_key(text: str) -> str:
+    return re.sub(r'[^a-z0-9]', '', text.lower())
+
+
+# Study keys and display names ("Load Flow Study") both map to the study code
+STUDY_CODES = {**{_lookup_key(data['name']): code for code, data in enumerate(STUDIES_DATA.values())},
+               **{_lookup_key(key): code for code, key in enumerate(STUDY_KEYS)}}
+TIER_CODES = {_lookup_key(tier): code for code, tier in enumerate(TIER_LEVELS)}
+DELIVERY_CODES = {_lookup_key(kind): code for code, kind in enumerate(DELIVERY_TYPES)}
+LEVEL_CODES = {_lookup_key(level): code for code, level in enumerate(RESOURCE_LEVELS)}
+
+
+def _mapped(frame: pd.DataFrame, name: str, codes: Dict[str, int], default: Optional[int] = None) -> pd.Series:
+    """Integer codes for a text column; unknown values become -1."""
+    if name not in frame:
+        return pd.Series(-1 if default is None else default, index=frame.index, dtype=np.int64)
+    # Exports repeat a few spellings, so normalise the distinct values only
+    missing = -1 if default is None else default
+    positions, uniques = pd.factorize(frame[name])
+    keys = [_lookup_key(str(value)) for value in uniques]
+    table = np.array([codes.get(key, -1) if key else missing for key in keys] + [missing], dtype=np.int64)
+    # factorize marks missing values with -1, which indexes the trailing ``missing`` entry
+    return pd.Series(table[positions], index=frame.index)
+
+
+def _numeric(frame: pd.DataFrame, name: str, default: float = np.nan) -> pd.Series:
+    if name not in frame:
+        return pd.Series(default, index=frame.index, dtype=np.float64)
+    return pd.to_numeric(frame[name], errors='coerce').astype(np.float64)
+
+
+def _chunk_rows(frame: pd.DataFrame) -> Tuple[pd.DataFrame, int]:
+    """Normalise one timesheet chunk; returns the usable rows and how many were skipped."""
+    rows = pd.DataFrame({
+        'study': _mapped(frame, 'study', STUDY_CODES),
+        'tier': _mapped(frame, 'tier_level', TIER_CODES),
+        'delivery': _mapped(frame, 'delivery_type', DELIVERY_CODES, default=0),
+        'buses': _numeric(frame, 'buses'),
+        'modeling': _numeric(frame, 'typical_modeling_factor', 1.0).fillna(1.0),
+    })
+    if 'hours' in frame and 'level' in frame:
+        level = _mapped(frame, 'level', LEVEL_CODES)
+        hours = _numeric(frame, 'hours').fillna(0.0)
+        for code, column in enumerate(HOUR_COLUMNS):
+            rows[column] = hours.where(level == code, 0.0)
+        unknown_level = level < 0
+    elif set(HOUR_COLUMNS) & set(frame.columns):
+        for column in HOUR_COLUMNS:
+            rows[column] = _numeric(frame, column, 0.0).fillna(0.0)
+        unknown_level = pd.Series(False, index=frame.index)
+    else:
+        raise ValueError("Timesheets need l1_hours/l2_hours/l3_hours columns, or level and hours columns")
+    if 'project_id' in frame:
+        rows['project'] = frame['project_id'].astype(str)
+
+    valid = ((rows['study'] >= 0) & (rows['tier'] >= 0) & (rows['delivery'] >= 0) & ~unknown_level
+             & (rows[list(HOUR_COLUMNS)] >= 0).all(axis=1) & (rows['modeling'] > 0))
+    if 'project' not in rows:
+        # One row per project and study: it must carry its own bus count and hours
+        valid &= (rows['buses'] > 0) & (rows[list(HOUR_COLUMNS)].sum(axis=1) > 0)
+    return rows[valid], int((~valid).sum())
+
+
+def _aggregate(partials: List[pd.DataFrame]) -> pd.DataFrame:
+    """Sum per-engineer entries into one row per project and study."""
+    combined = pd.concat(partials, ignore_index=True)
+    return combined.groupby(['project', 'study'], sort=False).agg(
+        tier=('tier', 'first'), delivery=('delivery', 'first'), buses=('buses', 'max'),
+        modeling=('modeling', 'first'), **{column: (column, 'sum') for column in HOUR_COLUMNS},
+    ).reset_index()
+
+
+@dataclass
+class TimesheetData:
+    """One observation per project and study, as compact arrays."""
+
+    study: np.ndarray  # int8 codes into STUDY_KEYS
+    tier: np.ndarray  # int8 codes into TIER_LEVELS
+    delivery: np.ndarray  # int8 codes into DELIVERY_TYPES
+    buses: np.ndarray
+    modeling: np.ndarray
+    level_hours: np.ndarray  # N × len(RESOURCE_LEVELS)
+    rows_read: int = 0
+    rows_skipped: int = 0
+
+    def __len__(self):
+        return len(self.buses)
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame, rows_read: int = 0, rows_skipped: int = 0) -> "TimesheetData":
+        return cls(
+            study=frame['study'].to_numpy(np.int8),
+            tier=frame['tier'].to_numpy(np.int8),
+            delivery=frame['delivery'].to_numpy(np.int8),
+            buses=frame['buses'].to_numpy(np.float64),
+            modeling=frame['modeling'].to_numpy(np.float64),
+            level_hours=frame[list(HOUR_COLUMNS)].to_numpy(np.float64),
+            rows_read=rows_read,
+            rows_skipped=rows_skipped,
+        )
+
+
+def read_timesheets(source: Union[str, BinaryIO], file_format: str,
+                    chunk_rows: int = DEFAULT_CHUNK_ROWS * 10, progress=None) -> TimesheetData:
+    """Stream a timesheet export into :class:`TimesheetData`.
+
+    ``progress`` is called with the number of rows read after each chunk.
+    """
+    partials, rows_read, skipped = [], 0, 0
+    for chunk in iter_quote_chunks(source, file_format, chunk_rows):
+        rows, chunk_skipped = _chunk_rows(chunk)
+        rows_read += len(chunk)
+        skipped += chunk_skipped
+        # Entries are pre-summed per chunk so memory follows projects, not timesheet rows
+        partials.append(_aggregate([rows]) if 'project' in rows else rows)
+        if progress is not None:
+            progress(rows_read)
+    if not partials:
+        raise ValueError("The timesheet file is empty")
+
+    if 'project' in partials[0]:
+        frame = _aggregate(partials)
+        usable = (frame['buses'] > 0) & (frame[list(HOUR_COLUMNS)].sum(axis=1) > 0)
+        skipped += int((~usable).sum())
+        frame = frame[usable]
+    else:
+        frame = pd.concat(partials, ignore_index=True)
+    if frame.empty:
+        raise ValueError("No usable timesheet rows: check the study, tier_level, buses and hours columns")
+    return TimesheetData.from_frame(frame, rows_read, skipped)
+
+
+@dataclass
+class CalibrationResult:
+    """Fitted coefficients, with per (study, tier) residuals for review."""
+
+    base_hours_per_bus: Dict[str, float]
+    tier_complexity: Dict[str, float]
+    resource_split: Dict[str, float]
+    residuals: pd.DataFrame
+    observations: int
+    iterations: int
+    r_squared: float  # of log hours per bus
+    rmse_log: float
+    median_abs_error: float  # relative, on hours
+    downweighted: float  # share of observations the Huber fit down-weighted
+    smearing: float  # retransformation factor applied to the hours per bus
+    predicted_to_actual: float  # total hours the calibrated card predicts over total hours booked
+    unobserved: Tuple[str, ...] = field(default=())  # coefficients kept from the base card
+
+    def rate_card(self, base: RateCard, version: str, effective_from: str) -> RateCard:
+        """``base`` with the calibrated tables, validated like a rate card file."""
+        data = rate_card_dict(base)
+        data.update(version=version, effective_from=effective_from,
+                    base_hours_per_bus=self.base_hours_per_bus, tier_complexity=self.tier_complexity,
+                    resource_split=self.resource_split)
+        return parse_rate_card(data, source=f"calibrated rate card {version}")
+
+
+def _huber_weights(residuals: np.ndarray) -> Tuple[np.ndarray, float]:
+    scale = 1.4826 * np.median(np.abs(residuals - np.median(residuals)))
+    if scale <= 0:
+        return np.ones_like(residuals), 0.0
+    limit = HUBER_K * scale
+    magnitude = np.abs(residuals)
+    with np.errstate(divide='ignore'):
+        return np.where(magnitude <= limit, 1.0, limit / magnitude), scale
+
+
+def calibrate(data: TimesheetData, base: RateCard, robust: bool = True) -> CalibrationResult:
+    """Fit hours per bus, tier complexity and resource split to ``data``.
+
+    Tier complexity is only identified relative to one tier, so the lowest
+    tier in the data keeps ``base``'s value and the others are fitted
+    against it. Studies and tiers absent from the data keep ``base``'s values.
+    """
+    hours = data.level_hours.sum(axis=1)
+    delivery = np.array([base.delivery_multipliers[kind] for kind in DELIVERY_TYPES])[data.delivery]
+    y = np.log(hours / (data.buses * delivery * data.modeling))
+
+    studies = np.unique(data.study)
+    tiers = np.unique(data.tier)
+    reference = tiers[0]
+    free_tiers = tiers[1:]
+    n_tiers = len(TIER_LEVELS)
+
+    # Every observation falls in one (study, tier) cell; the design lives on the cells
+    cell = data.study.astype(np.int64) * n_tiers + data.tier
+    cells = np.unique(cell)
+    cell_study, cell_tier = np.divmod(cells, n_tiers)
+    design = np.zeros((len(cells), len(studies) + len(free_tiers)))
+    design[np.arange(len(cells)), np.searchsorted(studies, cell_study)] = 1.0
+    for column, tier in enumerate(free_tiers, start=len(studies)):
+        design[cell_tier == tier, column] = 1.0
+    offset = np.where(cell_tier == reference, math.log(base.tier_complexity[TIER_LEVELS[reference]]), 0.0)
+    cell_index = np.searchsorted(cells, cell)
+
+    weights = np.ones(len(y))
+    fitted_cells = np.zeros(len(cells))
+    iterations = 0
+    for iterations in range(1, (MAX_ITERATIONS if robust else 1) + 1):
+        # Weighted least squares on the cells: Σ w (y - xβ)² = Σ_cells W (ȳ_w - xβ)² + const
+        cell_weight = np.bincount(cell_index, weights, minlength=len(cells))
+        cell_mean = np.bincount(cell_index, weights * y, minlength=len(cells)) / cell_weight
+        root = np.sqrt(cell_weight)[:, None]
+        beta, _, rank, _ = np.linalg.lstsq(design * root, (cell_mean - offset) * root[:, 0], rcond=None)
+        if rank < design.shape[1]:
+            raise ValueError("The timesheets cannot separate study hours from tier complexity: every study "
+                             "must share at least one tier with the others")
+        previous, fitted_cells = fitted_cells, design @ beta + offset
+        if not robust:
+            break
+        weights, _ = _huber_weights(y - fitted_cells[cell_index])
+        if iterations > 1 and np.max(np.abs(fitted_cells - previous)) < TOLERANCE:
+            break
+
+    residuals = y - fitted_cells[cell_index]
+    # exp() of the fitted log is a geometric mean; smearing restores the mean hours
+    smearing = float(np.average(np.exp(residuals), weights=weights))
+    hours_per_bus = dict(base.base_hours_per_bus)
+    for column, study in enumerate(studies):
+        hours_per_bus[STUDY_KEYS[study]] = round(math.exp(beta[column]) * smearing, 4)
+    tier_complexity = dict(base.tier_complexity)
+    for column, tier in enumerate(free_tiers, start=len(studies)):
+        tier_complexity[TIER_LEVELS[tier]] = round(math.exp(beta[column]), 4)
+
+    totals = data.level_hours.sum(axis=0)
+    shares = [round(float(value), 4) for value in totals[:-1] / totals.sum()]
+    resource_split = dict(zip(RESOURCE_LEVELS, [*shares, round(1.0 - sum(shares), 4)]))
+
+    actual = np.exp(y)
+    fitted = np.exp(fitted_cells[cell_index]) * smearing
+    frame = pd.DataFrame({'cell': cell_index, 'actual': actual, 'relative_error': np.abs(actual / fitted - 1),
+                          'residual': residuals, 'downweighted': weights < 1.0})
+    grouped = frame.groupby('cell').agg(observations=('actual', 'size'), actual_median=('actual', 'median'),
+                                        median_abs_error=('relative_error', 'median'),
+                                        mean_log_residual=('residual', 'mean'),
+                                        downweighted=('downweighted', 'mean'))
+    table = pd.DataFrame({
+        'study': [STUDY_KEYS[study] for study in cell_study],
+        'tier_level': [TIER_LEVELS[tier] for tier in cell_tier],
+        'observations': grouped['observations'].to_numpy(),
+        'actual_hours_per_bus': grouped['actual_median'].to_numpy(),
+        'fitted_hours_per_bus': np.exp(fitted_cells) * smearing,
+        'base_hours_per_bus': [base.base_hours_per_bus[STUDY_KEYS[study]] * base.tier_complexity[TIER_LEVELS[tier]]
+                               for study, tier in zip(cell_study, cell_tier)],
+        'median_abs_error': grouped['median_abs_error'].to_numpy(),
+        'mean_log_residual': grouped['mean_log_residual'].to_numpy(),
+        'downweighted': grouped['downweighted'].to_numpy(),
+    })
+
+    total_variance = np.sum((y - y.mean()) ** 2)
+    return CalibrationResult(
+        base_hours_per_bus=hours_per_bus,
+        tier_complexity=tier_complexity,
+        resource_split=resource_split,
+        residuals=table,
+        observations=len(y),
+        iterations=iterations,
+        r_squared=float(1 - np.sum(residuals ** 2) / total_variance) if total_variance > 0 else 1.0,
+        rmse_log=float(np.sqrt(np.mean(residuals ** 2))),
+        median_abs_error=float(np.median(frame['relative_error'])),
+        downweighted=float(np.mean(weights < 1.0)),
+        smearing=smearing,
+        predicted_to_actual=float(np.sum(fitted * hours / actual) / np.sum(hours)),
+        unobserved=tuple([STUDY_KEYS[code] for code in range(len(STUDY_KEYS)) if code not in studies]
+                         + [TIER_LEVELS[code] for code in range(n_tiers) if code not in tiers]),
+    )
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m dc_estimator.calibration", description=__doc__.splitlines()[0])
+    parser.add_argument('timesheets', help="CSV or Parquet timesheet export")
+    parser.add_argument('--version', required=True, help="version of the calibrated rate card, e.g. 2025-Q3")
+    parser.add_argument('--effective-from', required=True, metavar='YYYY-MM-DD')
+    parser.add_argument('--base', help="rate card to start from (default: the one in force)")
+    parser.add_argument('--output', help="rate card file to write (default: <rate card dir>/<version>.json)")
+    parser.add_argument('--least-squares', action='store_true', help="plain least squares, no Huber down-weighting")
+    args = parser.parse_args(argv)
+
+    registry = default_rate_cards()
+    file_format = 'parquet' if args.timesheets.lower().endswith('.parquet') else 'csv'
+    try:
+        base = registry.get(args.base) if args.base else registry.in_force()
+        data = read_timesheets(args.timesheets, file_format)
+        result = calibrate(data, base, robust=not args.least_squares)
+        card = result.rate_card(base, args.version, args.effective_from)
+    except (OSError, ValueError) as error:
+        parser.error(str(error))
+
+    output = args.output or os.path.join(registry.directory, f"{args.version}.json")
+    if os.path.exists(output):
+        parser.error(f"{output} already exists")
+    write_rate_card(card, output)
+    print(result.residuals.to_string(index=False, float_format=lambda value: f"{value:.3f}"))
+    print(f"\n{result.observations:,} observations from {data.rows_read:,} rows ({data.rows_skipped:,} skipped); "
+          f"R² {result.r_squared:.3f}, predicted/booked hours {result.predicted_to_actual:.1%}, "
+          f"median error {result.median_abs_error:.1%}, "
+          f"{result.downweighted:.1%} down-weighted")
+    print(f"Wrote rate card {card.version} to {output}")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,209 @@
+"""Month-by-month cost and cash-flow projection of a dated quote.
+
+Each phase's study hours are spread evenly over its days (``start`` to
+``end`` inclusive), split into L1/L2/L3 hours by the rate card and costed at
+that month's escalated rates. Its report is costed in the month the phase
+ends. Rates and report prices escalate from each anniversary month of
+``escalation_base``, by one rate for every year or by a per-year schedule.
+
+The quoted (competitive) price of a phase is billed in two instalments. The
+advance is due in the month the phase starts, and the balance falls
+``payment_terms_days`` after it ends. Additional costs are incurred and
+billed with the first advance.
+
+Everything is computed as date-indexed NumPy arrays. A ``phases × months``
+matrix of overlapping days distributes the hours, and the escalation factor
+is one value per month, so a multi-year campus programme with hundreds of
+phases projects in a few milliseconds. With zero escalation the totals equal
+the engine's ``standard_cost`` and ``competitive_cost``.
+"""
+
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Dict, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .engine import RESOURCE_LEVELS, QuoteConfig, report_cost
+
+
+@dataclass
+class CashflowProjection:
+    """Monthly arrays of one projection, all indexed by ``months``.
+
+    ``labor_cost`` is months × ``RESOURCE_LEVELS``; costs are before the
+    premium, phase-extension and competitive factors, which
+    ``standard_cost`` and ``competitive_cost`` include.
+    """
+
+    months: np.ndarray  # datetime64[M]
+    escalation: np.ndarray  # rate multiplier in force each month
+    hours: np.ndarray  # months × levels
+    labor_cost: np.ndarray  # months × levels
+    report_cost: np.ndarray
+    additional_cost: np.ndarray
+    standard_cost: np.ndarray
+    competitive_cost: np.ndarray
+    receipts: np.ndarray
+    phase_names: Tuple[str, ...]
+    phase_billing: np.ndarray  # escalated quoted price per phase
+
+    @property
+    def cumulative_competitive(self) -> np.ndarray:
+        return np.cumsum(self.competitive_cost)
+
+    @property
+    def cumulative_receipts(self) -> np.ndarray:
+        return np.cumsum(self.receipts)
+
+    @property
+    def billing_position(self) -> np.ndarray:
+        """Cumulative receipts less the quoted value of work done; negative means work is unfunded."""
+        return self.cumulative_receipts - self.cumulative_competitive
+
+    def totals(self) -> Dict[str, float]:
+        return {
+            'months': len(self.months),
+            'hours': float(self.hours.sum()),
+            'labor_cost': float(self.labor_cost.sum()),
+            'report_cost': float(self.report_cost.sum()),
+            'standard_cost': float(self.standard_cost.sum()),
+            'competitive_cost': float(self.competitive_cost.sum()),
+            'receipts': float(self.receipts.sum()),
+            'peak_unfunded': float(max(0.0, -self.billing_position.min())) if len(self.months) else 0.0,
+        }
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        """Columns for a month-by-month table."""
+        return {
+            'month': self.months.astype('datetime64[D]').astype(object),
+            'escalation': self.escalation,
+            **{f"{level.lower()}_hours": self.hours[:, column] for column, level in enumerate(RESOURCE_LEVELS)},
+            **{f"{level.lower()}_cost": self.labor_cost[:, column] for column, level in enumerate(RESOURCE_LEVELS)},
+            'report_cost': self.report_cost,
+            'additional_cost': self.additional_cost,
+            'standard_cost': self.standard_cost,
+            'competitive_cost': self.competitive_cost,
+            'receipts': self.receipts,
+            'cumulative_receipts': self.cumulative_receipts,
+            'billing_position': self.billing_position,
+        }
+
+
+def _day(value: date) -> np.datetime64:
+    return np.datetime64(value, 'D')
+
+
+def escalation_factors(months: np.ndarray, base: date, escalation: Union[float, Sequence[float]]) -> np.ndarray:
+    """Compounded rate multiplier for each month, stepping up in every anniversary month of ``base``.
+
+    ``escalation`` is one annual rate (0.05 = 5%) or a per-year schedule
+    whose last rate repeats.
+    """
+    base_month = np.datetime64(base, 'M')
+    # Monthly resolution: the whole anniversary month is at the new rate
+    years = np.maximum((months - base_month).astype(np.int64) // 12, 0)
+    schedule = np.atleast_1d(np.asarray(escalation, dtype=np.float64))
+    if schedule.size == 0:
+        schedule = np.zeros(1)
+    span = int(years.max()) if years.size else 0
+    steps = np.concatenate([schedule, np.full(max(0, span - schedule.size), schedule[-1])])[:span]
+    multipliers = np.concatenate([[1.0], np.cumprod(1.0 + steps)])
+    return multipliers[years]
+
+
+def project_cashflow(config: QuoteConfig, results: dict, start: Optional[date] = None, end: Optional[date] = None,
+                     escalation: Union[float, Sequence[float]] = 0.0, escalation_base: Optional[date] = None,
+                     advance_share: float = 0.3, payment_terms_days: int = 30) -> CashflowProjection:
+    """Project ``results`` (from :func:`calculate_enhanced_project_costs`) month by month.
+
+    Phase-wise quotes use each phase's dates; ``start``/``end`` date a
+    Consolidated quote and any phase without dates of its own. Escalation
+    counts from ``escalation_base``, by default the first start date.
+    """
+    if not 0 <= advance_share <= 1:
+        raise ValueError("advance_share must be between 0 and 1")
+    rate_card = config.rate_card
+
+    if config.calculation_methodology == "Phase-wise":
+        names = tuple(phase.name for phase in config.phases)
+        starts = [phase.start or start for phase in config.phases]
+        ends = [phase.end or end for phase in config.phases]
+        phase_hours = np.array([phase['total_hours'] for phase in results['phase_results']], dtype=np.float64)
+    else:
+        names = ("Project",)
+        starts, ends = [start], [end]
+        phase_hours = np.array([results['total_hours']], dtype=np.float64)
+    undated = [name for name, first, last in zip(names, starts, ends) if first is None or last is None]
+    if undated:
+        raise ValueError(f"No start/end dates for {', '.join(undated[:5])}{'…' if len(undated) > 5 else ''}")
+    first_days = np.array([_day(value) for value in starts])
+    last_days = np.array([_day(value) for value in ends])
+    if np.any(last_days < first_days):
+        raise ValueError("A phase ends before it starts")
+
+    # Month grid wide enough for the last balance payment
+    balance_days = last_days + np.timedelta64(int(payment_terms_days), 'D')
+    first_month = first_days.min().astype('datetime64[M]')
+    months = np.arange(first_month, max(last_days.max(), balance_days.max()).astype('datetime64[M]') + 1)
+    month_starts = months.astype('datetime64[D]')
+    month_ends = (months + 1).astype('datetime64[D]')
+
+    # Days of each phase falling in each month (phases × months), as a share of the phase
+    overlap = (np.minimum(last_days[:, None] + 1, month_ends[None, :])
+               - np.maximum(first_days[:, None], month_starts[None, :])).astype(np.int64)
+    overlap = np.clip(overlap, 0, None)
+    shares = overlap / (last_days - first_days + 1).astype(np.int64)[:, None]
+
+    base = escalation_base or starts[int(np.argmin(first_days))]
+    factors = escalation_factors(months, base, escalation)
+
+    split = np.array([rate_card.resource_split[level] for level in RESOURCE_LEVELS])
+    rates = np.array([rate_card.resource_rates[level] for level in RESOURCE_LEVELS])
+    hours = (shares.T @ phase_hours)[:, None] * split[None, :]
+    labor = hours * rates[None, :] * factors[:, None]
+
+    # Every phase bills the same reports, in the month it ends
+    phase_report = sum(report_cost(config, key) for key in config.selected_studies)
+    end_index = (last_days.astype('datetime64[M]') - first_month).astype(np.int64)
+    reports = np.bincount(end_index, minlength=len(months)) * phase_report * factors
+
+    additional = np.zeros(len(months))
+    additional[0] = config.additional_costs
+
+    premium = config.effective_premium_factor
+    extension = config.effective_phase_extension_discount
+    competitive_multiplier = config.competitive_multiplier
+    standard = ((labor.sum(axis=1) + reports) * premium + additional) * extension
+    competitive = standard * competitive_multiplier
+
+    # Each phase's escalated price, billed as an advance at its start and the balance after its end
+    blended = float(split @ rates)
+    phase_cost = (shares @ factors) * phase_hours * blended + phase_report * factors[end_index]
+    phase_billing = phase_cost * premium * extension * competitive_multiplier
+    start_index = (first_days.astype('datetime64[M]') - first_month).astype(np.int64)
+    balance_index = (balance_days.astype('datetime64[M]') - first_month).astype(np.int64)
+    receipts = (np.bincount(start_index, phase_billing * advance_share, minlength=len(months))
+                + np.bincount(balance_index, phase_billing * (1 - advance_share), minlength=len(months)))
+    receipts[int(start_index.min())] += config.additional_costs * extension * competitive_multiplier
+
+    return CashflowProjection(
+        months=months,
+        escalation=factors,
+        hours=hours,
+        labor_cost=labor,
+        report_cost=reports,
+        additional_cost=additional,
+        standard_cost=standard,
+        competitive_cost=competitive,
+        receipts=receipts,
+        phase_names=names,
+        phase_billing=phase_billing,
+    )
+
+
+def default_phase_dates(count: int, start: date, phase_weeks: int = 13) -> Tuple[Tuple[date, date], ...]:
+    """Back-to-back ``(start, end)`` dates for ``count`` phases of ``phase_weeks`` each."""
+    return tuple((start + timedelta(weeks=index * phase_weeks),
+                  start + timedelta(weeks=(index + 1) * phase_weeks) - timedelta(days=1))
+                 for index in range(count))
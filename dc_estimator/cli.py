@@ -0,0 +1,175 @@
+"""Headless command-line pricing: ``python -m dc_estimator``.
+
+Prices one quote from flags and/or a JSON or YAML file and prints the
+standard, competitive and savings figures. Only the standard-library engine
+is imported, so the command starts in well under 100 ms and can be shelled
+out to from CRM hooks and cron jobs. PyYAML is imported only when a YAML
+file is given.
+
+Examples::
+
+    python -m dc_estimator --it-capacity 20 --tier-level "Tier IV" --repeat-customer
+    python -m dc_estimator --config quote.json --json
+    python -m dc_estimator --it-capacity 20 --as-of 2024-06-30
+    python -m dc_estimator --it-capacity 20 --topology etap_buses.csv
+
+Quotes use the rate card in force today unless ``--rate-card`` names a
+version or ``--as-of`` picks the card in force on another date.
+"""
+
+import argparse
+import dataclasses
+import json
+import sys
+from datetime import date
+from typing import Optional, Sequence
+
+from .engine import (
+    CLIENT_TYPES,
+    DELIVERY_TYPES,
+    METHODOLOGIES,
+    PROJECT_TYPES,
+    REPORT_FORMATS,
+    STUDY_KEYS,
+    TIER_LEVELS,
+    Phase,
+    QuoteConfig,
+    calculate_enhanced_project_costs,
+)
+from .ratecard import default_rate_cards
+from .topology import summarize_topology
+
+CHOICES = {
+    'tier_level': TIER_LEVELS,
+    'delivery_type': DELIVERY_TYPES,
+    'project_type': PROJECT_TYPES,
+    'calculation_methodology': METHODOLOGIES,
+    'client_type': CLIENT_TYPES,
+    'report_format': REPORT_FORMATS,
+}
+# Fields with a structured value get hand-written flags below
+STRUCTURED_FIELDS = ('phases', 'selected_studies', 'base_report_costs', 'rate_card')
+
+
+def _parse_phase(text: str) -> Phase:
+    name, separator, value = text.rpartition('=')
+    if not separator:
+        raise argparse.ArgumentTypeError(f"expected NAME=MW[:BUSES], got {text!r}")
+    capacity, _, buses = value.partition(':')
+    try:
+        return Phase(name, float(capacity), int(buses) if buses else None)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"phase capacity and bus override must be numbers, got {value!r}") from None
+
+
+def _parse_report_cost(text: str):
+    study, separator, price = text.partition('=')
+    if not separator or study not in STUDY_KEYS:
+        raise argparse.ArgumentTypeError(f"expected STUDY=PRICE with STUDY in {', '.join(STUDY_KEYS)}, got {text!r}")
+    try:
+        return study, float(price)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"report price must be a number, got {price!r}") from None
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m dc_estimator",
+        description="Price a DC project quote without the Streamlit UI.",
+    )
+    parser.add_argument('--config', metavar='FILE', help="JSON or YAML file of QuoteConfig fields; flags override it")
+    parser.add_argument('--json', action='store_true', help="print the full results dict as JSON")
+    parser.add_argument('--topology', metavar='FILE',
+                        help="ETAP bus/branch export (CSV or XML) whose bus count replaces the estimate")
+    rates = parser.add_mutually_exclusive_group()
+    rates.add_argument('--rate-card', metavar='VERSION', default=None,
+                       help="price against this rate card version (default: the card in force today)")
+    rates.add_argument('--as-of', metavar='YYYY-MM-DD', type=date.fromisoformat, default=None,
+                       help="price against the rate card in force on this date")
+
+    quote = parser.add_argument_group("quote inputs")
+    for field in dataclasses.fields(QuoteConfig):
+        if field.name in STRUCTURED_FIELDS:
+            continue
+        flag = '--' + field.name.replace('_', '-')
+        if field.type is bool:
+            quote.add_argument(flag, action=argparse.BooleanOptionalAction, default=None)
+        elif field.name in CHOICES:
+            quote.add_argument(flag, choices=CHOICES[field.name], default=None)
+        elif field.name == 'custom_bus_count':
+            quote.add_argument(flag, type=int, default=None, metavar='N')
+        else:
+            quote.add_argument(flag, type=float, default=None, metavar='X')
+    quote.add_argument('--studies', type=lambda text: tuple(filter(None, text.split(','))), default=None,
+                       metavar='KEYS', help=f"comma-separated subset of {','.join(STUDY_KEYS)}")
+    quote.add_argument('--phase', dest='phases', type=_parse_phase, action='append', default=None,
+                       metavar='NAME=MW[:BUSES]',
+                       help="add a phase, optionally with a bus override (repeatable); implies Phase-wise methodology")
+    quote.add_argument('--report-cost', dest='report_costs', type=_parse_report_cost, action='append', default=None,
+                       metavar='STUDY=PRICE', help="override a base report price (repeatable)")
+    return parser
+
+
+def load_config_file(path: str) -> dict:
+    with open(path, encoding='utf-8') as handle:
+        if path.endswith(('.yaml', '.yml')):
+            try:
+                import yaml
+            except ImportError:
+                raise ValueError("Reading YAML quote files needs PyYAML (pip install pyyaml)") from None
+            data = yaml.safe_load(handle)
+        else:
+            data = json.load(handle)
+    if not isinstance(data, dict):
+        raise ValueError(f"{path} must contain a mapping of QuoteConfig fields")
+    return data
+
+
+def config_from_args(args: argparse.Namespace) -> QuoteConfig:
+    values = load_config_file(args.config) if args.config else {}
+    for field in dataclasses.fields(QuoteConfig):
+        value = getattr(args, field.name, None)
+        if field.name not in STRUCTURED_FIELDS and value is not None:
+            values[field.name] = value
+    if args.studies is not None:
+        values['selected_studies'] = args.studies
+    if args.phases:
+        values['phases'] = [dataclasses.astuple(phase) for phase in args.phases]
+        values.setdefault('calculation_methodology', "Phase-wise")
+    if args.report_costs:
+        values['base_report_costs'] = {**values.get('base_report_costs', {}), **dict(args.report_costs)}
+    if args.topology and args.custom_bus_count is None:
+        values['custom_bus_count'] = summarize_topology(args.topology).buses
+    if args.rate_card is not None:
+        values['rate_card'] = args.rate_card
+    elif args.as_of is not None or 'rate_card' not in values:
+        values['rate_card'] = default_rate_cards().in_force(args.as_of)
+    return QuoteConfig.from_dict(values)
+
+
+def format_results(results: dict) -> str:
+    return "\n".join([
+        f"Total load:       {results['total_load']:.1f} MW",
+        f"Estimated buses:  {results['estimated_buses']:,}",
+        f"Total hours:      {results['total_hours']:,.0f}",
+        f"Standard cost:    ₹{results['standard_cost']:,.0f}",
+        f"Competitive cost: ₹{results['competitive_cost']:,.0f}",
+        f"Savings:          ₹{results['savings']:,.0f} ({results['savings_percentage']:.1f}%)",
+    ])
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    try:
+        config = config_from_args(args)
+    except (OSError, ValueError, TypeError) as error:
+        parser.error(str(error))
+
+    results = calculate_enhanced_project_costs(config)
+    if args.json:
+        json.dump(results, sys.stdout, indent=2, ensure_ascii=False)
+        sys.stdout.write("\n")
+    else:
+        print(format_results(results))
+    return 0
@@ -0,0 +1,374 @@
+"""Scalar pricing engine.
+
+``calculate_enhanced_project_costs`` prices a single :class:`QuoteConfig` and
+returns the same ``results`` dict the Streamlit page renders. The module only
+depends on the standard library so it stays cheap to import.
+"""
+
+import math
+import numbers
+from dataclasses import dataclass, field
+from datetime import date
+from types import MappingProxyType
+from typing import Dict, Mapping, Optional, Tuple
+
+# The tables below are built once per process and shared by every session,
+# so they are exposed read-only. The rates and factors are the built-in rate
+# card; quotes priced against a versioned card read it from QuoteConfig.rate_card.
+
+# Study Configuration (from successful Perplexity model)
+STUDIES_DATA = MappingProxyType({key: MappingProxyType(data) for key, data in {
+    'load_flow': {'name': 'Load Flow Study', 'base_hours_per_bus': 0.8, 'complexity': 'Medium', 'emoji': '⚡'},
+    'short_circuit': {'name': 'Short Circuit Study', 'base_hours_per_bus': 1.0, 'complexity': 'Medium-High', 'emoji': '⚡'},
+    'pdc': {'name': 'Protective Device Coordination', 'base_hours_per_bus': 1.5, 'complexity': 'High', 'emoji': '🔧'},
+    'arc_flash': {'name': 'Arc Flash Study', 'base_hours_per_bus': 1.2, 'complexity': 'High', 'emoji': '🔥'}
+}.items()})
+STUDY_KEYS = tuple(STUDIES_DATA)
+
+# Tier-based bus estimation and technical multipliers (proven values)
+TIER_LEVELS = ("Tier I", "Tier II", "Tier III", "Tier IV")
+TIER_BUS_MULTIPLIERS = MappingProxyType({"Tier I": 1.5, "Tier II": 1.8, "Tier III": 2.1, "Tier IV": 2.6})
+TIER_COMPLEXITY = MappingProxyType({"Tier I": 1.0, "Tier II": 1.15, "Tier III": 1.3, "Tier IV": 1.6})
+
+DELIVERY_TYPES = ("Standard", "Urgent")
+DELIVERY_MULTIPLIERS = MappingProxyType({"Standard": 1.0, "Urgent": 1.3})
+
+PROJECT_TYPES = ("Fresh/New Project", "Phase Extension")
+METHODOLOGIES = ("Consolidated", "Phase-wise")
+CLIENT_TYPES = ("Normal", "Premium")
+
+# Resource allocation (successful rates from Perplexity)
+L1_RATE, L2_RATE, L3_RATE = 1200, 750, 500
+L1_PERCENTAGE, L2_PERCENTAGE, L3_PERCENTAGE = 0.20, 0.30, 0.50
+BLENDED_RATE = L1_RATE * L1_PERCENTAGE + L2_RATE * L2_PERCENTAGE + L3_RATE * L3_PERCENTAGE
+
+REPORT_FORMATS = ("Basic", "Detailed", "Comprehensive")
+REPORT_FORMAT_MULTIPLIERS = MappingProxyType({"Basic": 0.8, "Detailed": 1.0, "Comprehensive": 1.4})
+
+DEFAULT_REPORT_COSTS = MappingProxyType({'load_flow': 18000, 'short_circuit': 22000, 'pdc': 32000, 'arc_flash': 25000})
+
+# Below this many phases the plain loop beats the NumPy setup cost
+VECTORIZED_MIN_PHASES = 16
+
+RESOURCE_LEVELS = ("L1", "L2", "L3")
+
+
+@dataclass(frozen=True, eq=False)
+class RateCard:
+    """Labor rates and technical factors in force from ``effective_from``.
+
+    Rate cards are versioned JSON files loaded by :mod:`dc_estimator.ratecard`;
+    :data:`BUILTIN_RATE_CARD` holds the original hard-coded values. Cards are
+    shared by every session and compared by identity.
+    """
+
+    version: str
+    effective_from: str  # ISO date
+    resource_rates: Mapping[str, float]  # ₹/hour per RESOURCE_LEVELS
+    resource_split: Mapping[str, float]  # share of study hours per RESOURCE_LEVELS
+    tier_bus_multipliers: Mapping[str, float]
+    tier_complexity: Mapping[str, float]
+    delivery_multipliers: Mapping[str, float]
+    report_format_multipliers: Mapping[str, float]
+    base_hours_per_bus: Mapping[str, float]  # per STUDY_KEYS
+
+    @property
+    def blended_rate(self) -> float:
+        return sum(self.resource_rates[level] * self.resource_split[level] for level in RESOURCE_LEVELS)
+
+
+BUILTIN_RATE_CARD = RateCard(
+    version="builtin",
+    effective_from="2000-01-01",
+    resource_rates=MappingProxyType({"L1": L1_RATE, "L2": L2_RATE, "L3": L3_RATE}),
+    resource_split=MappingProxyType({"L1": L1_PERCENTAGE, "L2": L2_PERCENTAGE, "L3": L3_PERCENTAGE}),
+    tier_bus_multipliers=TIER_BUS_MULTIPLIERS,
+    tier_complexity=TIER_COMPLEXITY,
+    delivery_multipliers=DELIVERY_MULTIPLIERS,
+    report_format_multipliers=REPORT_FORMAT_MULTIPLIERS,
+    base_hours_per_bus=MappingProxyType({key: data['base_hours_per_bus'] for key, data in STUDIES_DATA.items()}),
+)
+
+
+@dataclass(frozen=True)
+class Phase:
+    """One build phase; ``bus_override`` replaces the tier-based bus estimate.
+
+    ``start`` and ``end`` (inclusive) date the phase's study work for the
+    cash-flow projection; they do not change its price. ISO date strings are
+    accepted and converted.
+    """
+
+    name: str
+    capacity: float
+    bus_override: Optional[int] = None
+    start: Optional[date] = None
+    end: Optional[date] = None
+
+    def __post_init__(self):
+        _check_number(f"Phase {self.name!r}: capacity", self.capacity)
+        object.__setattr__(self, 'bus_override', _check_count(f"Phase {self.name!r}: bus_override", self.bus_override))
+        for name in ('start', 'end'):
+            value = getattr(self, name)
+            if isinstance(value, str):
+                try:
+                    object.__setattr__(self, name, date.fromisoformat(value))
+                except ValueError:
+                    raise ValueError(f"Phase {self.name!r}: {name} must be an ISO date, got {value!r}") from None
+        if self.start is not None and self.end is not None and self.end < self.start:
+            raise ValueError(f"Phase {self.name!r} ends before it starts")
+
+
+@dataclass(frozen=True)
+class QuoteConfig:
+    """Every input that affects the price of one quote.
+
+    Defaults match the initial state of the Streamlit sidebar. Discount
+    factors only apply when their toggle is on, mirroring the UI where the
+    slider is hidden otherwise.
+    """
+
+    it_capacity: float = 15.0
+    mechanical_load: float = 10.0
+    house_load: float = 5.0
+    custom_bus_count: Optional[int] = None
+    tier_level: str = "Tier III"
+    delivery_type: str = "Standard"
+    project_type: str = "Fresh/New Project"
+    calculation_methodology: str = "Consolidated"
+    client_type: str = "Normal"
+    premium_factor: float = 1.3
+    phases: Tuple[Phase, ...] = ()
+    selected_studies: Tuple[str, ...] = STUDY_KEYS
+    base_report_costs: Mapping[str, float] = field(default_factory=lambda: dict(DEFAULT_REPORT_COSTS))
+    report_format: str = "Detailed"
+    report_complexity_factor: float = 1.0
+    typical_modeling_factor: float = 1.0
+    etap_model_available: bool = False
+    etap_discount_factor: float = 0.85
+    repeat_customer: bool = False
+    repeat_discount_factor: float = 0.88
+    phase_extension_discount: float = 0.90
+    overall_competitive_factor: float = 0.88
+    additional_costs: float = 0.0
+    rate_card: RateCard = BUILTIN_RATE_CARD
+
+    def __post_init__(self):
+        for name in NUMERIC_FIELDS:
+            _check_number(name, getattr(self, name))
+        object.__setattr__(self, 'custom_bus_count', _check_count("custom_bus_count", self.custom_bus_count))
+        for name in ('etap_model_available', 'repeat_customer'):
+            if not isinstance(getattr(self, name), bool):
+                raise ValueError(f"{name} must be true or false, got {getattr(self, name)!r}")
+        for study_key, cost in self.base_report_costs.items():
+            _check_number(f"base_report_costs[{study_key!r}]", cost)
+        _check_choice("tier_level", self.tier_level, TIER_LEVELS)
+        _check_choice("delivery_type", self.delivery_type, DELIVERY_TYPES)
+        _check_choice("project_type", self.project_type, PROJECT_TYPES)
+        _check_choice("calculation_methodology", self.calculation_methodology, METHODOLOGIES)
+        _check_choice("client_type", self.client_type, CLIENT_TYPES)
+        _check_choice("report_format", self.report_format, REPORT_FORMATS)
+        for study_key in self.selected_studies:
+            _check_choice("selected_studies", study_key, STUDY_KEYS)
+        missing = [key for key in self.selected_studies if key not in self.base_report_costs]
+        if missing:
+            raise ValueError(f"base_report_costs is missing {', '.join(missing)}")
+        if self.calculation_methodology == "Phase-wise" and not self.phases:
+            raise ValueError("Phase-wise methodology needs at least one phase")
+
+    @classmethod
+    def from_dict(cls, data: Mapping) -> "QuoteConfig":
+        """Build a config from plain JSON/YAML values (lists for phases and studies)."""
+        values = dict(data)
+        unknown = values.keys() - cls.__dataclass_fields__.keys()
+        if unknown:
+            raise ValueError(f"Unknown quote field(s): {', '.join(sorted(unknown))}")
+        if 'phases' in values:
+            values['phases'] = tuple(
+                Phase(**phase) if isinstance(phase, Mapping) else Phase(*phase) for phase in values['phases']
+            )
+        if 'selected_studies' in values:
+            values['selected_studies'] = tuple(values['selected_studies'])
+        if 'base_report_costs' in values:
+            values['base_report_costs'] = {**DEFAULT_REPORT_COSTS, **values['base_report_costs']}
+        if isinstance(values.get('rate_card'), str):
+            # Imported here so pricing with the built-in card never touches the rate card files
+            from .ratecard import default_rate_cards
+
+            values['rate_card'] = default_rate_cards().get(values['rate_card'])
+        return cls(**values)
+
+    @property
+    def total_load(self) -> float:
+        return self.it_capacity + self.mechanical_load + self.house_load
+
+    @property
+    def effective_premium_factor(self) -> float:
+        return self.premium_factor if self.client_type == "Premium" else 1.0
+
+    @property
+    def effective_phase_extension_discount(self) -> float:
+        return self.phase_extension_discount if self.project_type == "Phase Extension" else 1.0
+
+    @property
+    def competitive_multiplier(self) -> float:
+        multiplier = 1.0
+        if self.etap_model_available:
+            multiplier *= self.etap_discount_factor
+        if self.repeat_customer:
+            multiplier *= self.repeat_discount_factor
+        return multiplier * self.overall_competitive_factor
+
+
+# Numeric QuoteConfig fields; JSON callers can send anything, so each is checked
+# where the config is built rather than failing later inside the pricing maths
+NUMERIC_FIELDS = ('it_capacity', 'mechanical_load', 'house_load', 'premium_factor', 'report_complexity_factor',
+                  'typical_modeling_factor', 'etap_discount_factor', 'repeat_discount_factor',
+                  'phase_extension_discount', 'overall_competitive_factor', 'additional_costs')
+
+
+def _check_number(name, value):
+    if isinstance(value, bool) or not isinstance(value, numbers.Real) or not math.isfinite(value) or value < 0:
+        raise ValueError(f"{name} must be a non-negative number, got {value!r}")
+
+
+def _check_count(name, value) -> Optional[int]:
+    """A bus count as an ``int`` (whole floats such as ``12.0`` are converted), or ``None``."""
+    if value is None:
+        return None
+    if (isinstance(value, bool) or not isinstance(value, numbers.Real) or not math.isfinite(value)
+            or value != int(value) or value < 0):
+        raise ValueError(f"{name} must be a whole number of buses, got {value!r}")
+    return int(value)
+
+
+def _check_choice(name, value, choices):
+    if value not in choices:
+        raise ValueError(f"{name} must be one of {', '.join(choices)}; got {value!r}")
+
+
+def estimate_buses(load: float, tier_level: str, rate_card: RateCard = BUILTIN_RATE_CARD) -> int:
+    return math.ceil(load * rate_card.tier_bus_multipliers[tier_level])
+
+
+def phase_buses(phase: Phase, tier_level: str, rate_card: RateCard = BUILTIN_RATE_CARD) -> int:
+    if phase.bus_override:
+        return phase.bus_override
+    return estimate_buses(phase.capacity, tier_level, rate_card)
+
+
+def report_cost(config: QuoteConfig, study_key: str) -> float:
+    return (config.base_report_costs[study_key] * config.rate_card.report_format_multipliers[config.report_format]
+            * config.report_complexity_factor)
+
+
+def price_study(study_key: str, buses: int, tier_complexity: float, delivery_multiplier: float,
+                typical_modeling_factor: float, study_report_cost: float,
+                rate_card: RateCard = BUILTIN_RATE_CARD) -> dict:
+    study_data = STUDIES_DATA[study_key]
+    rates, split = rate_card.resource_rates, rate_card.resource_split
+
+    # Hours calculation
+    study_hours = (buses * rate_card.base_hours_per_bus[study_key] *
+                   tier_complexity * delivery_multiplier * typical_modeling_factor)
+
+    # Resource allocation
+    l1_hours = study_hours * split["L1"]
+    l2_hours = study_hours * split["L2"]
+    l3_hours = study_hours * split["L3"]
+
+    # Labor cost
+    labor_cost = (l1_hours * rates["L1"] + l2_hours * rates["L2"] + l3_hours * rates["L3"])
+
+    return {
+        'name': study_data['name'],
+        'emoji': study_data['emoji'],
+        'hours': study_hours,
+        'l1_hours': l1_hours,
+        'l2_hours': l2_hours,
+        'l3_hours': l3_hours,
+        'labor_cost': labor_cost,
+        'report_cost': study_report_cost,
+        'total_cost': labor_cost + study_report_cost,
+        'complexity': study_data['complexity']
+    }
+
+
+def _price_studies(config: QuoteConfig, buses: int) -> Dict[str, dict]:
+    rate_card = config.rate_card
+    tier_complexity = rate_card.tier_complexity[config.tier_level]
+    delivery_multiplier = rate_card.delivery_multipliers[config.delivery_type]
+    return {
+        study_key: price_study(study_key, buses, tier_complexity, delivery_multiplier,
+                               config.typical_modeling_factor, report_cost(config, study_key), rate_card)
+        for study_key in config.selected_studies
+    }
+
+
+def calculate_enhanced_project_costs(config: QuoteConfig) -> dict:
+    """Price one quote and return the breakdown rendered by the UI."""
+    total_load = config.total_load
+
+    if config.custom_bus_count:
+        estimated_buses = config.custom_bus_count
+    else:
+        estimated_buses = estimate_buses(total_load, config.tier_level, config.rate_card)
+
+    results = {
+        'estimated_buses': estimated_buses,
+        'total_load': total_load,
+        'studies': {},
+        'phase_results': [],
+        'standard_cost': 0,
+        'competitive_cost': 0,
+        'additional_costs': config.additional_costs
+    }
+
+    total_standard_cost = 0
+    total_hours = 0
+
+    if config.calculation_methodology == "Phase-wise" and len(config.phases) >= VECTORIZED_MIN_PHASES:
+        # Large campuses: one array pass over the phases × studies matrix.
+        # Imported lazily so small quotes and the CLI never load NumPy.
+        from .phases import price_phase_matrix
+
+        results['phase_results'] = price_phase_matrix(config).phase_results()
+        for phase_result in results['phase_results']:
+            total_standard_cost += phase_result['total_cost']
+            total_hours += phase_result['total_hours']
+    elif config.calculation_methodology == "Phase-wise":
+        for phase in config.phases:
+            buses = phase_buses(phase, config.tier_level, config.rate_card)
+            phase_studies = _price_studies(config, buses)
+            phase_total_cost = sum(study['total_cost'] for study in phase_studies.values())
+            phase_total_hours = sum(study['hours'] for study in phase_studies.values())
+
+            results['phase_results'].append({
+                'name': phase.name,
+                'capacity': phase.capacity,
+                'buses': buses,
+                'studies': phase_studies,
+                'total_hours': phase_total_hours,
+                'total_cost': phase_total_cost
+            })
+            total_standard_cost += phase_total_cost
+            total_hours += phase_total_hours
+    else:
+        results['studies'] = _price_studies(config, estimated_buses)
+        for study in results['studies'].values():
+            total_standard_cost += study['total_cost']
+            total_hours += study['hours']
+
+    results['total_hours'] = total_hours
+
+    # Premium client factor, additional costs, then phase extension discount
+    total_standard_cost *= config.effective_premium_factor
+    total_standard_cost += results['additional_costs']
+    total_standard_cost *= config.effective_phase_extension_discount
+
+    results['standard_cost'] = total_standard_cost
+    results['competitive_cost'] = total_standard_cost * config.competitive_multiplier
+    results['savings'] = results['standard_cost'] - results['competitive_cost']
+    results['savings_percentage'] = (results['savings'] / results['standard_cost']) * 100 if results['standard_cost'] > 0 else 0
+
+    return results
@@ -0,0 +1,444 @@
+"""Client-ready PDF and Excel exports of a priced quote.
+
+:func:`quote_report` turns a config and its results into plain tables: the
+summary, the study and phase breakdowns, additional costs, applied
+competitive factors and the chart series. The renderers lay those tables out
+as a PDF (reportlab) or a multi-sheet workbook (openpyxl). The charts are
+drawn natively in each format, so neither needs a browser or image exporter.
+Both libraries are imported only when a report is rendered.
+
+Rendering runs on a small shared thread pool (:func:`submit_export`), so
+Streamlit sessions never block on it, and finished files are kept in
+:data:`export_cache` by quote hash, so a repeat download costs nothing.
+:func:`write_export_archive` streams any number of reports into one zip,
+keeping only a bounded window of rendered files in memory.
+"""
+
+import io
+import threading
+import zipfile
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date
+from typing import BinaryIO, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .cache import LRUCache, quote_key
+from .engine import QuoteConfig
+
+EXPORT_WORKERS = 2
+ARCHIVE_WINDOW = 8  # rendered reports held in memory while writing an archive
+CHART_LIMIT = 20  # bars/slices drawn before the rest are folded into "Other"
+
+
+@dataclass
+class QuoteReport:
+    """Everything an export shows, as rows of plain values."""
+    title: str
+    client: Optional[str]
+    reference: str
+    prepared: str
+    summary: List[Tuple[str, object]]
+    study_rows: List[tuple]
+    phase_rows: List[tuple] = field(default_factory=list)
+    additional_rows: List[Tuple[str, float]] = field(default_factory=list)
+    reductions: List[Tuple[str, str]] = field(default_factory=list)
+    premiums: List[Tuple[str, str]] = field(default_factory=list)
+    chart_names: List[str] = field(default_factory=list)
+    chart_standard: List[float] = field(default_factory=list)
+    chart_competitive: List[float] = field(default_factory=list)
+
+    STUDY_COLUMNS = ("Study", "Complexity", "Hours", "Labor Cost", "Report Cost", "Standard", "Competitive")
+    PHASE_COLUMNS = ("Phase", "Capacity (MW)", "Buses", "Hours", "Standard", "Competitive", "Avg Cost/Bus")
+
+
+def quote_report(config: QuoteConfig, results: dict, client: Optional[str] = None,
+                 additional_items: Sequence[Tuple[str, float]] = ()) -> QuoteReport:
+    """Tabulate one priced quote for export.
+
+    ``additional_items`` itemises ``config.additional_costs`` (labels, site
+    visits, ...) as ``(description, amount)`` pairs.
+    """
+    factor = config.overall_competitive_factor
+
+    if config.calculation_methodology == "Phase-wise":
+        # Studies summed over every phase
+        study_totals = {}
+        for phase in results['phase_results']:
+            for study_key, study in phase['studies'].items():
+                totals = study_totals.setdefault(study_key, dict(study, hours=0.0, labor_cost=0.0,
+                                                                 report_cost=0.0, total_cost=0.0))
+                for name in ('hours', 'labor_cost', 'report_cost', 'total_cost'):
+                    totals[name] += study[name]
+        studies = study_totals
+    else:
+        studies = results['studies']
+
+    study_rows = [(study['name'], study['complexity'], study['hours'], study['labor_cost'], study['report_cost'],
+                   study['total_cost'], study['total_cost'] * factor) for study in studies.values()]
+    # A phase with no buses (0 MW) has no cost per bus
+    phase_rows = [(phase['name'], phase['capacity'], phase['buses'], phase['total_hours'], phase['total_cost'],
+                   phase['total_cost'] * factor, phase['total_cost'] / phase['buses'] if phase['buses'] else None)
+                  for phase in results['phase_results']]
+
+    reductions = []
+    if config.etap_model_available:
+        reductions.append(("ETAP Model Discount", f"{(1 - config.etap_discount_factor) * 100:.0f}%"))
+    if config.repeat_customer:
+        reductions.append(("Repeat Customer", f"{(1 - config.repeat_discount_factor) * 100:.0f}%"))
+    if config.project_type == "Phase Extension":
+        reductions.append(("Phase Extension", f"{(1 - config.phase_extension_discount) * 100:.0f}%"))
+    reductions.append(("Overall Competitive", f"{(1 - factor) * 100:.0f}%"))
+    premiums = []
+    if config.client_type == "Premium":
+        premiums.append(("Premium Client", f"+{(config.premium_factor - 1) * 100:.0f}%"))
+    premiums.append(("Modeling Factor", f"{config.typical_modeling_factor:.0%}"))
+    premiums.append(("Report Complexity", f"{config.report_complexity_factor:.0%}"))
+
+    if phase_rows:
+        chart_names = [row[0] for row in phase_rows]
+        chart_standard = [row[4] for row in phase_rows]
+    else:
+        chart_names = [row[0] for row in study_rows]
+        chart_standard = [row[5] for row in study_rows]
+
+    return QuoteReport(
+        title="DC Power System Studies – Cost Estimate",
+        client=client,
+        reference=quote_key(config)[:12].upper(),
+        prepared=date.today().isoformat(),
+        summary=[
+            ("Total Load (MW)", results['total_load']),
+            ("Estimated Buses", results['estimated_buses']),
+            ("Total Hours", results['total_hours']),
+            ("Tier Level", config.tier_level),
+            ("Delivery Type", config.delivery_type),
+            ("Project Type", config.project_type),
+            ("Methodology", config.calculation_methodology),
+            ("Client Type", config.client_type),
+            ("Report Format", config.report_format),
+            ("Standard Price", results['standard_cost']),
+            ("Competitive Price", results['competitive_cost']),
+            ("Savings", results['savings']),
+            ("Savings (%)", results['savings_percentage']),
+        ],
+        study_rows=study_rows,
+        phase_rows=phase_rows,
+        additional_rows=[(description, float(amount)) for description, amount in additional_items if amount]
+        or ([("Additional Costs", float(results['additional_costs']))] if results['additional_costs'] else []),
+        reductions=reductions,
+        premiums=premiums,
+        chart_names=chart_names,
+        chart_standard=chart_standard,
+        chart_competitive=[cost * factor for cost in chart_standard],
+    )
+
+
+def _chart_series(report: QuoteReport) -> Tuple[List[str], List[float], List[float]]:
+    # Hundreds of phases make an unreadable chart: keep the largest, fold the rest
+    names, standard, competitive = report.chart_names, report.chart_standard, report.chart_competitive
+    if len(names) <= CHART_LIMIT:
+        return names, standard, competitive
+    order = sorted(range(len(names)), key=lambda i: standard[i], reverse=True)
+    kept, folded = sorted(order[:CHART_LIMIT - 1]), order[CHART_LIMIT - 1:]
+    return ([names[i] for i in kept] + [f"Other ({len(folded)})"],
+            [standard[i] for i in kept] + [sum(standard[i] for i in folded)],
+            [competitive[i] for i in kept] + [sum(competitive[i] for i in folded)])
+
+
+def render_excel(report: QuoteReport) -> bytes:
+    """Workbook with Summary, Studies, Phases, Additional Costs, Factors and Charts sheets."""
+    from openpyxl import Workbook
+    from openpyxl.chart import BarChart, PieChart, Reference
+    from openpyxl.styles import Font, PatternFill
+
+    money = '"₹"#,##0'
+    header_font = Font(bold=True, color="FFFFFF")
+    header_fill = PatternFill("solid", fgColor="0078FF")
+
+    def table(sheet, columns, rows, formats):
+        sheet.append(list(columns))
+        for cell in sheet[sheet.max_row]:
+            cell.font, cell.fill = header_font, header_fill
+        for row in rows:
+            sheet.append(list(row))
+            for cell, number_format in zip(sheet[sheet.max_row], formats):
+                if number_format:
+                    cell.number_format = number_format
+        for column, name in zip(sheet.columns, columns):
+            sheet.column_dimensions[column[0].column_letter].width = max(12, len(name) + 4)
+        sheet.freeze_panes = "A2"
+
+    workbook = Workbook()
+    summary = workbook.active
+    summary.title = "Summary"
+    summary.append([report.title])
+    summary["A1"].font = Font(bold=True, size=14)
+    summary.append(["Client", report.client or "—"])
+    summary.append(["Reference", report.reference])
+    summary.append(["Prepared", report.prepared])
+    summary.append([])
+    for label, value in report.summary:
+        summary.append([label, value])
+        if label.endswith("Price") or label == "Savings":
+            summary.cell(summary.max_row, 2).number_format = money
+        elif isinstance(value, float):
+            summary.cell(summary.max_row, 2).number_format = "#,##0.0"
+    summary.column_dimensions["A"].width = 22
+    summary.column_dimensions["B"].width = 22
+
+    table(workbook.create_sheet("Studies"), QuoteReport.STUDY_COLUMNS, report.study_rows,
+          (None, None, "#,##0.0", money, money, money, money))
+    if report.phase_rows:
+        table(workbook.create_sheet("Phases"), QuoteReport.PHASE_COLUMNS, report.phase_rows,
+              (None, "#,##0.0", "#,##0", "#,##0", money, money, money))
+    if report.additional_rows:
+        table(workbook.create_sheet("Additional Costs"), ("Description", "Amount"), report.additional_rows,
+              (None, money))
+    table(workbook.create_sheet("Factors"), ("Factor", "Value", "Type"),
+          [(label, value, "Reduction") for label, value in report.reductions]
+          + [(label, value, "Premium") for label, value in report.premiums], (None, None, None))
+
+    # Chart data lives on the Charts sheet so the native charts can reference it
+    names, standard, competitive = _chart_series(report)
+    if names:
+        charts = workbook.create_sheet("Charts")
+        table(charts, ("Item", "Standard", "Competitive"), zip(names, standard, competitive), (None, money, money))
+        categories = Reference(charts, min_col=1, min_row=2, max_row=len(names) + 1)
+
+        bars = BarChart()
+        bars.title = "Standard vs Competitive Pricing"
+        bars.add_data(Reference(charts, min_col=2, max_col=3, min_row=1, max_row=len(names) + 1),
+                      titles_from_data=True)
+        bars.set_categories(categories)
+        bars.width, bars.height = 18, 9
+        charts.add_chart(bars, "E2")
+
+        if sum(standard) > 0:
+            pie = PieChart()
+            pie.title = "Cost Distribution"
+            pie.add_data(Reference(charts, min_col=2, min_row=1, max_row=len(names) + 1), titles_from_data=True)
+            pie.set_categories(categories)
+            pie.width, pie.height = 12, 9
+            charts.add_chart(pie, "E22")
+
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+def render_pdf(report: QuoteReport) -> bytes:
+    """A4 report: summary, breakdown tables, factors and both charts."""
+    from reportlab.graphics.charts.barcharts import VerticalBarChart
+    from reportlab.graphics.charts.legends import Legend
+    from reportlab.graphics.charts.piecharts import Pie
+    from reportlab.graphics.shapes import Drawing
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.lib.units import mm
+    from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+    # The standard PDF fonts have no ₹ glyph
+    def inr(value):
+        return f"INR {value:,.0f}"
+
+    def text(value):
+        return value.replace("₹", "INR ") if isinstance(value, str) else value
+
+    styles = getSampleStyleSheet()
+    teal, coral = colors.HexColor("#00a88a"), colors.HexColor("#ff6b6b")
+    grid = TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor("#0078ff")),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 8),
+        ('ALIGN', (1, 1), (-1, -1), 'RIGHT'),
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor("#f1f5f9")]),
+        ('GRID', (0, 0), (-1, -1), 0.25, colors.HexColor("#cbd5e1")),
+    ])
+
+    def table(columns, rows):
+        return Table([list(columns)] + [[text(value) for value in row] for row in rows], style=grid, repeatRows=1,
+                     hAlign='LEFT')
+
+    story = [
+        Paragraph(report.title, styles['Title']),
+        Paragraph(f"Client: {report.client or '—'} &nbsp;&nbsp; Reference: {report.reference} "
+                  f"&nbsp;&nbsp; Prepared: {report.prepared}", styles['Normal']),
+        Spacer(1, 6 * mm),
+        Paragraph("Project Summary", styles['Heading2']),
+        table(("Item", "Value"), [
+            (label, inr(value) if label.endswith("Price") or label == "Savings"
+             else f"{value:,.1f}" if isinstance(value, float) else f"{value:,}" if isinstance(value, int) else value)
+            for label, value in report.summary]),
+        Paragraph("Study-wise Cost Breakdown", styles['Heading2']),
+        table(QuoteReport.STUDY_COLUMNS, [
+            (name, complexity, f"{hours:,.1f}", inr(labor), inr(report_cost), inr(standard), inr(competitive))
+            for name, complexity, hours, labor, report_cost, standard, competitive in report.study_rows]),
+    ]
+    if report.phase_rows:
+        story += [
+            Paragraph("Phase-wise Breakdown", styles['Heading2']),
+            table(QuoteReport.PHASE_COLUMNS, [
+                (name, f"{capacity:,.1f}", f"{buses:,}", f"{hours:,.0f}", inr(standard), inr(competitive),
+                 inr(per_bus) if per_bus is not None else "—")
+                for name, capacity, buses, hours, standard, competitive, per_bus in report.phase_rows]),
+        ]
+    if report.additional_rows:
+        story += [Paragraph("Additional Costs", styles['Heading2']),
+                  table(("Description", "Amount"), [(description, inr(amount))
+                                                    for description, amount in report.additional_rows])]
+    story += [
+        Paragraph("Applied Competitive Factors", styles['Heading2']),
+        table(("Factor", "Value", "Type"), [(label, value, "Reduction") for label, value in report.reductions]
+              + [(label, value, "Premium") for label, value in report.premiums]),
+    ]
+
+    names, standard, competitive = _chart_series(report)
+    if names:
+        story.append(Paragraph("Cost Analysis Charts", styles['Heading2']))
+
+        bar_drawing = Drawing(170 * mm, 75 * mm)
+        bars = VerticalBarChart()
+        bars.x, bars.y, bars.width, bars.height = 15 * mm, 18 * mm, 150 * mm, 50 * mm
+        bars.data = [standard, competitive]
+        bars.categoryAxis.categoryNames = names
+        bars.categoryAxis.labels.angle = 30 if len(names) > 6 else 0
+        bars.categoryAxis.labels.boxAnchor = 'ne' if len(names) > 6 else 'n'
+        bars.categoryAxis.labels.fontName = bars.valueAxis.labels.fontName = 'Helvetica'
+        bars.categoryAxis.labels.fontSize = 6
+        bars.valueAxis.valueMin = 0
+        bars.valueAxis.labelTextFormat = lambda value: f"{value / 1000:,.0f}k"
+        bars.bars[0].fillColor, bars.bars[1].fillColor = teal, coral
+        legend = Legend()
+        legend.x, legend.y, legend.fontName, legend.fontSize = 130 * mm, 73 * mm, 'Helvetica', 7
+        legend.alignment = 'right'
+        legend.colorNamePairs = [(teal, "Standard"), (coral, "Competitive")]
+        bar_drawing.add(bars)
+        bar_drawing.add(legend)
+        story.append(bar_drawing)
+
+    # A quote priced at zero has no cost distribution to draw
+    total = sum(standard)
+    if names and total > 0:
+        pie_drawing = Drawing(170 * mm, 70 * mm)
+        pie = Pie()
+        pie.x, pie.y, pie.width, pie.height = 15 * mm, 5 * mm, 60 * mm, 60 * mm
+        pie.data = standard
+        palette = [teal, coral, colors.HexColor("#0ea5e9"), colors.HexColor("#feca57"), colors.HexColor("#a78bfa")]
+        for i in range(len(standard)):
+            pie.slices[i].fillColor = palette[i % len(palette)]
+            pie.slices[i].strokeColor = colors.white
+        pie_legend = Legend()
+        pie_legend.x, pie_legend.y, pie_legend.fontName, pie_legend.fontSize = 90 * mm, 65 * mm, 'Helvetica', 7
+        pie_legend.alignment = 'right'
+        pie_legend.columnMaximum = CHART_LIMIT
+        pie_legend.colorNamePairs = [(palette[i % len(palette)], f"{name}: {value / total:.0%}")
+                                     for i, (name, value) in enumerate(zip(names, standard))]
+        pie_drawing.add(pie)
+        pie_drawing.add(pie_legend)
+        story.append(pie_drawing)
+
+    buffer = io.BytesIO()
+    SimpleDocTemplate(buffer, pagesize=A4, title=report.title, leftMargin=15 * mm, rightMargin=15 * mm,
+                      topMargin=15 * mm, bottomMargin=15 * mm).build(story)
+    return buffer.getvalue()
+
+
+@dataclass(frozen=True)
+class ExportFormat:
+    extension: str
+    mime: str
+    render: Callable[[QuoteReport], bytes]
+
+
+EXPORT_FORMATS: Dict[str, ExportFormat] = {
+    'pdf': ExportFormat('pdf', 'application/pdf', render_pdf),
+    'xlsx': ExportFormat('xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', render_excel),
+}
+
+export_cache = LRUCache(maxsize=64)
+_executor = ThreadPoolExecutor(max_workers=EXPORT_WORKERS, thread_name_prefix="quote-export")
+_pending: Dict[tuple, Future] = {}
+_pending_lock = threading.Lock()
+
+
+def export_key(config: QuoteConfig, export_format: str, client: Optional[str] = None,
+               additional_items: Sequence[Tuple[str, float]] = ()) -> tuple:
+    # quote_key ignores display-only inputs, which the report does show
+    return (export_format, quote_key(config), tuple(phase.name for phase in config.phases), client,
+            tuple(additional_items), date.today().isoformat())
+
+
+def export_quote(config: QuoteConfig, results: dict, export_format: str, client: Optional[str] = None,
+                 additional_items: Sequence[Tuple[str, float]] = ()) -> bytes:
+    """Render one export on the calling thread (served from :data:`export_cache` when possible)."""
+    return export_cache.get_or_compute(
+        export_key(config, export_format, client, additional_items),
+        lambda: EXPORT_FORMATS[export_format].render(quote_report(config, results, client, additional_items)))
+
+
+def submit_export(config: QuoteConfig, results: dict, export_format: str, client: Optional[str] = None,
+                  additional_items: Sequence[Tuple[str, float]] = ()) -> Future:
+    """Render one export on the shared pool; identical in-flight requests share a future."""
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format {export_format!r}; expected one of {', '.join(EXPORT_FORMATS)}")
+    key = export_key(config, export_format, client, additional_items)
+    cached = export_cache.get(key)
+    if cached is not None:
+        future = Future()
+        future.set_result(cached)
+        return future
+
+    with _pending_lock:
+        future = _pending.get(key)
+        if future is None:
+            future = _pending[key] = _executor.submit(export_quote, config, results, export_format, client,
+                                                      tuple(additional_items))
+            future.add_done_callback(lambda done: _forget(key))
+    return future
+
+
+def _forget(key: tuple):
+    with _pending_lock:
+        _pending.pop(key, None)
+
+
+def write_export_archive(quotes: Iterable[Tuple[str, QuoteConfig, dict]], output: BinaryIO,
+                         formats: Sequence[str] = ('pdf', 'xlsx'), progress=None) -> int:
+    """Zip one report per format for every ``(name, config, results)`` in ``quotes``.
+
+    ``quotes`` is consumed lazily and rendering runs on the shared pool, at
+    most :data:`ARCHIVE_WINDOW` reports ahead of the zip writer, so memory
+    stays flat however many quotes there are. Batch reports bypass
+    :data:`export_cache`. ``progress`` is called with the number of quotes
+    written so far. Returns that number.
+    """
+    for export_format in formats:
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported export format {export_format!r}; expected one of {', '.join(EXPORT_FORMATS)}")
+
+    def render(config, results, client):
+        report = quote_report(config, results, client)
+        return [EXPORT_FORMATS[export_format].render(report) for export_format in formats]
+
+    written = 0
+    window = deque()
+    with zipfile.ZipFile(output, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        def drain_one():
+            nonlocal written
+            name, future = window.popleft()
+            for export_format, data in zip(formats, future.result()):
+                archive.writestr(f"{name}.{EXPORT_FORMATS[export_format].extension}", data)
+            written += 1
+            if progress is not None:
+                progress(written)
+
+        for name, config, results in quotes:
+            window.append((name, _executor.submit(render, config, results, None)))
+            if len(window) >= ARCHIVE_WINDOW:
+                drain_one()
+        while window:
+            drain_one()
+    return written
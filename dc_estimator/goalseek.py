@@ -0,0 +1,110 @@
+"""Closed-form cost coefficients and inverse ("goal-seek") pricing.
+
+For a fixed tier, delivery type, study set and report setup the standard cost
+is affine in the number of priced buses::
+
+    standard    = ((labor_per_bus × buses + report_units × report_cost) × premium
+                   + additional_costs) × phase_extension
+    competitive = standard × etap × repeat × overall_competitive_factor
+
+so both directions, the price for N buses and the buses or competitive
+factor that hit a target price, are O(1) once the coefficients are known.
+"""
+
+import math
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional, Tuple
+
+from .engine import BUILTIN_RATE_CARD, QuoteConfig, RateCard, estimate_buses, phase_buses
+
+
+@dataclass(frozen=True)
+class CostCoefficients:
+    labor_per_bus: float
+    report_cost: float
+    report_units: int
+    premium_factor: float
+    additional_costs: float
+    phase_extension_discount: float
+    discount_multiplier: float
+    overall_competitive_factor: float
+
+    @property
+    def competitive_multiplier(self) -> float:
+        return self.discount_multiplier * self.overall_competitive_factor
+
+    def standard_cost(self, buses: float) -> float:
+        return (((self.labor_per_bus * buses + self.report_units * self.report_cost) * self.premium_factor
+                 + self.additional_costs) * self.phase_extension_discount)
+
+    def competitive_cost(self, buses: float) -> float:
+        return self.standard_cost(buses) * self.competitive_multiplier
+
+    def max_buses(self, target_price: float, competitive: bool = True) -> Optional[int]:
+        """Largest bus count whose price does not exceed ``target_price``.
+
+        Returns ``None`` when the price does not depend on buses (no studies
+        selected), and 0 when even zero buses exceed the target.
+        """
+        if self.labor_per_bus <= 0:
+            return None
+        multiplier = self.competitive_multiplier if competitive else 1.0
+        standard = target_price / (multiplier * self.phase_extension_discount)
+        buses = ((standard - self.additional_costs) / self.premium_factor
+                 - self.report_units * self.report_cost) / self.labor_per_bus
+        # Nudge before flooring so a target equal to an exact price keeps that bus count
+        return max(0, math.floor(buses + 1e-9))
+
+    def required_overall_factor(self, buses: float, target_price: float) -> Optional[float]:
+        """``overall_competitive_factor`` that makes the competitive price equal ``target_price``."""
+        denominator = self.standard_cost(buses) * self.discount_multiplier
+        if denominator <= 0:
+            return None
+        return target_price / denominator
+
+
+@lru_cache(maxsize=1024)
+def _unit_coefficients(tier_level: str, delivery_type: str, selected_studies: Tuple[str, ...],
+                       report_format: str, report_costs: Tuple[float, ...], report_complexity_factor: float,
+                       typical_modeling_factor: float, rate_card: RateCard) -> Tuple[float, float]:
+    hours_per_bus = sum(rate_card.base_hours_per_bus[key] for key in selected_studies)
+    labor_per_bus = (hours_per_bus * rate_card.tier_complexity[tier_level]
+                     * rate_card.delivery_multipliers[delivery_type] * typical_modeling_factor
+                     * rate_card.blended_rate)
+    report_cost = (sum(report_costs) * rate_card.report_format_multipliers[report_format]
+                   * report_complexity_factor)
+    return labor_per_bus, report_cost
+
+
+def cost_coefficients(config: QuoteConfig) -> CostCoefficients:
+    """Coefficients of ``config``'s price as a function of priced buses (cached per configuration)."""
+    labor_per_bus, report_cost = _unit_coefficients(
+        config.tier_level, config.delivery_type, tuple(config.selected_studies), config.report_format,
+        tuple(float(config.base_report_costs[key]) for key in config.selected_studies),
+        config.report_complexity_factor, config.typical_modeling_factor, config.rate_card)
+    return CostCoefficients(
+        labor_per_bus=labor_per_bus,
+        report_cost=report_cost,
+        report_units=len(config.phases) if config.calculation_methodology == "Phase-wise" else 1,
+        premium_factor=config.effective_premium_factor,
+        additional_costs=config.additional_costs,
+        phase_extension_discount=config.effective_phase_extension_discount,
+        discount_multiplier=((config.etap_discount_factor if config.etap_model_available else 1.0)
+                             * (config.repeat_discount_factor if config.repeat_customer else 1.0)),
+        overall_competitive_factor=config.overall_competitive_factor,
+    )
+
+
+def priced_buses(config: QuoteConfig) -> int:
+    """Buses the engine charges labor for: the project estimate, or the sum over phases."""
+    if config.calculation_methodology == "Phase-wise":
+        return sum(phase_buses(phase, config.tier_level, config.rate_card) for phase in config.phases)
+    if config.custom_bus_count:
+        return config.custom_bus_count
+    return estimate_buses(config.total_load, config.tier_level, config.rate_card)
+
+
+def max_load_for_buses(buses: int, tier_level: str, rate_card: RateCard = BUILTIN_RATE_CARD) -> float:
+    """Largest total load (MW) whose tier-based bus estimate stays within ``buses``."""
+    return buses / rate_card.tier_bus_multipliers[tier_level]
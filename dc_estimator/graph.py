@@ -0,0 +1,291 @@
+"""Incremental pricing on a dependency graph of inputs → intermediates → outputs.
+
+:func:`~dc_estimator.engine.calculate_enhanced_project_costs` recomputes
+every intermediate on each call. :class:`QuoteGraph` instead keeps each
+pricing term (bus count, per-study hours, L1/L2/L3 split, labor, report,
+multipliers, totals) as a node of a :class:`Graph`. Changing an input marks
+its dependents dirty; reading an output recomputes only dirty nodes, and a
+node whose new value equals its old one does not force its dependents to
+recompute ("early cutoff"). Changing ``overall_competitive_factor`` therefore
+re-runs only the competitive multiplier and what follows it, and changing one
+``base_report_costs`` entry only that study's report and total nodes and the
+sums above them.
+
+The consolidated and phase-wise totals are separate sums behind a switch node
+on ``calculation_methodology``. A switch pulls only the branch it selects, so
+a phase edit on a phase-wise quote never recomputes the per-study chain, and
+an edit on a consolidated quote never prices the phases.
+
+Each recomputation is logged in :attr:`Graph.recomputed` for profiling. The
+estimator page keeps one :class:`QuoteGraph` per session and prices on it
+whenever the shared results cache misses; the performance profile lists the
+nodes the last change recomputed.
+"""
+
+from collections import defaultdict
+from typing import Any, Callable, Dict, Hashable, List, Sequence, Tuple
+
+from .engine import STUDIES_DATA, STUDY_KEYS, QuoteConfig, estimate_buses, price_study
+
+# QuoteConfig fields that become one graph input each; the structured fields
+# (phases, base_report_costs) are split into one input per phase or study
+SCALAR_FIELDS = tuple(name for name in QuoteConfig.__dataclass_fields__
+                      if name not in ('phases', 'base_report_costs'))
+
+
+class Graph:
+    """A pull-based dependency graph with dirty tracking and early cutoff."""
+
+    def __init__(self):
+        self._functions: Dict[Hashable, Callable] = {}
+        self._dependencies: Dict[Hashable, Sequence[Hashable]] = {}
+        self._dependents: Dict[Hashable, List[Hashable]] = defaultdict(list)
+        self._switches: Dict[Hashable, Tuple[Hashable, Dict[Any, Hashable]]] = {}
+        self._values: Dict[Hashable, Any] = {}
+        self._dirty = set()
+        self._tick = 0
+        self._changed_at: Dict[Hashable, int] = {}
+        self._verified_at: Dict[Hashable, int] = {}
+        self.recomputed: List[Hashable] = []
+
+    def __contains__(self, name):
+        return name in self._values or name in self._functions
+
+    def add_input(self, name: Hashable, value):
+        self._values[name] = value
+        self._changed_at[name] = self._tick
+
+    def add_node(self, name: Hashable, function: Callable, dependencies: Sequence[Hashable]):
+        """``function`` receives the dependencies' values positionally."""
+        self._functions[name] = function
+        self._dependencies[name] = tuple(dependencies)
+        for dependency in dependencies:
+            self._dependents[dependency].append(name)
+        self._dirty.add(name)
+
+    def add_switch(self, name: Hashable, selector: Hashable, branches: Dict[Any, Hashable]):
+        """A node equal to ``branches[value of selector]``; the other branches are not pulled."""
+        self._switches[name] = (selector, dict(branches))
+        self.add_node(name, lambda key, value: value, [selector, *branches.values()])
+
+    def set(self, name: Hashable, value) -> bool:
+        """Change an input; returns False (and dirties nothing) if the value is unchanged."""
+        if name in self._functions:
+            raise ValueError(f"{name!r} is a computed node, not an input")
+        if self._values[name] == value:
+            return False
+        self._tick += 1
+        self._values[name] = value
+        self._changed_at[name] = self._tick
+
+        stack = list(self._dependents[name])
+        while stack:
+            dependent = stack.pop()
+            if dependent not in self._dirty:
+                self._dirty.add(dependent)
+                stack.extend(self._dependents[dependent])
+        return True
+
+    def get(self, name: Hashable):
+        if name in self._dirty:
+            self._refresh(name)
+        return self._values[name]
+
+    def take_recomputed(self) -> List[Hashable]:
+        """Nodes recomputed since the last call, in evaluation order."""
+        recomputed, self.recomputed = self.recomputed, []
+        return recomputed
+
+    def _refresh(self, name):
+        if name in self._switches:
+            selector, branches = self._switches[name]
+            dependencies = (selector, branches[self.get(selector)])
+        else:
+            dependencies = self._dependencies[name]
+        values = [self.get(dependency) for dependency in dependencies]
+        verified = self._verified_at.get(name)
+        if verified is None or any(self._changed_at[dependency] > verified for dependency in dependencies):
+            value = self._functions[name](*values)
+            self.recomputed.append(name)
+            if verified is None or value != self._values[name]:
+                self._values[name] = value
+                self._changed_at[name] = self._tick
+        self._verified_at[name] = self._tick
+        self._dirty.discard(name)
+
+
+def _competitive_multiplier(etap_model_available, etap_discount_factor, repeat_customer,
+                            repeat_discount_factor, overall_competitive_factor):
+    # Same order of operations as QuoteConfig.competitive_multiplier
+    multiplier = 1.0
+    if etap_model_available:
+        multiplier *= etap_discount_factor
+    if repeat_customer:
+        multiplier *= repeat_discount_factor
+    return multiplier * overall_competitive_factor
+
+
+class QuoteGraph:
+    """One quote held as a :class:`Graph`, updated in place by :meth:`update`.
+
+    Node names are strings such as ``'standard_cost'``, ``'report_cost[pdc]'``
+    or ``'phase[3].buses'``. Adding or removing phases rebuilds the graph;
+    every other change is incremental.
+    """
+
+    def __init__(self, config: QuoteConfig):
+        self.config = config
+        self.graph = self._build(config)
+
+    def update(self, config: QuoteConfig) -> List[Hashable]:
+        """Move to ``config`` and return the nodes recomputed to price it."""
+        if len(config.phases) != len(self.config.phases):
+            self.config = config
+            self.graph = self._build(config)
+        else:
+            graph = self.graph
+            for name in SCALAR_FIELDS:
+                graph.set(name, getattr(config, name))
+            for study_key in STUDY_KEYS:
+                graph.set(f'base_report_cost[{study_key}]', config.base_report_costs.get(study_key, 0.0))
+            for index, phase in enumerate(config.phases):
+                graph.set(f'phase[{index}].name', phase.name)
+                graph.set(f'phase[{index}].capacity', phase.capacity)
+                graph.set(f'phase[{index}].bus_override', phase.bus_override)
+            self.config = config
+        self.graph.take_recomputed()
+        self.results()
+        return self.graph.take_recomputed()
+
+    def results(self) -> dict:
+        """The same ``results`` dict as ``calculate_enhanced_project_costs``."""
+        get = self.graph.get
+        phase_wise = get('calculation_methodology') == "Phase-wise"
+        selected = get('selected_studies')
+        return {
+            'estimated_buses': get('estimated_buses'),
+            'total_load': get('total_load'),
+            'studies': {} if phase_wise else {key: get(f'study[{key}]') for key in selected},
+            'phase_results': [get(f'phase[{index}]') for index in range(len(self.config.phases))] if phase_wise else [],
+            'standard_cost': get('standard_cost'),
+            'competitive_cost': get('competitive_cost'),
+            'additional_costs': get('additional_costs'),
+            'total_hours': get('total_hours'),
+            'savings': get('savings'),
+            'savings_percentage': get('savings_percentage'),
+        }
+
+    @staticmethod
+    def _build(config: QuoteConfig) -> Graph:
+        graph = Graph()
+        node = graph.add_node
+        for name in SCALAR_FIELDS:
+            graph.add_input(name, getattr(config, name))
+
+        node('total_load', lambda it, mechanical, house: it + mechanical + house,
+             ['it_capacity', 'mechanical_load', 'house_load'])
+        node('estimated_buses',
+             lambda custom, load, tier, card: custom if custom else estimate_buses(load, tier, card),
+             ['custom_bus_count', 'total_load', 'tier_level', 'rate_card'])
+        # Rate card lookups are nodes of their own, so switching to a card that
+        # only revises some values recomputes only what those values feed
+        node('tier_complexity', lambda card, tier: card.tier_complexity[tier], ['rate_card', 'tier_level'])
+        node('delivery_multiplier', lambda card, delivery: card.delivery_multipliers[delivery],
+             ['rate_card', 'delivery_type'])
+        node('report_format_multiplier', lambda card, fmt: card.report_format_multipliers[fmt],
+             ['rate_card', 'report_format'])
+        node('resource_split', lambda card: card.resource_split, ['rate_card'])
+        node('resource_rates', lambda card: card.resource_rates, ['rate_card'])
+
+        # Consolidated: one chain of nodes per study
+        for key in STUDY_KEYS:
+            graph.add_input(f'base_report_cost[{key}]', config.base_report_costs.get(key, 0.0))
+            node(f'report_cost[{key}]', lambda base, fmt, complexity: base * fmt * complexity,
+                 [f'base_report_cost[{key}]', 'report_format_multiplier', 'report_complexity_factor'])
+            node(f'hours_per_bus[{key}]', lambda card, key=key: card.base_hours_per_bus[key], ['rate_card'])
+            node(f'hours[{key}]',
+                 lambda buses, per_bus, tier, delivery, modeling: buses * per_bus * tier * delivery * modeling,
+                 ['estimated_buses', f'hours_per_bus[{key}]', 'tier_complexity', 'delivery_multiplier',
+                  'typical_modeling_factor'])
+            node(f'l1_hours[{key}]', lambda hours, split: hours * split["L1"], [f'hours[{key}]', 'resource_split'])
+            node(f'l2_hours[{key}]', lambda hours, split: hours * split["L2"], [f'hours[{key}]', 'resource_split'])
+            node(f'l3_hours[{key}]', lambda hours, split: hours * split["L3"], [f'hours[{key}]', 'resource_split'])
+            node(f'labor_cost[{key}]',
+                 lambda l1, l2, l3, rates: l1 * rates["L1"] + l2 * rates["L2"] + l3 * rates["L3"],
+                 [f'l1_hours[{key}]', f'l2_hours[{key}]', f'l3_hours[{key}]', 'resource_rates'])
+            node(f'total_cost[{key}]', lambda labor, report: labor + report,
+                 [f'labor_cost[{key}]', f'report_cost[{key}]'])
+            node(f'study[{key}]',
+                 lambda hours, l1, l2, l3, labor, report, total, data=STUDIES_DATA[key]: {
+                     'name': data['name'], 'emoji': data['emoji'], 'hours': hours,
+                     'l1_hours': l1, 'l2_hours': l2, 'l3_hours': l3, 'labor_cost': labor,
+                     'report_cost': report, 'total_cost': total, 'complexity': data['complexity']},
+                 [f'hours[{key}]', f'l1_hours[{key}]', f'l2_hours[{key}]', f'l3_hours[{key}]',
+                  f'labor_cost[{key}]', f'report_cost[{key}]', f'total_cost[{key}]'])
+
+        # Phase-wise: one node per phase, fed by shared multipliers and report costs
+        report_nodes = [f'report_cost[{key}]' for key in STUDY_KEYS]
+        for index, phase in enumerate(config.phases):
+            prefix = f'phase[{index}]'
+            graph.add_input(f'{prefix}.name', phase.name)
+            graph.add_input(f'{prefix}.capacity', phase.capacity)
+            graph.add_input(f'{prefix}.bus_override', phase.bus_override)
+            node(f'{prefix}.buses', _phase_buses,
+                 [f'{prefix}.capacity', f'{prefix}.bus_override', 'tier_level', 'rate_card'])
+            node(prefix, _phase_result,
+                 [f'{prefix}.name', f'{prefix}.capacity', f'{prefix}.buses', 'selected_studies', 'tier_complexity',
+                  'delivery_multiplier', 'typical_modeling_factor', 'rate_card', *report_nodes])
+
+        phase_nodes = [f'phase[{index}]' for index in range(len(config.phases))]
+        total_nodes = [f'total_cost[{key}]' for key in STUDY_KEYS]
+        hours_nodes = [f'hours[{key}]' for key in STUDY_KEYS]
+        node('consolidated_cost_sum', _selected_sum, ['selected_studies', *total_nodes])
+        node('consolidated_hours', _selected_sum, ['selected_studies', *hours_nodes])
+        node('phase_cost_sum', lambda *phases: sum(phase['total_cost'] for phase in phases), phase_nodes)
+        node('phase_hours', lambda *phases: sum(phase['total_hours'] for phase in phases), phase_nodes)
+        graph.add_switch('study_cost_sum', 'calculation_methodology',
+                         {"Consolidated": 'consolidated_cost_sum', "Phase-wise": 'phase_cost_sum'})
+        graph.add_switch('total_hours', 'calculation_methodology',
+                         {"Consolidated": 'consolidated_hours', "Phase-wise": 'phase_hours'})
+
+        node('effective_premium_factor', lambda client, premium: premium if client == "Premium" else 1.0,
+             ['client_type', 'premium_factor'])
+        node('effective_phase_extension_discount',
+             lambda project, discount: discount if project == "Phase Extension" else 1.0,
+             ['project_type', 'phase_extension_discount'])
+        node('standard_cost', lambda total, premium, additional, extension: (total * premium + additional) * extension,
+             ['study_cost_sum', 'effective_premium_factor', 'additional_costs', 'effective_phase_extension_discount'])
+        node('competitive_multiplier', _competitive_multiplier,
+             ['etap_model_available', 'etap_discount_factor', 'repeat_customer', 'repeat_discount_factor',
+              'overall_competitive_factor'])
+        node('competitive_cost', lambda standard, multiplier: standard * multiplier,
+             ['standard_cost', 'competitive_multiplier'])
+        node('savings', lambda standard, competitive: standard - competitive, ['standard_cost', 'competitive_cost'])
+        node('savings_percentage', lambda savings, standard: (savings / standard) * 100 if standard > 0 else 0,
+             ['savings', 'standard_cost'])
+        return graph
+
+
+def _phase_buses(capacity, bus_override, tier_level, rate_card):
+    return bus_override if bus_override else estimate_buses(capacity, tier_level, rate_card)
+
+
+def _phase_result(name, capacity, buses, selected_studies, tier_complexity, delivery_multiplier,
+                  typical_modeling_factor, rate_card, *report_costs):
+    report_by_study = dict(zip(STUDY_KEYS, report_costs))
+    studies = {key: price_study(key, buses, tier_complexity, delivery_multiplier, typical_modeling_factor,
+                                report_by_study[key], rate_card)
+               for key in selected_studies}
+    return {
+        'name': name,
+        'capacity': capacity,
+        'buses': buses,
+        'studies': studies,
+        'total_hours': sum(study['hours'] for study in studies.values()),
+        'total_cost': sum(study['total_cost'] for study in studies.values())
+    }
+
+
+def _selected_sum(selected_studies, *values):
+    by_study = dict(zip(STUDY_KEYS, values))
+    return sum(by_study[key] for key in selected_studies)
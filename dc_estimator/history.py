@@ -0,0 +1,316 @@
+"""Persistent quote history in a local SQLite database.
+
+Every priced quote is stored with its inputs, its results and the client it
+was prepared for. Indexes on client, date, tier and total load keep filtered
+searches over 100k+ quotes in the millisecond range, and
+:meth:`QuoteHistory.client_profile` lets the UI pre-fill the repeat-customer
+and historical-ETAP-model discounts for a returning client. Every rerun with
+new inputs saves a quote, so each row carries the id of the session that
+priced it and a session's own quotes never make its client "returning".
+Quotes the client accepted are flagged with :meth:`QuoteHistory.set_awarded`;
+only those are work the team has to staff.
+
+Writes never block the caller: :meth:`QuoteHistory.record` only enqueues,
+and a background thread inserts the queue in batches, one transaction per
+batch. The database runs in WAL mode so searches proceed while it writes.
+
+The default database is ``quote_history.db`` in the working directory;
+set ``DC_ESTIMATOR_DB`` to use another file.
+"""
+
+import atexit
+import dataclasses
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import List, Optional
+
+from .cache import quote_key
+from .engine import QuoteConfig
+
+DEFAULT_DB_PATH = "quote_history.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS quotes (
+    id INTEGER PRIMARY KEY,
+    created_at REAL NOT NULL,
+    client TEXT,
+    client_key TEXT,
+    quote_key TEXT NOT NULL,
+    tier_level TEXT NOT NULL,
+    total_load REAL NOT NULL,
+    calculation_methodology TEXT NOT NULL,
+    project_type TEXT NOT NULL,
+    client_type TEXT NOT NULL,
+    etap_model_available INTEGER NOT NULL,
+    repeat_customer INTEGER NOT NULL,
+    estimated_buses INTEGER NOT NULL,
+    total_hours REAL NOT NULL,
+    standard_cost REAL NOT NULL,
+    competitive_cost REAL NOT NULL,
+    savings_percentage REAL NOT NULL,
+    inputs TEXT NOT NULL,
+    results TEXT NOT NULL,
+    session_id TEXT,
+    awarded INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_quotes_client ON quotes (client_key, created_at);
+CREATE INDEX IF NOT EXISTS idx_quotes_created ON quotes (created_at);
+CREATE INDEX IF NOT EXISTS idx_quotes_tier ON quotes (tier_level, total_load);
+CREATE INDEX IF NOT EXISTS idx_quotes_load ON quotes (total_load);
+"""
+
+INSERT_COLUMNS = ('created_at', 'client', 'client_key', 'quote_key', 'tier_level', 'total_load',
+                  'calculation_methodology', 'project_type', 'client_type', 'etap_model_available',
+                  'repeat_customer', 'estimated_buses', 'total_hours', 'standard_cost', 'competitive_cost',
+                  'savings_percentage', 'inputs', 'results', 'session_id')
+# Headline columns returned by search(); the JSON blobs are fetched only on demand
+SUMMARY_COLUMNS = ('id', 'created_at', 'client', 'quote_key', 'tier_level', 'total_load', 'calculation_methodology',
+                   'project_type', 'client_type', 'estimated_buses', 'total_hours', 'standard_cost',
+                   'competitive_cost', 'savings_percentage', 'awarded')
+# Columns added since the first release, with their definitions, for databases created before them
+ADDED_COLUMNS = {
+    'session_id': "TEXT",
+    'awarded': "INTEGER NOT NULL DEFAULT 0",
+}
+
+_STOP = object()
+
+
+def client_key(client: Optional[str]) -> Optional[str]:
+    """Case- and whitespace-insensitive lookup key for a client name."""
+    if client is None:
+        return None
+    key = " ".join(client.split()).casefold()
+    return key or None
+
+
+@dataclasses.dataclass(frozen=True)
+class ClientProfile:
+    """A client's earlier quotes, not counting those of the asking session."""
+
+    client: str
+    quotes: int
+    first_quoted: Optional[float]
+    last_quoted: Optional[float]
+    largest_load: Optional[float]
+    etap_model_available: bool = False  # an earlier quote was priced with their ETAP model
+
+    @property
+    def repeat_customer(self) -> bool:
+        return self.quotes > 0
+
+
+def _config_values(config: QuoteConfig) -> dict:
+    # dataclasses.asdict deep-copies every value and dominates the writer's time
+    values = {name: getattr(config, name) for name in config.__dataclass_fields__}
+    values['phases'] = [[phase.name, phase.capacity, phase.bus_override,
+                         phase.start and phase.start.isoformat(), phase.end and phase.end.isoformat()]
+                        for phase in config.phases]
+    values['base_report_costs'] = dict(config.base_report_costs)
+    values['rate_card'] = config.rate_card.version
+    return values
+
+
+class QuoteHistory:
+    """A quote store backed by one SQLite file, with a batched background writer."""
+
+    def __init__(self, path: str = DEFAULT_DB_PATH, batch_size: int = 500, flush_interval: float = 0.25):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._local = threading.local()
+        self._queue = queue.Queue()
+        self._closed = False
+        self.last_error: Optional[Exception] = None
+
+        connection = self._connection()
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.executescript(SCHEMA)
+        columns = {row[1] for row in connection.execute("PRAGMA table_info(quotes)")}
+        for name, definition in ADDED_COLUMNS.items():
+            if name not in columns:
+                connection.execute(f"ALTER TABLE quotes ADD COLUMN {name} {definition}")
+        connection.commit()
+        self._writer = threading.Thread(target=self._write_loop, name="quote-history-writer", daemon=True)
+        self._writer.start()
+
+    # -- writing -----------------------------------------------------------
+
+    def record(self, config: QuoteConfig, results: dict, client: Optional[str] = None,
+               created_at: Optional[float] = None, session: Optional[str] = None):
+        """Queue one priced quote for saving; returns immediately.
+
+        ``session`` identifies the UI session that priced it (see :meth:`client_profile`).
+        """
+        if self._closed:
+            raise RuntimeError("QuoteHistory is closed")
+        self._queue.put((time.time() if created_at is None else created_at, client, config, results, session))
+
+    def flush(self):
+        """Block until every queued quote has been written."""
+        self._queue.join()
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            self._queue.put(_STOP)
+            self._writer.join()
+
+    def set_awarded(self, quote_id: int, awarded: bool = True):
+        """Mark a stored quote as accepted by the client (or not); written at once."""
+        connection = self._connection()
+        with connection:
+            connection.execute("UPDATE quotes SET awarded = ? WHERE id = ?", (int(awarded), quote_id))
+
+    def _write_loop(self):
+        connection = sqlite3.connect(self.path)
+        connection.execute("PRAGMA synchronous=NORMAL")
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            batch = [item]
+            # Gather whatever else arrives within flush_interval, up to batch_size
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size and item is not _STOP:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                batch.append(item)
+
+            stopping = batch[-1] is _STOP
+            try:
+                rows = []
+                for entry in batch:
+                    if entry is _STOP:
+                        continue
+                    try:
+                        rows.append(self._row(*entry))
+                    except (TypeError, ValueError, KeyError) as error:
+                        # A quote that cannot be serialised is dropped, not the batch
+                        self.last_error = error
+                with connection:
+                    connection.executemany(
+                        f"INSERT INTO quotes ({', '.join(INSERT_COLUMNS)}) "
+                        f"VALUES ({', '.join('?' * len(INSERT_COLUMNS))})", rows)
+            except sqlite3.Error as error:
+                # Keep the writer alive (a locked or full disk is usually transient)
+                self.last_error = error
+            finally:
+                # Always acknowledge the batch, or flush() would wait forever
+                for _ in batch:
+                    self._queue.task_done()
+        connection.close()
+
+    @staticmethod
+    def _row(created_at, client, config: QuoteConfig, results: dict, session: Optional[str] = None) -> tuple:
+        client = " ".join(client.split()) if client else None
+        return (
+            created_at, client, client_key(client), quote_key(config), config.tier_level, config.total_load,
+            config.calculation_methodology, config.project_type, config.client_type,
+            int(config.etap_model_available), int(config.repeat_customer),
+            results['estimated_buses'], results['total_hours'], results['standard_cost'],
+            results['competitive_cost'], results['savings_percentage'],
+            json.dumps(_config_values(config), ensure_ascii=False),
+            json.dumps(results, ensure_ascii=False),
+            session,
+        )
+
+    # -- reading -----------------------------------------------------------
+
+    def search(self, client: Optional[str] = None, tier_level: Optional[str] = None,
+               min_load: Optional[float] = None, max_load: Optional[float] = None,
+               since: Optional[float] = None, until: Optional[float] = None, awarded: Optional[bool] = None,
+               latest_per_client: bool = False, limit: int = 100) -> List[dict]:
+        """Most recent quotes matching every given filter (headline columns only).
+
+        With ``latest_per_client`` only each client's newest matching quote is
+        returned (quotes without a client count as one client), since every
+        what-if an estimator tries is saved as a quote of its own.
+        """
+        clauses, parameters = [], []
+        if client is not None:
+            clauses.append("client_key = ?")
+            parameters.append(client_key(client))
+        if tier_level is not None:
+            clauses.append("tier_level = ?")
+            parameters.append(tier_level)
+        if min_load is not None:
+            clauses.append("total_load >= ?")
+            parameters.append(min_load)
+        if max_load is not None:
+            clauses.append("total_load <= ?")
+            parameters.append(max_load)
+        if since is not None:
+            clauses.append("created_at >= ?")
+            parameters.append(since)
+        if until is not None:
+            clauses.append("created_at < ?")
+            parameters.append(until)
+        if awarded is not None:
+            clauses.append("awarded = ?")
+            parameters.append(int(awarded))
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        source = "quotes"
+        if latest_per_client:
+            source = (f"(SELECT *, ROW_NUMBER() OVER (PARTITION BY COALESCE(client_key, '') "
+                      f"ORDER BY created_at DESC, id DESC) AS client_rank FROM quotes {where})")
+            where = "WHERE client_rank = 1"
+        cursor = self._connection().execute(
+            f"SELECT {', '.join(SUMMARY_COLUMNS)} FROM {source} {where} ORDER BY created_at DESC LIMIT ?",
+            (*parameters, limit))
+        return [dict(zip(SUMMARY_COLUMNS, row)) for row in cursor]
+
+    def load(self, quote_id: int) -> Optional[dict]:
+        """Full inputs and results of one stored quote."""
+        row = self._connection().execute(
+            "SELECT created_at, client, inputs, results FROM quotes WHERE id = ?", (quote_id,)).fetchone()
+        if row is None:
+            return None
+        return {'created_at': row[0], 'client': row[1], 'inputs': json.loads(row[2]), 'results': json.loads(row[3])}
+
+    def client_profile(self, client: str, exclude_session: Optional[str] = None) -> ClientProfile:
+        """Earlier quotes for ``client``, leaving out those recorded by ``exclude_session``.
+
+        The ETAP discount is pre-filled only if an earlier quote was priced
+        with the client's ETAP model, not merely because they were quoted.
+        """
+        quotes, first, last, largest, etap = self._connection().execute(
+            "SELECT COUNT(*), MIN(created_at), MAX(created_at), MAX(total_load), MAX(etap_model_available) "
+            "FROM quotes WHERE client_key = ? AND (session_id IS NULL OR session_id != ?)",
+            (client_key(client), exclude_session or "")).fetchone()
+        return ClientProfile(client, quotes, first, last, largest, bool(etap))
+
+    def count(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM quotes").fetchone()[0]
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3 connections must stay on the thread that created them
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = self._local.connection = sqlite3.connect(self.path)
+        return connection
+
+
+_default_history = None
+_default_lock = threading.Lock()
+
+
+def default_history() -> QuoteHistory:
+    """The process-wide store at ``$DC_ESTIMATOR_DB`` (shared by every session)."""
+    global _default_history
+    with _default_lock:
+        if _default_history is None:
+            _default_history = QuoteHistory(os.environ.get("DC_ESTIMATOR_DB", DEFAULT_DB_PATH))
+            atexit.register(_default_history.close)
+        return _default_history
+
+
+def format_timestamp(created_at: float) -> str:
+    return datetime.fromtimestamp(created_at).strftime("%Y-%m-%d %H:%M")
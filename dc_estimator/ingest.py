@@ -0,0 +1,272 @@
+"""Bulk quote ingestion from CSV or Parquet files.
+
+Each row is one Consolidated quote. Files are read in bounded chunks, every
+chunk is priced with one :func:`dc_estimator.batch.price_batch` call and the
+priced columns are appended to the output as they are produced, so memory
+use depends on the chunk size rather than the file size.
+
+Recognised columns (all optional except a load):
+
+``quote_id``
+    Passed through to the output; defaults to the 1-based row number.
+``total_load_mw`` or ``it_capacity``/``mechanical_load``/``house_load``
+    Load in MW.
+``custom_bus_count``
+    Overrides the tier-based bus estimate when > 0.
+``tier_level``, ``delivery_type``, ``project_type``, ``client_type``, ``report_format``
+    Same choices as the sidebar.
+``studies``
+    ``;``-separated study keys (``load_flow;pdc``); blank means all studies.
+``report_cost_<study>``
+    Base report price per study.
+``premium_factor``, ``report_complexity_factor``, ``typical_modeling_factor``,
+``phase_extension_discount``, ``overall_competitive_factor``
+    Numeric factors, defaulting to the sidebar defaults.
+``etap_discount_factor``, ``repeat_discount_factor``
+    Blank means the discount is not offered.
+``additional_costs``
+    Labels, site visits and other custom costs in ₹.
+
+A whole file is priced against one rate card, passed by the caller.
+"""
+
+import io
+from typing import BinaryIO, Iterator, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from .batch import QuoteBatch, consolidated_buses, price_batch
+from .engine import (
+    BUILTIN_RATE_CARD,
+    CLIENT_TYPES,
+    DEFAULT_REPORT_COSTS,
+    DELIVERY_TYPES,
+    PROJECT_TYPES,
+    REPORT_FORMATS,
+    STUDY_KEYS,
+    TIER_LEVELS,
+    QuoteConfig,
+    RateCard,
+)
+
+DEFAULT_CHUNK_ROWS = 10_000
+OUTPUT_COLUMNS = ['quote_id', 'estimated_buses', 'total_hours', 'standard_cost',
+                  'competitive_cost', 'savings', 'savings_percentage']
+
+_DEFAULTS = QuoteConfig()
+
+
+def _numeric(frame: pd.DataFrame, name: str, default: float) -> np.ndarray:
+    if name not in frame:
+        return np.full(len(frame), default, dtype=np.float64)
+    values = pd.to_numeric(frame[name], errors='coerce')
+    bad = frame[name].notna() & values.isna()
+    if bad.any():
+        raise ValueError(f"Row {bad.idxmax() + 1}: {name} must be numeric, got {frame[name][bad.idxmax()]!r}")
+    return values.fillna(default).to_numpy(np.float64)
+
+
+def _codes(frame: pd.DataFrame, name: str, choices, default: str) -> np.ndarray:
+    if name not in frame:
+        return np.full(len(frame), choices.index(default), dtype=np.int8)
+    values = frame[name].fillna(default).astype(str).str.strip().replace('', default)
+    codes = pd.Categorical(values, categories=choices).codes
+    if (codes < 0).any():
+        row = int(np.argmax(codes < 0))
+        raise ValueError(f"Row {frame.index[row] + 1}: {name} must be one of "
+                         f"{', '.join(choices)}; got {values.iloc[row]!r}")
+    return codes.astype(np.int8)
+
+
+def _study_mask(frame: pd.DataFrame) -> np.ndarray:
+    if 'studies' not in frame:
+        return np.ones((len(frame), len(STUDY_KEYS)), dtype=bool)
+    tokens = (frame['studies'].fillna(';'.join(STUDY_KEYS)).astype(str)
+              .str.replace(' ', '', regex=False).replace('', ';'.join(STUDY_KEYS))
+              .str.split(';'))
+    exploded = tokens.explode()
+    exploded = exploded[exploded != '']
+    unknown = ~exploded.isin(STUDY_KEYS)
+    if unknown.any():
+        raise ValueError(f"Row {unknown.idxmax() + 1}: unknown study {exploded[unknown].iloc[0]!r}; "
+                         f"expected {', '.join(STUDY_KEYS)}")
+    mask = np.zeros((len(frame), len(STUDY_KEYS)), dtype=bool)
+    rows = frame.index.get_indexer(exploded.index)
+    mask[rows, [STUDY_KEYS.index(key) for key in exploded]] = True
+    empty = ~mask.any(axis=1)
+    if empty.any():
+        raise ValueError(f"Row {frame.index[int(np.argmax(empty))] + 1}: select at least one study")
+    return mask
+
+
+def _total_load(frame: pd.DataFrame) -> np.ndarray:
+    if 'total_load_mw' in frame:
+        total_load = _numeric(frame, 'total_load_mw', np.nan)
+    elif {'it_capacity', 'mechanical_load', 'house_load'} & set(frame.columns):
+        total_load = (_numeric(frame, 'it_capacity', 0.0) + _numeric(frame, 'mechanical_load', 0.0)
+                      + _numeric(frame, 'house_load', 0.0))
+    else:
+        raise ValueError("Quote file needs a total_load_mw column or it_capacity/mechanical_load/house_load")
+    if np.isnan(total_load).any() or (total_load <= 0).any():
+        row = int(np.argmax(np.isnan(total_load) | (total_load <= 0)))
+        raise ValueError(f"Row {frame.index[row] + 1}: load must be a positive number")
+    return total_load
+
+
+def frame_to_batch(frame: pd.DataFrame, rate_card: RateCard = BUILTIN_RATE_CARD) -> QuoteBatch:
+    """Convert one chunk of quote rows into a :class:`QuoteBatch`."""
+    total_load = _total_load(frame)
+    tier = _codes(frame, 'tier_level', TIER_LEVELS, _DEFAULTS.tier_level)
+    custom_buses = _numeric(frame, 'custom_bus_count', 0.0)
+    estimated_buses = np.where(custom_buses > 0, np.ceil(custom_buses).astype(np.int64),
+                               consolidated_buses(total_load, tier, rate_card))
+
+    client = _codes(frame, 'client_type', CLIENT_TYPES, _DEFAULTS.client_type)
+    project = _codes(frame, 'project_type', PROJECT_TYPES, _DEFAULTS.project_type)
+    premium = np.where(client == CLIENT_TYPES.index("Premium"),
+                       _numeric(frame, 'premium_factor', _DEFAULTS.premium_factor), 1.0)
+    extension = np.where(project == PROJECT_TYPES.index("Phase Extension"),
+                         _numeric(frame, 'phase_extension_discount', _DEFAULTS.phase_extension_discount), 1.0)
+    competitive = (_numeric(frame, 'etap_discount_factor', 1.0)
+                   * _numeric(frame, 'repeat_discount_factor', 1.0)
+                   * _numeric(frame, 'overall_competitive_factor', _DEFAULTS.overall_competitive_factor))
+
+    report_costs = np.column_stack([
+        _numeric(frame, f'report_cost_{key}', DEFAULT_REPORT_COSTS[key]) for key in STUDY_KEYS
+    ])
+
+    return QuoteBatch(
+        estimated_buses=estimated_buses,
+        buses=estimated_buses.astype(np.float64),
+        report_units=np.ones(len(frame)),
+        tier=tier,
+        delivery=_codes(frame, 'delivery_type', DELIVERY_TYPES, _DEFAULTS.delivery_type),
+        study_mask=_study_mask(frame),
+        report_costs=report_costs,
+        report_format=_codes(frame, 'report_format', REPORT_FORMATS, _DEFAULTS.report_format),
+        report_complexity_factor=_numeric(frame, 'report_complexity_factor', _DEFAULTS.report_complexity_factor),
+        typical_modeling_factor=_numeric(frame, 'typical_modeling_factor', _DEFAULTS.typical_modeling_factor),
+        premium_factor=premium,
+        phase_extension_discount=extension,
+        competitive_multiplier=competitive,
+        additional_costs=_numeric(frame, 'additional_costs', 0.0),
+        total_load=total_load,
+    )
+
+
+def _quote_ids(frame: pd.DataFrame) -> pd.Series:
+    quote_ids = frame['quote_id'] if 'quote_id' in frame else pd.Series(frame.index + 1, index=frame.index)
+    return quote_ids.astype(str)
+
+
+def frame_to_configs(frame: pd.DataFrame,
+                     rate_card: RateCard = BUILTIN_RATE_CARD) -> Iterator[Tuple[str, QuoteConfig]]:
+    """Yield ``(quote_id, QuoteConfig)`` per row, read with the same rules as :func:`frame_to_batch`.
+
+    For per-quote work such as report exports; pricing whole files should go
+    through :func:`price_frame`. The load is carried as ``it_capacity``.
+    """
+    total_load = _total_load(frame)
+    custom_buses = _numeric(frame, 'custom_bus_count', 0.0)
+    codes = {name: _codes(frame, name, choices, getattr(_DEFAULTS, name)) for name, choices in (
+        ('tier_level', TIER_LEVELS), ('delivery_type', DELIVERY_TYPES), ('project_type', PROJECT_TYPES),
+        ('client_type', CLIENT_TYPES), ('report_format', REPORT_FORMATS))}
+    factors = {name: _numeric(frame, name, getattr(_DEFAULTS, name)) for name in (
+        'premium_factor', 'report_complexity_factor', 'typical_modeling_factor', 'phase_extension_discount',
+        'overall_competitive_factor', 'additional_costs')}
+    etap = _numeric(frame, 'etap_discount_factor', np.nan)
+    repeat = _numeric(frame, 'repeat_discount_factor', np.nan)
+    study_mask = _study_mask(frame)
+    report_costs = {key: _numeric(frame, f'report_cost_{key}', DEFAULT_REPORT_COSTS[key]) for key in STUDY_KEYS}
+
+    for row, quote_id in enumerate(_quote_ids(frame)):
+        yield quote_id, QuoteConfig(
+            it_capacity=float(total_load[row]), mechanical_load=0.0, house_load=0.0,
+            custom_bus_count=int(np.ceil(custom_buses[row])) if custom_buses[row] > 0 else None,
+            **{name: choices[codes[name][row]] for name, choices in (
+                ('tier_level', TIER_LEVELS), ('delivery_type', DELIVERY_TYPES), ('project_type', PROJECT_TYPES),
+                ('client_type', CLIENT_TYPES), ('report_format', REPORT_FORMATS))},
+            **{name: float(values[row]) for name, values in factors.items()},
+            selected_studies=tuple(key for key, selected in zip(STUDY_KEYS, study_mask[row]) if selected),
+            base_report_costs={key: float(values[row]) for key, values in report_costs.items()},
+            etap_model_available=not np.isnan(etap[row]),
+            etap_discount_factor=_DEFAULTS.etap_discount_factor if np.isnan(etap[row]) else float(etap[row]),
+            repeat_customer=not np.isnan(repeat[row]),
+            repeat_discount_factor=_DEFAULTS.repeat_discount_factor if np.isnan(repeat[row]) else float(repeat[row]),
+            rate_card=rate_card,
+        )
+
+
+def price_frame(frame: pd.DataFrame, rate_card: RateCard = BUILTIN_RATE_CARD) -> pd.DataFrame:
+    """Price one chunk and return the output columns for it."""
+    priced = price_batch(frame_to_batch(frame, rate_card), rate_card)
+    return pd.DataFrame({
+        'quote_id': _quote_ids(frame).to_numpy(),
+        **{name: priced[name] for name in OUTPUT_COLUMNS[1:]},
+    })
+
+
+def iter_quote_chunks(source: Union[str, BinaryIO], file_format: str,
+                      chunk_rows: int = DEFAULT_CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """Yield the quote file as DataFrames of at most ``chunk_rows`` rows.
+
+    The index of each chunk continues from the previous one so error messages
+    and default quote ids refer to the row number in the whole file.
+    """
+    if file_format == 'csv':
+        yield from pd.read_csv(source, chunksize=chunk_rows, skipinitialspace=True)
+    elif file_format == 'parquet':
+        import pyarrow.parquet as pq
+
+        offset = 0
+        for record_batch in pq.ParquetFile(source).iter_batches(batch_size=chunk_rows):
+            chunk = record_batch.to_pandas()
+            chunk.index = pd.RangeIndex(offset, offset + len(chunk))
+            offset += len(chunk)
+            yield chunk
+    else:
+        raise ValueError(f"Unsupported quote file format {file_format!r}; expected csv or parquet")
+
+
+def price_quote_file(source: Union[str, BinaryIO], output: Union[str, BinaryIO], file_format: str,
+                     output_format: str = 'csv', chunk_rows: int = DEFAULT_CHUNK_ROWS,
+                     progress=None, rate_card: RateCard = BUILTIN_RATE_CARD) -> int:
+    """Stream ``source`` through the pricing engine into ``output``.
+
+    ``progress`` is called with the number of rows priced so far after each
+    chunk. Returns the total number of rows written.
+    """
+    rows = 0
+    writer = None
+    text_output = None
+    try:
+        for chunk in iter_quote_chunks(source, file_format, chunk_rows):
+            priced = price_frame(chunk, rate_card)
+            if output_format == 'csv':
+                if text_output is None:
+                    text_output = (open(output, 'w', newline='', encoding='utf-8') if isinstance(output, str)
+                                   else io.TextIOWrapper(output, encoding='utf-8', newline='', write_through=True))
+                priced.to_csv(text_output, header=rows == 0, index=False)
+            elif output_format == 'parquet':
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+
+                table = pa.Table.from_pandas(priced, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(output, table.schema)
+                writer.write_table(table)
+            else:
+                raise ValueError(f"Unsupported output format {output_format!r}; expected csv or parquet")
+            rows += len(priced)
+            if progress is not None:
+                progress(rows)
+    finally:
+        if writer is not None:
+            writer.close()
+        if text_output is not None:
+            if isinstance(output, str):
+                text_output.close()
+            else:
+                text_output.detach()
+    return rows
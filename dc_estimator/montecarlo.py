@@ -0,0 +1,116 @@
+"""Monte Carlo cost-uncertainty simulation.
+
+The point estimate treats ``base_hours_per_bus``, the L1/L2/L3 rates and the
+tier bus multiplier as exact. Here each of them is drawn from a distribution
+centred on its point value and the whole quote is priced once per sample with
+array expressions, so 100k+ samples cost a few tens of milliseconds.
+"""
+
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from .engine import QuoteConfig, report_cost
+from .ratecard import compiled
+
+DISTRIBUTIONS = ("Triangular", "Uniform", "Normal")
+PERCENTILES = (10, 50, 90)
+
+
+@dataclass(frozen=True)
+class Distribution:
+    """Relative spread around a point value.
+
+    ``spread`` is the half-width as a fraction of the point value for the
+    triangular and uniform kinds, and the standard deviation for the normal
+    kind. Normal draws are clipped at zero.
+    """
+
+    kind: str = "Triangular"
+    spread: float = 0.0
+
+    def __post_init__(self):
+        if self.kind not in DISTRIBUTIONS:
+            raise ValueError(f"kind must be one of {', '.join(DISTRIBUTIONS)}; got {self.kind!r}")
+        if not 0.0 <= self.spread < 1.0:
+            raise ValueError(f"spread must be in [0, 1); got {self.spread}")
+
+    def sample(self, rng: np.random.Generator, size) -> np.ndarray:
+        """Draw multiplicative factors with mean 1.0."""
+        if self.spread == 0.0:
+            return np.ones(size)
+        if self.kind == "Triangular":
+            return rng.triangular(1.0 - self.spread, 1.0, 1.0 + self.spread, size)
+        if self.kind == "Uniform":
+            return rng.uniform(1.0 - self.spread, 1.0 + self.spread, size)
+        return np.maximum(rng.normal(1.0, self.spread, size), 0.0)
+
+
+@dataclass
+class SimulationResult:
+    standard_cost: np.ndarray
+    competitive_cost: np.ndarray
+    total_hours: np.ndarray
+
+    def percentiles(self, name: str = 'competitive_cost') -> dict:
+        values = np.percentile(getattr(self, name), PERCENTILES)
+        return {f"P{p}": value for p, value in zip(PERCENTILES, values)}
+
+    def histogram(self, name: str = 'competitive_cost', bins: int = 50):
+        """Pre-binned ``(counts, edges)`` so charts never see the raw samples."""
+        return np.histogram(getattr(self, name), bins=bins)
+
+
+def simulate_costs(config: QuoteConfig, samples: int = 100_000,
+                   hours: Distribution = Distribution(spread=0.2),
+                   rates: Distribution = Distribution(spread=0.1),
+                   bus_multiplier: Distribution = Distribution(spread=0.1),
+                   seed: Optional[int] = None) -> SimulationResult:
+    """Draw ``samples`` quotes for ``config`` with uncertain hours, rates and bus counts.
+
+    Hours per bus vary independently per study, rates independently per
+    engineer level, and one bus-multiplier factor is shared by every phase of
+    a sample. Custom and per-phase overridden bus counts are taken as known and
+    are not perturbed.
+    """
+    rng = np.random.default_rng(seed)
+    rate_card = config.rate_card
+
+    # Buses: tier multiplier drawn once per sample
+    multiplier = rate_card.tier_bus_multipliers[config.tier_level] * bus_multiplier.sample(rng, samples)
+    if config.calculation_methodology == "Phase-wise":
+        # Overridden phases have a known bus count; identical capacities share one draw
+        buses = np.full(samples, float(sum(phase.bus_override or 0 for phase in config.phases)))
+        capacities, counts = np.unique([phase.capacity for phase in config.phases if not phase.bus_override],
+                                       return_counts=True)
+        for capacity, count in zip(capacities, counts):
+            buses += count * np.ceil(capacity * multiplier)
+        report_units = len(config.phases)
+    elif config.custom_bus_count:
+        buses = np.full(samples, float(config.custom_bus_count))
+        report_units = 1
+    else:
+        buses = np.ceil(config.total_load * multiplier)
+        report_units = 1
+
+    # Hours per bus: one independent factor per selected study
+    base_hours = np.array([rate_card.base_hours_per_bus[key] for key in config.selected_studies])
+    hours_per_bus = hours.sample(rng, (samples, len(base_hours))) @ base_hours
+
+    # Blended L1/L2/L3 rate
+    tables = compiled(rate_card)
+    weighted_rates = tables.resource_rates * tables.resource_split
+    blended_rate = rates.sample(rng, (samples, len(weighted_rates))) @ weighted_rates
+
+    total_hours = (buses * hours_per_bus * rate_card.tier_complexity[config.tier_level]
+                   * rate_card.delivery_multipliers[config.delivery_type] * config.typical_modeling_factor)
+    reports = report_units * sum(report_cost(config, key) for key in config.selected_studies)
+
+    standard_cost = ((total_hours * blended_rate + reports) * config.effective_premium_factor
+                     + config.additional_costs) * config.effective_phase_extension_discount
+    return SimulationResult(
+        standard_cost=standard_cost,
+        competitive_cost=standard_cost * config.competitive_multiplier,
+        total_hours=total_hours,
+    )
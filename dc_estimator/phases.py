@@ -0,0 +1,120 @@
+"""Phase-wise pricing as one array pass over a phases × studies matrix.
+
+Hyperscale campus bids carry 40–200 build phases. Rather than looping over
+phases and studies in Python, the per-phase bus counts form a column vector
+that is broadcast against the selected studies' hours per bus, giving every
+phase's hours, L1/L2/L3 split and labor cost in a few NumPy expressions. The
+arithmetic is element-for-element the same as :func:`engine._price_studies`,
+so results match the scalar loop exactly.
+"""
+
+from dataclasses import dataclass
+from typing import List, Tuple
+
+import numpy as np
+
+from .engine import STUDIES_DATA, QuoteConfig, report_cost
+
+
+@dataclass
+class PhaseMatrix:
+    """Per-phase, per-study pricing for one Phase-wise quote.
+
+    2-D arrays are len(phases) × len(study_keys); ``report_cost`` is one entry
+    per study since every phase bills the same report.
+    """
+
+    names: Tuple[str, ...]
+    capacities: np.ndarray
+    buses: np.ndarray
+    study_keys: Tuple[str, ...]
+    hours: np.ndarray
+    l1_hours: np.ndarray
+    l2_hours: np.ndarray
+    l3_hours: np.ndarray
+    labor_cost: np.ndarray
+    report_cost: np.ndarray
+
+    @property
+    def study_costs(self) -> np.ndarray:
+        return self.labor_cost + self.report_cost
+
+    @property
+    def total_cost(self) -> np.ndarray:
+        return self.study_costs.sum(axis=1)
+
+    @property
+    def total_hours(self) -> np.ndarray:
+        return self.hours.sum(axis=1)
+
+    def phase_results(self) -> List[dict]:
+        """The engine's ``phase_results`` list of dicts."""
+        columns = {name: getattr(self, name).tolist()
+                   for name in ('hours', 'l1_hours', 'l2_hours', 'l3_hours', 'labor_cost', 'study_costs')}
+        report_costs = self.report_cost.tolist()
+        studies = [STUDIES_DATA[key] for key in self.study_keys]
+
+        phase_results = []
+        for row, (name, capacity, buses) in enumerate(zip(self.names, self.capacities.tolist(), self.buses.tolist())):
+            phase_studies = {}
+            for col, (study_key, study_data) in enumerate(zip(self.study_keys, studies)):
+                phase_studies[study_key] = {
+                    'name': study_data['name'],
+                    'emoji': study_data['emoji'],
+                    'hours': columns['hours'][row][col],
+                    'l1_hours': columns['l1_hours'][row][col],
+                    'l2_hours': columns['l2_hours'][row][col],
+                    'l3_hours': columns['l3_hours'][row][col],
+                    'labor_cost': columns['labor_cost'][row][col],
+                    'report_cost': report_costs[col],
+                    'total_cost': columns['study_costs'][row][col],
+                    'complexity': study_data['complexity']
+                }
+            phase_results.append({
+                'name': name,
+                'capacity': capacity,
+                'buses': buses,
+                'studies': phase_studies,
+                # Summed left to right like the scalar loop so totals match exactly
+                'total_hours': sum(columns['hours'][row]),
+                'total_cost': sum(columns['study_costs'][row])
+            })
+        return phase_results
+
+
+def phase_bus_counts(config: QuoteConfig) -> np.ndarray:
+    """Priced buses per phase: the override where set, else the tier estimate."""
+    capacities = np.array([phase.capacity for phase in config.phases], dtype=float)
+    overrides = np.array([phase.bus_override or 0 for phase in config.phases], dtype=np.int64)
+    estimated = np.ceil(capacities * config.rate_card.tier_bus_multipliers[config.tier_level]).astype(np.int64)
+    return np.where(overrides > 0, overrides, estimated)
+
+
+def price_phase_matrix(config: QuoteConfig) -> PhaseMatrix:
+    """Price every phase of a Phase-wise ``config`` at once."""
+    rate_card = config.rate_card
+    rates, split = rate_card.resource_rates, rate_card.resource_split
+    study_keys = tuple(config.selected_studies)
+    buses = phase_bus_counts(config)
+    hours_per_bus = np.array([rate_card.base_hours_per_bus[key] for key in study_keys])
+
+    # Same operation order as the scalar engine, broadcast over phases × studies
+    hours = (buses[:, None] * hours_per_bus[None, :] * rate_card.tier_complexity[config.tier_level]
+             * rate_card.delivery_multipliers[config.delivery_type] * config.typical_modeling_factor)
+    l1_hours = hours * split["L1"]
+    l2_hours = hours * split["L2"]
+    l3_hours = hours * split["L3"]
+    labor_cost = l1_hours * rates["L1"] + l2_hours * rates["L2"] + l3_hours * rates["L3"]
+
+    return PhaseMatrix(
+        names=tuple(phase.name for phase in config.phases),
+        capacities=np.array([phase.capacity for phase in config.phases], dtype=float),
+        buses=buses,
+        study_keys=study_keys,
+        hours=hours,
+        l1_hours=l1_hours,
+        l2_hours=l2_hours,
+        l3_hours=l3_hours,
+        labor_cost=labor_cost,
+        report_cost=np.array([report_cost(config, key) for key in study_keys]),
+    )
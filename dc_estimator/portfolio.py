@@ -0,0 +1,355 @@
+"""Multi-site portfolio pricing with incremental roll-ups.
+
+Framework agreements cover a client's whole estate as a tree::
+
+    portfolio → campus → building → phase
+
+Every leaf is a :class:`~dc_estimator.engine.Phase` priced exactly like one
+phase of a Phase-wise quote, using the portfolio's shared
+:class:`~dc_estimator.engine.QuoteConfig` for the tier, delivery type, study
+set and report setup. Each node caches the buses, hours and cost of its
+subtree. Editing a leaf or a node's discounts computes the change once and
+adds it to the ancestors only, so an edit costs O(depth) instead of
+re-pricing 10k+ leaves.
+
+Repeat-customer and ETAP-model discounts can be switched on or off per
+subtree and are inherited by descendants that do not set their own. A node
+stores its discount *relative to its parent*, so every discounted roll-up is
+``discount × Σ children``. Premium, phase-extension, additional costs and the
+overall competitive factor apply once, at the portfolio level.
+"""
+
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional
+
+from .engine import Phase, QuoteConfig, phase_buses
+from .goalseek import cost_coefficients
+
+LEVELS = ("portfolio", "campus", "building", "phase")
+
+
+class PortfolioNode:
+    """One node of the estate tree and the cached totals of its subtree.
+
+    ``standard_cost`` is the sum of leaf phase costs before portfolio-level
+    factors; ``discounted_cost`` is the same after the subtree's ETAP and
+    repeat-customer discounts.
+    """
+
+    __slots__ = ('name', 'level', 'parent', 'children', 'phase', 'etap_model_available', 'repeat_customer',
+                 'discount', 'leaf_count', 'capacity', 'buses', 'hours', 'standard_cost', 'child_discounted_cost')
+
+    def __init__(self, name: str, level: str, parent: Optional["PortfolioNode"] = None,
+                 phase: Optional[Phase] = None, etap_model_available: Optional[bool] = None,
+                 repeat_customer: Optional[bool] = None):
+        self.name = name
+        self.level = level
+        self.parent = parent
+        self.children: List[PortfolioNode] = []
+        self.phase = phase
+        # None inherits the parent's setting
+        self.etap_model_available = etap_model_available
+        self.repeat_customer = repeat_customer
+        self.discount = 1.0
+        self.leaf_count = 0
+        self.capacity = 0.0
+        self.buses = 0
+        self.hours = 0.0
+        self.standard_cost = 0.0
+        # Σ children discounted cost (for a leaf: its own undiscounted cost)
+        self.child_discounted_cost = 0.0
+
+    @property
+    def is_leaf(self) -> bool:
+        return self.level == LEVELS[-1]
+
+    @property
+    def discounted_cost(self) -> float:
+        return self.discount * self.child_discounted_cost
+
+    @property
+    def path(self) -> str:
+        names = []
+        node = self
+        while node is not None:
+            names.append(node.name)
+            node = node.parent
+        return " / ".join(reversed(names))
+
+    def walk(self) -> Iterator["PortfolioNode"]:
+        """This node and its descendants, depth first."""
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(reversed(node.children))
+
+    def __repr__(self):
+        return f"PortfolioNode({self.path!r}, {self.level})"
+
+
+class Portfolio:
+    """An estate tree priced under one shared ``config``.
+
+    ``config`` supplies everything except the phases: its methodology and
+    phase list are ignored, and its ``etap_model_available`` and
+    ``repeat_customer`` become the root's discount settings.
+    """
+
+    def __init__(self, config: QuoteConfig, name: str = "Portfolio"):
+        self.config = config
+        coefficients = cost_coefficients(config)
+        self._labor_per_bus = coefficients.labor_per_bus
+        self._report_cost = coefficients.report_cost
+        rate_card = config.rate_card
+        self._hours_per_bus = (sum(rate_card.base_hours_per_bus[key] for key in config.selected_studies)
+                               * rate_card.tier_complexity[config.tier_level]
+                               * rate_card.delivery_multipliers[config.delivery_type]
+                               * config.typical_modeling_factor)
+        self.root = PortfolioNode(name, LEVELS[0], etap_model_available=config.etap_model_available,
+                                  repeat_customer=config.repeat_customer)
+        self.root.discount = self._multiplier(self.root)
+
+    # -- building the tree -------------------------------------------------
+
+    def add(self, parent: PortfolioNode, name: str, etap_model_available: Optional[bool] = None,
+            repeat_customer: Optional[bool] = None) -> PortfolioNode:
+        """Add a campus under the portfolio or a building under a campus."""
+        level = self._child_level(parent)
+        if level == LEVELS[-1]:
+            raise ValueError(f"Use add_phase to add phases under {parent.path}")
+        node = PortfolioNode(name, level, parent, etap_model_available=etap_model_available,
+                             repeat_customer=repeat_customer)
+        parent.children.append(node)
+        node.discount = self._relative_discount(node)
+        return node
+
+    def add_phase(self, building: PortfolioNode, phase: Phase, etap_model_available: Optional[bool] = None,
+                  repeat_customer: Optional[bool] = None) -> PortfolioNode:
+        """Add a priced phase under a building and roll it up."""
+        if self._child_level(building) != LEVELS[-1]:
+            raise ValueError(f"Phases belong under a building, not a {building.level}")
+        leaf = PortfolioNode(phase.name, LEVELS[-1], building, phase=phase,
+                             etap_model_available=etap_model_available, repeat_customer=repeat_customer)
+        building.children.append(leaf)
+        leaf.discount = self._relative_discount(leaf)
+        leaf.leaf_count = 1
+        self._price_leaf(leaf)
+        self._propagate(building, 1, leaf.capacity, leaf.buses, leaf.hours, leaf.standard_cost,
+                        leaf.discounted_cost)
+        return leaf
+
+    @classmethod
+    def from_records(cls, config: QuoteConfig, records: Iterable[Mapping], name: str = "Portfolio") -> "Portfolio":
+        """Build a tree from flat rows with ``campus``, ``building``, ``phase``, ``capacity``
+        and an optional ``bus_override``."""
+        portfolio = cls(config, name)
+        campuses: Dict[str, PortfolioNode] = {}
+        buildings: Dict[tuple, PortfolioNode] = {}
+        for record in records:
+            campus_name, building_name = str(record['campus']), str(record['building'])
+            campus = campuses.get(campus_name)
+            if campus is None:
+                campus = campuses[campus_name] = portfolio.add(portfolio.root, campus_name)
+            building = buildings.get((campus_name, building_name))
+            if building is None:
+                building = buildings[campus_name, building_name] = portfolio.add(campus, building_name)
+            bus_override = record.get('bus_override')
+            # Blank CSV cells arrive as None or NaN
+            bus_override = int(bus_override) if bus_override and bus_override == bus_override else None
+            portfolio.add_phase(building, Phase(str(record['phase']), float(record['capacity']), bus_override))
+        return portfolio
+
+    # -- incremental edits -------------------------------------------------
+
+    def update_phase(self, leaf: PortfolioNode, capacity: Optional[float] = None,
+                     bus_override: Optional[int] = ..., name: Optional[str] = None):
+        """Change one leaf and re-aggregate only its ancestors.
+
+        Leave ``bus_override`` out to keep the current override; pass ``None``
+        to clear it.
+        """
+        if not leaf.is_leaf:
+            raise ValueError(f"{leaf.path} is not a phase")
+        phase = leaf.phase
+        leaf.phase = Phase(phase.name if name is None else name,
+                           phase.capacity if capacity is None else capacity,
+                           phase.bus_override if bus_override is ... else bus_override, phase.start, phase.end)
+        leaf.name = leaf.phase.name
+
+        before = (leaf.capacity, leaf.buses, leaf.hours, leaf.standard_cost, leaf.discounted_cost)
+        self._price_leaf(leaf)
+        self._propagate(leaf.parent, 0, leaf.capacity - before[0], leaf.buses - before[1],
+                        leaf.hours - before[2], leaf.standard_cost - before[3], leaf.discounted_cost - before[4])
+
+    def set_discounts(self, node: PortfolioNode, etap_model_available: Optional[bool] = ...,
+                      repeat_customer: Optional[bool] = ...):
+        """Switch a subtree's ETAP/repeat discounts (``None`` = inherit, omitted = unchanged).
+
+        Only this node and descendants that set their own discounts change
+        their relative factor; each change is pushed up the ancestors as a
+        delta.
+        """
+        if etap_model_available is not ...:
+            node.etap_model_available = etap_model_available
+        if repeat_customer is not ...:
+            node.repeat_customer = repeat_customer
+
+        changed = self._explicit_frontier(node) + [node]
+        for target in changed:
+            new_discount = self._relative_discount(target) if target.parent else self._multiplier(target)
+            if new_discount != target.discount:
+                before = target.discounted_cost
+                target.discount = new_discount
+                if target.parent is not None:
+                    self._propagate(target.parent, 0, 0.0, 0, 0.0, 0.0, target.discounted_cost - before)
+
+    def remove(self, node: PortfolioNode):
+        """Detach a subtree and subtract its totals from the ancestors."""
+        if node.parent is None:
+            raise ValueError("Cannot remove the portfolio root")
+        node.parent.children.remove(node)
+        self._propagate(node.parent, -node.leaf_count, -node.capacity, -node.buses, -node.hours,
+                        -node.standard_cost, -node.discounted_cost)
+        node.parent = None
+
+    def recompute(self):
+        """Re-price every leaf and rebuild all roll-ups from scratch.
+
+        Edits never need this; it clears floating-point drift after very long
+        editing sessions and serves as a reference for the incremental path.
+        """
+        for node in reversed(list(self.root.walk())):
+            node.discount = self._relative_discount(node) if node.parent else self._multiplier(node)
+            if node.is_leaf:
+                self._price_leaf(node)
+                continue
+            node.leaf_count = sum(child.leaf_count for child in node.children)
+            node.capacity = sum(child.capacity for child in node.children)
+            node.buses = sum(child.buses for child in node.children)
+            node.hours = sum(child.hours for child in node.children)
+            node.standard_cost = sum(child.standard_cost for child in node.children)
+            node.child_discounted_cost = sum(child.discounted_cost for child in node.children)
+
+    # -- results -----------------------------------------------------------
+
+    def node_costs(self, node: PortfolioNode) -> dict:
+        """Standard and competitive price of a subtree on its own (no additional costs)."""
+        config = self.config
+        factor = config.effective_premium_factor * config.effective_phase_extension_discount
+        standard = node.standard_cost * factor
+        competitive = node.discounted_cost * self._ancestor_discount(node) * factor * config.overall_competitive_factor
+        return {
+            'leaves': node.leaf_count,
+            'capacity': node.capacity,
+            'buses': node.buses,
+            'total_hours': node.hours,
+            'standard_cost': standard,
+            'competitive_cost': competitive,
+            'savings': standard - competitive,
+        }
+
+    def totals(self) -> dict:
+        """Portfolio totals in the shape of the engine's headline figures."""
+        config = self.config
+        root = self.root
+        standard = ((root.standard_cost * config.effective_premium_factor + config.additional_costs)
+                    * config.effective_phase_extension_discount)
+        competitive = ((root.discounted_cost * config.effective_premium_factor
+                        + config.additional_costs * root.discount)
+                       * config.effective_phase_extension_discount * config.overall_competitive_factor)
+        savings = standard - competitive
+        return {
+            'phases': root.leaf_count,
+            'total_load': root.capacity,
+            'estimated_buses': root.buses,
+            'total_hours': root.hours,
+            'standard_cost': standard,
+            'competitive_cost': competitive,
+            'savings': savings,
+            'savings_percentage': savings / standard * 100 if standard > 0 else 0,
+        }
+
+    def rows(self, max_level: str = LEVELS[-1]) -> List[dict]:
+        """Flattened roll-ups down to ``max_level``, parents before children."""
+        depth = LEVELS.index(max_level)
+        rows = []
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            rows.append({'path': node.path, 'level': node.level, 'name': node.name, **self.node_costs(node)})
+            if LEVELS.index(node.level) < depth:
+                stack.extend(reversed(node.children))
+        return rows
+
+    # -- internals ---------------------------------------------------------
+
+    def _price_leaf(self, leaf: PortfolioNode):
+        buses = phase_buses(leaf.phase, self.config.tier_level, self.config.rate_card)
+        leaf.capacity = leaf.phase.capacity
+        leaf.buses = buses
+        leaf.hours = buses * self._hours_per_bus
+        leaf.standard_cost = buses * self._labor_per_bus + self._report_cost
+        leaf.child_discounted_cost = leaf.standard_cost
+
+    @staticmethod
+    def _propagate(node: Optional[PortfolioNode], leaves, capacity, buses, hours, standard, discounted):
+        # ``discounted`` is the change in one child's discounted cost; each
+        # ancestor scales it by its own relative discount before passing it on
+        while node is not None:
+            node.leaf_count += leaves
+            node.capacity += capacity
+            node.buses += buses
+            node.hours += hours
+            node.standard_cost += standard
+            node.child_discounted_cost += discounted
+            discounted *= node.discount
+            node = node.parent
+
+    @staticmethod
+    def _child_level(parent: PortfolioNode) -> str:
+        index = LEVELS.index(parent.level)
+        if index == len(LEVELS) - 1:
+            raise ValueError(f"A {parent.level} cannot have children")
+        return LEVELS[index + 1]
+
+    def _effective_flags(self, node: PortfolioNode):
+        etap = repeat = None
+        while node is not None and (etap is None or repeat is None):
+            if etap is None:
+                etap = node.etap_model_available
+            if repeat is None:
+                repeat = node.repeat_customer
+            node = node.parent
+        return bool(etap), bool(repeat)
+
+    def _multiplier(self, node: PortfolioNode) -> float:
+        etap, repeat = self._effective_flags(node)
+        return ((self.config.etap_discount_factor if etap else 1.0)
+                * (self.config.repeat_discount_factor if repeat else 1.0))
+
+    def _relative_discount(self, node: PortfolioNode) -> float:
+        if node.etap_model_available is None and node.repeat_customer is None:
+            return 1.0
+        return self._multiplier(node) / self._multiplier(node.parent)
+
+    def _ancestor_discount(self, node: PortfolioNode) -> float:
+        discount = 1.0
+        node = node.parent
+        while node is not None:
+            discount *= node.discount
+            node = node.parent
+        return discount
+
+    @staticmethod
+    def _explicit_frontier(node: PortfolioNode) -> List[PortfolioNode]:
+        # Descendants that set a discount of their own, deepest first. Below a
+        # node that sets both discounts nothing can depend on ``node`` any more.
+        frontier = []
+        stack = list(node.children)
+        while stack:
+            child = stack.pop()
+            if child.etap_model_available is not None or child.repeat_customer is not None:
+                frontier.append(child)
+            if child.etap_model_available is None or child.repeat_customer is None:
+                stack.extend(child.children)
+        return frontier[::-1]
@@ -0,0 +1,170 @@
+"""Per-stage timing of Streamlit script runs.
+
+``app.py`` wraps each stage of a run (imports and page config, sidebar
+widgets, the pricing engine, HTML cards, phase breakdown, Plotly figure
+construction and serialisation) in :meth:`RunProfile.stage`, and reports the
+size of every large ``unsafe_allow_html`` block through
+:meth:`RunProfile.payload`. :meth:`RunProfile.as_dict` gives a plain dict that
+the debug panel shows, the user can download as JSON, and
+:func:`export_profile` appends to a metrics file. Each session keeps its
+recent runs as :class:`ProfileSummary` objects, which hold only the run's
+numbers and share one tuple of stage and block names with every other run.
+
+Set ``DC_ESTIMATOR_METRICS`` to a file path to append every run as one JSON
+line; profiles are also emitted on the ``dc_estimator.profiling`` logger at
+DEBUG level.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+_metrics_lock = threading.Lock()
+
+# Stage and HTML block names are the same for nearly every run of every session,
+# so summaries share one tuple of them per distinct layout
+_layouts = {}
+_MAX_LAYOUTS = 1024
+
+
+class RunProfile:
+    """Wall-clock timings and HTML payload sizes for one script or fragment run.
+
+    Stages nest (``charts/plotly build``); a stage entered more than once
+    at the same place in a run accumulates its time and call count.
+    """
+
+    def __init__(self, kind: str = "full", started: Optional[float] = None):
+        self.kind = kind
+        self.created_at = time.time()
+        self.started = time.perf_counter() if started is None else started
+        self.finished = None
+        self.stages = {}
+        self.payloads = {}
+        self._open = []
+
+    @contextmanager
+    def stage(self, name: str):
+        self.start(name)
+        try:
+            yield
+        finally:
+            self.stop()
+
+    def start(self, name: str):
+        """Open a stage inside the innermost open one; :meth:`stop` closes it."""
+        path = self._path(name)
+        # Entered here rather than on stop so stages list in the order they began
+        self.stages.setdefault(path, {'seconds': 0.0, 'calls': 0})
+        self._open.append((path, time.perf_counter()))
+
+    def stop(self):
+        path, started = self._open.pop()
+        self._add(path, time.perf_counter() - started)
+
+    def add_time(self, name: str, seconds: float):
+        """Record a span measured elsewhere (e.g. imports, before the profile existed)."""
+        self._add(self._path(name), seconds)
+
+    def _path(self, name: str) -> tuple:
+        return (self._open[-1][0] if self._open else ()) + (name,)
+
+    def _add(self, path: tuple, seconds: float):
+        entry = self.stages.setdefault(path, {'seconds': 0.0, 'calls': 0})
+        entry['seconds'] += seconds
+        entry['calls'] += 1
+
+    def payload(self, name: str, html: str) -> str:
+        """Record the UTF-8 size of an HTML block; returns ``html`` unchanged."""
+        entry = self.payloads.setdefault(name, {'bytes': 0, 'blocks': 0})
+        entry['bytes'] += len(html.encode('utf-8'))
+        entry['blocks'] += 1
+        return html
+
+    def finish(self):
+        if self.finished is None:
+            self.finished = time.perf_counter()
+
+    @property
+    def total_seconds(self) -> float:
+        return (self.finished or time.perf_counter()) - self.started
+
+    def as_dict(self) -> dict:
+        return {
+            'kind': self.kind,
+            'created_at': self.created_at,
+            'total_ms': self.total_seconds * 1000,
+            'stages': [{'stage': path[-1], 'path': "/".join(path), 'depth': len(path) - 1,
+                        'ms': entry['seconds'] * 1000, 'calls': entry['calls']}
+                       for path, entry in self.stages.items()],
+            'payloads': [{'block': name, **entry} for name, entry in self.payloads.items()],
+            'payload_bytes': sum(entry['bytes'] for entry in self.payloads.values()),
+        }
+
+
+def _shared_layout(layout: tuple) -> tuple:
+    if len(_layouts) >= _MAX_LAYOUTS:
+        return _layouts.get(layout, layout)
+    return _layouts.setdefault(layout, layout)
+
+
+class ProfileSummary:
+    """A finished run's :meth:`RunProfile.as_dict` record in compact form, for session history.
+
+    Timings and sizes are tuples aligned with the shared ``stages``
+    (``(path, stage, depth)`` per stage) and ``blocks`` layouts; about a
+    fifth of the memory of the dict. :meth:`as_dict` restores the record.
+    This trims the history the debug panel keeps, not any state the page
+    held before profiling was added.
+    """
+
+    __slots__ = ('kind', 'created_at', 'total_ms', 'stages', 'stage_ms', 'stage_calls', 'blocks', 'block_bytes',
+                 'block_counts')
+
+    def __init__(self, record: dict):
+        self.kind = record['kind']
+        self.created_at = record['created_at']
+        self.total_ms = record['total_ms']
+        self.stages = _shared_layout(tuple((stage['path'], stage['stage'], stage['depth'])
+                                           for stage in record['stages']))
+        self.stage_ms = tuple(stage['ms'] for stage in record['stages'])
+        self.stage_calls = tuple(stage['calls'] for stage in record['stages'])
+        self.blocks = _shared_layout(tuple(payload['block'] for payload in record['payloads']))
+        self.block_bytes = tuple(payload['bytes'] for payload in record['payloads'])
+        self.block_counts = tuple(payload['blocks'] for payload in record['payloads'])
+
+    @property
+    def slowest_stage(self) -> str:
+        if not self.stages:
+            return ""
+        return self.stages[max(range(len(self.stages)), key=self.stage_ms.__getitem__)][1]
+
+    def as_dict(self) -> dict:
+        return {
+            'kind': self.kind,
+            'created_at': self.created_at,
+            'total_ms': self.total_ms,
+            'stages': [{'stage': stage, 'path': path, 'depth': depth, 'ms': ms, 'calls': calls}
+                       for (path, stage, depth), ms, calls in zip(self.stages, self.stage_ms, self.stage_calls)],
+            'payloads': [{'block': block, 'bytes': size, 'blocks': count}
+                         for block, size, count in zip(self.blocks, self.block_bytes, self.block_counts)],
+            'payload_bytes': sum(self.block_bytes),
+        }
+
+
+def export_profile(profile: RunProfile, path: Optional[str] = None):
+    """Log ``profile`` and append it as a JSON line to ``path`` (default ``$DC_ESTIMATOR_METRICS``)."""
+    record = profile.as_dict()
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(json.dumps(record))
+    path = path or os.environ.get("DC_ESTIMATOR_METRICS")
+    if path:
+        with _metrics_lock, open(path, 'a', encoding='utf-8') as handle:
+            handle.write(json.dumps(record) + "\n")
+    return record
@@ -0,0 +1,302 @@
+"""Versioned rate cards loaded from JSON files.
+
+Rates and technical factors are revised quarterly. Each revision is one JSON
+file with a ``version`` and the date it takes effect::
+
+    {
+      "version": "2025-Q1",
+      "effective_from": "2025-01-01",
+      "resource_rates": {"L1": 1200, "L2": 750, "L3": 500},
+      "resource_split": {"L1": 0.2, "L2": 0.3, "L3": 0.5},
+      "tier_bus_multipliers": {"Tier I": 1.5, ...},
+      "tier_complexity": {"Tier I": 1.0, ...},
+      "delivery_multipliers": {"Standard": 1.0, "Urgent": 1.3},
+      "report_format_multipliers": {"Basic": 0.8, ...},
+      "base_hours_per_bus": {"load_flow": 0.8, ...}
+    }
+
+:class:`RateCardRegistry` parses and validates every file in a directory
+once, keeps the resulting :class:`~dc_estimator.engine.RateCard` objects for
+all sessions, and re-reads a file only when its modification time or size
+changes. :meth:`RateCardRegistry.in_force` picks the card for a pricing date,
+so old quotes can be repriced against the rates of their day.
+:func:`compiled` turns a card into read-only NumPy lookup tables indexed by
+the tier, delivery, report-format and study codes the vectorized modules use.
+
+The bundled cards live in ``dc_estimator/rate_cards``; set
+``DC_ESTIMATOR_RATE_CARDS`` to use another directory.
+"""
+
+import hashlib
+import json
+import math
+import os
+import re
+import threading
+import weakref
+from dataclasses import dataclass
+from datetime import date
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Tuple, Union
+
+from .engine import (
+    BUILTIN_RATE_CARD,
+    DELIVERY_TYPES,
+    REPORT_FORMATS,
+    RESOURCE_LEVELS,
+    STUDY_KEYS,
+    TIER_LEVELS,
+    RateCard,
+)
+
+DEFAULT_RATE_CARD_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "rate_cards")
+
+# Every rate card table and the keys it must define, in code order
+TABLES = {
+    'resource_rates': RESOURCE_LEVELS,
+    'resource_split': RESOURCE_LEVELS,
+    'tier_bus_multipliers': TIER_LEVELS,
+    'tier_complexity': TIER_LEVELS,
+    'delivery_multipliers': DELIVERY_TYPES,
+    'report_format_multipliers': REPORT_FORMATS,
+    'base_hours_per_bus': STUDY_KEYS,
+}
+
+# Versions name their files (<version>.json), so they may not contain path separators
+VERSION_PATTERN = re.compile(r'[A-Za-z0-9._-]+')
+
+
+def _check_version(version, source: str) -> str:
+    if not isinstance(version, str) or not version.strip():
+        raise ValueError(f"{source}: version must be a non-empty string")
+    version = version.strip()
+    if not VERSION_PATTERN.fullmatch(version) or not version.strip('.'):
+        raise ValueError(f"{source}: version may only contain letters, digits, '.', '_' and '-', got {version!r}")
+    return version
+
+
+def parse_rate_card(data: Mapping, source: str = "rate card") -> RateCard:
+    """Validate plain JSON values and build a read-only :class:`RateCard`."""
+    unknown = data.keys() - TABLES.keys() - {'version', 'effective_from', 'notes'}
+    if unknown:
+        raise ValueError(f"{source}: unknown field(s) {', '.join(sorted(unknown))}")
+    version = _check_version(data.get('version'), source)
+    try:
+        effective_from = date.fromisoformat(str(data.get('effective_from'))).isoformat()
+    except ValueError:
+        raise ValueError(f"{source}: effective_from must be an ISO date, got {data.get('effective_from')!r}") from None
+
+    tables = {}
+    for name, keys in TABLES.items():
+        table = data.get(name)
+        if not isinstance(table, Mapping):
+            raise ValueError(f"{source}: {name} must map {', '.join(keys)} to numbers")
+        if set(table) != set(keys):
+            raise ValueError(f"{source}: {name} must define exactly {', '.join(keys)}")
+        for key, value in table.items():
+            if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value) or value <= 0:
+                raise ValueError(f"{source}: {name}[{key!r}] must be a positive number, got {value!r}")
+        tables[name] = MappingProxyType({key: table[key] for key in keys})
+    if not math.isclose(sum(tables['resource_split'].values()), 1.0, abs_tol=1e-9):
+        raise ValueError(f"{source}: resource_split must sum to 1")
+
+    return RateCard(version=version, effective_from=effective_from, **tables)
+
+
+def load_rate_card(path: str) -> RateCard:
+    with open(path, encoding='utf-8') as handle:
+        try:
+            data = json.load(handle)
+        except json.JSONDecodeError as error:
+            raise ValueError(f"{path}: {error}") from None
+    if not isinstance(data, Mapping):
+        raise ValueError(f"{path}: expected a JSON object")
+    return parse_rate_card(data, source=os.path.basename(path))
+
+
+def rate_card_dict(card: RateCard) -> dict:
+    """Plain JSON values of ``card``, the inverse of :func:`parse_rate_card`."""
+    return {'version': card.version, 'effective_from': card.effective_from,
+            **{name: dict(getattr(card, name)) for name in TABLES}}
+
+
+def write_rate_card(card: RateCard, path: str):
+    """Write ``card`` as a rate card file (atomically, so a reloading registry never sees half a file)."""
+    _check_version(card.version, os.path.basename(path))
+    temporary = f"{path}.tmp"
+    with open(temporary, 'w', encoding='utf-8') as handle:
+        json.dump(rate_card_dict(card), handle, indent=2)
+        handle.write("\n")
+    os.replace(temporary, path)
+
+
+class RateCardRegistry:
+    """Every rate card file in ``directory``, reloaded per file on change."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._files: Dict[str, Tuple[Tuple[int, int], RateCard]] = {}
+        self._cards: Tuple[RateCard, ...] = ()
+        self._in_use: set = set()  # files whose cards are in _cards
+        self._duplicates: set = set()  # loaded files skipped for repeating another file's version
+        self.errors: Dict[str, str] = {}  # file -> problem, for files that failed to (re)load
+
+    def refresh(self) -> Tuple[RateCard, ...]:
+        """Re-read added or modified files; returns every card, oldest first.
+
+        Costs one ``stat`` per file when nothing changed. A file that fails
+        validation is reported in :attr:`errors` and skipped, keeping its
+        previous card if it had loaded before. So is a file repeating the
+        version of another (e.g. a copy made to draft the next quarter): the
+        card already in use, or else the older file's, keeps the version.
+        """
+        with self._lock:
+            try:
+                entries = [entry for entry in os.scandir(self.directory)
+                           if entry.name.endswith(".json") and entry.is_file()]
+            except FileNotFoundError:
+                entries = []
+            seen = {}
+            changed = len(entries) != len(self._files)
+            for entry in entries:
+                stat = entry.stat()
+                signature = (stat.st_mtime_ns, stat.st_size)
+                cached = self._files.get(entry.path)
+                if cached is None or cached[0] != signature:
+                    try:
+                        cached = (signature, load_rate_card(entry.path))
+                    except (OSError, ValueError) as error:
+                        # A half-edited file must not take pricing down: keep its last good card
+                        self.errors[entry.path] = str(error)
+                        if cached is not None:
+                            seen[entry.path] = cached
+                        continue
+                    self.errors.pop(entry.path, None)
+                    changed = True
+                seen[entry.path] = cached
+            for path in self.errors.keys() - {entry.path for entry in entries}:
+                del self.errors[path]
+            if changed:
+                for path in self._duplicates:
+                    self.errors.pop(path, None)
+                owners = {}
+                for path in sorted(seen, key=lambda path: (path not in self._in_use, seen[path][0], path)):
+                    version = seen[path][1].version
+                    if version in owners:
+                        self.errors[path] = (f"{os.path.basename(path)}: version {version!r} is already defined by "
+                                             f"{os.path.basename(owners[version])}")
+                    else:
+                        owners[version] = path
+                self._in_use = set(owners.values())
+                self._duplicates = seen.keys() - self._in_use
+                cards = sorted((seen[path][1] for path in self._in_use),
+                               key=lambda card: (card.effective_from, card.version))
+                self._files, self._cards = seen, tuple(cards)
+            return self._cards
+
+    def cards(self) -> Tuple[RateCard, ...]:
+        return self.refresh()
+
+    def versions(self) -> List[str]:
+        return [card.version for card in self.refresh()]
+
+    def choices(self) -> Tuple[RateCard, ...]:
+        """Cards to offer in a picker: newest first, then the built-in card."""
+        return (*reversed(self.refresh()), BUILTIN_RATE_CARD)
+
+    def get(self, version: str) -> RateCard:
+        if version == BUILTIN_RATE_CARD.version:
+            return BUILTIN_RATE_CARD
+        for card in self.refresh():
+            if card.version == version:
+                return card
+        raise ValueError(f"Unknown rate card {version!r}; available: {', '.join(self.versions()) or 'none'}")
+
+    def in_force(self, on: Union[date, str, None] = None) -> RateCard:
+        """The newest card effective on ``on`` (default today); the built-in card if none is."""
+        on = date.today().isoformat() if on is None else on if isinstance(on, str) else on.isoformat()
+        current = None
+        for card in self.refresh():
+            if card.effective_from <= on:
+                current = card
+        return current or BUILTIN_RATE_CARD
+
+
+_default_registry = None
+_default_lock = threading.Lock()
+
+
+def default_rate_cards() -> RateCardRegistry:
+    """The process-wide registry at ``$DC_ESTIMATOR_RATE_CARDS`` (shared by every session)."""
+    global _default_registry
+    with _default_lock:
+        if _default_registry is None:
+            _default_registry = RateCardRegistry(os.environ.get("DC_ESTIMATOR_RATE_CARDS", DEFAULT_RATE_CARD_DIR))
+        return _default_registry
+
+
+@dataclass(frozen=True)
+class CompiledRateCard:
+    """A rate card as read-only arrays indexed by the batch codes.
+
+    ``tier_*`` by ``TIER_LEVELS``, ``delivery`` by ``DELIVERY_TYPES``,
+    ``report_format`` by ``REPORT_FORMATS``, ``hours_per_bus`` by
+    ``STUDY_KEYS`` and the resource arrays by ``RESOURCE_LEVELS``.
+    """
+
+    tier_bus_multiplier: "np.ndarray"
+    tier_complexity: "np.ndarray"
+    delivery: "np.ndarray"
+    report_format: "np.ndarray"
+    hours_per_bus: "np.ndarray"
+    resource_rates: "np.ndarray"
+    resource_split: "np.ndarray"
+    blended_rate: float
+
+
+_compiled: "weakref.WeakKeyDictionary[RateCard, CompiledRateCard]" = weakref.WeakKeyDictionary()
+_compiled_lock = threading.Lock()
+
+
+def compiled(card: RateCard) -> CompiledRateCard:
+    """NumPy tables for ``card``, built on first use and shared while the card is alive."""
+    with _compiled_lock:
+        tables = _compiled.get(card)
+        if tables is None:
+            import numpy as np
+
+            def array(name):
+                values = np.array([getattr(card, name)[key] for key in TABLES[name]], dtype=np.float64)
+                values.setflags(write=False)
+                return values
+
+            tables = _compiled[card] = CompiledRateCard(
+                tier_bus_multiplier=array('tier_bus_multipliers'),
+                tier_complexity=array('tier_complexity'),
+                delivery=array('delivery_multipliers'),
+                report_format=array('report_format_multipliers'),
+                hours_per_bus=array('base_hours_per_bus'),
+                resource_rates=array('resource_rates'),
+                resource_split=array('resource_split'),
+                blended_rate=card.blended_rate,
+            )
+        return tables
+
+
+_fingerprints: "weakref.WeakKeyDictionary[RateCard, str]" = weakref.WeakKeyDictionary()
+
+
+def fingerprint(card: RateCard) -> str:
+    """Hex digest of ``card``'s version and values, so an edited file never matches its old cache keys."""
+    digest = _fingerprints.get(card)
+    if digest is None:
+        canonical = json.dumps(rate_card_dict(card), sort_keys=True, separators=(',', ':'))
+        digest = _fingerprints[card] = hashlib.blake2b(canonical.encode(), digest_size=8).hexdigest()
+    return digest
+
+
+def card_label(card: RateCard) -> str:
+    if card is BUILTIN_RATE_CARD:
+        return "builtin (original defaults)"
+    return f"{card.version} (from {card.effective_from})"
@@ -0,0 +1,200 @@
+"""Named quote scenarios priced together and compared against a baseline.
+
+Estimators compare options (ETAP model or not, repeat customer, report
+format, Consolidated vs Phase-wise) by saving each one as a named
+:class:`~dc_estimator.engine.QuoteConfig` in a :class:`ScenarioWorkspace`.
+:meth:`ScenarioWorkspace.price` sends every scenario whose cost-relevant
+inputs (:func:`~dc_estimator.cache.quote_key`) have not been priced yet
+through one :func:`~dc_estimator.batch.price_configs` call and reuses the
+stored figures for the rest, so editing one scenario of fifty re-prices one
+quote. :meth:`ScenarioWorkspace.comparison` lays the headline figures side
+by side with each scenario's difference from the baseline and the inputs
+that differ.
+"""
+
+import dataclasses
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .batch import price_configs
+from .cache import quote_key
+from .engine import QuoteConfig
+
+METRICS = ('standard_cost', 'competitive_cost', 'savings', 'savings_percentage', 'total_hours', 'estimated_buses')
+
+# Inputs described in the "changes vs baseline" column, with their labels
+COMPARED_FIELDS = {
+    'tier_level': "Tier",
+    'delivery_type': "Delivery",
+    'project_type': "Project",
+    'calculation_methodology': "Method",
+    'client_type': "Client",
+    'premium_factor': "Premium",
+    'custom_bus_count': "Buses",
+    'selected_studies': "Studies",
+    'report_format': "Report",
+    'report_complexity_factor': "Report complexity",
+    'typical_modeling_factor': "Modeling",
+    'etap_model_available': "ETAP model",
+    'etap_discount_factor': "ETAP discount",
+    'repeat_customer': "Repeat customer",
+    'repeat_discount_factor': "Repeat discount",
+    'phase_extension_discount': "Extension discount",
+    'overall_competitive_factor': "Competitive factor",
+    'additional_costs': "Additional costs",
+}
+
+
+def _describe(name: str, value) -> str:
+    if name == 'selected_studies':
+        return "+".join(value) or "none"
+    if isinstance(value, bool):
+        return "on" if value else "off"
+    if isinstance(value, float):
+        return f"{value:g}"
+    return str(value)
+
+
+def config_changes(baseline: QuoteConfig, config: QuoteConfig) -> List[str]:
+    """Short ``"Label: old → new"`` notes for the inputs where ``config`` differs from ``baseline``."""
+    changes = []
+    if baseline.total_load != config.total_load:
+        changes.append(f"Load: {baseline.total_load:g} → {config.total_load:g} MW")
+    for name, label in COMPARED_FIELDS.items():
+        old, new = getattr(baseline, name), getattr(config, name)
+        if old != new:
+            changes.append(f"{label}: {_describe(name, old)} → {_describe(name, new)}")
+    if baseline.phases != config.phases and config.calculation_methodology == "Phase-wise":
+        changes.append(f"Phases: {len(baseline.phases)} → {len(config.phases)}")
+    if baseline.base_report_costs != config.base_report_costs:
+        changes.append("Report prices")
+    if baseline.rate_card is not config.rate_card:
+        changes.append(f"Rate card: {baseline.rate_card.version} → {config.rate_card.version}")
+    return changes
+
+
+class ScenarioWorkspace:
+    """An ordered set of named scenarios and the priced figures of their inputs.
+
+    Figures are stored per :func:`quote_key`, so renaming a scenario or
+    saving an identical one never re-prices, and keys no scenario uses any
+    more are dropped on the next :meth:`price`.
+    """
+
+    def __init__(self):
+        self._configs: Dict[str, QuoteConfig] = {}
+        self._keys: Dict[str, str] = {}
+        self._priced: Dict[str, Dict[str, float]] = {}
+        self.baseline: Optional[str] = None
+        self.last_priced = 0  # scenarios sent to the engine by the last price()
+
+    def __len__(self):
+        return len(self._configs)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._configs
+
+    def __iter__(self) -> Iterator[Tuple[str, QuoteConfig]]:
+        return iter(self._configs.items())
+
+    @property
+    def names(self) -> List[str]:
+        return list(self._configs)
+
+    def get(self, name: str) -> QuoteConfig:
+        return self._configs[name]
+
+    def save(self, name: str, config: QuoteConfig):
+        """Add a scenario, or replace the inputs of an existing one."""
+        name = name.strip()
+        if not name:
+            raise ValueError("A scenario needs a name")
+        self._configs[name] = config
+        self._keys[name] = quote_key(config)
+        if self.baseline is None:
+            self.baseline = name
+
+    def update(self, name: str, **changes):
+        """Change some inputs of a scenario (validated like a new ``QuoteConfig``)."""
+        self.save(name, dataclasses.replace(self._configs[name], **changes))
+
+    def rename(self, name: str, new_name: str):
+        new_name = new_name.strip()
+        if not new_name:
+            raise ValueError("A scenario needs a name")
+        if new_name != name and new_name in self._configs:
+            raise ValueError(f"A scenario called {new_name!r} already exists")
+        # Rebuild in place so the scenario keeps its position
+        self._configs = {new_name if key == name else key: value for key, value in self._configs.items()}
+        self._keys = {new_name if key == name else key: value for key, value in self._keys.items()}
+        if self.baseline == name:
+            self.baseline = new_name
+
+    def remove(self, name: str):
+        del self._configs[name]
+        del self._keys[name]
+        if self.baseline == name:
+            self.baseline = next(iter(self._configs), None)
+
+    def clear(self):
+        self.__init__()
+
+    def price(self) -> Dict[str, Dict[str, float]]:
+        """Headline figures per scenario name, pricing only inputs not seen before."""
+        pending = {}
+        for name, key in self._keys.items():
+            if key not in self._priced and key not in pending:
+                pending[key] = self._configs[name]
+        if pending:
+            priced = price_configs(list(pending.values()))
+            for row, key in enumerate(pending):
+                self._priced[key] = {metric: priced[metric][row].item() for metric in METRICS}
+        self.last_priced = len(pending)
+
+        live = set(self._keys.values())
+        for key in [key for key in self._priced if key not in live]:
+            del self._priced[key]
+        return {name: self._priced[key] for name, key in self._keys.items()}
+
+    def comparison(self, baseline: Optional[str] = None) -> List[dict]:
+        """One row per scenario: its figures, their change against ``baseline`` and the inputs that differ.
+
+        ``<metric>_delta`` is the absolute change and ``<metric>_delta_pct``
+        the change in percent of the baseline value (``None`` when that is 0).
+        """
+        baseline = baseline or self.baseline
+        figures = self.price()
+        if not figures:
+            return []
+        if baseline not in figures:
+            raise ValueError(f"Unknown baseline scenario {baseline!r}")
+        reference = figures[baseline]
+        baseline_config = self._configs[baseline]
+
+        rows = []
+        for name, values in figures.items():
+            row = {'scenario': name, 'baseline': name == baseline, **values}
+            for metric in METRICS:
+                delta = values[metric] - reference[metric]
+                row[f'{metric}_delta'] = delta
+                row[f'{metric}_delta_pct'] = delta / reference[metric] * 100 if reference[metric] else None
+            row['changes'] = "; ".join(config_changes(baseline_config, self._configs[name]))
+            rows.append(row)
+        return rows
+
+    def variants(self, name: str) -> Dict[str, QuoteConfig]:
+        """Common what-ifs of one scenario: each toggle flipped and each other report format or methodology."""
+        config = self._configs[name]
+        variants = {
+            f"{name} · ETAP model {'off' if config.etap_model_available else 'on'}":
+                dataclasses.replace(config, etap_model_available=not config.etap_model_available),
+            f"{name} · repeat customer {'off' if config.repeat_customer else 'on'}":
+                dataclasses.replace(config, repeat_customer=not config.repeat_customer),
+        }
+        for report_format in config.rate_card.report_format_multipliers:
+            if report_format != config.report_format:
+                variants[f"{name} · {report_format} reports"] = dataclasses.replace(config, report_format=report_format)
+        if config.calculation_methodology == "Phase-wise":
+            variants[f"{name} · Consolidated"] = dataclasses.replace(config, calculation_methodology="Consolidated")
+        elif config.phases:
+            variants[f"{name} · Phase-wise"] = dataclasses.replace(config, calculation_methodology="Phase-wise")
+        return {variant: value for variant, value in variants.items() if variant not in self._configs}
@@ -0,0 +1,282 @@
+"""Staffing plans for the awarded quotes under weekly L1/L2/L3 capacity.
+
+Each quote's hours are split across the resource levels exactly as the engine
+prices them (``total_hours × resource_split``). Every level is a pool of
+engineer-hours per week, and the levels work in parallel: a project is done
+when its last level finishes. Within a level, work is handed out week by
+week in earliest-deadline-first order from a heap. Preemptive EDF minimises
+the worst lateness on one resource, so a plan in which some project is late
+means no ordering of that team's hours could have delivered everything on
+time. ``max_share`` caps the share of a level's weekly hours one project can
+take, so a single large job cannot absorb the whole team.
+
+Weeks are counted from the start of the plan (week 0 is the current week);
+``deadline`` is the week by whose start the work must be finished.
+
+:func:`urgency_surcharge` plans the team's work with and without a new quote.
+Work pushed past a deadline has to be done as overtime. The extra overtime
+the quote causes, priced at :data:`OVERTIME_PREMIUM` × the level's rate,
+gives a surcharge that is derived from current workload, unlike the rate
+card's flat Urgent multiplier. It is capped at the quote's own hours, since
+working exactly those as overtime always leaves the rest of the plan as it was.
+
+Planning is pure Python over ``heapq``. Idle weeks are skipped, so a plan for
+hundreds of projects over a year takes milliseconds, and adding a quote
+simply re-plans from scratch.
+"""
+
+import heapq
+from dataclasses import dataclass, field
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+from .engine import BUILTIN_RATE_CARD, DELIVERY_TYPES, RESOURCE_LEVELS, QuoteConfig, RateCard
+
+HOURS_PER_WEEK = 40.0
+OVERTIME_PREMIUM = 1.5  # overtime hours cost 1.5× the level's rate
+# Weeks from award to delivery when a quote does not give a deadline
+DEFAULT_LEAD_WEEKS = {"Standard": 8, "Urgent": 4}
+SECONDS_PER_WEEK = 7 * 24 * 3600
+
+_EPSILON = 1e-9
+
+
+@dataclass(frozen=True)
+class StaffingProject:
+    """The hours one quote needs per resource level and when they are due."""
+
+    name: str
+    hours: Mapping[str, float]  # per RESOURCE_LEVELS
+    deadline: int
+    release: int = 0
+    delivery_type: str = "Standard"
+
+    @property
+    def total_hours(self) -> float:
+        return sum(self.hours.values())
+
+
+@dataclass(frozen=True)
+class TeamCapacity:
+    """Engineers available per level, each working ``hours_per_week``."""
+
+    engineers: Mapping[str, float]
+    hours_per_week: float = HOURS_PER_WEEK
+    max_share: float = 1.0
+
+    def __post_init__(self):
+        if not 0 < self.max_share <= 1:
+            raise ValueError("max_share must be in (0, 1]")
+
+    def weekly_hours(self, level: str) -> float:
+        return self.engineers.get(level, 0) * self.hours_per_week
+
+
+def project_hours(total_hours: float, rate_card: RateCard = BUILTIN_RATE_CARD) -> Dict[str, float]:
+    return {level: total_hours * rate_card.resource_split[level] for level in RESOURCE_LEVELS}
+
+
+def project_from_quote(name: str, config: QuoteConfig, results: dict, deadline: Optional[int] = None,
+                       release: int = 0) -> StaffingProject:
+    """A project for a freshly priced quote, due ``DEFAULT_LEAD_WEEKS`` after ``release`` unless given."""
+    if deadline is None:
+        deadline = release + DEFAULT_LEAD_WEEKS[config.delivery_type]
+    return StaffingProject(name, project_hours(results['total_hours'], config.rate_card), deadline, release,
+                           config.delivery_type)
+
+
+def project_from_record(name: str, record: Mapping, now: float, rate_card: RateCard = BUILTIN_RATE_CARD,
+                        deadline: Optional[int] = None) -> StaffingProject:
+    """A project for a stored quote (:meth:`QuoteHistory.load`), already running at ``now``.
+
+    Without an explicit ``deadline`` the quote is due its delivery type's
+    lead time after it was saved, counted in weeks from ``now``; overdue
+    quotes are due at once (week 1).
+    """
+    delivery_type = record['inputs'].get('delivery_type', "Standard")
+    if delivery_type not in DELIVERY_TYPES:
+        delivery_type = "Standard"
+    if deadline is None:
+        weeks_elapsed = int((now - record['created_at']) // SECONDS_PER_WEEK)
+        deadline = max(1, DEFAULT_LEAD_WEEKS[delivery_type] - weeks_elapsed)
+    return StaffingProject(name, project_hours(record['results']['total_hours'], rate_card), deadline, 0,
+                           delivery_type)
+
+
+@dataclass
+class StaffingPlan:
+    """Per-project timeline and per-level weekly load of one schedule.
+
+    ``start``/``finish`` are week indexes (``finish`` exclusive), ``None``
+    for a project with no hours. ``tardy_hours[i][level]`` is the work of
+    project ``i`` done in or after its deadline week.
+    """
+
+    projects: Tuple[StaffingProject, ...]
+    team: TeamCapacity
+    start: List[Optional[int]]
+    finish: List[Optional[int]]
+    level_finish: List[Dict[str, int]]
+    tardy_hours: List[Dict[str, float]]
+    weekly_hours: Dict[str, List[float]]  # hours worked per level per week
+
+    @property
+    def weeks(self) -> int:
+        return max((len(hours) for hours in self.weekly_hours.values()), default=0)
+
+    def lateness(self, index: int) -> int:
+        finish = self.finish[index]
+        return 0 if finish is None else max(0, finish - self.projects[index].deadline)
+
+    @property
+    def late_projects(self) -> int:
+        return sum(1 for index in range(len(self.projects)) if self.lateness(index) > 0)
+
+    def total_tardy_hours(self) -> Dict[str, float]:
+        return {level: sum(hours[level] for hours in self.tardy_hours) for level in RESOURCE_LEVELS}
+
+    def utilization(self, weeks: Optional[int] = None) -> Dict[str, float]:
+        """Share of each level's capacity used over the first ``weeks`` weeks (default: the whole plan)."""
+        weeks = self.weeks if weeks is None else weeks
+        utilization = {}
+        for level in RESOURCE_LEVELS:
+            capacity = self.team.weekly_hours(level) * weeks
+            utilization[level] = sum(self.weekly_hours[level][:weeks]) / capacity if capacity > 0 else 0.0
+        return utilization
+
+    def weekly_utilization(self) -> Dict[str, List[float]]:
+        """Per level, the share of capacity used in each week of the plan."""
+        utilization = {}
+        for level in RESOURCE_LEVELS:
+            capacity = self.team.weekly_hours(level)
+            hours = self.weekly_hours[level] + [0.0] * (self.weeks - len(self.weekly_hours[level]))
+            utilization[level] = [used / capacity if capacity > 0 else 0.0 for used in hours]
+        return utilization
+
+    def rows(self) -> List[dict]:
+        """One row per project, in input order."""
+        return [{
+            'project': project.name,
+            'delivery_type': project.delivery_type,
+            **{f"{level.lower()}_hours": project.hours[level] for level in RESOURCE_LEVELS},
+            'start_week': self.start[index],
+            'finish_week': self.finish[index],
+            'deadline_week': project.deadline,
+            'weeks_late': self.lateness(index),
+            'tardy_hours': sum(self.tardy_hours[index].values()),
+        } for index, project in enumerate(self.projects)]
+
+
+def _schedule_level(projects: Sequence[StaffingProject], level: str, weekly: float, max_share: float):
+    remaining = [project.hours[level] for project in projects]
+    start: List[Optional[int]] = [None] * len(projects)
+    finish: List[Optional[int]] = [None] * len(projects)
+    tardy = [0.0] * len(projects)
+    used: List[float] = []
+
+    pending = [(project.release, index) for index, project in enumerate(projects) if remaining[index] > _EPSILON]
+    if pending and weekly <= 0:
+        raise ValueError(f"No {level} capacity for {len(pending)} project(s) with {level} hours")
+    heapq.heapify(pending)
+    ready = []
+    cap = weekly * max_share
+    week = 0
+    while pending or ready:
+        if not ready and pending[0][0] > week:
+            # Nothing to work on until the next release: skip the idle weeks
+            used.extend([0.0] * (pending[0][0] - week))
+            week = pending[0][0]
+        while pending and pending[0][0] <= week:
+            _, index = heapq.heappop(pending)
+            heapq.heappush(ready, (projects[index].deadline, projects[index].release, index))
+
+        available = weekly
+        deferred = []
+        while available > _EPSILON and ready:
+            item = heapq.heappop(ready)
+            index = item[2]
+            worked = min(remaining[index], available, cap)
+            if start[index] is None:
+                start[index] = week
+            remaining[index] -= worked
+            available -= worked
+            if week >= projects[index].deadline:
+                tardy[index] += worked
+            if remaining[index] > _EPSILON:
+                deferred.append(item)
+            else:
+                finish[index] = week + 1
+        for item in deferred:
+            heapq.heappush(ready, item)
+        used.append(weekly - available)
+        week += 1
+    return start, finish, tardy, used
+
+
+def schedule(projects: Sequence[StaffingProject], team: TeamCapacity) -> StaffingPlan:
+    """Plan every project's hours against ``team``, earliest deadline first per level."""
+    projects = tuple(projects)
+    start: List[Optional[int]] = [None] * len(projects)
+    finish: List[Optional[int]] = [None] * len(projects)
+    level_finish = [{} for _ in projects]
+    tardy_hours = [{} for _ in projects]
+    weekly_hours = {}
+    for level in RESOURCE_LEVELS:
+        level_start, level_end, level_tardy, used = _schedule_level(projects, level, team.weekly_hours(level),
+                                                                    team.max_share)
+        weekly_hours[level] = used
+        for index in range(len(projects)):
+            tardy_hours[index][level] = level_tardy[index]
+            if level_start[index] is None:
+                continue
+            level_finish[index][level] = level_end[index]
+            start[index] = level_start[index] if start[index] is None else min(start[index], level_start[index])
+            finish[index] = level_end[index] if finish[index] is None else max(finish[index], level_end[index])
+    return StaffingPlan(projects, team, start, finish, level_finish, tardy_hours, weekly_hours)
+
+
+@dataclass
+class UrgencySurcharge:
+    """What taking on one more quote does to the team's deadlines."""
+
+    plan: StaffingPlan  # including the new quote, as the last project
+    overtime_hours: Dict[str, float]  # per level: extra tardy hours, at most the quote's own hours
+    overtime_cost: float
+    labor_cost: float  # the new quote's hours at standard rates
+    finish: Optional[int] = None
+    on_time: bool = True
+    displaced: List[str] = field(default_factory=list)  # existing projects the quote makes late
+
+    @property
+    def multiplier(self) -> float:
+        """Labour price multiplier that covers the overtime (1.0 when the team has room)."""
+        return 1.0 + self.overtime_cost / self.labor_cost if self.labor_cost > 0 else 1.0
+
+
+def urgency_surcharge(projects: Sequence[StaffingProject], team: TeamCapacity, quote: StaffingProject,
+                      rate_card: RateCard = BUILTIN_RATE_CARD,
+                      baseline: Optional[StaffingPlan] = None) -> UrgencySurcharge:
+    """Overtime ``quote`` adds to the plan for ``projects``, priced with ``rate_card``.
+
+    Pass the existing plan as ``baseline`` to avoid planning it again.
+    """
+    if baseline is None:
+        baseline = schedule(projects, team)
+    plan = schedule([*projects, quote], team)
+    before, after = baseline.total_tardy_hours(), plan.total_tardy_hours()
+    # Working the quote's own hours as overtime always restores the baseline,
+    # however far the knock-on delays spread
+    overtime_hours = {level: min(quote.hours[level], max(0.0, after[level] - before[level]))
+                      for level in RESOURCE_LEVELS}
+    rates = rate_card.resource_rates
+    index = len(plan.projects) - 1
+    return UrgencySurcharge(
+        plan=plan,
+        overtime_hours=overtime_hours,
+        overtime_cost=sum(overtime_hours[level] * rates[level] * OVERTIME_PREMIUM for level in RESOURCE_LEVELS),
+        labor_cost=sum(quote.hours[level] * rates[level] for level in RESOURCE_LEVELS),
+        finish=plan.finish[index],
+        on_time=plan.lateness(index) == 0,
+        displaced=[project.name for position, project in enumerate(baseline.projects)
+                   if baseline.lateness(position) == 0 and plan.lateness(position) > 0],
+    )
+
@@ -0,0 +1,122 @@
+"""One-at-a-time sensitivity sweep for the tornado chart.
+
+Every pricing slider is swept across the range the sidebar allows, and every
+tier and delivery choice is tried, while the other inputs stay at the current
+quote. A factor that only applies behind a switch (the ETAP and repeat
+discounts, the premium factor, the phase-extension discount) is swept only
+when the current quote has that switch on: with it off, no setting of the
+slider is the current price, so the bar would not be anchored to the quote.
+The whole grid is one :class:`~dc_estimator.batch.QuoteBatch` priced with a
+single :func:`~dc_estimator.batch.price_batch` call.
+"""
+
+from dataclasses import dataclass, replace
+from typing import List
+
+import numpy as np
+
+from .batch import QuoteBatch, price_batch
+from .engine import DELIVERY_TYPES, TIER_LEVELS, QuoteConfig
+
+# (label, min, max) of each slider exactly as exposed in app.py
+FACTOR_RANGES = {
+    'premium_factor': ("Premium Client Factor", 1.0, 2.0),
+    'etap_discount_factor': ("ETAP Model Discount Factor", 0.70, 0.95),
+    'repeat_discount_factor': ("Repeat Customer Discount", 0.75, 0.95),
+    'phase_extension_discount': ("Phase Extension Discount", 0.80, 0.95),
+    'overall_competitive_factor': ("Overall Competitive Reduction", 0.75, 0.98),
+    'typical_modeling_factor': ("Typical Modelling Factor", 0.80, 1.20),
+    'report_complexity_factor': ("Study Complexity Factor for Reports", 0.5, 2.0),
+}
+# Factors that apply only when a config field has a given value: field, value
+FACTOR_SWITCHES = {
+    'premium_factor': ('client_type', "Premium"),
+    'etap_discount_factor': ('etap_model_available', True),
+    'repeat_discount_factor': ('repeat_customer', True),
+    'phase_extension_discount': ('project_type', "Phase Extension"),
+}
+CHOICE_FACTORS = {
+    'tier_level': ("Tier Level", TIER_LEVELS),
+    'delivery_type': ("Delivery Type", DELIVERY_TYPES),
+}
+
+
+@dataclass(frozen=True)
+class FactorSensitivity:
+    name: str
+    label: str
+    low_value: object
+    high_value: object
+    low_cost: float
+    high_cost: float
+
+    @property
+    def swing(self) -> float:
+        return self.high_cost - self.low_cost
+
+
+def _sweep_columns(config: QuoteConfig, name: str, values: np.ndarray, batch: QuoteBatch):
+    """Overwrite the batch column(s) that ``name`` feeds."""
+    etap = config.etap_discount_factor if config.etap_model_available else 1.0
+    repeat = config.repeat_discount_factor if config.repeat_customer else 1.0
+    overall = config.overall_competitive_factor
+
+    if name == 'premium_factor':
+        batch.premium_factor = values
+    elif name == 'etap_discount_factor':
+        batch.competitive_multiplier = values * repeat * overall
+    elif name == 'repeat_discount_factor':
+        batch.competitive_multiplier = etap * values * overall
+    elif name == 'overall_competitive_factor':
+        batch.competitive_multiplier = etap * repeat * values
+    elif name == 'phase_extension_discount':
+        batch.phase_extension_discount = values
+    else:
+        setattr(batch, name, values)
+
+
+def sensitivity_analysis(config: QuoteConfig, points: int = 21,
+                         metric: str = 'competitive_cost') -> List[FactorSensitivity]:
+    """Rank every pricing factor by the swing it causes in ``metric``.
+
+    Returns one entry per factor that applies to ``config``, largest swing
+    first. ``low_value`` and ``high_value`` are the factor settings giving the
+    lowest and highest cost within the sweep.
+    """
+    base = QuoteBatch.from_configs([config])
+    segments = []  # (name, label, values)
+    batches = []
+
+    for name, (label, low, high) in FACTOR_RANGES.items():
+        if name in FACTOR_SWITCHES:
+            field, on = FACTOR_SWITCHES[name]
+            if getattr(config, field) != on:
+                continue
+        values = np.linspace(low, high, points)
+        swept = base.repeat(points)
+        _sweep_columns(config, name, values, swept)
+        segments.append((name, label, values))
+        batches.append(swept)
+
+    for name, (label, choices) in CHOICE_FACTORS.items():
+        segments.append((name, label, np.array(choices, dtype=object)))
+        batches.append(QuoteBatch.from_configs([replace(config, **{name: choice}) for choice in choices]))
+
+    costs = price_batch(QuoteBatch.concat(batches), config.rate_card)[metric]
+
+    ranked = []
+    offset = 0
+    for name, label, values in segments:
+        segment = costs[offset:offset + len(values)]
+        offset += len(values)
+        low, high = int(np.argmin(segment)), int(np.argmax(segment))
+        ranked.append(FactorSensitivity(
+            name=name,
+            label=label,
+            low_value=values[low].item() if hasattr(values[low], 'item') else values[low],
+            high_value=values[high].item() if hasattr(values[high], 'item') else values[high],
+            low_cost=float(segment[low]),
+            high_cost=float(segment[high]),
+        ))
+    ranked.sort(key=lambda factor: factor.swing, reverse=True)
+    return ranked
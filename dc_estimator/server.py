@@ -0,0 +1,231 @@
+"""Local HTTP quoting service: ``python -m dc_estimator.server``.
+
+A small asyncio HTTP/1.1 server with keep-alive connections that exposes the
+pricing engine to other local tools such as the CRM:
+
+``POST /quote``
+    Body: one JSON object of :class:`~dc_estimator.engine.QuoteConfig` fields.
+    Returns the full results dict.
+``POST /quotes``
+    Body: ``{"quotes": [{...}, ...]}``. All quotes are priced in one
+    vectorized :func:`~dc_estimator.batch.price_batch` pass and returned in
+    order with the headline figures. Batches are parsed and priced on a
+    worker thread, so a large one does not stall other connections.
+``GET /metrics``
+    Request counts and latency percentiles per endpoint.
+``GET /health``
+    Liveness probe.
+
+A quote without a ``rate_card`` field is priced against the card in force
+that day; pass a version string to pin one. Only ``Content-Length`` request
+bodies are supported. See
+``benchmarks/server_loadtest.py`` for a load generator.
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from collections import defaultdict, deque
+from typing import Optional, Sequence, Tuple
+
+from .batch import price_configs
+from .cache import memoized_costs
+from .engine import QuoteConfig, RateCard
+from .ratecard import default_rate_cards
+
+MAX_BODY_BYTES = 64 * 1024 * 1024
+BATCH_FIELDS = ('estimated_buses', 'total_hours', 'standard_cost', 'competitive_cost', 'savings', 'savings_percentage')
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           411: "Length Required", 413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class LatencyMetrics:
+    """Per-endpoint request counts and a rolling window of latencies."""
+
+    def __init__(self, window: int = 10000):
+        self.started = time.time()
+        self.requests = defaultdict(int)
+        self.errors = defaultdict(int)
+        self.quotes = 0
+        self._latencies = defaultdict(lambda: deque(maxlen=window))
+
+    def record(self, endpoint: str, seconds: float, status: int, quotes: int = 0):
+        self.requests[endpoint] += 1
+        if status >= 400:
+            self.errors[endpoint] += 1
+        self.quotes += quotes
+        self._latencies[endpoint].append(seconds)
+
+    def snapshot(self) -> dict:
+        endpoints = {}
+        for endpoint, latencies in self._latencies.items():
+            ordered = sorted(latencies)
+            endpoints[endpoint] = {
+                'requests': self.requests[endpoint],
+                'errors': self.errors[endpoint],
+                **{f'p{p}_ms': _percentile(ordered, p) * 1000 for p in (50, 90, 99)},
+                'max_ms': ordered[-1] * 1000,
+            }
+        return {'uptime_s': time.time() - self.started, 'quotes_priced': self.quotes, 'endpoints': endpoints}
+
+
+def _percentile(ordered, p):
+    return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+
+def _decode_json(body: bytes):
+    try:
+        return json.loads(body)
+    except (UnicodeDecodeError, json.JSONDecodeError) as error:
+        raise HTTPError(400, f"Invalid JSON body: {error}") from None
+
+
+def _config(data, rate_card) -> QuoteConfig:
+    if not isinstance(data, dict):
+        raise HTTPError(400, "Each quote must be a JSON object of QuoteConfig fields")
+    if 'rate_card' not in data:
+        data = {**data, 'rate_card': rate_card}
+    try:
+        return QuoteConfig.from_dict(data)
+    except (TypeError, ValueError) as error:
+        raise HTTPError(400, str(error)) from None
+
+
+class QuoteServer:
+    def __init__(self, metrics: Optional[LatencyMetrics] = None):
+        self.metrics = metrics or LatencyMetrics()
+
+    async def handle(self, method: str, path: str, body: bytes) -> Tuple[int, object, int]:
+        """Route one request; returns ``(status, payload, quotes priced)``."""
+        if path == '/health':
+            return 200, {'status': 'ok'}, 0
+        if path == '/metrics':
+            return 200, self.metrics.snapshot(), 0
+        if path not in ('/quote', '/quotes'):
+            raise HTTPError(404, f"No endpoint {path}")
+        if method != 'POST':
+            raise HTTPError(405, f"{path} only accepts POST")
+
+        rate_card = default_rate_cards().in_force()
+        if path == '/quote':
+            return 200, memoized_costs(_config(_decode_json(body), rate_card)), 1
+        # Up to MAX_BODY_BYTES of quotes: keep the event loop free for other connections meanwhile
+        return await asyncio.to_thread(self._price_batch, body, rate_card)
+
+    @staticmethod
+    def _price_batch(body: bytes, rate_card: RateCard) -> Tuple[int, object, int]:
+        data = _decode_json(body)
+        quotes = data.get('quotes') if isinstance(data, dict) else None
+        if not isinstance(quotes, list):
+            raise HTTPError(400, 'Batch body must be {"quotes": [...]}')
+        configs = []
+        for index, quote in enumerate(quotes):
+            try:
+                configs.append(_config(quote, rate_card))
+            except HTTPError as error:
+                raise HTTPError(400, f"quotes[{index}]: {error}") from None
+        if not configs:
+            return 200, {'quotes': []}, 0
+        priced = price_configs(configs)
+        columns = [priced[name].tolist() for name in BATCH_FIELDS]
+        return 200, {'quotes': [dict(zip(BATCH_FIELDS, row)) for row in zip(*columns)]}, len(configs)
+
+    async def serve_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                started = time.perf_counter()
+                keep_alive = True
+                endpoint = '?'
+                try:
+                    parts = request_line.decode('latin-1').split()
+                    if len(parts) != 3:
+                        keep_alive = False
+                        raise HTTPError(400, "Malformed HTTP request")
+                    method, target, version = parts
+                    endpoint = target.split('?', 1)[0]
+                    headers = {}
+                    while True:
+                        try:
+                            line = await reader.readline()
+                        except ValueError:  # a header line longer than the stream limit
+                            keep_alive = False
+                            raise HTTPError(400, "Malformed HTTP request") from None
+                        if line in (b'\r\n', b'\n', b''):
+                            break
+                        name, _, value = line.decode('latin-1').partition(':')
+                        headers[name.strip().lower()] = value.strip()
+                    connection = headers.get('connection', '').lower()
+                    keep_alive = connection != 'close' and (version == 'HTTP/1.1' or connection == 'keep-alive')
+
+                    body = b''
+                    if 'transfer-encoding' in headers:
+                        keep_alive = False
+                        raise HTTPError(411, "Chunked bodies are not supported; send Content-Length")
+                    length = headers.get('content-length', '0') or '0'
+                    if not (length.isascii() and length.isdigit()):
+                        keep_alive = False
+                        raise HTTPError(400, "Malformed HTTP request")
+                    length = int(length)
+                    if length > MAX_BODY_BYTES:
+                        keep_alive = False
+                        raise HTTPError(413, f"Body exceeds {MAX_BODY_BYTES} bytes")
+                    if length:
+                        body = await reader.readexactly(length)
+                    status, payload, quotes = await self.handle(method, endpoint, body)
+                except HTTPError as error:
+                    status, payload, quotes = error.status, {'error': str(error)}, 0
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    raise
+                except Exception as error:  # keep serving other requests on an engine bug
+                    status, payload, quotes = 500, {'error': f"{type(error).__name__}: {error}"}, 0
+
+                encoded = json.dumps(payload, ensure_ascii=False).encode()
+                writer.write(
+                    f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                    f"Content-Type: application/json; charset=utf-8\r\n"
+                    f"Content-Length: {len(encoded)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode('latin-1') + encoded
+                )
+                await writer.drain()
+                self.metrics.record(endpoint, time.perf_counter() - started, status, quotes)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(host: str = '127.0.0.1', port: int = 8765, ready: Optional[asyncio.Event] = None):
+    server = QuoteServer()
+    async with await asyncio.start_server(server.serve_connection, host, port) as listener:
+        if ready is not None:
+            ready.set()
+        await listener.serve_forever()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m dc_estimator.server", description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1', help="interface to bind (default: localhost only)")
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args(argv)
+    print(f"Serving quotes on http://{args.host}:{args.port}")
+    try:
+        asyncio.run(serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,284 @@
+"""Bus and equipment counts from ETAP bus/branch exports.
+
+When a client's ETAP model already exists, its element export gives the real
+bus count instead of the ``total_load × tier multiplier`` estimate. Two
+layouts are read:
+
+CSV
+    One row per element with a type column (``Type``, ``Element Type``,
+    ``Element`` or ``Equipment``) and optionally a nominal voltage column
+    (``kV``, ``Nominal kV``, ``Rated kV``, ``Voltage``).
+XML
+    One XML element per network element. The type is the ``Type`` attribute
+    or else the tag (``<Bus ID="B1" kV="11"/>``, ``<Cable .../>``); the
+    voltage is a ``kV``/``NominalkV`` attribute or child element. Every
+    element with an ``ID`` or ``Name`` counts towards ``elements``, as every
+    CSV row does, while only recognised types count as buses, branches and
+    so on. Elements may nest (breakers and loads under their bus); a named
+    element of unrecognised type that holds others is a wrapper and is not
+    counted.
+
+Files are read as a stream (``csv.reader`` over a text wrapper, or
+``ElementTree.iterparse`` clearing each element once finished), so campus
+models with hundreds of thousands of elements are summarised in bounded
+memory. Summaries are cached by the SHA-256 of the file's bytes and shared by
+every session; re-running the script with the same upload only re-hashes it.
+"""
+
+import csv
+import hashlib
+import io
+import os
+import re
+import xml.etree.ElementTree as ElementTree
+from collections import Counter
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import BinaryIO, Dict, Mapping, Optional, Tuple, Union
+
+from .cache import LRUCache
+
+TYPE_COLUMNS = ("type", "elementtype", "element", "equipment", "equipmenttype", "category")
+VOLTAGE_COLUMNS = ("kv", "nominalkv", "ratedkv", "basekv", "voltage", "voltagekv")
+
+# Normalised type prefixes per category; the longest matching prefix wins
+CATEGORIES = (
+    ('bus', ('bus', 'node', 'switchgear', 'panel', 'mcc', 'switchboard')),
+    ('protective', ('relay', 'breaker', 'hvcb', 'lvcb', 'cb', 'fuse', 'recloser', 'overload')),
+    ('branch', ('cable', 'line', 'transmissionline', 'transformer', 'xfmr', 'xfr', 'reactor', 'impedance',
+                'busduct', 'busway')),
+    ('load', ('load', 'lumpload', 'staticload', 'motor', 'indmotor', 'inductionmotor', 'synmotor',
+              'synchronousmotor', 'mtr')),
+    ('source', ('generator', 'gen', 'utility', 'grid', 'ups', 'inverter', 'pv', 'battery', 'wtg')),
+)
+
+# IEEE 1584 arc-flash calculations cover three-phase buses up to 15 kV
+ARC_FLASH_MAX_KV = 15.0
+
+HASH_CHUNK_BYTES = 1 << 20
+
+
+@dataclass(frozen=True)
+class TopologySummary:
+    """Element counts of one network export.
+
+    ``buses_by_voltage`` maps nominal kV (``None`` when the export gives no
+    voltage) to the number of buses at that level; ``equipment`` maps each
+    element type as written in the file to its count.
+    """
+
+    digest: str
+    elements: int
+    buses: int
+    branches: int
+    protective_devices: int
+    loads: int
+    sources: int
+    buses_by_voltage: Mapping[Optional[float], int]
+    equipment: Mapping[str, int]
+
+    @property
+    def arc_flash_buses(self) -> int:
+        """Buses within the IEEE 1584 range; buses of unknown voltage are included."""
+        return sum(count for kv, count in self.buses_by_voltage.items() if kv is None or kv <= ARC_FLASH_MAX_KV)
+
+    def study_counts(self) -> Dict[str, int]:
+        """The element count each study's effort follows."""
+        return {
+            'load_flow': self.buses,
+            'short_circuit': self.buses,
+            'pdc': self.protective_devices,
+            'arc_flash': self.arc_flash_buses,
+        }
+
+    def voltage_levels(self) -> Tuple[Tuple[str, int], ...]:
+        """``(label, buses)`` per voltage level, highest voltage first."""
+        levels = sorted(self.buses_by_voltage.items(), key=lambda item: (item[0] is None, -(item[0] or 0)))
+        return tuple((f"{kv:g} kV" if kv is not None else "Unknown", count) for kv, count in levels)
+
+
+# Exports repeat a handful of type names, tags and voltages, so the string
+# handling below is memoised instead of run once per element
+@lru_cache(maxsize=4096)
+def _normalise(text: str) -> str:
+    return re.sub(r'[^a-z0-9]', '', text.lower())
+
+
+_PREFIXES = sorted(((prefix, category) for category, prefixes in CATEGORIES for prefix in prefixes),
+                   key=lambda item: -len(item[0]))
+
+
+@lru_cache(maxsize=4096)
+def _category(element_type: str) -> Optional[str]:
+    normalised = _normalise(element_type)
+    for prefix, category in _PREFIXES:
+        if normalised.startswith(prefix):
+            return category
+    return None
+
+
+@lru_cache(maxsize=4096)
+def _voltage(text) -> Optional[float]:
+    if text is None:
+        return None
+    match = re.search(r'[-+]?\d*\.?\d+(?:[eE][-+]?\d+)?', str(text))
+    if not match:
+        return None
+    kv = float(match.group())
+    # Values written in volts ("11000", "480 V") rather than kV
+    if re.search(r'(?<!k)v\b', str(text), re.IGNORECASE) or kv >= 1000:
+        kv /= 1000
+    return round(kv, 3) if kv > 0 else None
+
+
+class _Tally:
+    def __init__(self):
+        self.elements = 0
+        self.categories = Counter()
+        self.equipment = Counter()
+        self.bus_voltages = Counter()
+
+    def add(self, element_type: str, voltage):
+        element_type = element_type.strip()
+        if not element_type:
+            return
+        category = _category(element_type)
+        self.elements += 1
+        self.equipment[element_type] += 1
+        if category is not None:
+            self.categories[category] += 1
+        if category == 'bus':
+            self.bus_voltages[_voltage(voltage)] += 1
+
+    def summary(self, digest: str) -> TopologySummary:
+        if not self.categories['bus']:
+            raise ValueError("No buses found in the topology export; check the element type column or tags")
+        return TopologySummary(
+            digest=digest,
+            elements=self.elements,
+            buses=self.categories['bus'],
+            branches=self.categories['branch'],
+            protective_devices=self.categories['protective'],
+            loads=self.categories['load'],
+            sources=self.categories['source'],
+            buses_by_voltage=dict(self.bus_voltages),
+            equipment=dict(self.equipment.most_common()),
+        )
+
+
+def _tally_csv(stream: BinaryIO) -> _Tally:
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', errors='replace', newline='')
+    try:
+        reader = csv.reader(text)
+        header = next(reader, None)
+        if header is None:
+            raise ValueError("The topology export is empty")
+        columns = {_normalise(name): index for index, name in enumerate(header)}
+        type_index = next((columns[name] for name in TYPE_COLUMNS if name in columns), None)
+        if type_index is None:
+            raise ValueError(f"CSV topology export needs an element type column; found {', '.join(header)}")
+        voltage_index = next((columns[name] for name in VOLTAGE_COLUMNS if name in columns), None)
+
+        tally = _Tally()
+        for row in reader:
+            if len(row) > type_index:
+                voltage = row[voltage_index] if voltage_index is not None and len(row) > voltage_index else None
+                tally.add(row[type_index], voltage)
+        return tally
+    finally:
+        # Leave the caller's stream open
+        text.detach()
+
+
+def _tally_xml(stream: BinaryIO) -> _Tally:
+    tally = _Tally()
+    # Open elements, each with whether a network element has been counted inside it
+    open_elements = []
+    try:
+        for event, element in ElementTree.iterparse(stream, events=('start', 'end')):
+            if event == 'start':
+                open_elements.append([element, False])
+                continue
+            container = open_elements.pop()[1]
+            tag = element.tag.rsplit('}', 1)[-1]
+            attributes = {_normalise(name): value for name, value in element.attrib.items()}
+            element_type = attributes.get('type') or tag
+            # Elements with an ID or name are network elements, like CSV rows. Recognised types count
+            # even when other elements nest inside them (breakers under a bus); an unrecognised named
+            # element only counts as a leaf, so wrappers such as <Network Name="Campus"> do not
+            named = 'id' in attributes or 'name' in attributes
+            if named and (not container or _category(element_type) is not None):
+                voltage = next((attributes[name] for name in VOLTAGE_COLUMNS if name in attributes), None)
+                if voltage is None:
+                    voltage = next((child.text for child in element
+                                    if _normalise(child.tag.rsplit('}', 1)[-1]) in VOLTAGE_COLUMNS), None)
+                tally.add(element_type, voltage)
+            if open_elements:
+                if named:
+                    open_elements[-1][1] = True
+                # Drop every finished element so memory stays flat, except plain value
+                # children (<kV>11</kV>), kept until the element that owns them is done
+                if named or container or len(element):
+                    element.clear()
+                    open_elements[-1][0].remove(element)
+    except ElementTree.ParseError as error:
+        raise ValueError(f"Invalid XML topology export: {error}") from None
+    return tally
+
+
+def file_digest(stream: BinaryIO) -> str:
+    """SHA-256 of ``stream``'s remaining bytes; the position is restored afterwards."""
+    position = stream.tell()
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: stream.read(HASH_CHUNK_BYTES), b''):
+        digest.update(chunk)
+    stream.seek(position)
+    return digest.hexdigest()
+
+
+def _detect_format(stream: BinaryIO, name: Optional[str]) -> str:
+    extension = os.path.splitext(name or '')[1].lower()
+    if extension in ('.csv', '.xml'):
+        return extension[1:]
+    position = stream.tell()
+    head = stream.read(512).lstrip(b'\xef\xbb\xbf \t\r\n')
+    stream.seek(position)
+    return 'xml' if head.startswith(b'<') else 'csv'
+
+
+def parse_topology(stream: BinaryIO, file_format: str, digest: str = '') -> TopologySummary:
+    """Count the elements of an export read from a binary stream (uncached)."""
+    if file_format == 'csv':
+        return _tally_csv(stream).summary(digest)
+    if file_format == 'xml':
+        return _tally_xml(stream).summary(digest)
+    raise ValueError(f"Unsupported topology format {file_format!r}; expected csv or xml")
+
+
+topology_cache = LRUCache(maxsize=32)
+
+
+def summarize_topology(source: Union[str, BinaryIO], file_format: Optional[str] = None,
+                       digest: Optional[str] = None) -> TopologySummary:
+    """Summary of a topology export, parsed at most once per distinct file content.
+
+    ``source`` is a path or a seekable binary file object (such as a
+    Streamlit upload). ``file_format`` is detected from the file name or
+    content when omitted; pass ``digest`` when the content hash is already
+    known to skip re-hashing.
+    """
+    if isinstance(source, str):
+        with open(source, 'rb') as stream:
+            return summarize_topology(stream, file_format or _detect_format(stream, source), digest)
+
+    file_format = file_format or _detect_format(source, getattr(source, 'name', None))
+    digest = digest or file_digest(source)
+
+    def parse():
+        position = source.tell()
+        try:
+            return parse_topology(source, file_format, digest)
+        finally:
+            source.seek(position)
+
+    return topology_cache.get_or_compute((digest, file_format), parse)
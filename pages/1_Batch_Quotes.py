@@ -0,0 +1,114 @@
+import re
+import tempfile
+
+import streamlit as st
+
+from dc_estimator.engine import STUDY_KEYS, calculate_enhanced_project_costs
+from dc_estimator.export import EXPORT_FORMATS, write_export_archive
+from dc_estimator.ingest import DEFAULT_CHUNK_ROWS, frame_to_configs, iter_quote_chunks, price_quote_file
+from dc_estimator.ratecard import card_label, default_rate_cards
+
+st.set_page_config(
+    page_title="Batch Quotes | Enhanced DC Cost Estimator v2.0",
+    page_icon="⚡",
+    layout="wide"
+)
+
+st.title("📦 Batch Quotes")
+st.write(
+    "Upload a CSV or Parquet file with one Consolidated project per row. The file is priced in "
+    "chunks with the same engine as the interactive estimator and the standard, competitive and "
+    "savings columns are returned as a download."
+)
+
+with st.expander("📄 Expected columns"):
+    st.markdown(f"""
+- `quote_id` (optional, defaults to the row number)
+- `total_load_mw`, or `it_capacity` / `mechanical_load` / `house_load`
+- `custom_bus_count` (optional override)
+- `tier_level`, `delivery_type`, `project_type`, `client_type`, `report_format`
+- `studies`: `;`-separated keys from {', '.join(f'`{key}`' for key in STUDY_KEYS)} (blank = all)
+- `report_cost_<study>` base report prices
+- `premium_factor`, `report_complexity_factor`, `typical_modeling_factor`, `phase_extension_discount`, `overall_competitive_factor`
+- `etap_discount_factor`, `repeat_discount_factor` (blank = not offered)
+- `additional_costs` (₹)
+""")
+    template = ("quote_id,total_load_mw,tier_level,delivery_type,studies,etap_discount_factor,"
+                "repeat_discount_factor,overall_competitive_factor,additional_costs\n"
+                "Q-001,30,Tier III,Standard,load_flow;short_circuit;pdc;arc_flash,,,0.88,0\n"
+                "Q-002,12.5,Tier IV,Urgent,pdc;arc_flash,0.85,0.88,0.9,15000\n")
+    st.download_button("Download template CSV", template, file_name="batch_quote_template.csv", mime="text/csv")
+
+uploaded = st.file_uploader("Quote file", type=["csv", "parquet"])
+settings_col1, settings_col2, settings_col3 = st.columns(3)
+with settings_col1:
+    output_format = st.selectbox("Output Format", ["csv", "parquet"])
+with settings_col2:
+    chunk_rows = st.number_input("Rows per Chunk", min_value=1000, max_value=100000,
+                                 value=DEFAULT_CHUNK_ROWS, step=1000)
+with settings_col3:
+    rate_cards = {card.version: card for card in default_rate_cards().choices()}
+    rate_card_version = st.selectbox("Rate Card", list(rate_cards),
+                                     index=list(rate_cards).index(default_rate_cards().in_force().version),
+                                     format_func=lambda version: card_label(rate_cards[version]))
+    rate_card = rate_cards[rate_card_version]
+
+if uploaded is not None and st.button("💰 Price Quotes", type="primary"):
+    file_format = "parquet" if uploaded.name.lower().endswith(".parquet") else "csv"
+    progress = st.empty()
+
+    with tempfile.TemporaryFile() as output:
+        try:
+            rows = price_quote_file(uploaded, output, file_format, output_format=output_format,
+                                    chunk_rows=int(chunk_rows), rate_card=rate_card,
+                                    progress=lambda done: progress.info(f"Priced {done:,} quotes…"))
+        except ValueError as error:
+            progress.empty()
+            st.error(f"⚠️ {error}")
+        else:
+            output.seek(0)
+            progress.success(f"✅ Priced {rows:,} quotes")
+            stem = uploaded.name.rsplit(".", 1)[0]
+            st.download_button(
+                "⬇️ Download Priced Quotes",
+                output.read(),
+                file_name=f"{stem}_priced.{output_format}",
+                mime="text/csv" if output_format == "csv" else "application/octet-stream"
+            )
+
+# Client-ready reports for every row, streamed into one zip
+st.markdown("### 🗂️ Quote Reports")
+st.write(
+    "Builds a PDF report and/or Excel workbook per quote and packs them into one zip archive. "
+    "Reports are rendered a few at a time as the file is read, so large files do not pile up in memory."
+)
+report_formats = st.multiselect("Report Formats", list(EXPORT_FORMATS), default=['pdf'],
+                                format_func=lambda export_format: {'pdf': "PDF", 'xlsx': "Excel"}[export_format])
+
+if uploaded is not None and st.button("🗂️ Build Report Archive", disabled=not report_formats):
+    file_format = "parquet" if uploaded.name.lower().endswith(".parquet") else "csv"
+    progress = st.empty()
+
+    def priced_quotes():
+        seen = {}
+        for chunk in iter_quote_chunks(uploaded, file_format, int(chunk_rows)):
+            for quote_id, config in frame_to_configs(chunk, rate_card):
+                # Quote ids become file names inside the archive
+                name = re.sub(r'[^\w.-]+', '_', quote_id).strip('._') or "quote"
+                seen[name] = seen.get(name, 0) + 1
+                yield (name if seen[name] == 1 else f"{name}_{seen[name]}"), config, calculate_enhanced_project_costs(config)
+
+    uploaded.seek(0)
+    with tempfile.TemporaryFile() as output:
+        try:
+            reports = write_export_archive(priced_quotes(), output, report_formats,
+                                           progress=lambda done: progress.info(f"Rendered {done:,} reports…"))
+        except ValueError as error:
+            progress.empty()
+            st.error(f"⚠️ {error}")
+        else:
+            output.seek(0)
+            progress.success(f"✅ Rendered reports for {reports:,} quotes")
+            stem = uploaded.name.rsplit(".", 1)[0]
+            st.download_button("⬇️ Download Report Archive", output.read(), file_name=f"{stem}_reports.zip",
+                               mime="application/zip")
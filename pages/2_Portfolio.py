@@ -0,0 +1,164 @@
+import time
+
+import pandas as pd
+import streamlit as st
+
+from dc_estimator.engine import QuoteConfig
+from dc_estimator.portfolio import LEVELS, Portfolio
+from dc_estimator.ratecard import default_rate_cards
+
+st.set_page_config(
+    page_title="Portfolio | Enhanced DC Cost Estimator v2.0",
+    page_icon="⚡",
+    layout="wide"
+)
+
+st.title("🌐 Multi-site Portfolio")
+st.write(
+    "Price a client's whole estate as portfolio → campus → building → phase. Every phase is priced "
+    "like a Phase-wise phase with the tier, studies and reporting set on the main estimator page, and "
+    "totals roll up at every level. Edits update only the affected branch."
+)
+
+DISCOUNT_CHOICES = {"Inherit": None, "On": True, "Off": False}
+
+# Shared pricing inputs come from the main page's sidebar when it has run this session
+sidebar_inputs = st.session_state.get('sidebar_inputs')
+shared = {key: value for key, value in (sidebar_inputs or {}).items()
+          if key not in ('phases', 'calculation_methodology')}
+shared.setdefault('rate_card', default_rate_cards().in_force())
+if not sidebar_inputs:
+    st.caption("Using default pricing inputs; open the main estimator page to change tier, studies or reports.")
+
+settings_col1, settings_col2, settings_col3 = st.columns(3)
+with settings_col1:
+    overall_competitive_factor = st.slider("Overall Competitive Reduction", 0.75, 0.98, 0.88, 0.01)
+with settings_col2:
+    portfolio_etap = st.toggle("ETAP Model Available (whole portfolio)")
+with settings_col3:
+    portfolio_repeat = st.toggle("Repeat Customer (whole portfolio)")
+
+config = QuoteConfig(**shared, overall_competitive_factor=overall_competitive_factor,
+                     etap_model_available=portfolio_etap, repeat_customer=portfolio_repeat)
+
+with st.expander("📄 Estate file", expanded='portfolio_records' not in st.session_state):
+    st.markdown("Upload a CSV with columns `campus`, `building`, `phase`, `capacity` (MW) and an optional "
+                "`bus_override`, or generate an example estate.")
+    uploaded = st.file_uploader("Estate CSV", type=["csv"])
+    example_col1, example_col2, example_col3, example_col4 = st.columns(4)
+    with example_col1:
+        example_campuses = st.number_input("Campuses", min_value=1, max_value=200, value=5, step=1)
+    with example_col2:
+        example_buildings = st.number_input("Buildings per Campus", min_value=1, max_value=100, value=4, step=1)
+    with example_col3:
+        example_phases = st.number_input("Phases per Building", min_value=1, max_value=100, value=10, step=1)
+    with example_col4:
+        generate = st.button("Generate Example Estate")
+
+    if uploaded is not None and st.session_state.get('portfolio_source') != uploaded.file_id:
+        frame = pd.read_csv(uploaded)
+        missing = {'campus', 'building', 'phase', 'capacity'} - set(frame.columns)
+        if missing:
+            st.error(f"⚠️ Missing column(s): {', '.join(sorted(missing))}")
+        else:
+            st.session_state['portfolio_records'] = frame.to_dict('records')
+            st.session_state['portfolio_source'] = uploaded.file_id
+    elif generate:
+        st.session_state['portfolio_records'] = [
+            {'campus': f"Campus {c+1}", 'building': f"Building {b+1}", 'phase': f"Phase {p+1}",
+             'capacity': round(4 + (c * 7 + b * 3 + p) % 17 * 1.5, 1)}
+            for c in range(example_campuses) for b in range(example_buildings) for p in range(example_phases)
+        ]
+        st.session_state['portfolio_source'] = ('example', example_campuses, example_buildings, example_phases)
+
+records = st.session_state.get('portfolio_records')
+if not records:
+    st.info("Upload an estate file or generate an example to get started.")
+    st.stop()
+
+# Rebuild only when the shared pricing inputs or the estate file change; edits
+# made below are applied incrementally to the stored tree
+build_key = (config, st.session_state['portfolio_source'])
+if st.session_state.get('portfolio_key') != build_key:
+    started = time.perf_counter()
+    st.session_state['portfolio'] = Portfolio.from_records(config, records)
+    st.session_state['portfolio_key'] = build_key
+    st.session_state['portfolio_last_update'] = (f"Built {len(records):,} phases", time.perf_counter() - started)
+portfolio = st.session_state['portfolio']
+
+# Edits
+campuses = portfolio.root.children
+edit_col1, edit_col2 = st.columns(2)
+
+with edit_col1:
+    st.markdown("### 🏷️ Subtree Discounts")
+    campus_names = [campus.name for campus in campuses]
+    campus = campuses[campus_names.index(st.selectbox("Campus", campus_names, key="discount_campus"))]
+    building_names = ["(whole campus)"] + [building.name for building in campus.children]
+    building_choice = st.selectbox("Building", building_names, key="discount_building")
+    target = campus if building_choice == "(whole campus)" else campus.children[building_names.index(building_choice) - 1]
+
+    current = {value: label for label, value in DISCOUNT_CHOICES.items()}
+    etap_choice = st.radio("ETAP Model Discount", list(DISCOUNT_CHOICES), horizontal=True,
+                           index=list(DISCOUNT_CHOICES).index(current[target.etap_model_available]),
+                           key=f"etap_{target.path}")
+    repeat_choice = st.radio("Repeat Customer Discount", list(DISCOUNT_CHOICES), horizontal=True,
+                             index=list(DISCOUNT_CHOICES).index(current[target.repeat_customer]),
+                             key=f"repeat_{target.path}")
+    if (DISCOUNT_CHOICES[etap_choice], DISCOUNT_CHOICES[repeat_choice]) != (target.etap_model_available,
+                                                                          target.repeat_customer):
+        started = time.perf_counter()
+        portfolio.set_discounts(target, etap_model_available=DISCOUNT_CHOICES[etap_choice],
+                                repeat_customer=DISCOUNT_CHOICES[repeat_choice])
+        st.session_state['portfolio_last_update'] = (f"Discounts for {target.path}", time.perf_counter() - started)
+
+with edit_col2:
+    st.markdown("### ✏️ Edit a Phase")
+    edit_campus = campuses[campus_names.index(st.selectbox("Campus", campus_names, key="edit_campus"))]
+    edit_building_names = [building.name for building in edit_campus.children]
+    edit_building = edit_campus.children[edit_building_names.index(
+        st.selectbox("Building", edit_building_names, key="edit_building"))]
+    leaf_names = [leaf.name for leaf in edit_building.children]
+    leaf = edit_building.children[leaf_names.index(st.selectbox("Phase", leaf_names, key="edit_phase"))]
+
+    with st.form("edit_phase_form"):
+        new_capacity = st.number_input("Capacity (MW)", min_value=0.1, max_value=100.0,
+                                       value=float(leaf.phase.capacity), step=0.1)
+        new_override = st.number_input("Bus Override (0 = estimate)", min_value=0, max_value=100000,
+                                       value=int(leaf.phase.bus_override or 0), step=1)
+        if st.form_submit_button("Apply"):
+            started = time.perf_counter()
+            portfolio.update_phase(leaf, capacity=new_capacity, bus_override=int(new_override) or None)
+            st.session_state['portfolio_last_update'] = (f"Updated {leaf.path}", time.perf_counter() - started)
+
+label, seconds = st.session_state['portfolio_last_update']
+st.caption(f"⏱️ {label} in {seconds * 1000:.2f} ms")
+
+# Totals and roll-ups
+totals = portfolio.totals()
+metric_col1, metric_col2, metric_col3, metric_col4 = st.columns(4)
+with metric_col1:
+    st.metric("Total Load", f"{totals['total_load']:,.1f} MW", delta=f"{totals['phases']:,} phases")
+with metric_col2:
+    st.metric("Estimated Buses", f"{totals['estimated_buses']:,}")
+with metric_col3:
+    st.metric("Standard Cost", f"₹{totals['standard_cost']:,.0f}")
+with metric_col4:
+    st.metric("Competitive Cost", f"₹{totals['competitive_cost']:,.0f}",
+              delta=f"-{totals['savings_percentage']:.1f}%", delta_color="inverse")
+
+st.markdown("### 📊 Roll-ups")
+level = st.select_slider("Roll-up Level", options=list(LEVELS[1:]), value="building")
+rows = pd.DataFrame(portfolio.rows(level)).drop(columns=['name'])
+st.dataframe(
+    rows,
+    hide_index=True,
+    width='stretch',
+    column_config={
+        'capacity': st.column_config.NumberColumn("Capacity (MW)", format="%.1f"),
+        'total_hours': st.column_config.NumberColumn("Hours", format="%.0f"),
+        'standard_cost': st.column_config.NumberColumn("Standard (₹)", format="%.0f"),
+        'competitive_cost': st.column_config.NumberColumn("Competitive (₹)", format="%.0f"),
+        'savings': st.column_config.NumberColumn("Savings (₹)", format="%.0f"),
+    },
+)
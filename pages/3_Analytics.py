@@ -0,0 +1,96 @@
+import plotly.graph_objects as go
+import streamlit as st
+
+from dc_estimator.analytics import default_snapshot_dir, snapshot_fingerprint, snapshot_history, summarize
+from dc_estimator.cache import results_cache
+from dc_estimator.history import default_history
+
+st.set_page_config(
+    page_title="Analytics | Enhanced DC Cost Estimator v2.0",
+    page_icon="⚡",
+    layout="wide"
+)
+
+st.title("📈 Quote Analytics")
+st.write(
+    "Trends across every saved quote. Quotes are snapshotted from the history database into "
+    "columnar Arrow files, and the charts are drawn from small pre-aggregated summaries."
+)
+
+snapshot_dir = default_snapshot_dir()
+
+refresh_col1, refresh_col2 = st.columns([1, 3])
+with refresh_col1:
+    refresh = st.button("🔄 Refresh Snapshot", type="primary")
+if refresh:
+    with st.spinner("Snapshotting new quotes…"):
+        added = snapshot_history(default_history(), snapshot_dir)
+    with refresh_col2:
+        st.success(f"Added {added:,} new quotes to the snapshot")
+
+# Summaries only change when a new part file lands, so they are shared across sessions
+fingerprint = snapshot_fingerprint(snapshot_dir)
+summary = results_cache.get_or_compute(('analytics', snapshot_dir, fingerprint), lambda: summarize(snapshot_dir))
+if summary is None:
+    st.info("No quotes in the snapshot yet. Price some quotes on the estimator page, then refresh.")
+    st.stop()
+
+st.caption(f"{summary['quotes']:,} quotes from {summary['first_quote']:%Y-%m-%d} to {summary['last_quote']:%Y-%m-%d}")
+
+layout = dict(template='plotly_dark', paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)')
+
+# Price trends by tier
+st.markdown("### 📅 Price Trends by Tier")
+trend = summary['price_trend'].to_pydict()
+trend_metric = st.radio("Metric", ["Cost per MW", "Cost per Bus", "Competitive Price"], horizontal=True)
+trend_column = {"Cost per MW": 'cost_per_mw_mean', "Cost per Bus": 'cost_per_bus_mean',
+                "Competitive Price": 'competitive_cost_mean'}[trend_metric]
+fig_trend = go.Figure()
+for tier in sorted(set(trend['tier_level'])):
+    rows = [i for i, value in enumerate(trend['tier_level']) if value == tier]
+    fig_trend.add_trace(go.Scatter(x=[trend['month'][i] for i in rows], y=[trend[trend_column][i] for i in rows],
+                                   mode='lines+markers', name=tier))
+fig_trend.update_layout(title=f"Monthly Mean {trend_metric} (₹)", **layout)
+st.plotly_chart(fig_trend, width='stretch')
+
+unit_col1, unit_col2 = st.columns(2)
+
+with unit_col1:
+    # Unit costs by tier
+    units = summary['unit_costs'].to_pydict()
+    fig_units = go.Figure()
+    fig_units.add_trace(go.Bar(name='Mean ₹/MW', x=units['tier_level'], y=units['cost_per_mw_mean'], marker_color='#00d4aa'))
+    fig_units.add_trace(go.Bar(name='Median ₹/MW', x=units['tier_level'], y=units['cost_per_mw_approximate_median'],
+                               marker_color='#0ea5e9'))
+    fig_units.add_trace(go.Bar(name='Mean ₹/Bus', x=units['tier_level'], y=units['cost_per_bus_mean'], marker_color='#ff6b6b'))
+    fig_units.update_layout(title="Unit Costs by Tier", barmode='group', **layout)
+    st.plotly_chart(fig_units, width='stretch')
+
+with unit_col2:
+    # Savings distribution by client type
+    savings = summary['savings_distribution'].to_pydict()
+    fig_savings = go.Figure()
+    for client_type, color in zip(sorted(set(savings['client_type'])), ['#00d4aa', '#feca57']):
+        rows = [i for i, value in enumerate(savings['client_type']) if value == client_type]
+        fig_savings.add_trace(go.Bar(name=client_type, x=[savings['savings_bin'][i] for i in rows],
+                                     y=[savings['id_count'][i] for i in rows], marker_color=color, opacity=0.75))
+    fig_savings.update_layout(title="Savings % Distribution by Client Type", barmode='overlay',
+                              xaxis_title="Savings (%)", yaxis_title="Quotes", **layout)
+    st.plotly_chart(fig_savings, width='stretch')
+
+# Phase extension vs fresh project
+st.markdown("### 🏗️ Phase Extension vs Fresh Project")
+project_types = summary['project_types'].to_pandas().rename(columns={
+    'project_type': 'Project Type', 'id_count': 'Quotes', 'total_load_mean': 'Mean Load (MW)',
+    'cost_per_mw_mean': 'Mean ₹/MW', 'cost_per_bus_mean': 'Mean ₹/Bus', 'savings_percentage_mean': 'Mean Savings (%)'})
+st.dataframe(
+    project_types,
+    hide_index=True,
+    width='stretch',
+    column_config={
+        'Mean Load (MW)': st.column_config.NumberColumn(format="%.1f"),
+        'Mean ₹/MW': st.column_config.NumberColumn(format="%.0f"),
+        'Mean ₹/Bus': st.column_config.NumberColumn(format="%.0f"),
+        'Mean Savings (%)': st.column_config.NumberColumn(format="%.1f"),
+    },
+)
@@ -0,0 +1,121 @@
+import os
+from datetime import date
+
+import pandas as pd
+import streamlit as st
+
+from dc_estimator.calibration import calibrate, read_timesheets
+from dc_estimator.engine import RESOURCE_LEVELS, STUDIES_DATA, STUDY_KEYS, TIER_LEVELS
+from dc_estimator.ratecard import card_label, default_rate_cards, write_rate_card
+
+st.set_page_config(
+    page_title="Calibration | Enhanced DC Cost Estimator v2.0",
+    page_icon="⚡",
+    layout="wide"
+)
+
+st.title("🎯 Rate Card Calibration")
+st.write(
+    "Fit hours per bus, tier complexity and the L1/L2/L3 split to the hours actually booked on past "
+    "projects. The fitted coefficients are saved as a new rate card, which the estimator picks up "
+    "from its effective date."
+)
+
+with st.expander("📄 Expected columns"):
+    st.markdown(f"""
+- `study`: one of {', '.join(f'`{key}`' for key in STUDY_KEYS)} or its display name
+- `tier_level`, `buses`
+- `l1_hours`, `l2_hours`, `l3_hours`, or `level` (L1/L2/L3) plus `hours`
+- `project_id` (optional): rows are summed per project and study, so raw timesheet entries can be uploaded as exported
+- `delivery_type`, `typical_modeling_factor` (optional)
+""")
+
+registry = default_rate_cards()
+uploaded = st.file_uploader("Timesheet file", type=["csv", "parquet"])
+settings_col1, settings_col2, settings_col3 = st.columns(3)
+with settings_col1:
+    rate_cards = {card.version: card for card in registry.choices()}
+    base_version = st.selectbox("Base Rate Card", list(rate_cards),
+                                index=list(rate_cards).index(registry.in_force().version),
+                                format_func=lambda version: card_label(rate_cards[version]))
+    base = rate_cards[base_version]
+with settings_col2:
+    new_version = st.text_input("New Version", placeholder="e.g. 2025-Q3")
+with settings_col3:
+    # A calibrated card should take effect from the next quarter, not reprice quotes already sent
+    today = date.today()
+    next_quarter = (date(today.year + 1, 1, 1) if today.month > 9
+                    else date(today.year, (today.month - 1) // 3 * 3 + 4, 1))
+    effective_from = st.date_input("Effective From", value=next_quarter)
+robust = st.checkbox("Down-weight outlier projects (Huber)", value=True,
+                     help="Projects with rework or scope changes pull a plain least-squares fit; "
+                          "the robust fit limits their influence.")
+
+if uploaded is not None and st.button("🎯 Calibrate", type="primary"):
+    file_format = "parquet" if uploaded.name.lower().endswith(".parquet") else "csv"
+    progress = st.empty()
+    try:
+        data = read_timesheets(uploaded, file_format,
+                               progress=lambda done: progress.info(f"Read {done:,} timesheet rows…"))
+        st.session_state['calibration'] = (calibrate(data, base, robust=robust), data, base)
+    except ValueError as error:
+        st.session_state.pop('calibration', None)
+        progress.empty()
+        st.error(f"⚠️ {error}")
+    else:
+        progress.success(f"✅ Fitted {len(data):,} observations from {data.rows_read:,} rows "
+                         f"({data.rows_skipped:,} skipped)")
+
+if 'calibration' in st.session_state:
+    result, data, fitted_base = st.session_state['calibration']
+
+    metric_col1, metric_col2, metric_col3, metric_col4, metric_col5 = st.columns(5)
+    metric_col1.metric("Observations", f"{result.observations:,}")
+    metric_col2.metric("R² (log hours/bus)", f"{result.r_squared:.3f}")
+    metric_col3.metric("Predicted / Booked Hours", f"{result.predicted_to_actual:.1%}",
+                       help=f"Hours per bus include a ×{result.smearing:.3f} smearing correction for the log fit")
+    metric_col4.metric("Median Error", f"{result.median_abs_error:.1%}")
+    metric_col5.metric("Down-weighted", f"{result.downweighted:.1%}")
+    if result.unobserved:
+        st.caption(f"No data for {', '.join(result.unobserved)}; kept from {card_label(fitted_base)}.")
+
+    coefficient_col1, coefficient_col2, coefficient_col3 = st.columns(3)
+    with coefficient_col1:
+        st.markdown("#### Hours per Bus")
+        st.dataframe(pd.DataFrame({
+            'Study': [STUDIES_DATA[key]['name'] for key in STUDY_KEYS],
+            'Current': [fitted_base.base_hours_per_bus[key] for key in STUDY_KEYS],
+            'Calibrated': [result.base_hours_per_bus[key] for key in STUDY_KEYS],
+        }), hide_index=True, width='stretch')
+    with coefficient_col2:
+        st.markdown("#### Tier Complexity")
+        st.dataframe(pd.DataFrame({
+            'Tier': TIER_LEVELS,
+            'Current': [fitted_base.tier_complexity[tier] for tier in TIER_LEVELS],
+            'Calibrated': [result.tier_complexity[tier] for tier in TIER_LEVELS],
+        }), hide_index=True, width='stretch')
+    with coefficient_col3:
+        st.markdown("#### Resource Split")
+        st.dataframe(pd.DataFrame({
+            'Level': RESOURCE_LEVELS,
+            'Current': [fitted_base.resource_split[level] for level in RESOURCE_LEVELS],
+            'Calibrated': [result.resource_split[level] for level in RESOURCE_LEVELS],
+        }), hide_index=True, width='stretch')
+
+    st.markdown("#### Residuals by Study and Tier")
+    st.dataframe(result.residuals.style.format({
+        'actual_hours_per_bus': '{:.3f}', 'fitted_hours_per_bus': '{:.3f}', 'base_hours_per_bus': '{:.3f}',
+        'median_abs_error': '{:.1%}', 'mean_log_residual': '{:+.3f}', 'downweighted': '{:.1%}',
+    }), hide_index=True, width='stretch')
+
+    if st.button("💾 Save as Rate Card", disabled=not new_version.strip()):
+        version = new_version.strip()
+        path = os.path.join(registry.directory, f"{version}.json")
+        try:
+            if os.path.exists(path) or version in registry.versions():
+                raise ValueError(f"Rate card {version} already exists")
+            write_rate_card(result.rate_card(fitted_base, version, effective_from.isoformat()), path)
+        except (OSError, ValueError) as error:
+            st.error(f"⚠️ {error}")
+        else:
+            st.success(f"✅ Saved rate card {version}, in force from {effective_from:%Y-%m-%d}")
@@ -0,0 +1,205 @@
+import time
+from datetime import date, timedelta
+
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+
+from dc_estimator.cache import memoized_costs
+from dc_estimator.engine import RESOURCE_LEVELS, QuoteConfig
+from dc_estimator.history import default_history, format_timestamp
+from dc_estimator.ratecard import default_rate_cards
+from dc_estimator.scheduling import (
+    DEFAULT_LEAD_WEEKS,
+    SECONDS_PER_WEEK,
+    StaffingProject,
+    TeamCapacity,
+    project_from_quote,
+    project_from_record,
+    schedule,
+    urgency_surcharge,
+)
+
+st.set_page_config(
+    page_title="Staffing | Enhanced DC Cost Estimator v2.0",
+    page_icon="⚡",
+    layout="wide"
+)
+
+st.title("👷 Staffing Plan")
+st.write(
+    "Check whether the team can deliver the awarded quotes. Each quote's hours are split into L1/L2/L3 "
+    "work as priced, scheduled earliest-deadline-first against weekly capacity, and the quote on the "
+    "main estimator page is priced for the overtime it would cause."
+)
+
+registry = default_rate_cards()
+
+# Team capacity
+st.markdown("### 🧑‍🔧 Team Capacity")
+team_col1, team_col2, team_col3, team_col4, team_col5 = st.columns(5)
+with team_col1:
+    l1_engineers = st.number_input("L1 Engineers", min_value=0, max_value=500, value=2, step=1)
+with team_col2:
+    l2_engineers = st.number_input("L2 Engineers", min_value=0, max_value=500, value=4, step=1)
+with team_col3:
+    l3_engineers = st.number_input("L3 Engineers", min_value=0, max_value=500, value=8, step=1)
+with team_col4:
+    hours_per_week = st.number_input("Hours per Engineer-Week", min_value=1.0, max_value=80.0, value=40.0, step=1.0)
+with team_col5:
+    max_share = st.slider("Max Share of a Level per Project", 0.1, 1.0, 0.5, 0.05,
+                          help="The largest share of one level's weekly hours a single project can use")
+team = TeamCapacity({"L1": l1_engineers, "L2": l2_engineers, "L3": l3_engineers}, hours_per_week, max_share)
+
+# Awarded quotes from the history database
+st.markdown("### 📋 Awarded Quotes")
+st.caption("Every priced what-if is saved as a quote, so only quotes marked **Awarded** are planned. The list shows "
+           "each client's latest quote in the window plus every quote already awarded; ticks are saved for the team.")
+window_col1, window_col2 = st.columns(2)
+with window_col1:
+    window_weeks = st.number_input("Quotes Saved in the Last (weeks)", min_value=1, max_value=104, value=12, step=1)
+with window_col2:
+    max_quotes = st.number_input("Maximum Quotes", min_value=10, max_value=2000, value=300, step=10)
+
+now = time.time()
+history = default_history()
+since = now - window_weeks * SECONDS_PER_WEEK
+candidates = {summary['id']: summary for summary in history.search(since=since, awarded=True, limit=int(max_quotes))}
+for summary in history.search(since=since, latest_per_client=True, limit=int(max_quotes)):
+    candidates.setdefault(summary['id'], summary)
+summaries = sorted(candidates.values(), key=lambda summary: summary['created_at'], reverse=True)[:int(max_quotes)]
+
+# Stored quotes never change, so each one's inputs and results are loaded once per session
+records = st.session_state.setdefault('staffing_records', {})
+for summary in summaries:
+    if summary['id'] not in records:
+        records[summary['id']] = history.load(summary['id'])
+
+projects = []
+for summary in summaries:
+    record = records[summary['id']]
+    try:
+        rate_card = registry.get(record['inputs'].get('rate_card', ''))
+    except ValueError:
+        rate_card = registry.in_force()
+    name = f"#{summary['id']} {summary['client'] or 'Unnamed'} ({format_timestamp(summary['created_at'])})"
+    projects.append(project_from_record(name, record, now, rate_card))
+
+if projects:
+    edited = st.data_editor(
+        pd.DataFrame({
+            'awarded': [bool(summary['awarded']) for summary in summaries],
+            'project': [project.name for project in projects],
+            'delivery_type': [project.delivery_type for project in projects],
+            'total_hours': [project.total_hours for project in projects],
+            'deadline_week': [project.deadline for project in projects],
+        }),
+        hide_index=True,
+        width='stretch',
+        disabled=['project', 'delivery_type', 'total_hours'],
+        column_config={
+            'awarded': st.column_config.CheckboxColumn("Awarded"),
+            'total_hours': st.column_config.NumberColumn("Hours", format="%.0f"),
+            'deadline_week': st.column_config.NumberColumn("Due (week)", min_value=1, step=1),
+        },
+        key="staffing_quotes",
+    )
+    for summary, awarded in zip(summaries, edited['awarded']):
+        if bool(awarded) != bool(summary['awarded']):
+            history.set_awarded(summary['id'], bool(awarded))
+            summary['awarded'] = int(bool(awarded))
+    projects = [StaffingProject(project.name, project.hours, int(deadline), project.release, project.delivery_type)
+                for project, awarded, deadline in zip(projects, edited['awarded'], edited['deadline_week'])
+                if awarded]
+    if not projects:
+        st.info("No quotes marked as awarded yet: the plan below only covers the current quote.")
+else:
+    st.info("No quotes saved in this window. Price quotes on the estimator page to add them.")
+
+try:
+    started = time.perf_counter()
+    plan = schedule(projects, team)
+    plan_seconds = time.perf_counter() - started
+except ValueError as error:
+    st.error(f"⚠️ {error}")
+    st.stop()
+
+plan_start = date.today() - timedelta(days=date.today().weekday())
+
+
+def week_date(week):
+    return None if week is None else plan_start + timedelta(weeks=week)
+
+
+# Plan summary
+st.markdown("### 📅 Delivery Timeline")
+st.caption(f"⏱️ Planned {len(projects):,} projects in {plan_seconds * 1000:.1f} ms; week 0 starts {plan_start:%Y-%m-%d}")
+utilization = plan.utilization()
+metric_col1, metric_col2, metric_col3, metric_col4, metric_col5 = st.columns(5)
+metric_col1.metric("Projects Late", f"{plan.late_projects:,} / {len(projects):,}")
+metric_col2.metric("All Work Done", f"{plan.weeks} weeks")
+for column, level in zip((metric_col3, metric_col4, metric_col5), RESOURCE_LEVELS):
+    column.metric(f"{level} Utilization", f"{utilization[level]:.0%}")
+
+if projects:
+    rows = pd.DataFrame(plan.rows())
+    rows['start'] = [week_date(week) for week in rows['start_week']]
+    rows['finish'] = [week_date(week) for week in rows['finish_week']]
+    rows['due'] = [week_date(week) for week in rows['deadline_week']]
+    st.dataframe(
+        rows.sort_values(['weeks_late', 'deadline_week'], ascending=[False, True]),
+        hide_index=True,
+        width='stretch',
+        column_order=['project', 'delivery_type', 'l1_hours', 'l2_hours', 'l3_hours', 'start', 'finish', 'due',
+                      'weeks_late', 'tardy_hours'],
+        column_config={
+            'l1_hours': st.column_config.NumberColumn("L1 Hours", format="%.0f"),
+            'l2_hours': st.column_config.NumberColumn("L2 Hours", format="%.0f"),
+            'l3_hours': st.column_config.NumberColumn("L3 Hours", format="%.0f"),
+            'tardy_hours': st.column_config.NumberColumn("Hours Past Due", format="%.0f"),
+        },
+    )
+
+    weekly = plan.weekly_utilization()
+    fig_utilization = go.Figure()
+    for level in RESOURCE_LEVELS:
+        fig_utilization.add_trace(go.Scatter(x=[week_date(week) for week in range(plan.weeks)],
+                                             y=[share * 100 for share in weekly[level]], mode='lines', name=level))
+    fig_utilization.update_layout(title="Weekly Utilization by Level (%)", template='plotly_dark',
+                                  paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)')
+    st.plotly_chart(fig_utilization, width='stretch')
+
+# The quote on the main page, priced for the overtime it adds
+st.markdown("### ⚡ Urgency Surcharge for the Current Quote")
+sidebar_inputs = st.session_state.get('sidebar_inputs')
+if not sidebar_inputs:
+    st.info("Open the main estimator page to set up a quote, then come back to check it against the plan.")
+    st.stop()
+try:
+    config = QuoteConfig(**sidebar_inputs)
+except ValueError as error:
+    st.warning(f"⚠️ {error}")
+    st.stop()
+
+quote_col1, quote_col2 = st.columns(2)
+with quote_col1:
+    start_week = st.number_input("Start (week)", min_value=0, max_value=104, value=0, step=1)
+with quote_col2:
+    lead_weeks = st.number_input("Delivery Time (weeks)", min_value=1, max_value=104,
+                                 value=DEFAULT_LEAD_WEEKS[config.delivery_type], step=1)
+quote = project_from_quote("Current quote", config, memoized_costs(config), deadline=start_week + lead_weeks,
+                           release=start_week)
+surcharge = urgency_surcharge(projects, team, quote, config.rate_card, baseline=plan)
+
+urgent_multiplier = config.rate_card.delivery_multipliers["Urgent"]
+surcharge_col1, surcharge_col2, surcharge_col3, surcharge_col4 = st.columns(4)
+surcharge_col1.metric("Delivered", f"{week_date(surcharge.finish):%Y-%m-%d}" if surcharge.finish is not None else "—",
+                      delta="on time" if surcharge.on_time else "late",
+                      delta_color="normal" if surcharge.on_time else "inverse")
+surcharge_col2.metric("Overtime Hours", f"{sum(surcharge.overtime_hours.values()):,.0f}")
+surcharge_col3.metric("Overtime Cost", f"₹{surcharge.overtime_cost:,.0f}")
+surcharge_col4.metric("Derived Labour Multiplier", f"{surcharge.multiplier:.2f}×",
+                      delta=f"flat Urgent: {urgent_multiplier:.2f}×", delta_color="off")
+if surcharge.displaced:
+    st.warning(f"Taking this quote on makes {len(surcharge.displaced)} awarded quote(s) late: "
+               + ", ".join(surcharge.displaced[:10]) + ("…" if len(surcharge.displaced) > 10 else ""))
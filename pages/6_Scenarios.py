@@ -0,0 +1,195 @@
+import time
+
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+
+from dc_estimator.engine import (
+    CLIENT_TYPES,
+    DELIVERY_TYPES,
+    METHODOLOGIES,
+    PROJECT_TYPES,
+    REPORT_FORMATS,
+    TIER_LEVELS,
+    QuoteConfig,
+)
+from dc_estimator.ratecard import default_rate_cards
+from dc_estimator.scenarios import ScenarioWorkspace
+
+st.set_page_config(
+    page_title="Scenarios | Enhanced DC Cost Estimator v2.0",
+    page_icon="⚡",
+    layout="wide"
+)
+
+st.title("🧪 Scenario Comparison")
+st.write(
+    "Save configurations from the estimator page (or generate what-ifs here) and compare them side by side. "
+    "All scenarios are priced in one batched engine call, and only scenarios whose inputs changed are re-priced."
+)
+
+workspace = st.session_state.setdefault('scenario_workspace', ScenarioWorkspace())
+grid_version = st.session_state.setdefault('scenario_grid_version', 0)
+
+
+def refresh_grid():
+    # The editor's pending edits refer to row positions, so start a fresh editor after applying them
+    st.session_state['scenario_grid_version'] += 1
+    st.rerun()
+
+
+if not workspace:
+    st.info("No scenarios yet. Use **Save as Scenario** on the estimator page, or start from the current inputs.")
+    if st.button("➕ Start from Current Inputs", type="primary"):
+        sidebar_inputs = st.session_state.get('sidebar_inputs') or {}
+        shared = dict(sidebar_inputs)
+        shared.setdefault('rate_card', default_rate_cards().in_force())
+        try:
+            workspace.save("Baseline", QuoteConfig(**shared))
+        except ValueError as error:
+            st.error(f"⚠️ {error}")
+        else:
+            refresh_grid()
+    st.stop()
+
+# Baseline and what-ifs
+control_col1, control_col2, control_col3 = st.columns([2, 1, 1])
+with control_col1:
+    baseline = st.selectbox("Baseline", workspace.names, index=workspace.names.index(workspace.baseline))
+    workspace.baseline = baseline
+with control_col2:
+    st.write("")
+    if st.button("✨ Add What-ifs of Baseline", width='stretch',
+                 help="ETAP model and repeat customer flipped, every other report format, and the other methodology"):
+        for name, config in workspace.variants(baseline).items():
+            workspace.save(name, config)
+        refresh_grid()
+with control_col3:
+    st.write("")
+    if st.button("🗑️ Clear All", width='stretch'):
+        workspace.clear()
+        refresh_grid()
+
+# Editable scenario grid: each edited row changes only that scenario
+st.markdown("### ✏️ Scenarios")
+GRID_FIELDS = ('tier_level', 'delivery_type', 'calculation_methodology', 'project_type', 'client_type',
+               'report_format', 'etap_model_available', 'repeat_customer', 'overall_competitive_factor',
+               'additional_costs')
+grid = pd.DataFrame([{'name': name, 'remove': False, 'total_load': config.total_load,
+                      **{field: getattr(config, field) for field in GRID_FIELDS}} for name, config in workspace])
+edited = st.data_editor(
+    grid,
+    key=f"scenario_grid_{grid_version}",
+    hide_index=True,
+    width='stretch',
+    disabled=['total_load'],
+    column_config={
+        'name': st.column_config.TextColumn("Scenario", required=True),
+        'remove': st.column_config.CheckboxColumn("Remove"),
+        'total_load': st.column_config.NumberColumn("Load (MW)", format="%.1f"),
+        'tier_level': st.column_config.SelectboxColumn("Tier", options=TIER_LEVELS, required=True),
+        'delivery_type': st.column_config.SelectboxColumn("Delivery", options=DELIVERY_TYPES, required=True),
+        'calculation_methodology': st.column_config.SelectboxColumn("Method", options=METHODOLOGIES, required=True),
+        'project_type': st.column_config.SelectboxColumn("Project", options=PROJECT_TYPES, required=True),
+        'client_type': st.column_config.SelectboxColumn("Client", options=CLIENT_TYPES, required=True),
+        'report_format': st.column_config.SelectboxColumn("Report", options=REPORT_FORMATS, required=True),
+        'etap_model_available': st.column_config.CheckboxColumn("ETAP Model"),
+        'repeat_customer': st.column_config.CheckboxColumn("Repeat"),
+        'overall_competitive_factor': st.column_config.NumberColumn("Competitive Factor", min_value=0.75,
+                                                                    max_value=0.98, step=0.01, format="%.2f"),
+        'additional_costs': st.column_config.NumberColumn("Additional (₹)", min_value=0, step=1000, format="%.0f"),
+    },
+)
+
+changed = False
+errors = []
+for (_, original), (_, row) in zip(grid.iterrows(), edited.iterrows()):
+    name = original['name']
+    if row['remove']:
+        workspace.remove(name)
+        changed = True
+        continue
+    updates = {field: row[field].item() if hasattr(row[field], 'item') else row[field]
+               for field in GRID_FIELDS if row[field] != original[field]}
+    try:
+        if updates:
+            workspace.update(name, **updates)
+            changed = True
+        if row['name'] != name:
+            workspace.rename(name, row['name'])
+            changed = True
+    except ValueError as error:
+        errors.append(f"{name}: {error}")
+for error in errors:
+    st.error(f"⚠️ {error}")
+if changed and not errors:
+    refresh_grid()
+
+# Comparison matrix against the baseline
+st.markdown("### 📊 Comparison")
+started = time.perf_counter()
+rows = workspace.comparison(baseline)
+st.caption(f"⏱️ Priced {workspace.last_priced} of {len(workspace)} scenarios in "
+           f"{(time.perf_counter() - started) * 1000:.1f} ms; the rest were unchanged")
+
+comparison = pd.DataFrame(rows)
+display_columns = ['scenario', 'standard_cost', 'standard_cost_delta_pct', 'competitive_cost',
+                   'competitive_cost_delta', 'competitive_cost_delta_pct', 'savings', 'savings_delta',
+                   'total_hours', 'total_hours_delta_pct', 'estimated_buses', 'changes']
+
+
+def delta_color(value):
+    # Cheaper or fewer hours than the baseline is good news
+    if pd.isna(value) or abs(value) < 1e-9:
+        return ""
+    return "color: #00d4aa" if value < 0 else "color: #ff6b6b"
+
+
+def savings_color(value):
+    return delta_color(-value) if not pd.isna(value) else ""
+
+
+styled = (comparison[display_columns].style
+          .map(delta_color, subset=['standard_cost_delta_pct', 'competitive_cost_delta',
+                                    'competitive_cost_delta_pct', 'total_hours_delta_pct'])
+          .map(savings_color, subset=['savings_delta'])
+          .apply(lambda column: ['font-weight: 700' if is_baseline else '' for is_baseline in comparison['baseline']],
+                 subset=['scenario'])
+          .format({
+              'standard_cost': "₹{:,.0f}", 'competitive_cost': "₹{:,.0f}", 'savings': "₹{:,.0f}",
+              'competitive_cost_delta': "{:+,.0f}", 'savings_delta': "{:+,.0f}",
+              'standard_cost_delta_pct': "{:+.1f}%", 'competitive_cost_delta_pct': "{:+.1f}%",
+              'total_hours_delta_pct': "{:+.1f}%", 'total_hours': "{:,.0f}", 'estimated_buses': "{:,}",
+          }, na_rep="—"))
+st.dataframe(
+    styled,
+    hide_index=True,
+    width='stretch',
+    column_config={
+        'scenario': "Scenario",
+        'standard_cost': "Standard",
+        'standard_cost_delta_pct': "Δ Standard",
+        'competitive_cost': "Competitive",
+        'competitive_cost_delta': "Δ Competitive (₹)",
+        'competitive_cost_delta_pct': "Δ Competitive",
+        'savings': "Savings",
+        'savings_delta': "Δ Savings (₹)",
+        'total_hours': "Hours",
+        'total_hours_delta_pct': "Δ Hours",
+        'estimated_buses': "Buses",
+        'changes': st.column_config.TextColumn("Changes vs Baseline", width="large"),
+    },
+)
+
+fig_scenarios = go.Figure()
+fig_scenarios.add_trace(go.Bar(name='Standard', x=comparison['scenario'], y=comparison['standard_cost'],
+                               marker_color='#00d4aa'))
+fig_scenarios.add_trace(go.Bar(name='Competitive', x=comparison['scenario'], y=comparison['competitive_cost'],
+                               marker_color='#ff6b6b'))
+fig_scenarios.add_hline(y=float(comparison.loc[comparison['baseline'], 'competitive_cost'].iloc[0]),
+                        line_dash='dot', annotation_text="Baseline competitive")
+fig_scenarios.update_layout(title="Scenario Prices (₹)", barmode='group', template='plotly_dark',
+                            paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)')
+st.plotly_chart(fig_scenarios, width='stretch')
+st.download_button("⬇️ Download Comparison (CSV)", comparison.to_csv(index=False), file_name="scenario_comparison.csv",
+                   mime="text/csv")
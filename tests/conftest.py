@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Run from anywhere without installing the package, like the benchmarks
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
@@ -0,0 +1,46 @@
+import io
+import itertools
+import math
+
+import pandas as pd
+import pytest
+
+from dc_estimator.calibration import calibrate, read_timesheets
+from dc_estimator.engine import BUILTIN_RATE_CARD
+
+HOURS_PER_BUS = {'load_flow': 1.2, 'short_circuit': 0.6, 'pdc': 2.0, 'arc_flash': 0.9}
+TIER_COMPLEXITY = {'Tier II': BUILTIN_RATE_CARD.tier_complexity['Tier II'], 'Tier III': 1.5, 'Tier IV': 2.25}
+
+
+def timesheets(**overrides) -> bytes:
+    rows = []
+    for (study, per_bus), (tier, complexity), buses in itertools.product(
+            HOURS_PER_BUS.items(), TIER_COMPLEXITY.items(), (20, 45, 80)):
+        hours = buses * per_bus * complexity
+        rows.append({'study': study, 'tier_level': tier, 'buses': buses,
+                     'l1_hours': hours * 0.2, 'l2_hours': hours * 0.3, 'l3_hours': hours * 0.5})
+    rows.append({'study': "harmonics", 'tier_level': "Tier III", 'buses': 10,
+                 'l1_hours': 1.0, 'l2_hours': 1.0, 'l3_hours': 1.0})
+    return pd.DataFrame(rows).assign(**overrides).to_csv(index=False).encode()
+
+
+def test_exact_timesheets_recover_the_coefficients():
+    data = read_timesheets(io.BytesIO(timesheets()), 'csv')
+    assert (data.rows_read, data.rows_skipped, len(data)) == (37, 1, 36)
+    result = calibrate(data, BUILTIN_RATE_CARD)
+    for study, per_bus in HOURS_PER_BUS.items():
+        assert result.base_hours_per_bus[study] == pytest.approx(per_bus, rel=1e-3)
+    for tier, complexity in TIER_COMPLEXITY.items():
+        assert result.tier_complexity[tier] == pytest.approx(complexity, rel=1e-3)
+    assert result.resource_split == pytest.approx({'L1': 0.2, 'L2': 0.3, 'L3': 0.5})
+    assert result.unobserved == ('Tier I',)
+    assert math.isclose(result.predicted_to_actual, 1.0, rel_tol=1e-6)
+
+
+def test_urgent_jobs_are_divided_out():
+    urgent = BUILTIN_RATE_CARD.delivery_multipliers['Urgent']
+    frame = pd.read_csv(io.BytesIO(timesheets()))
+    for column in ('l1_hours', 'l2_hours', 'l3_hours'):
+        frame[column] *= urgent
+    data = read_timesheets(io.BytesIO(frame.assign(delivery_type="Urgent").to_csv(index=False).encode()), 'csv')
+    assert calibrate(data, BUILTIN_RATE_CARD).base_hours_per_bus['pdc'] == pytest.approx(2.0, rel=1e-3)
@@ -0,0 +1,46 @@
+import json
+
+import pytest
+
+from dc_estimator.cli import main
+from dc_estimator.engine import BUILTIN_RATE_CARD, Phase, QuoteConfig, calculate_enhanced_project_costs
+
+
+def run_json(capsys, *argv):
+    assert main([*argv, '--rate-card', BUILTIN_RATE_CARD.version, '--json']) == 0
+    return json.loads(capsys.readouterr().out)
+
+
+def test_flags_price_like_the_engine(capsys):
+    results = run_json(capsys, '--it-capacity', '20', '--tier-level', "Tier IV", '--repeat-customer',
+                       '--studies', 'load_flow,pdc')
+    expected = calculate_enhanced_project_costs(QuoteConfig(
+        it_capacity=20.0, tier_level="Tier IV", repeat_customer=True, selected_studies=("load_flow", "pdc")))
+    assert results['competitive_cost'] == pytest.approx(expected['competitive_cost'])
+    assert set(results['studies']) == {"load_flow", "pdc"}
+
+
+def test_phase_flags_imply_phase_wise(capsys):
+    results = run_json(capsys, '--phase', 'Hall A=12', '--phase', 'Hall B=8:40')
+    expected = calculate_enhanced_project_costs(QuoteConfig(
+        calculation_methodology="Phase-wise", phases=(Phase("Hall A", 12.0), Phase("Hall B", 8.0, 40))))
+    assert [phase['buses'] for phase in results['phase_results']] == [
+        phase['buses'] for phase in expected['phase_results']]
+    assert results['standard_cost'] == pytest.approx(expected['standard_cost'])
+
+
+def test_flags_override_the_config_file(tmp_path, capsys):
+    path = tmp_path / "quote.json"
+    path.write_text(json.dumps({'it_capacity': 50, 'delivery_type': "Urgent"}))
+    results = run_json(capsys, '--config', str(path), '--it-capacity', '10')
+    expected = calculate_enhanced_project_costs(QuoteConfig(it_capacity=10.0, delivery_type="Urgent"))
+    assert results['standard_cost'] == pytest.approx(expected['standard_cost'])
+
+
+def test_invalid_config_file_is_a_usage_error(tmp_path, capsys):
+    path = tmp_path / "quote.json"
+    path.write_text(json.dumps({'it_capacity': "abc"}))
+    with pytest.raises(SystemExit) as exit_info:
+        main(['--config', str(path)])
+    assert exit_info.value.code == 2
+    assert "it_capacity must be a non-negative number" in capsys.readouterr().err
@@ -0,0 +1,38 @@
+import io
+import zipfile
+
+import pytest
+
+from dc_estimator.engine import Phase, QuoteConfig, calculate_enhanced_project_costs
+from dc_estimator.export import quote_report, submit_export, write_export_archive
+
+PHASE_WISE = QuoteConfig(calculation_methodology="Phase-wise", phases=(Phase("P1", 10.0), Phase("P2", 0.0, 0)),
+                         etap_model_available=True, etap_discount_factor=0.9, additional_costs=5000.0)
+
+
+def test_phase_wise_report_sums_studies_over_phases():
+    results = calculate_enhanced_project_costs(PHASE_WISE)
+    report = quote_report(PHASE_WISE, results, client="Acme")
+    assert [row[0] for row in report.phase_rows] == ["P1", "P2"]
+    # A phase without buses has no cost per bus
+    assert report.phase_rows[1][6] is None
+    assert sum(row[5] for row in report.study_rows) == pytest.approx(
+        sum(phase['total_cost'] for phase in results['phase_results']))
+    assert ("ETAP Model Discount", "10%") in report.reductions
+    assert report.additional_rows == [("Additional Costs", 5000.0)]
+    assert report.chart_names == ["P1", "P2"]
+
+
+def test_rendered_files_and_archive():
+    config = QuoteConfig(it_capacity=20.0)
+    results = calculate_enhanced_project_costs(config)
+    assert submit_export(config, results, 'pdf').result(timeout=60).startswith(b"%PDF")
+    assert submit_export(config, results, 'xlsx').result(timeout=60).startswith(b"PK")
+    with pytest.raises(ValueError, match="Unsupported export format"):
+        submit_export(config, results, 'docx')
+
+    output = io.BytesIO()
+    quotes = ((f"quote-{index}", config, results) for index in range(3))
+    assert write_export_archive(quotes, output) == 3
+    assert sorted(zipfile.ZipFile(output).namelist()) == [
+        f"quote-{index}.{extension}" for index in range(3) for extension in ("pdf", "xlsx")]
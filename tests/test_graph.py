@@ -0,0 +1,40 @@
+from dataclasses import replace
+
+from dc_estimator.engine import Phase, QuoteConfig, calculate_enhanced_project_costs
+from dc_estimator.graph import QuoteGraph
+
+PHASES = (Phase("P1", 10.0), Phase("P2", 20.0), Phase("P3", 5.0))
+CONSOLIDATED_CHAIN = ('study[', 'hours[', 'total_cost[', 'labor_cost[', 'consolidated_')
+
+
+def priced_graph(config):
+    graph = QuoteGraph(config)
+    graph.results()
+    graph.graph.take_recomputed()
+    return graph
+
+
+def test_phase_edit_skips_consolidated_chain():
+    config = QuoteConfig(calculation_methodology="Phase-wise", phases=PHASES)
+    graph = priced_graph(config)
+    config = replace(config, phases=(PHASES[0], Phase("P2", 25.0), PHASES[2]))
+    recomputed = graph.update(config)
+    assert not [name for name in recomputed if name.startswith(CONSOLIDATED_CHAIN)]
+    # Only the edited phase is repriced
+    assert 'phase[1]' in recomputed and 'phase[0]' not in recomputed and 'phase[2]' not in recomputed
+    assert graph.results()['competitive_cost'] == calculate_enhanced_project_costs(config)['competitive_cost']
+
+
+def test_consolidated_quote_ignores_phase_edits():
+    config = QuoteConfig(calculation_methodology="Consolidated", phases=PHASES)
+    graph = priced_graph(config)
+    assert graph.update(replace(config, phases=(PHASES[0], Phase("P2", 25.0), PHASES[2]))) == []
+
+
+def test_switching_methodology_prices_the_other_branch():
+    config = QuoteConfig(calculation_methodology="Phase-wise", phases=PHASES)
+    graph = priced_graph(config)
+    config = replace(config, calculation_methodology="Consolidated")
+    recomputed = graph.update(config)
+    assert 'consolidated_cost_sum' in recomputed and not [name for name in recomputed if name.startswith('phase')]
+    assert graph.results()['total_hours'] == calculate_enhanced_project_costs(config)['total_hours']
@@ -0,0 +1,43 @@
+from dc_estimator.engine import QuoteConfig, calculate_enhanced_project_costs
+from dc_estimator.history import QuoteHistory
+
+
+def recorded(tmp_path, *quotes):
+    history = QuoteHistory(str(tmp_path / "history.db"), flush_interval=0.0)
+    for created_at, client, session, config in quotes:
+        history.record(config, calculate_enhanced_project_costs(config), client=client,
+                       created_at=created_at, session=session)
+    history.flush()
+    return history
+
+
+def test_client_profile_ignores_the_asking_session(tmp_path):
+    config = QuoteConfig(it_capacity=30.0)
+    history = recorded(tmp_path,
+                       (1.0, "Acme  Power", "earlier", QuoteConfig(etap_model_available=True)),
+                       (2.0, "acme power", "current", config))
+    try:
+        profile = history.client_profile("ACME POWER", exclude_session="current")
+        assert profile.quotes == 1 and profile.repeat_customer and profile.etap_model_available
+        assert history.client_profile("Acme Power", exclude_session="earlier").etap_model_available is False
+        assert not history.client_profile("Someone Else").repeat_customer
+    finally:
+        history.close()
+
+
+def test_search_filters_and_awarded_flag(tmp_path):
+    history = recorded(tmp_path,
+                       (1.0, "Acme", None, QuoteConfig(it_capacity=10.0)),
+                       (2.0, "Acme", None, QuoteConfig(it_capacity=50.0)),
+                       (3.0, "Beta", None, QuoteConfig(it_capacity=20.0, tier_level="Tier IV")))
+    try:
+        assert history.count() == 3
+        assert [row['client'] for row in history.search()] == ["Beta", "Acme", "Acme"]
+        assert [row['client'] for row in history.search(latest_per_client=True)] == ["Beta", "Acme"]
+        assert len(history.search(tier_level="Tier IV")) == 1
+        newest_acme = history.search(client="acme")[0]
+        history.set_awarded(newest_acme['id'])
+        assert [row['id'] for row in history.search(awarded=True)] == [newest_acme['id']]
+        assert history.load(newest_acme['id'])['inputs']['it_capacity'] == 50.0
+    finally:
+        history.close()
@@ -0,0 +1,34 @@
+import io
+import math
+
+import pandas as pd
+
+from dc_estimator.engine import calculate_enhanced_project_costs
+from dc_estimator.ingest import OUTPUT_COLUMNS, frame_to_configs, price_quote_file
+
+QUOTES_CSV = b"""quote_id,total_load_mw,tier_level,delivery_type,studies,etap_discount_factor,additional_costs
+A,12,Tier IV,Urgent,load_flow;pdc,0.9,25000
+B,40,Tier II,Standard,,,
+C,3.5,Tier III,Standard,arc_flash,,1000
+"""
+
+
+def test_priced_file_matches_engine_row_by_row():
+    output = io.BytesIO()
+    # Chunks of one row, so every row is priced in its own batch
+    assert price_quote_file(io.BytesIO(QUOTES_CSV), output, 'csv', chunk_rows=1) == 3
+    priced = pd.read_csv(io.BytesIO(output.getvalue()), dtype={'quote_id': str})
+    assert list(priced.columns) == OUTPUT_COLUMNS
+    configs = dict(frame_to_configs(pd.read_csv(io.BytesIO(QUOTES_CSV))))
+    assert list(priced['quote_id']) == list(configs) == ["A", "B", "C"]
+    for row in priced.itertuples():
+        results = calculate_enhanced_project_costs(configs[row.quote_id])
+        assert row.estimated_buses == results['estimated_buses']
+        assert math.isclose(row.competitive_cost, results['competitive_cost'], rel_tol=1e-9)
+
+
+def test_blank_discount_means_not_offered():
+    configs = dict(frame_to_configs(pd.read_csv(io.BytesIO(QUOTES_CSV))))
+    assert configs["A"].etap_model_available and configs["A"].etap_discount_factor == 0.9
+    assert not configs["B"].etap_model_available
+    assert configs["A"].selected_studies == ("load_flow", "pdc")
@@ -0,0 +1,195 @@
+"""The fast pricing paths must agree with the scalar engine.
+
+``calculate_enhanced_project_costs`` is the reference. The vectorized batch,
+the incremental :class:`QuoteGraph`, the portfolio roll-ups and the cash-flow
+projection each re-derive the same figures another way; these tests price
+randomized quotes both ways and compare.
+"""
+
+import math
+import random
+from dataclasses import replace
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+from dc_estimator.batch import price_configs
+from dc_estimator.cashflow import default_phase_dates, project_cashflow
+from dc_estimator.engine import (
+    BUILTIN_RATE_CARD,
+    CLIENT_TYPES,
+    DELIVERY_TYPES,
+    PROJECT_TYPES,
+    REPORT_FORMATS,
+    STUDY_KEYS,
+    TIER_LEVELS,
+    Phase,
+    QuoteConfig,
+    calculate_enhanced_project_costs,
+)
+from dc_estimator.graph import QuoteGraph
+from dc_estimator.portfolio import Portfolio
+from dc_estimator.ratecard import default_rate_cards
+from dc_estimator.server import BATCH_FIELDS
+
+RATE_CARDS = (BUILTIN_RATE_CARD, *default_rate_cards().choices())
+
+
+def random_phases(rng: random.Random, count: int):
+    return tuple(Phase(f"Phase {index + 1}", round(rng.uniform(1.0, 40.0), 1),
+                       rng.choice((None, None, None, rng.randint(5, 80))))
+                 for index in range(count))
+
+
+def random_config(rng: random.Random, methodology=None) -> QuoteConfig:
+    methodology = methodology or rng.choice(("Consolidated", "Phase-wise"))
+    return QuoteConfig(
+        it_capacity=round(rng.uniform(1.0, 60.0), 1),
+        mechanical_load=round(rng.uniform(0.0, 30.0), 1),
+        house_load=round(rng.uniform(0.0, 10.0), 1),
+        custom_bus_count=rng.choice((None, None, None, rng.randint(10, 300))),
+        tier_level=rng.choice(TIER_LEVELS),
+        delivery_type=rng.choice(DELIVERY_TYPES),
+        project_type=rng.choice(PROJECT_TYPES),
+        calculation_methodology=methodology,
+        client_type=rng.choice(CLIENT_TYPES),
+        premium_factor=round(rng.uniform(1.0, 1.5), 2),
+        phases=random_phases(rng, rng.randint(1, 6)) if methodology == "Phase-wise" else (),
+        selected_studies=tuple(key for key in STUDY_KEYS if rng.random() < 0.7) or (rng.choice(STUDY_KEYS),),
+        base_report_costs={key: rng.choice((18000, 22000, 25000, 32000)) for key in STUDY_KEYS},
+        report_format=rng.choice(REPORT_FORMATS),
+        report_complexity_factor=round(rng.uniform(0.8, 1.5), 2),
+        typical_modeling_factor=round(rng.uniform(0.8, 1.5), 2),
+        etap_model_available=rng.random() < 0.5,
+        etap_discount_factor=round(rng.uniform(0.7, 1.0), 2),
+        repeat_customer=rng.random() < 0.5,
+        repeat_discount_factor=round(rng.uniform(0.7, 1.0), 2),
+        phase_extension_discount=round(rng.uniform(0.7, 1.0), 2),
+        overall_competitive_factor=round(rng.uniform(0.7, 1.0), 2),
+        additional_costs=rng.choice((0.0, 0.0, round(rng.uniform(1000, 200000), 2))),
+        rate_card=rng.choice(RATE_CARDS),
+    )
+
+
+def assert_same(actual, expected, path="results"):
+    """Nested dicts, lists and numbers equal up to floating-point rounding."""
+    if isinstance(expected, dict):
+        assert set(actual) == set(expected), path
+        for key in expected:
+            assert_same(actual[key], expected[key], f"{path}[{key!r}]")
+    elif isinstance(expected, (list, tuple)):
+        assert len(actual) == len(expected), path
+        for index, (left, right) in enumerate(zip(actual, expected)):
+            assert_same(left, right, f"{path}[{index}]")
+    elif isinstance(expected, (int, float)) and not isinstance(expected, bool):
+        assert math.isclose(actual, expected, rel_tol=1e-9, abs_tol=1e-6), f"{path}: {actual!r} != {expected!r}"
+    else:
+        assert actual == expected, f"{path}: {actual!r} != {expected!r}"
+
+
+@pytest.mark.parametrize('methodology', ["Consolidated", "Phase-wise"])
+def test_batch_matches_scalar(methodology):
+    rng = random.Random(15)
+    configs = [random_config(rng, methodology) for _ in range(300)]
+    priced = price_configs(configs)
+    for name in BATCH_FIELDS:
+        expected = [calculate_enhanced_project_costs(config)[name] for config in configs]
+        np.testing.assert_allclose(priced[name], expected, rtol=1e-9, atol=1e-6, err_msg=name)
+
+
+def test_graph_matches_engine():
+    rng = random.Random(12)
+    config = random_config(rng)
+    graph = QuoteGraph(config)
+    assert_same(graph.results(), calculate_enhanced_project_costs(config))
+    for _ in range(200):
+        # Mostly small edits, as in the UI, with an occasional jump to an unrelated quote
+        if rng.random() < 0.2:
+            config = random_config(rng)
+        else:
+            candidate = random_config(rng, config.calculation_methodology)
+            field = rng.choice(('tier_level', 'delivery_type', 'overall_competitive_factor', 'selected_studies',
+                                'base_report_costs', 'phases', 'rate_card', 'custom_bus_count', 'client_type',
+                                'additional_costs', 'etap_model_available'))
+            if field == 'phases' and config.phases and rng.random() < 0.5:
+                # Same phase count, one capacity changed: the incremental path
+                phases = list(config.phases)
+                index = rng.randrange(len(phases))
+                phases[index] = Phase(phases[index].name, round(rng.uniform(1.0, 40.0), 1), phases[index].bus_override)
+                candidate = replace(config, phases=tuple(phases))
+            else:
+                candidate = replace(config, **{field: getattr(candidate, field)})
+            config = candidate
+        graph.update(config)
+        assert_same(graph.results(), calculate_enhanced_project_costs(config))
+
+
+def build_portfolio(rng: random.Random, config: QuoteConfig):
+    records = [{'campus': f"Campus {campus}", 'building': f"Building {building}", 'phase': f"Phase {phase}",
+                'capacity': round(rng.uniform(1.0, 40.0), 1),
+                'bus_override': rng.choice((None, None, None, rng.randint(5, 80)))}
+               for campus in range(3) for building in range(3) for phase in range(rng.randint(1, 5))]
+    return Portfolio.from_records(config, records), records
+
+
+def rollups(portfolio: Portfolio):
+    return portfolio.totals(), portfolio.rows()
+
+
+def test_portfolio_rollups_match_recompute():
+    rng = random.Random(30)
+    portfolio, _ = build_portfolio(rng, random_config(rng, "Consolidated"))
+    for _ in range(300):
+        nodes = list(portfolio.root.walk())
+        leaves = [node for node in nodes if node.is_leaf]
+        action = rng.random()
+        if action < 0.5 and leaves:
+            portfolio.update_phase(rng.choice(leaves), capacity=round(rng.uniform(1.0, 40.0), 1),
+                                   bus_override=rng.choice((None, rng.randint(5, 80))))
+        elif action < 0.85:
+            portfolio.set_discounts(rng.choice(nodes), etap_model_available=rng.choice((None, True, False)),
+                                    repeat_customer=rng.choice((None, True, False)))
+        elif action < 0.95 and len(leaves) > 1:
+            portfolio.remove(rng.choice(leaves))
+        else:
+            building = rng.choice([node for node in nodes if node.level == "building"])
+            portfolio.add_phase(building, Phase(f"Added {rng.randrange(1000)}", round(rng.uniform(1.0, 40.0), 1)))
+
+    incremental = rollups(portfolio)
+    portfolio.recompute()
+    assert_same(incremental, rollups(portfolio))
+
+
+def test_portfolio_totals_match_engine():
+    rng = random.Random(31)
+    for _ in range(20):
+        config = random_config(rng, "Consolidated")
+        portfolio, records = build_portfolio(rng, config)
+        phases = tuple(Phase(record['phase'], record['capacity'], record['bus_override']) for record in records)
+        results = calculate_enhanced_project_costs(
+            replace(config, calculation_methodology="Phase-wise", phases=phases))
+        totals = portfolio.totals()
+        for name in ('estimated_buses', 'total_hours', 'standard_cost', 'competitive_cost', 'savings'):
+            expected = (sum(phase['buses'] for phase in results['phase_results'])
+                        if name == 'estimated_buses' else results[name])
+            assert math.isclose(totals[name], expected, rel_tol=1e-9, abs_tol=1e-6), name
+
+
+@pytest.mark.parametrize('methodology', ["Consolidated", "Phase-wise"])
+def test_cashflow_totals_match_engine(methodology):
+    rng = random.Random(40)
+    for _ in range(50):
+        config = random_config(rng, methodology)
+        start = date(2026, 1, 1) + timedelta(days=rng.randrange(365))
+        if methodology == "Phase-wise":
+            dates = default_phase_dates(len(config.phases), start, phase_weeks=rng.randint(2, 20))
+            config = replace(config, phases=tuple(Phase(phase.name, phase.capacity, phase.bus_override, first, last)
+                                                  for phase, (first, last) in zip(config.phases, dates)))
+        results = calculate_enhanced_project_costs(config)
+        projection = project_cashflow(config, results, start=start, end=start + timedelta(days=rng.randint(0, 400)),
+                                      escalation=0.0)
+        assert math.isclose(projection.standard_cost.sum(), results['standard_cost'], rel_tol=1e-9)
+        assert math.isclose(projection.competitive_cost.sum(), results['competitive_cost'], rel_tol=1e-9)
+        assert math.isclose(projection.receipts.sum(), results['competitive_cost'], rel_tol=1e-9)
+        assert math.isclose(projection.hours.sum(), results['total_hours'], rel_tol=1e-9)
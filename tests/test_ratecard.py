@@ -0,0 +1,42 @@
+import os
+
+import pytest
+
+from dc_estimator.engine import BUILTIN_RATE_CARD
+from dc_estimator.ratecard import RateCardRegistry, parse_rate_card, rate_card_dict, write_rate_card
+
+
+def card_data(version="2026-Q1", effective_from="2026-01-01", **changes):
+    return {**rate_card_dict(BUILTIN_RATE_CARD), 'version': version, 'effective_from': effective_from, **changes}
+
+
+def test_rate_card_round_trips():
+    card = parse_rate_card(card_data())
+    assert rate_card_dict(card) == card_data()
+
+
+@pytest.mark.parametrize('changes, message', [
+    ({'resource_split': {"L1": 0.5, "L2": 0.5, "L3": 0.5}}, "resource_split must sum to 1"),
+    ({'resource_rates': {"L1": 1200, "L2": "750", "L3": 500}}, "resource_rates['L2']"),
+    ({'tier_complexity': {"Tier I": 1.0}}, "tier_complexity must define exactly"),
+    ({'version': "../escape"}, "version may only contain"),
+])
+def test_invalid_rate_cards_are_rejected(changes, message):
+    with pytest.raises(ValueError, match=message.replace("[", r"\[")):
+        parse_rate_card(card_data(**changes))
+
+
+def test_registry_picks_card_in_force_and_keeps_last_good_file(tmp_path):
+    registry = RateCardRegistry(str(tmp_path))
+    assert registry.in_force("2026-06-01") is BUILTIN_RATE_CARD
+    for version, effective_from in (("2026-Q1", "2026-01-01"), ("2026-Q3", "2026-07-01")):
+        write_rate_card(parse_rate_card(card_data(version, effective_from)), str(tmp_path / f"{version}.json"))
+    assert registry.versions() == ["2026-Q1", "2026-Q3"]
+    assert registry.in_force("2026-06-01").version == "2026-Q1"
+    assert registry.in_force("2026-07-01").version == "2026-Q3"
+
+    broken = tmp_path / "2026-Q3.json"
+    broken.write_text("{not json")
+    os.utime(broken, ns=(0, 1))
+    assert registry.versions() == ["2026-Q1", "2026-Q3"]
+    assert str(broken) in registry.errors
@@ -0,0 +1,45 @@
+import pytest
+
+from dc_estimator.engine import QuoteConfig, calculate_enhanced_project_costs
+from dc_estimator.scenarios import ScenarioWorkspace
+
+
+def test_only_new_inputs_are_priced():
+    workspace = ScenarioWorkspace()
+    workspace.save("Base", QuoteConfig(it_capacity=20.0))
+    workspace.save("Urgent", QuoteConfig(it_capacity=20.0, delivery_type="Urgent"))
+    workspace.save("Copy of base", QuoteConfig(it_capacity=20.0))
+    workspace.price()
+    assert workspace.last_priced == 2
+
+    workspace.rename("Urgent", "Rush")
+    workspace.price()
+    assert workspace.last_priced == 0
+    assert workspace.names == ["Base", "Rush", "Copy of base"]
+
+    workspace.update("Rush", overall_competitive_factor=0.8)
+    figures = workspace.price()
+    assert workspace.last_priced == 1
+    expected = calculate_enhanced_project_costs(workspace.get("Rush"))
+    assert figures["Rush"]['competitive_cost'] == pytest.approx(expected['competitive_cost'])
+
+
+def test_comparison_against_baseline():
+    workspace = ScenarioWorkspace()
+    workspace.save("Base", QuoteConfig(it_capacity=20.0))
+    workspace.save("Tier IV", QuoteConfig(it_capacity=20.0, tier_level="Tier IV"))
+    base, tier_iv = workspace.comparison()
+    assert base['baseline'] and base['standard_cost_delta'] == 0 and base['changes'] == ""
+    assert tier_iv['standard_cost_delta'] == pytest.approx(tier_iv['standard_cost'] - base['standard_cost'])
+    assert tier_iv['changes'] == "Tier: Tier III → Tier IV"
+    with pytest.raises(ValueError, match="Unknown baseline"):
+        workspace.comparison("Missing")
+
+
+def test_removing_the_baseline_promotes_the_next_scenario():
+    workspace = ScenarioWorkspace()
+    workspace.save("A", QuoteConfig())
+    workspace.save("B", QuoteConfig(repeat_customer=True))
+    workspace.remove("A")
+    assert workspace.baseline == "B"
+    assert "B · repeat customer off" in workspace.variants("B")
@@ -0,0 +1,45 @@
+import pytest
+
+from dc_estimator.engine import BUILTIN_RATE_CARD
+from dc_estimator.scheduling import OVERTIME_PREMIUM, StaffingProject, TeamCapacity, schedule, urgency_surcharge
+
+TEAM = TeamCapacity({'L1': 1, 'L2': 1, 'L3': 1}, hours_per_week=40)
+
+
+def project(name, hours, deadline, release=0):
+    return StaffingProject(name, {'L1': hours, 'L2': hours, 'L3': hours}, deadline, release)
+
+
+def test_earliest_deadline_goes_first():
+    plan = schedule([project("late-due", 80, 4), project("early-due", 40, 1)], TEAM)
+    assert plan.start == [1, 0] and plan.finish == [3, 1]
+    assert plan.late_projects == 0
+    assert plan.utilization() == {'L1': 1.0, 'L2': 1.0, 'L3': 1.0}
+
+
+def test_release_week_and_idle_weeks():
+    plan = schedule([project("later", 40, 6, release=3)], TEAM)
+    assert plan.start == [3] and plan.finish == [4]
+    assert plan.weekly_hours['L1'] == [0.0, 0.0, 0.0, 40.0]
+
+
+def test_max_share_caps_one_project():
+    plan = schedule([project("big", 80, 10)], TeamCapacity({'L1': 1, 'L2': 1, 'L3': 1}, 40, max_share=0.5))
+    assert plan.finish == [4]
+
+
+def test_no_capacity_for_a_level_is_an_error():
+    with pytest.raises(ValueError, match="No L3 capacity"):
+        schedule([project("a", 10, 2)], TeamCapacity({'L1': 1, 'L2': 1}))
+
+
+def test_surcharge_prices_the_overtime_a_quote_causes():
+    existing = [project("booked", 40, 1)]
+    assert urgency_surcharge(existing, TEAM, project("roomy", 40, 3)).multiplier == 1.0
+
+    surcharge = urgency_surcharge(existing, TEAM, project("rush", 40, 1))
+    # Either project slips a week; the rush quote's 40 h per level become overtime
+    assert surcharge.overtime_hours == {'L1': 40, 'L2': 40, 'L3': 40}
+    rates = BUILTIN_RATE_CARD.resource_rates
+    assert surcharge.overtime_cost == pytest.approx(40 * OVERTIME_PREMIUM * sum(rates.values()))
+    assert surcharge.multiplier == pytest.approx(1 + OVERTIME_PREMIUM)
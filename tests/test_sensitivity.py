@@ -0,0 +1,22 @@
+import pytest
+
+from dc_estimator.engine import QuoteConfig, calculate_enhanced_project_costs
+from dc_estimator.sensitivity import FACTOR_SWITCHES, sensitivity_analysis
+
+ALL_ON = dict(client_type="Premium", etap_model_available=True, repeat_customer=True, project_type="Phase Extension")
+
+
+@pytest.mark.parametrize('config', [QuoteConfig(it_capacity=20.0), QuoteConfig(it_capacity=20.0, **ALL_ON)])
+def test_every_range_contains_the_current_cost(config):
+    current = calculate_enhanced_project_costs(config)['competitive_cost']
+    for factor in sensitivity_analysis(config):
+        assert factor.low_cost <= current * (1 + 1e-9) and factor.high_cost >= current * (1 - 1e-9), factor.name
+
+
+def test_switched_off_factors_are_left_out():
+    names = {factor.name for factor in sensitivity_analysis(QuoteConfig(it_capacity=20.0))}
+    assert not names & FACTOR_SWITCHES.keys()
+    assert {'overall_competitive_factor', 'tier_level', 'delivery_type'} <= names
+
+    names = {factor.name for factor in sensitivity_analysis(QuoteConfig(it_capacity=20.0, **ALL_ON))}
+    assert FACTOR_SWITCHES.keys() <= names
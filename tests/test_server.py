@@ -0,0 +1,101 @@
+import asyncio
+import json
+
+import pytest
+
+from dc_estimator.engine import QuoteConfig, calculate_enhanced_project_costs
+from dc_estimator.ratecard import default_rate_cards
+from dc_estimator.server import BATCH_FIELDS, HTTPError, QuoteServer
+
+
+def post(path, payload):
+    return asyncio.run(QuoteServer().handle('POST', path, json.dumps(payload).encode()))
+
+
+def test_batch_prices_each_quote_like_the_engine():
+    quotes = [{'it_capacity': 12}, {'it_capacity': 40, 'tier_level': "Tier IV", 'repeat_customer': True}]
+    status, payload, priced = post('/quotes', {'quotes': quotes})
+    assert (status, priced) == (200, 2)
+    rate_card = default_rate_cards().in_force()
+    for quote, row in zip(quotes, payload['quotes']):
+        expected = calculate_enhanced_project_costs(QuoteConfig.from_dict({**quote, 'rate_card': rate_card}))
+        assert set(row) == set(BATCH_FIELDS)
+        assert row['competitive_cost'] == pytest.approx(expected['competitive_cost'])
+
+
+@pytest.mark.parametrize('method, path, status', [('GET', '/missing', 404), ('GET', '/quote', 405)])
+def test_routing_errors(method, path, status):
+    with pytest.raises(HTTPError) as error:
+        asyncio.run(QuoteServer().handle(method, path, b""))
+    assert error.value.status == status
+
+
+@pytest.mark.parametrize('payload, field', [
+    ({'it_capacity': "abc"}, "it_capacity"),
+    ({'overall_competitive_factor': None}, "overall_competitive_factor"),
+    ({'custom_bus_count': 12.5}, "custom_bus_count"),
+    ({'calculation_methodology': "Phase-wise", 'phases': [{'name': "P1", 'capacity': "x"}]}, "capacity"),
+    ({'calculation_methodology': "Phase-wise", 'phases': [{'name': "P1", 'capacity': 5, 'bus_override': "many"}]},
+     "bus_override"),
+])
+def test_bad_field_is_a_400_naming_it(payload, field):
+    with pytest.raises(HTTPError) as error:
+        post('/quote', payload)
+    assert error.value.status == 400
+    assert field in str(error.value)
+
+
+def test_bad_batch_quote_names_its_index():
+    with pytest.raises(HTTPError) as error:
+        post('/quotes', {'quotes': [{}, {'house_load': "5 MW"}]})
+    assert error.value.status == 400
+    assert "quotes[1]" in str(error.value) and "house_load" in str(error.value)
+
+
+def test_whole_float_bus_counts_are_accepted():
+    config = QuoteConfig.from_dict({'custom_bus_count': 40.0})
+    assert config.custom_bus_count == 40 and isinstance(config.custom_bus_count, int)
+
+
+def test_bad_quote_keeps_the_connection_open():
+    async def exchange():
+        server = await asyncio.start_server(QuoteServer().serve_connection, '127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        responses = []
+        for body in (b'{"calculation_methodology": "Phase-wise", "phases": [{"name": "P1", "capacity": "x"}]}',
+                     b'{"it_capacity": 20}'):
+            writer.write(b"POST /quote HTTP/1.1\r\nContent-Length: %d\r\n\r\n" % len(body) + body)
+            await writer.drain()
+            status = (await reader.readline()).decode()
+            headers = {}
+            while (line := await reader.readline()) != b'\r\n':
+                name, _, value = line.decode().partition(':')
+                headers[name.lower()] = value.strip()
+            payload = json.loads(await reader.readexactly(int(headers['content-length'])))
+            responses.append((status.split()[1], headers['connection'], payload))
+        writer.close()
+        server.close()
+        await server.wait_closed()
+        return responses
+
+    (bad_status, bad_connection, bad_payload), (good_status, _, good_payload) = asyncio.run(exchange())
+    assert (bad_status, bad_connection) == ("400", "keep-alive")
+    assert "capacity" in bad_payload['error']
+    assert good_status == "200" and good_payload['competitive_cost'] > 0
+
+
+def test_garbled_request_line_is_malformed():
+    async def exchange():
+        server = await asyncio.start_server(QuoteServer().serve_connection, '127.0.0.1', 0)
+        reader, writer = await asyncio.open_connection('127.0.0.1', server.sockets[0].getsockname()[1])
+        writer.write(b"NONSENSE\r\n\r\n")
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+        server.close()
+        await server.wait_closed()
+        return response
+
+    response = asyncio.run(exchange())
+    assert response.startswith(b"HTTP/1.1 400") and b"Connection: close" in response
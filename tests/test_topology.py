@@ -0,0 +1,36 @@
+import io
+
+from dc_estimator.topology import parse_topology
+
+NESTED_XML = b"""<?xml version="1.0"?>
+<Network Name="Campus">
+  <Bus ID="B1" kV="33"/>
+  <Bus ID="B2"><kV>11</kV></Bus>
+  <Bus ID="B3" kV="11">
+    <Breaker ID="CB1"/>
+    <Load ID="L1"/>
+  </Bus>
+  <Switch ID="S1"/>
+  <Cable ID="C1" kV="0.4"/>
+</Network>
+"""
+
+
+def test_xml_counts_elements_nested_under_buses():
+    summary = parse_topology(io.BytesIO(NESTED_XML), 'xml')
+    assert summary.buses == 3
+    assert summary.protective_devices == 1
+    assert summary.loads == 1
+    assert summary.branches == 1
+    assert summary.buses_by_voltage == {33.0: 1, 11.0: 2}
+    # The <Network> wrapper is not an element; the unrecognised <Switch> is, as a CSV row would be
+    assert summary.elements == 7
+    assert 'Network' not in summary.equipment
+
+
+def test_csv_and_xml_count_the_same_elements():
+    csv = (b"ID,Type,kV\nB1,Bus,33\nB2,Bus,11\nB3,Bus,11\nCB1,Breaker,\nL1,Load,\nS1,Switch,\nC1,Cable,0.4\n")
+    from_csv = parse_topology(io.BytesIO(csv), 'csv')
+    from_xml = parse_topology(io.BytesIO(NESTED_XML), 'xml')
+    assert (from_csv.elements, from_csv.buses, from_csv.equipment) == (
+        from_xml.elements, from_xml.buses, from_xml.equipment)